@@ -14,11 +14,31 @@ from app.db.database import get_db
 from app.db.models import User
 from app.core.security import verify_token
 from app.core.cache import is_token_blacklisted, get_cached_user
+from app.core.auth_cache import principal_cache
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+# User columns carried by a cached principal (enough to rebuild a detached User)
+_PRINCIPAL_FIELDS = (
+    "email", "hashed_password", "full_name", "role", "is_active",
+    "oauth_provider", "google_id", "profile_picture", "name_manually_edited",
+    "created_at", "updated_at",
+)
+
+
+def _principal_from_user(user: User) -> dict:
+    principal = {field: getattr(user, field, None) for field in _PRINCIPAL_FIELDS}
+    principal["id"] = str(user.id)
+    return principal
+
+
+def _user_from_principal(principal: dict) -> User:
+    # Detached instance: fine for read-only auth checks, re-query to modify
+    return User(id=UUID(principal["id"]), **{f: principal[f] for f in _PRINCIPAL_FIELDS})
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -26,9 +46,13 @@ async def get_current_user(
     """
     Dependency to get current authenticated user from JWT token
     
-    Enhanced with Redis:
-    - Checks if token is blacklisted (logout)
-    - Tries to get user from cache before database query
+    Lookup order:
+    - In-process principal cache (verified token -> user), bounded by token
+      expiry and AUTH_CACHE_TTL_SECONDS, evicted via Redis pub/sub on logout
+      and user changes
+    - JWT verification + blacklist check (local Bloom filter, Redis
+      only on a possible hit)
+    - Redis user cache, then database
     
     Args:
         token: JWT access token from Authorization header
@@ -40,63 +64,44 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid, blacklisted, or user not found
     """
-    print("\n" + "="*50)
-    print("[AUTH] Starting get_current_user...")
-    
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return _user_from_principal(principal)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Check if token is blacklisted (logout)
-    try:
-        print("[LOG] Checking if token is blacklisted...")
-        if is_token_blacklisted(token):
-            print(f"[ERR] Token is blacklisted")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        print("[OK] Token is not blacklisted")
-    except Exception as e:
-        # If blacklist check fails (Redis down), allow the token through
-        print(f"[WARN]  Blacklist check failed, allowing token: {e}")
-    
     # Verify token
-    print("[LOG] Calling verify_token...")
     payload = verify_token(token, token_type="access")
     if payload is None:
-        print(f"[ERR] Token verification failed")
         raise credentials_exception
-    print(f"[OK] Token payload received: {payload}")
+    
+    # Check if token is blacklisted (logout), keyed by its jti
+    # If the check itself fails (Redis down), the token is allowed through
+    if is_token_blacklisted(token, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     # Extract user ID - try 'user_id' first, then fall back to 'sub'
     # Note: Token was created with user_id as UUID and sub as email
     user_id_str: Optional[str] = payload.get("user_id") or payload.get("sub")
-    print(f"[LOG] User ID from token: {user_id_str}")
     if user_id_str is None:
-        print("[ERR] No 'user_id' or 'sub' field in token payload")
         raise credentials_exception
     
     try:
         user_id = UUID(user_id_str)
-        print(f"[OK] User UUID: {user_id}")
-    except ValueError as e:
-        print(f"[ERR] Invalid UUID format: {e}")
+    except ValueError:
         raise credentials_exception
     
     # Try to get user from Redis cache first
-    print(f"[LOG] Checking cache for user {user_id}...")
-    try:
-        cached_user_data = get_cached_user(user_id)
-    except Exception as e:
-        print(f"[WARN]  Cache lookup failed, falling back to DB: {e}")
-        cached_user_data = None
+    cached_user_data = get_cached_user(user_id)
     if cached_user_data:
-        print(f"[OK] User found in cache")
-        # Reconstruct User object from cached data
         user = User(
             id=UUID(cached_user_data["id"]),
             email=cached_user_data["email"],
@@ -107,28 +112,21 @@ async def get_current_user(
         )
         # Note: This is a detached instance, won't track changes
         # For read-only operations (most auth checks), this is fine
-        print(f"[OK] get_current_user completed successfully (from cache)")
-        print("="*50 + "\n")
+        principal_cache.put(token, _principal_from_user(user), payload.get("exp"))
         return user
     
     # Cache miss - get user from database
-    print(f"[LOG] Cache miss, querying database for user {user_id}...")
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        print(f"[ERR] User {user_id} not found in database!")
         raise credentials_exception
-    print(f"[OK] User found in database: {user.email}")
     
     if not user.is_active:
-        print(f"[ERR] User {user.email} is not active")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
-    print(f"[OK] User {user.email} is active")
-    
-    print(f"[OK] get_current_user completed successfully")
-    print("="*50 + "\n")
+
+    principal_cache.put(token, _principal_from_user(user), payload.get("exp"))
     return user
 
 
@@ -16,6 +16,8 @@ from app.db.models import Alert, Session as DBSession, User
 from app.schemas.eeg import AlertData, AlertResponse, AlertUpdate, AlertList
 from app.api.dependencies import get_current_user
 from app.core.rate_limiter import limiter, LIMIT_READ, LIMIT_WRITE
+from app.core import cache_events
+from app.core.session_summary import resummarize_debounced
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
@@ -172,6 +174,9 @@ async def create_alert(
     # Update session alert count
     session.alert_count = (session.alert_count or 0) + 1
     db.commit()
+    cache_events.emit(cache_events.ALERT_CREATED, session_id=session.id, user_id=session.user_id)
+    if session.session_status == "completed":
+        resummarize_debounced(session.id)
     
     return alert
 
@@ -206,11 +211,10 @@ async def update_alert(
             detail=f"Alert {alert_id} not found"
         )
     
-    # Verify ownership
-    if current_user.role not in ("admin", "researcher"):
-        session = db.query(DBSession).filter(DBSession.id == alert.session_id).first()
-        if not session or session.user_id != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    # Verify ownership (owner id is also needed for cache events)
+    owner_id = db.query(DBSession.user_id).filter(DBSession.id == alert.session_id).scalar()
+    if current_user.role not in ("admin", "researcher") and owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
     # Update fields
     if update_data.acknowledged is not None:
@@ -221,6 +225,8 @@ async def update_alert(
     
     db.commit()
     db.refresh(alert)
+    cache_events.emit(cache_events.ALERT_UPDATED, session_id=alert.session_id, user_id=owner_id)
+    resummarize_debounced(alert.session_id)
     
     return alert
 
@@ -250,14 +256,16 @@ async def delete_alert(
             detail=f"Alert {alert_id} not found"
         )
 
-    # Verify ownership
-    if current_user.role not in ("admin", "researcher"):
-        session = db.query(DBSession).filter(DBSession.id == alert.session_id).first()
-        if not session or session.user_id != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    # Verify ownership (owner id is also needed for cache events)
+    owner_id = db.query(DBSession.user_id).filter(DBSession.id == alert.session_id).scalar()
+    if current_user.role not in ("admin", "researcher") and owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
+    session_id = alert.session_id
     db.delete(alert)
     db.commit()
+    cache_events.emit(cache_events.ALERT_DELETED, session_id=session_id, user_id=owner_id)
+    resummarize_debounced(session_id)
     
     return None
 
@@ -19,10 +19,12 @@ from app.db.models import User
 from app.schemas.auth import Token, LoginRequest, RegisterRequest, RefreshTokenRequest, GoogleAuthRequest
 from app.schemas.user import UserResponse, ForgotPasswordRequest, ResetPasswordRequest
 from app.core.redis import get_redis
-from app.core.password import hash_password, verify_password
+from app.core.password import hash_password_async, verify_password_async, needs_rehash
 from app.core.security import create_access_token, create_refresh_token, verify_token
 from app.core.config import settings
-from app.core.cache import cache_user_session, blacklist_token, blacklist_refresh_token, invalidate_user_cache
+from app.core.cache import (
+    cache_user_session, blacklist_token, blacklist_refresh_token, invalidate_user_cache, is_token_blacklisted
+)
 from app.core.firebase import verify_firebase_token, is_firebase_available
 from app.api.dependencies import get_current_user, oauth2_scheme
 from app.core.rate_limiter import limiter, LIMIT_AUTH, LIMIT_READ
@@ -62,7 +64,7 @@ async def register(
         )
     
     # Create new user
-    hashed_pwd = hash_password(user_data.password)
+    hashed_pwd = await hash_password_async(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_pwd,
@@ -97,7 +99,7 @@ async def login(
     # Find user by email (username field contains email)
     user = db.query(User).filter(User.email == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -109,6 +111,11 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user account"
         )
+
+    # Upgrade the hash if BCRYPT_ROUNDS changed since it was created
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(form_data.password)
+        db.commit()
     
     # Create tokens with user info
     token_data = {
@@ -155,7 +162,7 @@ async def login_json(
     # Find user by email
     user = db.query(User).filter(User.email == login_data.email).first()
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -167,6 +174,11 @@ async def login_json(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user account"
         )
+
+    # Upgrade the hash if BCRYPT_ROUNDS changed since it was created
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(login_data.password)
+        db.commit()
     
     # Create tokens with user info
     token_data = {
@@ -212,7 +224,7 @@ async def refresh_token_endpoint(
     # Verify refresh token
     payload = verify_token(refresh_data.refresh_token, token_type="refresh")
     
-    if payload is None:
+    if payload is None or is_token_blacklisted(refresh_data.refresh_token, payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
@@ -231,7 +243,7 @@ async def refresh_token_endpoint(
         )
     
     # Blacklist old refresh token (prevent reuse)
-    blacklist_refresh_token(refresh_data.refresh_token)
+    blacklist_refresh_token(refresh_data.refresh_token, payload)
     
     # Create new tokens with user info
     token_data = {
@@ -494,7 +506,7 @@ async def reset_password(
             detail="Akun tidak ditemukan atau menggunakan OAuth."
         )
 
-    user.hashed_password = hash_password(data.new_password)
+    user.hashed_password = await hash_password_async(data.new_password)
     db.commit()
 
     # Delete the reset token
@@ -5,6 +5,8 @@ Week 3, Monday - EEG Data Relay System
 """
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from typing import Dict
 from uuid import UUID
 from datetime import datetime
@@ -13,7 +15,8 @@ from app.db.models import User
 from app.schemas.eeg import EEGStreamData, EEGDataPoint
 from app.api.websocket_manager import manager
 from app.api.dependencies import get_current_user, get_eeg_or_user_auth
-from app.core.eeg_relay import relay_eeg_to_clients, save_eeg_to_database
+from app.core.eeg_ingest import EEGRecord, parse_eeg_record
+from app.core.eeg_relay import relay_eeg_frame, relay_eeg_to_clients, save_eeg_to_database
 from app.core.rate_limiter import limiter, LIMIT_STREAM, LIMIT_READ
 
 router = APIRouter(prefix="/eeg", tags=["EEG Data"])
@@ -22,12 +25,24 @@ router = APIRouter(prefix="/eeg", tags=["EEG Data"])
 # Track active sessions receiving EEG data
 active_eeg_sessions: Dict[str, datetime] = {}
 
+# Latest pipeline stage timings per session (EEG server --send-timings)
+eeg_pipeline_health: Dict[str, dict] = {}
 
-@router.post("/stream", status_code=status.HTTP_200_OK)
+
+@router.post(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    # Body is read manually (see below); document it as EEGStreamData
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": EEGStreamData.model_json_schema()}},
+        }
+    },
+)
 @limiter.limit(LIMIT_STREAM)
 async def receive_eeg_stream(
     request: Request,
-    data: EEGStreamData,
     background_tasks: BackgroundTasks,
     _auth = Depends(get_eeg_or_user_auth),
 ):
@@ -40,32 +55,57 @@ async def receive_eeg_stream(
     
     **Data Flow**: Python LSL → HTTP POST → FastAPI → WebSocket → Browser
     
-    **Request Body**:
+    **Request Body** (`EEGStreamData`):
     - session_id: UUID of active driving session
     - timestamp: ISO format timestamp
     - sample_rate: Sampling rate (e.g., 256 Hz)
     - channels: EEG channel data (TP9, AF7, AF8, TP10)
     - processed: Processed metrics (theta/alpha power, fatigue score)
+    - timings: Optional per-stage processing times (ms), shown in /eeg/status
+    
+    Requests with a valid `X-EEG-API-Key` (our own EEG server) skip Pydantic
+    validation: the body is parsed once into an `EEGRecord` that is relayed
+    pre-encoded and buffered as-is for the batch insert.
     
     **Returns**:
     - status: "received"
     - clients_notified: Number of WebSocket clients that received the data
     """
-    session_id_str = str(data.session_id)
+    body = await request.body()
+    try:
+        if _auth == "eeg_internal":
+            record = parse_eeg_record(body)
+        else:
+            record = EEGRecord.from_stream_data(EEGStreamData.model_validate_json(body))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(), body=body)
+    except ValueError as e:
+        raise RequestValidationError(
+            [{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}], body=body
+        )
+
+    session_id_str = str(record.session_id)
     
     # Update session activity timestamp
     active_eeg_sessions[session_id_str] = datetime.now()
+    if record.timings:
+        eeg_pipeline_health[session_id_str] = {
+            "timings_ms": record.timings,
+            # "acquire" is mostly the idle wait for the next hop, not work
+            "total_ms": round(sum(ms for stage, ms in record.timings.items() if stage != "acquire"), 3),
+            "timestamp": record.timestamp_raw,
+        }
     
-    # Relay to WebSocket clients (non-blocking)
-    clients_notified = await relay_eeg_to_clients(session_id_str, data.dict())
+    # Relay to WebSocket clients (non-blocking), encoded once for all of them
+    clients_notified = await relay_eeg_frame(session_id_str, record.relay_frame())
     
     # Save to database in background (optional)
-    if data.save_to_db:
-        background_tasks.add_task(save_eeg_to_database, data)
+    if record.save_to_db:
+        background_tasks.add_task(save_eeg_to_database, record)
     
     return {
         "status": "received",
-        "timestamp": data.timestamp,
+        "timestamp": record.timestamp_raw,
         "clients_notified": clients_notified
     }
 
@@ -111,8 +151,9 @@ async def get_eeg_status():
     """
     Get status of EEG data flow
     
-    Returns information about active sessions receiving EEG data
-    and connected WebSocket clients.
+    Returns information about active sessions receiving EEG data,
+    connected WebSocket clients and, for EEG servers started with
+    --send-timings, the latest per-stage pipeline timings.
     """
     # Get WebSocket connection stats
     ws_stats = {
@@ -134,7 +175,8 @@ async def get_eeg_status():
         "last_activity": {
             session_id: timestamp.isoformat()
             for session_id, timestamp in active_eeg_sessions.items()
-        }
+        },
+        "pipeline": eeg_pipeline_health
     }
 
 
@@ -152,6 +194,7 @@ async def stop_eeg_session(
     
     if session_id_str in active_eeg_sessions:
         del active_eeg_sessions[session_id_str]
+        eeg_pipeline_health.pop(session_id_str, None)
         
         # Notify connected clients that EEG stream stopped
         await manager.broadcast_to_session(
@@ -8,38 +8,38 @@ import csv
 import io
 import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+import os
+import re
+import zipfile
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 from datetime import datetime
 
-from app.db.database import get_db
+from app.core.config import settings
+from app.db.database import get_db, SessionLocal
 from app.db.models import (
     User, Session as SessionModel, EEGData, FaceDetectionEvent, GameEvent, Alert
 )
 from app.api.dependencies import get_current_user
+from app.core.session_lookup import SessionRef, get_owned_session
+from app.core.export_jobs import export_jobs, artifact_key, MEDIA_TYPES, JOB_COMPLETED
+from app.core.rate_limiter import limiter, LIMIT_EXPORT, LIMIT_READ
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/sessions", tags=["Data Export"])
 
 
-def _get_user_session(session_id: UUID, current_user: User, db: Session) -> SessionModel:
-    """Helper: get session and verify ownership"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    if session.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this session"
-        )
-    return session
+def _get_user_session(session_id: UUID, current_user: User, db: Session) -> SessionRef:
+    """Helper: get session and verify ownership (read-through cached)"""
+    return get_owned_session(db, session_id, current_user)
 
 
 # -- EEG column definitions --------------------------
@@ -100,39 +100,48 @@ def _generate_csv(rows: list[dict], columns: list[str]):
     return output
 
 
-@router.get("/{session_id}/export")
-async def export_session_data(
-    session_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    format: str = Query("csv", description="Export format: csv or json"),
-    data_type: str = Query("eeg", description="Data type: eeg, face, game, alert, or all"),
-    start_time: Optional[datetime] = Query(None, description="Filter from timestamp"),
-    end_time: Optional[datetime] = Query(None, description="Filter to timestamp"),
-):
-    """
-    Export session data as CSV or JSON file download.
-    
-    - **format**: `csv` or `json`
-    - **data_type**: `eeg`, `face`, `game`, `alert`, or `all`
-    - **start_time** / **end_time**: optional time-range filter
-    """
-    # Validate params
-    if format not in ("csv", "json"):
+VALID_FORMATS = ("csv", "json")
+VALID_DATA_TYPES = ("eeg", "face", "game", "alert", "all")
+
+# Single "bytes=start-end" range; multi-range requests get the full file
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def _validate_export_params(format: str, data_type: str) -> None:
+    """Reject unsupported format / data_type values with 400"""
+    if format not in VALID_FORMATS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="format must be 'csv' or 'json'"
         )
-    valid_types = ("eeg", "face", "game", "alert", "all")
-    if data_type not in valid_types:
+    if data_type not in VALID_DATA_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"data_type must be one of: {', '.join(valid_types)}"
+            detail=f"data_type must be one of: {', '.join(VALID_DATA_TYPES)}"
         )
 
-    session_obj = _get_user_session(session_id, current_user, db)
+
+def _export_filename(session_obj: SessionModel, data_type: str, format: str) -> str:
     session_name = session_obj.session_name.replace(" ", "_")
+    return f"{session_name}_{data_type}.{format}"
+
 
+def _build_export_content(
+    db: Session,
+    *,
+    session_id: UUID,
+    session_name: str,
+    format: str,
+    data_type: str,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+) -> bytes:
+    """
+    Query the requested tables and render the export file.
+
+    Used both inline by the export endpoint and by background export jobs.
+    """
     # -- Gather requested data ------------------------
     export_data = {}
 
@@ -152,25 +161,19 @@ async def export_session_data(
         rows = _query_data(db, Alert, session_id, start_time, end_time)
         export_data["alert"] = _rows_to_dicts(rows, ALERT_COLUMNS)
 
-    # -- Format and return ----------------------------
+    # -- Format ---------------------------------------
     if format == "json":
         content = json.dumps(
             {
                 "session_id": str(session_id),
-                "session_name": session_obj.session_name,
+                "session_name": session_name,
                 "exported_at": datetime.utcnow().isoformat(),
                 "data": export_data,
             },
             indent=2,
             default=str,
         )
-        return StreamingResponse(
-            iter([content]),
-            media_type="application/json",
-            headers={
-                "Content-Disposition": f'attachment; filename="{session_name}_{data_type}.json"'
-            },
-        )
+        return content.encode("utf-8")
 
     # CSV — for "all" we combine into one CSV with a type column
     if data_type == "all":
@@ -195,10 +198,464 @@ async def export_session_data(
         rows = export_data[data_type]
         csv_stream = _generate_csv(rows, column_map[data_type])
 
+    return csv_stream.getvalue().encode("utf-8")
+
+
+def _serve_artifact(request: Request, path: str, media_type: str, filename: str):
+    """
+    Serve a cached export file, honouring a single `Range: bytes=` header.
+
+    `Content-Encoding: identity` keeps GZipMiddleware from compressing the
+    body, so byte offsets always refer to the file on disk.
+    """
+    file_size = os.path.getsize(path)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+        "Content-Encoding": "identity",
+    }
+
+    match = _RANGE_RE.match(request.headers.get("range", "").strip())
+    if not match or match.groups() == ("", ""):
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: last N bytes
+        start = max(file_size - int(last), 0)
+        end = file_size - 1 if int(last) > 0 else -1
+    else:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+
+    def _iter_range():
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(_RANGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_range(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@router.get("/{session_id}/export")
+async def export_session_data(
+    request: Request,
+    session_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    format: str = Query("csv", description="Export format: csv or json"),
+    data_type: str = Query("eeg", description="Data type: eeg, face, game, alert, or all"),
+    start_time: Optional[datetime] = Query(None, description="Filter from timestamp"),
+    end_time: Optional[datetime] = Query(None, description="Filter to timestamp"),
+):
+    """
+    Export session data as CSV or JSON file download.
+    
+    - **format**: `csv` or `json`
+    - **data_type**: `eeg`, `face`, `game`, `alert`, or `all`
+    - **start_time** / **end_time**: optional time-range filter
+
+    Exports of completed sessions are cached; repeated downloads are served
+    from the artifact cache and support `Range` requests. For large exports
+    prefer `POST /sessions/{session_id}/export/jobs`.
+    """
+    _validate_export_params(format, data_type)
+
+    session_obj = _get_user_session(session_id, current_user, db)
+    filename = _export_filename(session_obj, data_type, format)
+    build = partial(
+        _build_export_content,
+        session_id=session_id,
+        session_name=session_obj.session_name,
+        format=format,
+        data_type=data_type,
+        start_time=start_time,
+        end_time=end_time,
+    )
+
+    # Completed sessions are cached per data version (summarized_at)
+    if session_obj.session_status == "completed":
+        cache_key = artifact_key(
+            session_id, data_type, format, start_time, end_time, session_obj.summarized_at
+        )
+        path = export_jobs.cached_artifact(session_id, cache_key, format)
+        if path is None:
+            path = export_jobs.store_artifact(session_id, cache_key, format, build(db))
+        return _serve_artifact(request, path, MEDIA_TYPES[format], filename)
+
+    return StreamingResponse(
+        iter([build(db)]),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        },
+    )
+
+
+# ============================================
+# BACKGROUND EXPORT JOBS
+# ============================================
+
+def _job_payload(request: Request, job) -> dict:
+    payload = job.to_dict()
+    payload["status_url"] = str(request.url_for("get_export_job", job_id=job.id))
+    payload["download_url"] = (
+        str(request.url_for("download_export_job", job_id=job.id))
+        if job.status == JOB_COMPLETED else None
+    )
+    return payload
+
+
+def _get_user_job(job_id: str, current_user: User):
+    """Helper: get export job and verify it belongs to the caller"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    if job.user_id != str(current_user.id) and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this export job"
+        )
+    return job
+
+
+@router.post("/{session_id}/export/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit(LIMIT_EXPORT)
+async def submit_export_job(
+    request: Request,
+    session_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    format: str = Query("csv", description="Export format: csv or json"),
+    data_type: str = Query("eeg", description="Data type: eeg, face, game, alert, or all"),
+    start_time: Optional[datetime] = Query(None, description="Filter from timestamp"),
+    end_time: Optional[datetime] = Query(None, description="Filter to timestamp"),
+):
+    """
+    Submit a background export job.
+
+    Same parameters as `GET /sessions/{session_id}/export`. Returns a job id;
+    poll `status_url` until `status` is `completed`, then fetch `download_url`.
+    If the session is completed and the same export was built before, the job
+    is returned already completed (`cache_hit: true`).
+    """
+    _validate_export_params(format, data_type)
+
+    session_obj = _get_user_session(session_id, current_user, db)
+
+    job = export_jobs.submit(
+        session_id=session_id,
+        user_id=current_user.id,
+        data_type=data_type,
+        fmt=format,
+        start_time=start_time,
+        end_time=end_time,
+        filename=_export_filename(session_obj, data_type, format),
+        cacheable=session_obj.session_status == "completed",
+        version=session_obj.summarized_at,
+        builder=partial(
+            _build_export_content,
+            session_id=session_id,
+            session_name=session_obj.session_name,
+            format=format,
+            data_type=data_type,
+            start_time=start_time,
+            end_time=end_time,
+        ),
+    )
+    return _job_payload(request, job)
+
+
+@router.get("/export/jobs/{job_id}", name="get_export_job")
+@limiter.limit(LIMIT_READ)
+async def get_export_job(
+    request: Request,
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Poll the status of an export job"""
+    job = _get_user_job(job_id, current_user)
+    return _job_payload(request, job)
+
+
+@router.get("/export/jobs/{job_id}/download", name="download_export_job")
+@limiter.limit(LIMIT_READ)
+async def download_export_job(
+    request: Request,
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Download the artifact of a completed export job.
+
+    Supports `Range: bytes=...` for resumable downloads.
+    """
+    job = _get_user_job(job_id, current_user)
+    if job.status != JOB_COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status}"
+        )
+
+    path = export_jobs.artifact_path(job)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export artifact has expired, submit a new job"
+        )
+    return _serve_artifact(request, path, job.media_type, job.filename)
+
+
+# ============================================
+# COHORT (MULTI-SESSION) EXPORT
+# ============================================
+
+COHORT_TABLES = {
+    "eeg": (EEGData, EEG_COLUMNS),
+    "face": (FaceDetectionEvent, FACE_COLUMNS),
+    "game": (GameEvent, GAME_COLUMNS),
+    "alert": (Alert, ALERT_COLUMNS),
+}
+
+MANIFEST_COLUMNS = [
+    "session_id", "user_id", "session_name", "session_status",
+    "started_at", "ended_at", "duration_seconds",
+]
+
+
+class CohortExportRequest(BaseModel):
+    """Filter selecting the sessions of a cohort export"""
+    session_ids: Optional[List[UUID]] = Field(
+        None, description="Explicit session ids (other filters still apply)"
+    )
+    user_id: Optional[UUID] = Field(None, description="Only sessions of this user")
+    start_date: Optional[datetime] = Field(None, description="Sessions started at or after")
+    end_date: Optional[datetime] = Field(None, description="Sessions started at or before")
+    status: Optional[str] = Field(None, pattern="^(active|completed|failed)$")
+    data_types: List[Literal["eeg", "face", "game", "alert"]] = Field(
+        default_factory=lambda: ["eeg", "face", "game", "alert"]
+    )
+    format: Literal["csv", "parquet"] = "csv"
+
+
+class _ZipChunkBuffer(io.RawIOBase):
+    """
+    Write-only, non-seekable sink for ZipFile.
+
+    ZipFile falls back to data descriptors on unseekable output, so the
+    archive can be drained and streamed while it is still being written.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _iter_table_rows(db: Session, model, columns: List[str], session_ids: List[UUID]):
+    """
+    One query per table for the whole cohort: `session_id = ANY(:ids)`,
+    ordered by session so rows arrive grouped, fetched with a server-side
+    cursor in batches of EXPORT_COHORT_BATCH_SIZE.
+    """
+    ids_param = bindparam("session_ids", session_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+    query = (
+        db.query(model.session_id, *[getattr(model, col) for col in columns])
+        .filter(model.session_id == any_(ids_param))
+        .order_by(model.session_id, model.timestamp)
+        .execution_options(yield_per=settings.EXPORT_COHORT_BATCH_SIZE)
+    )
+    for row in query:
+        yield row[0], [_cell(v) for v in row[1:]]
+
+
+def _write_parquet(zf: zipfile.ZipFile, name: str, columns: List[str], rows: List[list]) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pylist([dict(zip(columns, r)) for r in rows])
+    out = io.BytesIO()
+    pq.write_table(table, out)
+    zf.writestr(name, out.getvalue())
+
+
+def _stream_cohort_zip(sessions: List[dict], data_types: List[str], fmt: str):
+    """Generate the cohort archive chunk by chunk"""
+    sink = _ZipChunkBuffer()
+    session_ids = [s["session_id"] for s in sessions]
+    batch_size = settings.EXPORT_COHORT_BATCH_SIZE
+
+    db = SessionLocal()
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+            # Manifest first so consumers can map folders to sessions
+            manifest = io.StringIO()
+            writer = csv.writer(manifest)
+            writer.writerow(MANIFEST_COLUMNS)
+            for s in sessions:
+                writer.writerow([_cell(s[col]) for col in MANIFEST_COLUMNS])
+            zf.writestr("manifest.csv", manifest.getvalue())
+            yield sink.drain()
+
+            for dtype in data_types:
+                model, columns = COHORT_TABLES[dtype]
+                current_sid = None
+                entry = text_out = writer = None
+                parquet_rows: List[list] = []
+                pending = 0
+
+                for sid, values in _iter_table_rows(db, model, columns, session_ids):
+                    if sid != current_sid:
+                        # Close the previous session's file
+                        if fmt == "parquet" and current_sid is not None:
+                            _write_parquet(zf, f"{current_sid}/{dtype}.parquet", columns, parquet_rows)
+                            parquet_rows = []
+                        elif text_out is not None:
+                            text_out.close()
+                        current_sid = sid
+                        if fmt == "csv":
+                            entry = zf.open(f"{sid}/{dtype}.csv", mode="w")
+                            text_out = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+                            writer = csv.writer(text_out)
+                            writer.writerow(columns)
+
+                    if fmt == "parquet":
+                        parquet_rows.append(values)
+                    else:
+                        writer.writerow(values)
+
+                    pending += 1
+                    if pending >= batch_size:
+                        pending = 0
+                        if text_out is not None:
+                            text_out.flush()
+                        yield sink.drain()
+
+                if fmt == "parquet" and current_sid is not None:
+                    _write_parquet(zf, f"{current_sid}/{dtype}.parquet", columns, parquet_rows)
+                elif text_out is not None:
+                    text_out.close()
+                yield sink.drain()
+
+        # Central directory is written on ZipFile close
+        yield sink.drain()
+    finally:
+        db.close()
+
+
+@router.post("/export/cohort")
+@limiter.limit(LIMIT_EXPORT)
+async def export_cohort(
+    request: Request,
+    cohort: CohortExportRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Export many sessions in one streamed zip archive.
+
+    Select sessions by explicit `session_ids` and/or filters (`user_id`,
+    `start_date`/`end_date` on session start, `status`). Researchers and
+    admins can export any session; other users only their own.
+
+    Archive layout:
+    - `manifest.csv` — one row per exported session
+    - `<session_id>/<data_type>.csv` (or `.parquet` when `format=parquet`)
+    """
+    if cohort.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parquet export requires pyarrow on the server; use format=csv"
+            )
+
+    query = db.query(SessionModel)
+    if current_user.role not in ("admin", "researcher"):
+        query = query.filter(SessionModel.user_id == current_user.id)
+    if cohort.session_ids:
+        query = query.filter(SessionModel.id.in_(cohort.session_ids))
+    if cohort.user_id:
+        query = query.filter(SessionModel.user_id == cohort.user_id)
+    if cohort.start_date:
+        query = query.filter(SessionModel.started_at >= cohort.start_date)
+    if cohort.end_date:
+        query = query.filter(SessionModel.started_at <= cohort.end_date)
+    if cohort.status:
+        query = query.filter(SessionModel.session_status == cohort.status)
+
+    limit = settings.EXPORT_COHORT_MAX_SESSIONS
+    matched = query.order_by(SessionModel.started_at.asc()).limit(limit + 1).all()
+    if not matched:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No sessions match the cohort filter"
+        )
+    if len(matched) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cohort matches more than {limit} sessions; narrow the filter"
+        )
+
+    # Plain dicts — the request DB session is closed before streaming starts
+    sessions = [
+        {
+            "session_id": s.id,
+            "user_id": s.user_id,
+            "session_name": s.session_name,
+            "session_status": s.session_status,
+            "started_at": s.started_at,
+            "ended_at": s.ended_at,
+            "duration_seconds": s.duration_seconds,
+        }
+        for s in matched
+    ]
+    data_types = list(dict.fromkeys(cohort.data_types))
+    filename = f"cohort_export_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.zip"
+
     return StreamingResponse(
-        csv_stream,
-        media_type="text/csv",
+        _stream_cohort_zip(sessions, data_types, cohort.format),
+        media_type="application/zip",
         headers={
-            "Content-Disposition": f'attachment; filename="{session_name}_{data_type}.csv"'
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            # Already deflated — keep GZipMiddleware out of the way
+            "Content-Encoding": "identity",
         },
     )
@@ -15,6 +15,7 @@ from app.db.database import get_db
 from app.db.models import FaceDetectionEvent, Session as DBSession
 from app.schemas.eeg import FaceDetectionData
 from app.api.dependencies import get_current_active_user
+from app.core.session_summary import get_stored_summary
 from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/face", tags=["Face Detection"])
@@ -236,6 +237,28 @@ async def get_face_statistics(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    # Completed sessions: read the summary materialized on completion
+    summary = get_stored_summary(session)
+    if summary is not None:
+        face = summary["face"]
+        return FaceStatsResponse(
+            session_id=session_id,
+            total_events=face["total_events"],
+            duration_seconds=face["duration_seconds"],
+            avg_blink_rate=face["avg_blink_rate"],
+            total_blinks=face["total_blinks"],
+            eyes_closed_count=face["eyes_closed_count"],
+            eyes_closed_percentage=face["eyes_closed_percentage"],
+            yawn_count=face["yawn_count"],
+            avg_fatigue_score=face["avg_fatigue_score"],
+            max_fatigue_score=face["max_fatigue_score"],
+            head_movement={
+                "avg_yaw": face["head_movement"]["avg_yaw"],
+                "avg_pitch": face["head_movement"]["avg_pitch"],
+                "avg_roll": face["head_movement"]["avg_roll"],
+            }
+        )
+    
     # Get aggregate statistics
     stats = db.query(
         func.count(FaceDetectionEvent.id).label('total_events'),
@@ -14,13 +14,16 @@ import os
 import time
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Query, Response, status
 from sqlalchemy import text
 
 from app.db.database import get_db
 from app.core.redis import get_redis, redis_health_check
 from app.core.cache import get_cache_stats
 from app.core.metrics import app_metrics
+from app.core.password import password_hasher
+from app.core.read_through import read_through_stats
+from app.core.report_cache import report_cache
 
 logger = logging.getLogger("fumorive.health")
 
@@ -139,26 +142,41 @@ async def readiness(response: Response):
 @router.get(
     "/metrics",
     summary="Application performance metrics",
-    description="In-process metrics: request counts, error rates, response-time "
-                "percentiles from a rolling window of the last 1 000 requests. "
+    description="In-process metrics: request counts, error rates, and per-route "
+                "response-time percentiles over 1m / 5m / 15m windows. "
                 "Lightweight alternative to Prometheus for quick health checks.",
 )
-async def app_level_metrics():
+async def app_level_metrics(
+    scope: str = Query("local", regex="^(local|cluster)$",
+                       description="`cluster` adds percentiles merged across all workers via Redis"),
+):
     """
     Return in-process performance counters and response-time percentiles.
 
-    Metrics are computed from a rolling window of up to 1 000 recent requests
-    held in memory — no external dependencies required.
+    Percentiles come from fixed-size streaming quantile sketches (1 % relative
+    error) kept per route in 10-second slots — no external dependencies required.
 
     Fields:
     - `total_requests`       — all requests served since process start
     - `error_rate`           — 4xx / 5xx counts and percentages
     - `slow_requests`        — requests that exceeded 500 ms
-    - `response_time_ms`     — mean, P50, P95, P99 latencies
-    - `throughput`           — approximate requests-per-second
+    - `response_time_ms`     — mean, P50, P95, P99 latencies (5m window)
+    - `throughput`           — requests-per-second (1m window)
+    - `windows`              — count / mean / P50 / P95 / P99 / errors per 1m, 5m, 15m
+    - `routes`               — the same windows per route template
     - `top_paths`            — top 10 most-hit endpoints
+    - `cluster`              — `windows` / `routes` for all workers (scope=cluster)
+    - `password_hashing`     — bcrypt pool queue wait / hash time
+    - `read_through_cache`   — L1 / L2 hits and misses per namespace
+    - `report_cache`         — fresh / stale / miss counts, refreshes, coalesced waits
     """
-    return app_metrics.snapshot()
+    snapshot = app_metrics.snapshot()
+    snapshot["password_hashing"] = password_hasher.stats()
+    snapshot["read_through_cache"] = read_through_stats()
+    snapshot["report_cache"] = report_cache.snapshot()
+    if scope == "cluster":
+        snapshot["cluster"] = app_metrics.cluster_snapshot()
+    return snapshot
 
 
 @router.get(
@@ -5,16 +5,16 @@ Week 4 - Session Playback Feature
 Week 5 - Optimized with TimescaleDB continuous aggregates
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
 from typing import Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.db.database import get_db
 from app.db.models import (
-    User, Session as SessionModel, EEGData, FaceDetectionEvent, GameEvent, Alert
+    User, EEGData, FaceDetectionEvent, GameEvent, Alert
 )
 from app.schemas.eeg import (
     EEGDataResponse, FaceEventResponse, GameEventResponse,
@@ -22,24 +22,19 @@ from app.schemas.eeg import (
     TimelineEvent, TimelineResponse
 )
 from app.api.dependencies import get_current_user
+from app.core.session_lookup import SessionRef, get_owned_session
+from app.core.agg_router import (
+    RESOLUTIONS, RESOLUTION_PATTERN, align_down, align_up, pick_view, resolution_for_range
+)
+from app.core.live_aggregates import live_eeg_aggregates, merge_aggregate_rows
+from app.core.serialization import FastJSONResponse
 
 router = APIRouter(prefix="/sessions", tags=["Session Playback"])
 
 
-def _get_user_session(session_id: UUID, current_user: User, db: Session) -> SessionModel:
-    """Helper: get session and verify ownership"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    if session.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this session"
-        )
-    return session
+def _get_user_session(session_id: UUID, current_user: User, db: Session) -> SessionRef:
+    """Helper: get session and verify ownership (read-through cached)"""
+    return get_owned_session(db, session_id, current_user)
 
 
 @router.get("/{session_id}/eeg", response_model=PaginatedEEGResponse)
@@ -73,13 +68,14 @@ async def get_session_eeg(
     offset = (page - 1) * page_size
     records = query.order_by(EEGData.timestamp.asc()).offset(offset).limit(page_size).all()
 
-    return PaginatedEEGResponse(
+    # Already validated: encode straight to bytes, skipping FastAPI's re-validation
+    return FastJSONResponse(PaginatedEEGResponse(
         total=total,
         page=page,
         page_size=page_size,
         has_next=(offset + page_size) < total,
         data=records,
-    )
+    ))
 
 
 @router.get("/{session_id}/eeg/aggregated")
@@ -99,8 +95,11 @@ async def get_session_eeg_aggregated(
 
     - **bucket**: '1min' (default) or '5min'
     - Use **5min** for full-session overview; **1min** for detailed view
+
+    For active sessions, the most recent buckets (not yet refreshed into the
+    views) are merged in from the live in-memory aggregator.
     """
-    _get_user_session(session_id, current_user, db)
+    session = _get_user_session(session_id, current_user, db)
 
     view = "eeg_1min_agg" if bucket == "1min" else "eeg_5min_agg"
 
@@ -128,12 +127,22 @@ async def get_session_eeg_aggregated(
         "start_time": start_time,
         "end_time": end_time,
     }).fetchall()
+    data = [dict(r._mapping) for r in rows]
+
+    if session.session_status == "active":
+        live = live_eeg_aggregates.rows(
+            str(session_id),
+            timedelta(minutes=1 if bucket == "1min" else 5),
+            start_time,
+            end_time,
+        )
+        data = merge_aggregate_rows(data, live)
 
     return {
         "session_id": str(session_id),
         "bucket_size": bucket,
-        "total": len(rows),
-        "data": [dict(r._mapping) for r in rows],
+        "total": len(data),
+        "data": data,
     }
 
 
@@ -163,13 +172,13 @@ async def get_session_face(
     offset = (page - 1) * page_size
     records = query.order_by(FaceDetectionEvent.timestamp.asc()).offset(offset).limit(page_size).all()
 
-    return PaginatedFaceResponse(
+    return FastJSONResponse(PaginatedFaceResponse(
         total=total,
         page=page,
         page_size=page_size,
         has_next=(offset + page_size) < total,
         data=records,
-    )
+    ))
 
 
 @router.get("/{session_id}/game-events", response_model=PaginatedGameResponse)
@@ -201,13 +210,13 @@ async def get_session_game_events(
     offset = (page - 1) * page_size
     records = query.order_by(GameEvent.timestamp.asc()).offset(offset).limit(page_size).all()
 
-    return PaginatedGameResponse(
+    return FastJSONResponse(PaginatedGameResponse(
         total=total,
         page=page,
         page_size=page_size,
         has_next=(offset + page_size) < total,
         data=records,
-    )
+    ))
 
 
 @router.get("/{session_id}/timeline", response_model=TimelineResponse)
@@ -341,10 +350,121 @@ async def get_session_timeline(
         for r in rows
     ]
 
-    return TimelineResponse(
+    return FastJSONResponse(TimelineResponse(
         total=total,
         page=page,
         page_size=page_size,
         has_next=(offset + page_size) < total,
         events=events,
-    )
+    ))
+
+
+# Per-source roll-up expressions over the continuous aggregates.
+# Averages are re-weighted from SUM/COUNT columns so any view rolls up exactly.
+_BUCKETED_SELECTS = {
+    "eeg": """
+        SUM(avg_fatigue_score * sample_count) / NULLIF(SUM(sample_count), 0)     AS avg_fatigue_score,
+        SUM(avg_theta_alpha_ratio * sample_count) / NULLIF(SUM(sample_count), 0) AS avg_theta_alpha_ratio,
+        SUM(sample_count)                                                         AS sample_count
+    """,
+    "face": """
+        SUM(event_count)                                  AS event_count,
+        SUM(eyes_closed_count)                            AS eyes_closed_count,
+        SUM(yawn_count)                                   AS yawn_count,
+        SUM(blink_rate_sum) / NULLIF(SUM(blink_rate_n), 0) AS avg_blink_rate,
+        SUM(fatigue_sum) / NULLIF(SUM(fatigue_n), 0)      AS avg_fatigue_score,
+        MAX(max_fatigue)                                  AS max_fatigue_score
+    """,
+    "game": """
+        SUM(event_count)                                          AS event_count,
+        SUM(speed_sum) / NULLIF(SUM(speed_n), 0)                  AS avg_speed,
+        MAX(max_speed)                                            AS max_speed,
+        SUM(lane_dev_abs_sum) / NULLIF(SUM(lane_dev_n), 0)        AS avg_abs_lane_deviation
+    """,
+    "alert": """
+        SUM(alert_count)                                               AS alert_count,
+        COALESCE(SUM(alert_count) FILTER (WHERE alert_level = 'warning'), 0)  AS warnings,
+        COALESCE(SUM(alert_count) FILTER (WHERE alert_level = 'critical'), 0) AS criticals,
+        MAX(max_fatigue)                                               AS max_fatigue_score
+    """,
+}
+
+
+def _plain(value):
+    """Numeric/Decimal → float/int for JSON responses"""
+    if value is None or isinstance(value, (int, float, bool, str)):
+        return value
+    f = float(value)
+    return int(f) if f.is_integer() else f
+
+
+@router.get("/{session_id}/timeline/aggregated")
+async def get_session_timeline_aggregated(
+    session_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    resolution: Optional[str] = Query(
+        None, regex=RESOLUTION_PATTERN,
+        description="Bucket size, e.g. '1 minute', '1 hour', '1 day'. "
+                    "Defaults to the finest size giving at most max_points buckets."
+    ),
+    max_points: int = Query(500, ge=10, le=5000, description="Upper bound on buckets when resolution is omitted"),
+    start_time: Optional[datetime] = Query(None, description="Filter from timestamp"),
+    end_time: Optional[datetime] = Query(None, description="Filter to timestamp"),
+):
+    """
+    Bucketed timeline of EEG, face, game and alert activity for a session.
+
+    Served entirely from continuous aggregates: for each source the router
+    picks the coarsest view (1 min / 1 h / 1 day) that fits the resolution,
+    so long sessions never touch raw rows. The range is widened to whole
+    buckets.
+    """
+    session = _get_user_session(session_id, current_user, db)
+
+    if resolution is None:
+        range_start = start_time or session.started_at
+        range_end = end_time or session.ended_at or datetime.utcnow()
+        resolution, width = resolution_for_range(range_start, range_end, max_points)
+    else:
+        width = RESOLUTIONS[resolution]
+
+    start = align_down(start_time, width) if start_time else None
+    end = align_up(end_time, width) if end_time else None
+
+    params = {
+        "session_id": str(session_id),
+        "resolution": resolution,
+        "start_time": start,
+        "end_time": end,
+    }
+
+    periods: dict = {}
+    sources = {}
+    for source, select in _BUCKETED_SELECTS.items():
+        view = pick_view(source, width, start, end)
+        sources[source] = view.name
+        rows = db.execute(text(f"""
+            SELECT time_bucket(CAST(:resolution AS interval), bucket) AS period,
+                   {select}
+            FROM {view.name}
+            WHERE session_id = :session_id
+              AND (CAST(:start_time AS timestamptz) IS NULL OR bucket >= :start_time)
+              AND (CAST(:end_time AS timestamptz) IS NULL OR bucket < :end_time)
+            GROUP BY period
+            ORDER BY period ASC
+        """), params).fetchall()
+
+        for row in rows:
+            values = dict(row._mapping)
+            period = values.pop("period")
+            entry = periods.setdefault(period, {"period": period.isoformat()})
+            entry[source] = {k: _plain(v) for k, v in values.items()}
+
+    return {
+        "session_id": str(session_id),
+        "resolution": resolution,
+        "sources": sources,
+        "total": len(periods),
+        "data": [periods[p] for p in sorted(periods)],
+    }
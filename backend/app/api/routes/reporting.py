@@ -9,63 +9,79 @@ Endpoints:
   GET /reports/sessions/{id}    — per-session deep stats
   GET /reports/fatigue-trend    — fatigue score trend over time
   GET /reports/alerts           — alert breakdown / frequency
+
+Every report is served through `report_cache`: one recompute per key,
+stale-while-revalidate and background refresh of hot keys. Compute
+functions open their own DB session so refreshes can outlive the request.
 """
 
 import logging
-import json
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
 
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.db.models import User, Session as DBSession, EEGData, FaceDetectionEvent, Alert
 from app.api.dependencies import get_current_user, require_researcher_or_admin
 from app.core.rate_limiter import limiter, LIMIT_EXPORT
-from app.core.redis import get_redis
+from app.core.cache_events import report_tags
+from app.core.report_cache import report_cache
+from app.core.session_lookup import get_session_ref
+from app.core.session_summary import get_stored_summary
+from app.core.agg_router import RESOLUTIONS, align_down, pick_view
+from app.core.live_aggregates import live_eeg_aggregates, merge_aggregate_rows
 
 logger = logging.getLogger("fumorive.reporting")
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
-_REPORT_CACHE_TTL = 300  # 5 minutes — safe for aggregate stats
-
-
-def _get_cached(cache_key: str):
-    """Return cached JSON value or None."""
-    r = get_redis()
-    if not r:
-        return None
+# Per-report (fresh TTL, stale window) in seconds. Within the stale window
+# the previous result is served while one background refresh runs. Writes
+# invalidate reports through cache events (app/core/cache_events.py), so
+# reports fully covered by events are kept for hours; short TTLs remain
+# only where some of the data changes without an event.
+_REPORT_TTLS = {
+    "sessions":          (6 * 3600, 3600),
+    "session_active":    (300, 60),        # EEG flushes invalidate (debounced)
+    "session_completed": (24 * 3600, 24 * 3600),
+    "fatigue_trend":     (300, 600),       # EEG aggregate refresh lags flushes
+    "alerts":            (6 * 3600, 3600),
+    "summary":           (600, 1200),      # sign-ups / EEG samples emit no event
+}
+
+
+async def _cached_report(name: str, key: str, compute, tags=()) -> dict:
+    ttl, stale_ttl = _REPORT_TTLS[name]
+    return await report_cache.get(key, compute, ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+
+
+def _with_db(fn, *args):
+    """Run fn(db, *args) on a dedicated DB session (safe off the request)."""
+    db = SessionLocal()
     try:
-        raw = r.get(cache_key)
-        return json.loads(raw) if raw else None
-    except Exception:
-        return None
-
-
-def _set_cached(cache_key: str, value: dict, ttl: int = _REPORT_CACHE_TTL) -> None:
-    """Persist JSON value to Redis with a TTL."""
-    r = get_redis()
-    if not r:
-        return
-    try:
-        r.setex(cache_key, ttl, json.dumps(value, default=str))
-    except Exception:
-        pass
+        return fn(db, *args)
+    finally:
+        db.close()
 
 
 # ----------------------------------------------
 # HELPERS
 # ----------------------------------------------
 
-def _session_base_query(db: Session, user: User):
-    """Return a query scoped to the current user (admin sees all)."""
+def _report_scope(user: User) -> Optional[str]:
+    """User id to scope reports to, or None when the user sees all users."""
+    return None if user.role in ("admin", "researcher") else str(user.id)
+
+
+def _session_base_query(db: Session, scope: Optional[str]):
+    """Return a query scoped to `scope` (None = all users)."""
     q = db.query(DBSession)
-    if user.role not in ("admin", "researcher"):
-        q = q.filter(DBSession.user_id == user.id)
+    if scope is not None:
+        q = q.filter(DBSession.user_id == scope)
     return q
 
 
@@ -78,7 +94,6 @@ def _session_base_query(db: Session, user: User):
 async def session_statistics(
     request: Request,                        # required by slowapi
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
     days: int = Query(30, ge=1, le=365, description="Look-back window in days"),
 ):
     """
@@ -86,15 +101,20 @@ async def session_statistics(
     (researcher/admin see all users).
 
     Returns counts, average durations, fatigue scores, and alert totals.
-    Results are cached for 5 minutes per user + days combination.
+    Results are cached per scope + days combination and invalidated when a
+    session in scope changes.
     """
-    cache_key = f"report:sessions:{current_user.id}:{days}"
-    cached = _get_cached(cache_key)
-    if cached:
-        return cached
+    scope = _report_scope(current_user)
+    return await _cached_report(
+        "sessions", f"sessions:{scope or 'all'}:{days}",
+        lambda: _with_db(_compute_session_statistics, scope, days),
+        tags=report_tags(scope, ["sessions"]),
+    )
 
+
+def _compute_session_statistics(db: Session, scope: Optional[str], days: int) -> dict:
     since = datetime.now(timezone.utc) - timedelta(days=days)
-    q = _session_base_query(db, current_user).filter(DBSession.started_at >= since)
+    q = _session_base_query(db, scope).filter(DBSession.started_at >= since)
 
     rows = q.with_entities(
         func.count(DBSession.id).label("total_sessions"),
@@ -108,7 +128,7 @@ async def session_statistics(
         func.sum(DBSession.alert_count).label("total_alerts"),
     ).one()
 
-    result = {
+    return {
         "period_days": days,
         "sessions": {
             "total":     rows.total_sessions or 0,
@@ -130,9 +150,6 @@ async def session_statistics(
         },
     }
 
-    _set_cached(cache_key, result)
-    return result
-
 
 # ----------------------------------------------
 # 2. PER-SESSION DEEP STATS
@@ -152,27 +169,84 @@ async def session_detail_report(
     - Face event counts (blinks, yawns, eye closures)
     - Alert timeline summary
     - Fatigue score distribution (bucketed into 10-point ranges)
+
+    Completed sessions are served from the summary materialized on completion.
+    The report is cached per session and invalidated by writes to it.
     """
-    session = _session_base_query(db, current_user).filter(DBSession.id == session_id).first()
-    if not session:
-        from fastapi import HTTPException, status
+    session = get_session_ref(db, session_id)
+    scope = _report_scope(current_user)
+    if session is None or (scope is not None and str(session.user_id) != scope):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+    # Status is part of the key so completing a session starts a fresh entry
+    state = "completed" if session.session_status == "completed" else "active"
+    report = await _cached_report(
+        f"session_{state}", f"session:{session_id}:{session.session_status}",
+        lambda: _with_db(_compute_session_detail, session_id),
+        tags=[f"session:{session_id}"],
+    )
+    if report is None:  # deleted after the lookup
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return report
 
-    # EEG aggregates — use continuous aggregate if available, else raw
-    eeg_row = db.execute(text("""
+
+def _compute_session_detail(db: Session, session_id: UUID) -> Optional[dict]:
+    session = db.query(DBSession).filter(DBSession.id == session_id).first()
+    if session is None:
+        return None
+
+    # Completed sessions: aggregates were materialized on completion
+    summary = get_stored_summary(session)
+    if summary is not None:
+        eeg, face = summary["eeg"], summary["face"]
+        return _detail_response(
+            session,
+            eeg={
+                "avg_delta":             eeg["avg_delta"] or 0,
+                "avg_theta":             eeg["avg_theta"] or 0,
+                "avg_alpha":             eeg["avg_alpha"] or 0,
+                "avg_beta":              eeg["avg_beta"] or 0,
+                "avg_gamma":             eeg["avg_gamma"] or 0,
+                "avg_theta_alpha_ratio": eeg["avg_theta_alpha_ratio"] or 0,
+                "avg_fatigue_score":     eeg["avg_fatigue_score"] or 0,
+                "avg_signal_quality":    eeg["avg_signal_quality"] or 0,
+                "total_samples":         eeg["total_samples"],
+            },
+            face={
+                "total_events":      face["total_events"],
+                "eyes_closed_count": face["eyes_closed_count"],
+                "yawn_count":        face["yawn_count"],
+                "avg_blink_rate":    face["avg_blink_rate"] or 0,
+                "avg_fatigue_score": face["avg_fatigue_score"] or 0,
+            },
+            alert_breakdown=summary["alerts"]["breakdown"],
+            distribution=summary["fatigue_distribution"],
+        )
+
+    # EEG per-minute buckets from the continuous aggregate, plus the live
+    # aggregator's buckets for sessions still streaming
+    minute_rows = [dict(r._mapping) for r in db.execute(text("""
         SELECT
-            AVG(avg_delta)              AS avg_delta,
-            AVG(avg_theta)              AS avg_theta,
-            AVG(avg_alpha)              AS avg_alpha,
-            AVG(avg_beta)               AS avg_beta,
-            AVG(avg_gamma)              AS avg_gamma,
-            AVG(avg_theta_alpha_ratio)  AS avg_theta_alpha_ratio,
-            AVG(avg_fatigue_score)      AS avg_eeg_fatigue,
-            AVG(avg_signal_quality)     AS avg_signal_quality,
-            SUM(sample_count)           AS total_samples
+            bucket,
+            avg_delta,
+            avg_theta,
+            avg_alpha,
+            avg_beta,
+            avg_gamma,
+            avg_theta_alpha_ratio,
+            avg_fatigue_score,
+            avg_signal_quality,
+            sample_count
         FROM eeg_1min_agg
         WHERE session_id = :sid
-    """), {"sid": str(session_id)}).one()
+        ORDER BY bucket
+    """), {"sid": str(session_id)}).fetchall()]
+    if session.session_status == "active":
+        minute_rows = merge_aggregate_rows(minute_rows, live_eeg_aggregates.rows(str(session_id)))
+
+    def _avg(column: str) -> float:
+        values = [row[column] for row in minute_rows if row[column] is not None]
+        return float(sum(values) / len(values)) if values else 0
 
     # Face event aggregates
     face_row = db.query(
@@ -192,42 +266,66 @@ async def session_detail_report(
     alert_breakdown = {row.alert_level: row.count for row in alert_rows}
 
     # Fatigue score distribution (buckets: 0-9, 10-19, ..., 90-100)
-    dist_rows = db.execute(text("""
-        SELECT
-            width_bucket(avg_fatigue_score, 0, 101, 10) - 1 AS bucket,
-            COUNT(*) AS cnt
-        FROM eeg_1min_agg
-        WHERE session_id = :sid AND avg_fatigue_score IS NOT NULL
-        GROUP BY bucket
-        ORDER BY bucket
-    """), {"sid": str(session_id)}).fetchall()
+    distribution: dict = {}
+    for row in minute_rows:
+        score = row["avg_fatigue_score"]
+        if score is None or not 0 <= score < 101:
+            continue
+        b = min(int(score // 10.1), 9)
+        label = f"{b * 10}-{b * 10 + 9}"
+        distribution[label] = distribution.get(label, 0) + 1
+
+    return _detail_response(
+        session,
+        eeg={
+            "avg_delta":             _avg("avg_delta"),
+            "avg_theta":             _avg("avg_theta"),
+            "avg_alpha":             _avg("avg_alpha"),
+            "avg_beta":              _avg("avg_beta"),
+            "avg_gamma":             _avg("avg_gamma"),
+            "avg_theta_alpha_ratio": _avg("avg_theta_alpha_ratio"),
+            "avg_fatigue_score":     _avg("avg_fatigue_score"),
+            "avg_signal_quality":    _avg("avg_signal_quality"),
+            "total_samples":         sum(int(row["sample_count"] or 0) for row in minute_rows),
+        },
+        face={
+            "total_events":      face_row.total_events or 0,
+            "eyes_closed_count": face_row.eyes_closed_count or 0,
+            "yawn_count":        face_row.yawn_count or 0,
+            "avg_blink_rate":    face_row.avg_blink_rate or 0,
+            "avg_fatigue_score": face_row.avg_face_fatigue or 0,
+        },
+        alert_breakdown=alert_breakdown,
+        distribution=distribution,
+    )
 
-    distribution = {f"{b * 10}-{b * 10 + 9}": int(c) for b, c in dist_rows if b is not None}
 
+def _detail_response(session, eeg: dict, face: dict, alert_breakdown: dict, distribution: dict) -> dict:
+    """Shape the per-session report (shared by stored-summary and live paths)."""
     return {
-        "session_id":   str(session_id),
+        "session_id":   str(session.id),
         "session_name": session.session_name,
         "status":       session.session_status,
         "started_at":   session.started_at.isoformat() if session.started_at else None,
         "ended_at":     session.ended_at.isoformat() if session.ended_at else None,
         "duration_s":   session.duration_seconds,
         "eeg": {
-            "avg_delta":            round(eeg_row.avg_delta or 0, 4),
-            "avg_theta":            round(eeg_row.avg_theta or 0, 4),
-            "avg_alpha":            round(eeg_row.avg_alpha or 0, 4),
-            "avg_beta":             round(eeg_row.avg_beta or 0, 4),
-            "avg_gamma":            round(eeg_row.avg_gamma or 0, 4),
-            "avg_theta_alpha_ratio":round(eeg_row.avg_theta_alpha_ratio or 0, 4),
-            "avg_fatigue_score":    round(eeg_row.avg_eeg_fatigue or 0, 2),
-            "avg_signal_quality":   round(eeg_row.avg_signal_quality or 0, 3),
-            "total_samples":        int(eeg_row.total_samples or 0),
+            "avg_delta":            round(eeg["avg_delta"], 4),
+            "avg_theta":            round(eeg["avg_theta"], 4),
+            "avg_alpha":            round(eeg["avg_alpha"], 4),
+            "avg_beta":             round(eeg["avg_beta"], 4),
+            "avg_gamma":            round(eeg["avg_gamma"], 4),
+            "avg_theta_alpha_ratio":round(eeg["avg_theta_alpha_ratio"], 4),
+            "avg_fatigue_score":    round(eeg["avg_fatigue_score"], 2),
+            "avg_signal_quality":   round(eeg["avg_signal_quality"], 3),
+            "total_samples":        eeg["total_samples"],
         },
         "face": {
-            "total_events":     face_row.total_events or 0,
-            "eyes_closed_count": face_row.eyes_closed_count or 0,
-            "yawn_count":       face_row.yawn_count or 0,
-            "avg_blink_rate":   round(face_row.avg_blink_rate or 0, 2),
-            "avg_fatigue_score": round(face_row.avg_face_fatigue or 0, 2),
+            "total_events":     face["total_events"],
+            "eyes_closed_count": face["eyes_closed_count"],
+            "yawn_count":       face["yawn_count"],
+            "avg_blink_rate":   round(face["avg_blink_rate"], 2),
+            "avg_fatigue_score": round(face["avg_fatigue_score"], 2),
         },
         "alerts": {
             "total":     sum(alert_breakdown.values()),
@@ -246,7 +344,6 @@ async def session_detail_report(
 async def fatigue_trend(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
     days: int = Query(7, ge=1, le=90),
     bucket: str = Query("1 day", regex=r"^(1 hour|6 hours|1 day|1 week)$",
                         description="Time bucket size"),
@@ -254,26 +351,37 @@ async def fatigue_trend(
     """
     Average daily (or hourly) fatigue scores aggregated across all user sessions.
     Useful for rendering a trend chart on the dashboard.
-    Results are cached for 5 minutes per user + parameters combination.
+    Results are cached for 5 minutes per scope + parameters combination and
+    invalidated (debounced) as EEG data is flushed.
     """
-    cache_key = f"report:fatigue:{current_user.id}:{days}:{bucket}"
-    cached = _get_cached(cache_key)
-    if cached:
-        return cached
+    scope = _report_scope(current_user)
+    return await _cached_report(
+        "fatigue_trend", f"fatigue:{scope or 'all'}:{days}:{bucket}",
+        lambda: _with_db(_compute_fatigue_trend, scope, days, bucket),
+        tags=report_tags(scope, ["eeg"]),
+    )
 
-    since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    # Join eeg_1min_agg → sessions to scope by user
-    scope_filter = "" if current_user.role in ("admin", "researcher") else \
-        "AND s.user_id = :user_id"
+def _compute_fatigue_trend(db: Session, scope: Optional[str], days: int, bucket: str) -> dict:
+    # Start on a period boundary so every period is complete, then let the
+    # router pick the coarsest EEG aggregate that fits the bucket size
+    resolution = RESOLUTIONS[bucket]
+    since = align_down(datetime.now(timezone.utc) - timedelta(days=days), resolution)
+    view = pick_view("eeg", resolution, since)
 
+    # Join aggregate → sessions to scope by user
+    scope_filter = "" if scope is None else "AND s.user_id = :user_id"
+
+    # Sample-weighted averages so 1-min and 5-min views give the same answer
     rows = db.execute(text(f"""
         SELECT
-            time_bucket(:bucket, a.bucket)  AS period,
-            AVG(a.avg_fatigue_score)        AS avg_fatigue,
-            AVG(a.avg_theta_alpha_ratio)    AS avg_theta_alpha,
-            COUNT(DISTINCT a.session_id)    AS session_count
-        FROM eeg_1min_agg a
+            time_bucket(CAST(:bucket AS interval), a.bucket)  AS period,
+            SUM(a.avg_fatigue_score * a.sample_count)
+                / NULLIF(SUM(a.sample_count), 0)              AS avg_fatigue,
+            SUM(a.avg_theta_alpha_ratio * a.sample_count)
+                / NULLIF(SUM(a.sample_count), 0)              AS avg_theta_alpha,
+            COUNT(DISTINCT a.session_id)                      AS session_count
+        FROM {view.name} a
         JOIN sessions s ON s.id = a.session_id
         WHERE a.bucket >= :since
           {scope_filter}
@@ -282,26 +390,23 @@ async def fatigue_trend(
     """), {
         "bucket":  bucket,
         "since":   since,
-        "user_id": str(current_user.id),
+        "user_id": scope,
     }).fetchall()
 
-    result = {
+    return {
         "period_days": days,
         "bucket_size": bucket,
         "data": [
             {
                 "period":           row.period.isoformat(),
-                "avg_fatigue":      round(row.avg_fatigue or 0, 2),
-                "avg_theta_alpha":  round(row.avg_theta_alpha or 0, 4),
+                "avg_fatigue":      round(float(row.avg_fatigue or 0), 2),
+                "avg_theta_alpha":  round(float(row.avg_theta_alpha or 0), 4),
                 "session_count":    row.session_count,
             }
             for row in rows
         ],
     }
 
-    _set_cached(cache_key, result)
-    return result
-
 
 # ----------------------------------------------
 # 4. ALERT REPORT
@@ -312,79 +417,83 @@ async def fatigue_trend(
 async def alert_report(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
     days: int = Query(30, ge=1, le=365),
 ):
     """
     Alert statistics — counts by level, top trigger reasons, and daily frequency.
-    Results are cached for 5 minutes per user + days combination.
+    Results are cached per scope + days combination and invalidated when an
+    alert in scope is created, updated or deleted.
     """
-    cache_key = f"report:alerts:{current_user.id}:{days}"
-    cached = _get_cached(cache_key)
-    if cached:
-        return cached
+    scope = _report_scope(current_user)
+    return await _cached_report(
+        "alerts", f"alerts:{scope or 'all'}:{days}",
+        lambda: _with_db(_compute_alert_report, scope, days),
+        tags=report_tags(scope, ["alerts"]),
+    )
 
-    since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    scope_filter = "" if current_user.role in ("admin", "researcher") else \
-        "AND s.user_id = :user_id"
+def _compute_alert_report(db: Session, scope: Optional[str], days: int) -> dict:
+    # Whole UTC days — lets the router answer from the 1-day alert aggregate
+    # instead of scanning raw alerts
+    day = RESOLUTIONS["1 day"]
+    since = align_down(datetime.now(timezone.utc) - timedelta(days=days), day)
+    view = pick_view("alert", day, since)
+
+    scope_filter = "" if scope is None else "AND s.user_id = :user_id"
 
     # By level
     level_rows = db.execute(text(f"""
-        SELECT a.alert_level, COUNT(*) AS cnt
-        FROM alerts a
+        SELECT a.alert_level, SUM(a.alert_count) AS cnt
+        FROM {view.name} a
         JOIN sessions s ON s.id = a.session_id
-        WHERE a.timestamp >= :since {scope_filter}
+        WHERE a.bucket >= :since {scope_filter}
         GROUP BY a.alert_level
         ORDER BY cnt DESC
-    """), {"since": since, "user_id": str(current_user.id)}).fetchall()
+    """), {"since": since, "user_id": scope}).fetchall()
 
     # Top trigger reasons (max 10)
     reason_rows = db.execute(text(f"""
-        SELECT a.trigger_reason, COUNT(*) AS cnt
-        FROM alerts a
+        SELECT a.trigger_reason, SUM(a.alert_count) AS cnt
+        FROM {view.name} a
         JOIN sessions s ON s.id = a.session_id
-        WHERE a.timestamp >= :since {scope_filter}
+        WHERE a.bucket >= :since {scope_filter}
         GROUP BY a.trigger_reason
         ORDER BY cnt DESC
         LIMIT 10
-    """), {"since": since, "user_id": str(current_user.id)}).fetchall()
+    """), {"since": since, "user_id": scope}).fetchall()
 
-    # Daily alert counts using TimescaleDB time_bucket
+    # Daily alert counts, rolled up from the aggregate buckets
     daily_rows = db.execute(text(f"""
         SELECT
-            time_bucket('1 day', a.timestamp) AS day,
-            COUNT(*) AS total,
-            COUNT(*) FILTER (WHERE a.alert_level = 'warning')  AS warnings,
-            COUNT(*) FILTER (WHERE a.alert_level = 'critical') AS criticals
-        FROM alerts a
+            time_bucket('1 day', a.bucket) AS day,
+            SUM(a.alert_count) AS total,
+            COALESCE(SUM(a.alert_count) FILTER (WHERE a.alert_level = 'warning'), 0)  AS warnings,
+            COALESCE(SUM(a.alert_count) FILTER (WHERE a.alert_level = 'critical'), 0) AS criticals
+        FROM {view.name} a
         JOIN sessions s ON s.id = a.session_id
-        WHERE a.timestamp >= :since {scope_filter}
+        WHERE a.bucket >= :since {scope_filter}
         GROUP BY day
         ORDER BY day ASC
-    """), {"since": since, "user_id": str(current_user.id)}).fetchall()
+    """), {"since": since, "user_id": scope}).fetchall()
 
-    alert_result = {
+    return {
         "period_days": days,
-        "by_level": {row.alert_level: row.cnt for row in level_rows},
+        "by_level": {row.alert_level: int(row.cnt) for row in level_rows},
         "top_triggers": [
-            {"reason": row.trigger_reason, "count": row.cnt}
+            {"reason": row.trigger_reason, "count": int(row.cnt)}
             for row in reason_rows
         ],
         "daily": [
             {
                 "date":      row.day.strftime("%Y-%m-%d"),
-                "total":     row.total,
-                "warnings":  row.warnings,
-                "criticals": row.criticals,
+                "total":     int(row.total),
+                "warnings":  int(row.warnings),
+                "criticals": int(row.criticals),
             }
             for row in daily_rows
         ],
     }
 
-    _set_cached(cache_key, alert_result)
-    return alert_result
-
 
 # ----------------------------------------------
 # 5. SYSTEM SUMMARY (admin / researcher only)
@@ -398,7 +507,6 @@ async def alert_report(
 @limiter.limit(LIMIT_EXPORT)
 async def system_summary(
     request: Request,
-    db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
 ):
     """
@@ -406,7 +514,18 @@ async def system_summary(
     - Total users, sessions, EEG samples
     - Average fatigue across all sessions
     - Alert rate per session
+
+    Results are cached for 10 minutes (shared by all callers) and invalidated
+    by session and alert writes; the EEG sample count may lag by the TTL.
     """
+    return await _cached_report(
+        "summary", "summary",
+        lambda: _with_db(_compute_system_summary),
+        tags=report_tags(None, ["sessions", "alerts"]),
+    )
+
+
+def _compute_system_summary(db: Session) -> dict:
     rows = db.execute(text("""
         SELECT
             (SELECT COUNT(*) FROM users)                        AS total_users,
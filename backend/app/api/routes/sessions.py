@@ -5,8 +5,7 @@ Week 2, Tuesday - API Routes for Sessions
 Week 5, Wednesday - Redis caching for session metadata
 """
 
-import json
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
@@ -16,51 +15,13 @@ from app.db.database import get_db
 from app.db.models import User, Session as DBSession
 from app.schemas.session import SessionCreate, SessionUpdate, SessionResponse, SessionListResponse
 from app.api.dependencies import get_current_user
-from app.core.cache import get_redis
+from app.core.session_summary import finalize_session_async
+from app.core import cache_events
+from app.core.export_jobs import export_jobs
+from app.core.session_lookup import get_owned_session, list_user_sessions
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
-# Cache TTL constants (seconds)
-_SESSION_TTL = 300   # 5 minutes for individual session metadata
-_SESSION_LIST_TTL = 60  # 1 minute for session list (changes more often)
-
-
-def _cache_key_session(session_id: UUID) -> str:
-    return f"session:{session_id}"
-
-
-def _get_cached_session(session_id: UUID) -> Optional[dict]:
-    r = get_redis()
-    if not r:
-        return None
-    try:
-        data = r.get(_cache_key_session(session_id))
-        return json.loads(data) if data else None
-    except Exception:
-        return None
-
-
-def _set_cached_session(session_id: UUID, session_data: dict) -> None:
-    r = get_redis()
-    if not r:
-        return
-    try:
-        r.setex(_cache_key_session(session_id), _SESSION_TTL, json.dumps(session_data, default=str))
-    except Exception:
-        pass
-
-
-def _invalidate_session_cache(session_id: UUID) -> None:
-    r = get_redis()
-    if not r:
-        return
-    try:
-        r.delete(_cache_key_session(session_id))
-    except Exception:
-        pass
-
-
-
 @router.post("", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_session(
     session_data: SessionCreate,
@@ -87,6 +48,9 @@ async def create_session(
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+
+    # Cached session lists and reports of this user are now out of date
+    cache_events.emit(cache_events.SESSION_CREATED, session_id=new_session.id, user_id=current_user.id)
     
     return new_session
 
@@ -105,26 +69,10 @@ async def list_sessions(
     - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 20, max: 100)
     - **status**: Optional filter by session status
-    """
-    query = db.query(DBSession).filter(DBSession.user_id == current_user.id)
-    
-    # Apply status filter if provided
-    if status:
-        query = query.filter(DBSession.session_status == status)
     
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    sessions = query.order_by(DBSession.started_at.desc()).offset(offset).limit(page_size).all()
-    
-    return {
-        "total": total,
-        "sessions": sessions,
-        "page": page,
-        "page_size": page_size
-    }
+    Pages are served from the read-through cache (60 s, invalidated on writes).
+    """
+    return list_user_sessions(db, current_user.id, status, page, page_size)
 
 
 @router.get("/latest-active", response_model=SessionResponse)
@@ -163,47 +111,10 @@ async def get_session(
     Get a specific session by ID
 
     User can only access their own sessions (unless admin).
-    Result is cached in Redis for 5 minutes to reduce DB load.
+    Served from the two-tier read-through cache (in-process + Redis),
+    invalidated whenever the session changes.
     """
-    # Try cache first (skip for admins so they always get fresh data)
-    if current_user.role != "admin":
-        cached = _get_cached_session(session_id)
-        if cached:
-            # Quick ownership check before returning
-            if cached.get("user_id") == str(current_user.id):
-                return cached
-
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
-
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-
-    # Check authorization (user can only access their own sessions)
-    if session.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this session"
-        )
-
-    # Populate cache for future reads
-    _set_cached_session(session_id, {
-        "id": str(session.id),
-        "user_id": str(session.user_id),
-        "session_name": session.session_name,
-        "device_type": session.device_type,
-        "session_status": session.session_status,
-        "started_at": str(session.started_at),
-        "ended_at": str(session.ended_at) if session.ended_at else None,
-        "duration_seconds": session.duration_seconds,
-        "avg_fatigue_score": session.avg_fatigue_score,
-        "max_fatigue_score": session.max_fatigue_score,
-        "alert_count": session.alert_count,
-    })
-
-    return session
+    return get_owned_session(db, session_id, current_user)
 
 
 @router.patch("/{session_id}", response_model=SessionResponse)
@@ -242,8 +153,8 @@ async def update_session(
     db.commit()
     db.refresh(session)
 
-    # Invalidate cached session — data has changed
-    _invalidate_session_cache(session_id)
+    # Invalidate cached session and reports — data has changed
+    cache_events.emit(cache_events.SESSION_UPDATED, session_id=session_id, user_id=session.user_id)
 
     return session
 
@@ -251,6 +162,7 @@ async def update_session(
 @router.post("/{session_id}/complete", response_model=SessionResponse)
 async def complete_session(
     session_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -259,6 +171,7 @@ async def complete_session(
     
     Sets status to 'completed' and ended_at to current time
     Calculates duration_seconds automatically
+    Session summary (avg/max fatigue, aggregates) is materialized in the background
     """
     session = db.query(DBSession).filter(DBSession.id == session_id).first()
     
@@ -287,8 +200,11 @@ async def complete_session(
     db.commit()
     db.refresh(session)
 
-    # Invalidate cache — session is now completed
-    _invalidate_session_cache(session_id)
+    # Invalidate caches — session is now completed
+    cache_events.emit(cache_events.SESSION_COMPLETED, session_id=session_id, user_id=session.user_id)
+
+    # Materialize session aggregates once, after the response is sent
+    background_tasks.add_task(finalize_session_async, session_id)
 
     return session
 
@@ -296,6 +212,7 @@ async def complete_session(
 @router.patch("/{session_id}/end", response_model=SessionResponse)
 async def end_session(
     session_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -304,6 +221,7 @@ async def end_session(
     
     Sets status to 'completed' and ended_at to current time
     Calculates duration_seconds automatically
+    Session summary (avg/max fatigue, aggregates) is materialized in the background
     """
     session = db.query(DBSession).filter(DBSession.id == session_id).first()
     
@@ -332,8 +250,11 @@ async def end_session(
     db.commit()
     db.refresh(session)
 
-    # Invalidate cache — session is now ended
-    _invalidate_session_cache(session_id)
+    # Invalidate caches — session is now ended
+    cache_events.emit(cache_events.SESSION_COMPLETED, session_id=session_id, user_id=session.user_id)
+
+    # Materialize session aggregates once, after the response is sent
+    background_tasks.add_task(finalize_session_async, session_id)
 
     return session
 
@@ -365,10 +286,12 @@ async def delete_session(
             detail="Not authorized to delete this session"
         )
     
+    owner_id = session.user_id
     db.delete(session)
     db.commit()
 
-    # Remove from cache
-    _invalidate_session_cache(session_id)
+    # Remove from caches (cascade deleted its EEG data and alerts too)
+    cache_events.emit(cache_events.SESSION_DELETED, session_id=session_id, user_id=owner_id)
+    export_jobs.delete_session_artifacts(session_id)
 
     return None
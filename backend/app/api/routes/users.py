@@ -11,7 +11,8 @@ from app.db.models import User
 from app.schemas.user import UserResponse, UserUpdate, ChangePasswordRequest
 from app.api.dependencies import get_current_user
 from app.core.cache import cache_user_session, invalidate_user_cache
-from app.core.password import hash_password, verify_password
+from app.core.auth_cache import invalidate_user
+from app.core.password import hash_password_async, verify_password_async
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -75,6 +76,7 @@ async def update_user_me(
     }
     
     cache_user_session(user.id, user_cache_data)
+    invalidate_user(user.id)
     
     return user
 
@@ -105,14 +107,14 @@ async def change_password(
         )
 
     # Verify current password
-    if not verify_password(data.current_password, user.hashed_password):
+    if not await verify_password_async(data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Password saat ini tidak sesuai."
         )
 
     # Set new password
-    user.hashed_password = hash_password(data.new_password)
+    user.hashed_password = await hash_password_async(data.new_password)
     db.commit()
 
     # Invalidate cache so tokens re-validate
@@ -14,6 +14,7 @@ from app.db.database import get_db
 from app.db.models import Session as DBSession, EEGData, FaceDetectionEvent, GameEvent, Alert
 from app.api.websocket_manager import manager as ws_manager
 from app.schemas.eeg import EEGDataPoint, FaceDetectionData, GameEventData, AlertData
+from app.core import cache_events
 
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
@@ -338,6 +339,8 @@ async def handle_alert(data: dict, session_id: UUID, db: Session):
             session.alert_count += 1
         
         db.commit()
+        if session:
+            cache_events.emit(cache_events.ALERT_CREATED, session_id=session.id, user_id=session.user_id)
         
     except Exception as e:
         print(f"Error handling alert: {e}")
@@ -10,6 +10,8 @@ from uuid import UUID
 import json
 import asyncio
 
+from app.core.serialization import dumps_str
+
 
 class ConnectionManager:
     """
@@ -85,7 +87,7 @@ class ConnectionManager:
             websocket: Target WebSocket connection
         """
         try:
-            await websocket.send_json(data)
+            await websocket.send_text(dumps_str(data))
         except Exception as e:
             print(f"Error sending JSON: {e}")
     
@@ -96,7 +98,19 @@ class ConnectionManager:
         
         Args:
             session_id: Session ID (as string) to broadcast to
-            message: Message to broadcast (as dict, will be JSON encoded)
+            message: Message to broadcast (as dict, JSON encoded once for all connections)
+        """
+        if session_id not in self.session_connections:
+            return
+        await self.broadcast_text_to_session(session_id, dumps_str(message))
+    
+    async def broadcast_text_to_session(self, session_id: str, text: str):
+        """
+        Broadcast an already-encoded JSON message to all connections for a session
+        
+        Args:
+            session_id: Session ID (as string) to broadcast to
+            text: JSON text frame, sent as-is
         """
         if session_id not in self.session_connections:
             return
@@ -108,7 +122,7 @@ class ConnectionManager:
         dead_connections = set()
         for connection in connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except Exception as e:
                 print(f"Error broadcasting to session {session_id}: {e}")
                 dead_connections.add(connection)
@@ -132,11 +146,12 @@ class ConnectionManager:
         # Add general connections
         all_connections.update(self.general_connections)
         
-        # Send to all connections, track dead ones
+        # Encode once, send to all connections, track dead ones
+        text = dumps_str(message)
         dead_connections = set()
         for connection in all_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except Exception as e:
                 print(f"Error broadcasting to all: {e}")
                 dead_connections.add(connection)
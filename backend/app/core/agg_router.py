@@ -0,0 +1,118 @@
+"""
+Continuous Aggregate Router
+Chooses which TimescaleDB continuous aggregate should answer a bucketed query.
+
+Rule: use the coarsest view whose bucket
+  - divides the requested resolution evenly, and
+  - lines up with the range boundaries (so no bucket straddles start / end).
+
+Views are listed coarsest first. `None` means no aggregate fits and the
+caller should fall back to the raw hypertable.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class AggregateView:
+    """A continuous aggregate and its bucket width"""
+    name: str
+    bucket: timedelta
+
+
+_MINUTE = timedelta(minutes=1)
+_HOUR = timedelta(hours=1)
+_DAY = timedelta(days=1)
+
+# Coarsest first (migrations 003 and 006)
+AGGREGATE_VIEWS: Dict[str, Tuple[AggregateView, ...]] = {
+    "eeg": (
+        AggregateView("eeg_5min_agg", timedelta(minutes=5)),
+        AggregateView("eeg_1min_agg", _MINUTE),
+    ),
+    "face": (
+        AggregateView("face_1day_agg", _DAY),
+        AggregateView("face_1hour_agg", _HOUR),
+        AggregateView("face_1min_agg", _MINUTE),
+    ),
+    "game": (
+        AggregateView("game_1day_agg", _DAY),
+        AggregateView("game_1hour_agg", _HOUR),
+        AggregateView("game_1min_agg", _MINUTE),
+    ),
+    "alert": (
+        AggregateView("alert_1day_agg", _DAY),
+        AggregateView("alert_1hour_agg", _HOUR),
+        AggregateView("alert_1min_agg", _MINUTE),
+    ),
+}
+
+# Resolutions accepted by bucketed endpoints (Postgres interval literals)
+RESOLUTIONS: Dict[str, timedelta] = {
+    "1 minute":   _MINUTE,
+    "5 minutes":  timedelta(minutes=5),
+    "15 minutes": timedelta(minutes=15),
+    "1 hour":     _HOUR,
+    "6 hours":    timedelta(hours=6),
+    "1 day":      _DAY,
+    "1 week":     timedelta(weeks=1),
+}
+RESOLUTION_PATTERN = "^(" + "|".join(RESOLUTIONS) + ")$"
+
+# time_bucket() origin for sub-month buckets (a Monday, midnight UTC)
+_ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc)
+
+
+def _as_utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+
+def align_down(ts: datetime, bucket: timedelta) -> datetime:
+    """Start of the time_bucket() bucket containing `ts`"""
+    ts = _as_utc(ts)
+    return ts - (ts - _ORIGIN) % bucket
+
+
+def align_up(ts: datetime, bucket: timedelta) -> datetime:
+    """Smallest bucket boundary >= `ts`"""
+    down = align_down(ts, bucket)
+    return down if down == _as_utc(ts) else down + bucket
+
+
+def _is_aligned(ts: Optional[datetime], bucket: timedelta) -> bool:
+    return ts is None or (_as_utc(ts) - _ORIGIN) % bucket == timedelta(0)
+
+
+def pick_view(
+    family: str,
+    resolution: timedelta,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Optional[AggregateView]:
+    """
+    Coarsest aggregate of `family` that can serve `resolution` over
+    [start, end), or None if only raw rows can.
+    """
+    for view in AGGREGATE_VIEWS[family]:
+        if resolution % view.bucket:
+            continue
+        if not (_is_aligned(start, view.bucket) and _is_aligned(end, view.bucket)):
+            continue
+        return view
+    return None
+
+
+def resolution_for_range(
+    start: datetime,
+    end: datetime,
+    max_points: int,
+) -> Tuple[str, timedelta]:
+    """Finest standard resolution that keeps (end - start) within `max_points` buckets"""
+    span = _as_utc(end) - _as_utc(start)
+    for label, width in RESOLUTIONS.items():
+        if span / width <= max_points:
+            return label, width
+    label = next(reversed(RESOLUTIONS))
+    return label, RESOLUTIONS[label]
@@ -0,0 +1,171 @@
+"""
+Local Principal Cache
+In-process cache of verified access token -> authenticated user principal.
+
+`get_current_user` runs on every authenticated request. Without this cache
+each call does a blacklist EXISTS, a user GET and a JWT decode. A cache hit
+is a dict lookup.
+
+Consistency:
+- Entries never outlive the token's `exp` claim, nor `AUTH_CACHE_TTL_SECONDS`
+  (short revalidation window used when invalidations cannot be delivered).
+- Logout / user changes evict locally and publish on the Redis channel
+  `auth:invalidate`, so every worker process evicts the same entries.
+  Revoked token ids travel on the same channel to the blacklist Bloom
+  filters (app/core/token_blacklist.py).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core import pubsub
+from app.core.token_blacklist import token_blacklist
+
+INVALIDATION_CHANNEL = "auth:invalidate"
+
+
+def token_key(token: str) -> str:
+    """Stable, non-reversible cache key for a token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """Thread-safe LRU of token hash -> (principal dict, expires_at)"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 30.0):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, principal: dict, token_exp: Optional[float] = None) -> None:
+        """Cache a principal until min(token exp, now + TTL)"""
+        if self._max_entries <= 0:
+            return
+        expires_at = time.time() + self._ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        key = token_key(token)
+        user_id = principal["id"]
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (principal, expires_at)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def evict_key(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def evict_user(self, user_id: str) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[0]["id"]
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+# ============================================
+# CROSS-PROCESS INVALIDATION
+# ============================================
+
+def _apply_invalidation(message: str) -> None:
+    kind, _, value = message.partition(":")
+    if kind == "token":
+        principal_cache.evict_key(value)
+    elif kind == "user":
+        principal_cache.evict_user(value)
+    elif kind == "revoked":
+        token_blacklist.add_local(value)
+
+
+def invalidate_token(token: str, revoked_id: Optional[str] = None) -> None:
+    """
+    Evict a revoked token here and in every other worker; `revoked_id`
+    (blacklist id) is also added to every worker's Bloom filter.
+    """
+    key = token_key(token)
+    principal_cache.evict_key(key)
+    _publish(f"token:{key}")
+    if revoked_id:
+        publish_revocation(revoked_id)
+
+
+def publish_revocation(revoked_id: str) -> None:
+    """Tell other workers' blacklist Bloom filters about a new revocation"""
+    _publish(f"revoked:{revoked_id}")
+
+
+def invalidate_user(user_id) -> None:
+    """Evict all cached principals of a user here and in every other worker"""
+    principal_cache.evict_user(str(user_id))
+    _publish(f"user:{user_id}")
+
+
+def _publish(message: str) -> None:
+    pubsub.publish(INVALIDATION_CHANNEL, message)
+
+
+def _resync() -> None:
+    principal_cache.clear()
+    token_blacklist.sync()
+
+
+pubsub.register(INVALIDATION_CHANNEL, _apply_invalidation, on_resubscribe=_resync)
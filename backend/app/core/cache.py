@@ -12,6 +12,8 @@ from uuid import UUID
 
 from app.core.redis import get_redis
 from app.core.config import settings
+from app.core.auth_cache import invalidate_token, invalidate_user, publish_revocation
+from app.core.token_blacklist import token_blacklist
 
 
 # ============================================
@@ -19,7 +21,6 @@ from app.core.config import settings
 # ============================================
 
 USER_CACHE_PREFIX = "user:"
-TOKEN_BLACKLIST_PREFIX = "blacklist:"
 
 
 # ============================================
@@ -107,6 +108,9 @@ def invalidate_user_cache(user_id: UUID) -> bool:
     Returns:
         True if deleted, False otherwise
     """
+    # Drop in-process principals (all workers) even if Redis is down
+    invalidate_user(user_id)
+
     r = get_redis()
     if not r:
         return False
@@ -126,64 +130,54 @@ def invalidate_user_cache(user_id: UUID) -> bool:
 
 # ============================================
 # TOKEN BLACKLIST (for Logout)
+# Keyed by jti; see app/core/token_blacklist.py
 # ============================================
 
-def blacklist_token(token: str, ttl_minutes: int = None) -> bool:
+def blacklist_token(token: str, ttl_minutes: int = None, claims: Optional[dict] = None) -> bool:
     """
     Add JWT token to blacklist (for logout)
     Token will be blacklisted until it expires naturally
     
     Args:
         token: JWT token string
-        ttl_minutes: Time to live (default: ACCESS_TOKEN_EXPIRE_MINUTES)
+        ttl_minutes: Fallback TTL if the token has no exp claim
+                     (default: ACCESS_TOKEN_EXPIRE_MINUTES)
+        claims: Already-decoded token claims (avoids re-parsing the token)
     
     Returns:
         True if blacklisted successfully, False otherwise
     """
-    r = get_redis()
-    if not r:
-        return False
-    
     try:
-        cache_key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
         ttl = ttl_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        
-        # Set with expiration (value doesn't matter, we just check existence)
-        r.setex(
-            name=cache_key,
-            time=timedelta(minutes=ttl),
-            value="1"
-        )
-
-        return True
-
+        tid = token_blacklist.revoke(token, claims, fallback_ttl=ttl * 60)
     except (redis.ConnectionError, redis.TimeoutError) as e:
         print(f"[WARN]  Blacklist token – Redis unavailable: {e}")
-        return False
+        tid = None
     except Exception as e:
         print(f"[WARN]  Blacklist token error: {e}")
-        return False
+        tid = None
+
+    # Evict cached principal and propagate the revocation to other workers
+    invalidate_token(token, revoked_id=tid)
+    return tid is not None
 
 
-def is_token_blacklisted(token: str) -> bool:
+def is_token_blacklisted(token: str, claims: Optional[dict] = None) -> bool:
     """
     Check if JWT token is blacklisted
     
+    The local Bloom filter answers "not revoked" without a Redis round-trip;
+    only possible hits are confirmed in Redis.
+    
     Args:
         token: JWT token string
+        claims: Already-decoded token claims (avoids re-parsing the token)
     
     Returns:
         True if blacklisted, False otherwise
     """
-    r = get_redis()
-    if not r:
-        # If Redis not available, cannot check blacklist
-        # Fallback: allow token (less secure but maintains functionality)
-        return False
-    
     try:
-        cache_key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
-        return r.exists(cache_key) > 0
+        return token_blacklist.is_revoked(token, claims)
 
     except (redis.ConnectionError, redis.TimeoutError) as e:
         print(f"[WARN]  Check token blacklist – Redis unavailable, allowing token: {e}")
@@ -193,37 +187,29 @@ def is_token_blacklisted(token: str) -> bool:
         return False
 
 
-def blacklist_refresh_token(token: str) -> bool:
+def blacklist_refresh_token(token: str, claims: Optional[dict] = None) -> bool:
     """
-    Blacklist refresh token (longer TTL)
+    Blacklist refresh token (until its own expiry)
     
     Args:
         token: Refresh token string
+        claims: Already-decoded token claims
     
     Returns:
         True if blacklisted successfully, False otherwise
     """
-    r = get_redis()
-    if not r:
-        return False
-    
     try:
-        cache_key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
-        ttl_days = settings.REFRESH_TOKEN_EXPIRE_DAYS
-        
-        # Set with expiration matching refresh token lifetime
-        r.setex(
-            name=cache_key,
-            time=timedelta(days=ttl_days),
-            value="1"
+        tid = token_blacklist.revoke(
+            token, claims, fallback_ttl=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
         )
-        
-        return True
-        
     except Exception as e:
         print(f"[WARN]  Blacklist refresh token error: {e}")
         return False
 
+    if tid is not None:
+        publish_revocation(tid)
+    return tid is not None
+
 
 # ============================================
 # UTILITY FUNCTIONS
@@ -241,19 +227,20 @@ def get_cache_stats() -> dict:
         return {"status": "unavailable"}
     
     try:
-        # Count cached users
-        user_keys = r.keys(f"{USER_CACHE_PREFIX}*")
+        # Count cached users (SCAN is incremental; KEYS would block Redis)
+        cached_users = sum(1 for _ in r.scan_iter(match=f"{USER_CACHE_PREFIX}*", count=1000))
         
-        # Count blacklisted tokens
-        blacklist_keys = r.keys(f"{TOKEN_BLACKLIST_PREFIX}*")
+        # Count blacklisted tokens from the maintained sorted set
+        blacklisted = token_blacklist.count()
         
         # Get Redis memory usage
         info = r.info("memory")
         
         return {
             "status": "available",
-            "cached_users": len(user_keys),
-            "blacklisted_tokens": len(blacklist_keys),
+            "cached_users": cached_users,
+            "blacklisted_tokens": blacklisted,
+            "blacklist_filter": token_blacklist.stats(),
             "memory_used": info.get("used_memory_human", "unknown")
         }
         
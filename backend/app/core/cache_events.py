@@ -0,0 +1,161 @@
+"""
+Cache Invalidation Events
+Write paths emit a domain event; a dependency map turns it into the cache
+tags that are now stale, in both the read-through cache (session metadata,
+session lists) and the report cache.
+
+    emit(SESSION_COMPLETED, session_id=sid, user_id=uid)
+    emit_debounced(EEG_FLUSHED, session_id=sid)   # hot path, trailing edge
+
+Report tags (set by app/api/routes/reporting.py):
+- `session:<id>`                      per-session detail report
+- `reports:<scope>:<kind>`            scope = `user:<id>` or `all`,
+                                      kind  = sessions | alerts | eeg
+
+Because the writes that feed sessions / alerts / session reports all emit
+an event, those reports are cached for hours. An invalidation that cannot
+reach Redis is not lost: the report cache keeps the tags and replays them
+once Redis is back (ReportCache.invalidate_tags), and read-through L1 caches
+are cleared when pub/sub resubscribes.
+
+Callers on the event loop must pass `user_id`; without it `emit` looks the
+owner up with a blocking DB query, which is only acceptable off the loop
+(debounced timers, background jobs).
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.read_through import invalidate_tags
+from app.core.report_cache import report_cache
+from app.core.session_lookup import get_session_ref
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SESSION_CREATED = "session.created"
+SESSION_UPDATED = "session.updated"
+SESSION_COMPLETED = "session.completed"
+SESSION_SUMMARIZED = "session.summarized"
+SESSION_DELETED = "session.deleted"
+ALERT_CREATED = "alert.created"
+ALERT_UPDATED = "alert.updated"
+ALERT_DELETED = "alert.deleted"
+EEG_FLUSHED = "eeg.flushed"
+
+# event -> report data kinds it changes
+_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    SESSION_CREATED:    ("sessions",),
+    SESSION_UPDATED:    ("sessions",),
+    SESSION_COMPLETED:  ("sessions",),
+    SESSION_SUMMARIZED: ("sessions",),
+    SESSION_DELETED:    ("sessions", "alerts", "eeg"),   # cascade delete
+    ALERT_CREATED:      ("alerts", "sessions"),          # sessions.alert_count
+    ALERT_UPDATED:      ("alerts",),
+    ALERT_DELETED:      ("alerts",),
+    EEG_FLUSHED:        ("eeg",),
+}
+
+# Events that change the session row itself (metadata + list pages)
+_SESSION_ROW_EVENTS = {
+    SESSION_CREATED, SESSION_UPDATED, SESSION_COMPLETED,
+    SESSION_SUMMARIZED, SESSION_DELETED, ALERT_CREATED,
+}
+
+
+def tags_for(event: str, session_id: UUID, user_id: Optional[UUID]) -> List[str]:
+    """Cache tags made stale by `event` on `session_id` (owned by `user_id`)"""
+    tags = [f"session:{session_id}"]
+    scopes = ["all"] + ([f"user:{user_id}"] if user_id is not None else [])
+    for kind in _DEPENDENCIES[event]:
+        tags.extend(f"reports:{scope}:{kind}" for scope in scopes)
+    if event in _SESSION_ROW_EVENTS and user_id is not None:
+        tags.append(f"user-sessions:{user_id}")
+    return tags
+
+
+def report_tags(scope: Optional[str], kinds: Iterable[str]) -> List[str]:
+    """Tags for a report over `kinds` of data, scoped to a user id or all users (None)"""
+    prefix = f"reports:user:{scope}" if scope else "reports:all"
+    return [f"{prefix}:{kind}" for kind in kinds]
+
+
+def emit(event: str, *, session_id: UUID, user_id: Optional[UUID] = None) -> None:
+    """
+    Invalidate everything that depends on `event`.
+
+    `user_id` (the session owner) should be passed when known; otherwise it
+    is looked up with a blocking DB query, since user-scoped reports are
+    tagged by owner. Async handlers must always pass it.
+    """
+    if event not in _DEPENDENCIES:
+        raise ValueError(f"Unknown cache event: {event}")
+    if user_id is None:
+        user_id = _session_owner(session_id)
+    tags = tags_for(event, session_id, user_id)
+    invalidate_tags(*tags)
+    report_cache.invalidate_tags(*tags)
+
+
+def _session_owner(session_id: UUID) -> Optional[UUID]:
+    db = SessionLocal()
+    try:
+        session = get_session_ref(db, session_id)
+        return session.user_id if session else None
+    except Exception as e:
+        logger.warning(f"Could not resolve owner of session {session_id}: {e}")
+        return None
+    finally:
+        db.close()
+
+
+# ============================================
+# DEBOUNCE
+# ============================================
+
+_pending: Dict[Tuple[str, str], threading.Timer] = {}
+_pending_lock = threading.Lock()
+
+
+def emit_debounced(
+    event: str,
+    *,
+    session_id: UUID,
+    user_id: Optional[UUID] = None,
+    delay: float = 15.0,
+) -> None:
+    """
+    Emit `event` at most once per `delay` seconds per session.
+
+    Trailing edge: the first call arms a timer and later calls within the
+    window are folded into it, so the last write is always covered.
+    """
+    key = (event, str(session_id))
+    with _pending_lock:
+        if key in _pending:
+            return
+        timer = threading.Timer(delay, _fire, args=(key, event, session_id, user_id))
+        timer.daemon = True
+        _pending[key] = timer
+    timer.start()
+
+
+def _fire(key: Tuple[str, str], event: str, session_id: UUID, user_id: Optional[UUID]) -> None:
+    with _pending_lock:
+        _pending.pop(key, None)
+    try:
+        emit(event, session_id=session_id, user_id=user_id)
+    except Exception as e:
+        logger.warning(f"Debounced cache event {event} failed: {e}")
+
+
+def flush_pending() -> None:
+    """Fire every armed debounce timer now (application shutdown)"""
+    with _pending_lock:
+        pending = list(_pending.items())
+        _pending.clear()
+    for _, timer in pending:
+        timer.cancel()
+        _fire(*timer.args)
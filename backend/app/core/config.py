@@ -24,6 +24,11 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50  # Pool size (sync and asyncio clients each)
+    REDIS_SOCKET_TIMEOUT: float = 2.0  # Seconds; bounds how long a dead Redis can stall a request
+    REDIS_HEALTH_CHECK_INTERVAL: int = 15  # Seconds between probes while Redis is down
+    REDIS_IDLE_CHECK_INTERVAL: int = 30  # Ping pooled connections idle longer than this on checkout
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 3  # Consecutive connection errors before bypassing Redis
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production"  # CHANGE IN PRODUCTION!
@@ -31,6 +36,20 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Password hashing (bcrypt runs on a bounded worker pool)
+    BCRYPT_ROUNDS: int = 12  # Cost factor; existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = 4  # Concurrent bcrypt operations
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running before returning 503
+
+    # In-process token -> user cache (evicted via Redis pub/sub on logout)
+    AUTH_CACHE_TTL_SECONDS: int = 30  # Revalidation window if an invalidation is missed
+    AUTH_CACHE_MAX_ENTRIES: int = 10000  # 0 disables the cache
+
+    # Token blacklist Bloom filter (per worker, rebuilt from Redis)
+    BLACKLIST_BLOOM_CAPACITY: int = 100000  # Expected revoked, unexpired tokens
+    BLACKLIST_BLOOM_ERROR_RATE: float = 0.001  # False positives fall through to Redis
+    BLACKLIST_SYNC_INTERVAL: int = 30  # Seconds between full rebuilds
+
     # Firebase Admin SDK (for OAuth)
     # Railway: set FIREBASE_SERVICE_ACCOUNT_JSON as JSON string env var
     # Local dev: use FIREBASE_SERVICE_ACCOUNT_PATH to point to the JSON file
@@ -71,7 +90,16 @@ class Settings(BaseSettings):
     LIMIT_WRITE: str = "30/minute"
     LIMIT_STREAM: str = "300/minute"
     LIMIT_EXPORT: str = "10/minute"
-    
+
+    # Background export jobs
+    EXPORT_CACHE_DIR: str = "export_cache"  # Content-addressed artifact cache
+    EXPORT_WORKERS: int = 2  # Worker threads building exports
+    EXPORT_JOB_TTL_SECONDS: int = 3600  # How long finished jobs stay pollable
+    EXPORT_CACHE_MAX_MB: int = 2048  # Size bound of the artifact cache (0 = unbounded)
+    EXPORT_CACHE_MAX_AGE_SECONDS: int = 7 * 86400  # Evict artifacts not served for this long (0 = never)
+    EXPORT_COHORT_MAX_SESSIONS: int = 500  # Upper bound for one cohort archive
+    EXPORT_COHORT_BATCH_SIZE: int = 5000  # Rows fetched per server-side cursor batch
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
@@ -0,0 +1,144 @@
+"""
+EEG Ingest Records
+Compact internal representation of one `/eeg/stream` sample.
+
+A sample is parsed once into an `EEGRecord`; the same object then feeds
+the WebSocket relay (pre-encoded frame), the live aggregates and the batch
+insert buffer (`to_mapping()` for `bulk_insert_mappings`).
+
+Requests from our own EEG server (`X-EEG-API-Key`) skip Pydantic and go
+through `parse_eeg_record()`, which checks only what persistence needs:
+a session UUID, an ISO timestamp and dict-shaped channels / metrics.
+Browser / JWT clients still validate with `EEGStreamData` and are converted
+with `EEGRecord.from_stream_data()`.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.core.serialization import dumps_str, loads
+from app.schemas.eeg import EEGStreamData
+
+# Processed metric -> eeg_data column (numeric)
+_METRIC_COLUMNS = (
+    "delta_power", "theta_power", "alpha_power", "beta_power", "gamma_power",
+    "theta_alpha_ratio", "beta_alpha_ratio", "signal_quality", "eeg_fatigue_score",
+)
+
+
+@dataclass(slots=True)
+class EEGRecord:
+    """One EEG sample, parsed once and shared by relay, aggregates and storage"""
+    session_id: UUID
+    timestamp: datetime
+    timestamp_raw: str
+    channels: Dict[str, Any]
+    processed: Dict[str, Any] = field(default_factory=dict)
+    sample_rate: int = 256
+    save_to_db: bool = False
+    timings: Optional[Dict[str, float]] = None  # Pipeline stage times (ms), not stored
+    frame: Optional[str] = None  # Encoded WebSocket message, built once
+
+    @classmethod
+    def from_stream_data(cls, data: EEGStreamData) -> "EEGRecord":
+        return cls(
+            session_id=data.session_id,
+            timestamp=_parse_timestamp(data.timestamp),
+            timestamp_raw=data.timestamp,
+            channels=data.channels,
+            processed=data.processed,
+            sample_rate=data.sample_rate,
+            save_to_db=data.save_to_db,
+            timings=_timings(data.timings),
+        )
+
+    def relay_frame(self) -> str:
+        """WebSocket `eeg_data` message for this sample (encoded on first use)"""
+        if self.frame is None:
+            self.frame = dumps_str({
+                "type": "eeg_data",
+                "session_id": str(self.session_id),
+                "timestamp": self.timestamp_raw,
+                "sample_rate": self.sample_rate,
+                "channels": self.channels,
+                "processed": self.processed,
+            })
+        return self.frame
+
+    def to_mapping(self) -> dict:
+        """Column mapping for `Session.bulk_insert_mappings(EEGData, ...)`"""
+        processed = self.processed
+        row = {
+            "session_id": self.session_id,
+            "timestamp": self.timestamp,
+            "raw_channels": self.channels,
+            "cognitive_state": _text(processed.get("cognitive_state")),
+        }
+        for column in _METRIC_COLUMNS:
+            row[column] = _number(processed.get(column))
+        return row
+
+
+def parse_eeg_record(body: bytes) -> EEGRecord:
+    """
+    Parse a trusted `/eeg/stream` request body without Pydantic.
+
+    Raises:
+        ValueError: if the body is not a usable EEG sample
+    """
+    try:
+        payload = loads(body)
+    except Exception as e:
+        raise ValueError(f"Invalid JSON body: {e}") from None
+    if not isinstance(payload, dict):
+        raise ValueError("Body must be a JSON object")
+
+    try:
+        session_id = UUID(str(payload["session_id"]))
+        timestamp_raw = payload["timestamp"]
+        timestamp = _parse_timestamp(timestamp_raw)
+        sample_rate = int(payload.get("sample_rate", 256))
+    except KeyError as e:
+        raise ValueError(f"Missing field: {e.args[0]}") from None
+    except (TypeError, AttributeError):
+        raise ValueError("timestamp must be an ISO string and sample_rate an integer") from None
+
+    channels = payload.get("channels")
+    processed = payload.get("processed") or {}
+    if not isinstance(channels, dict) or not isinstance(processed, dict):
+        raise ValueError("channels and processed must be JSON objects")
+
+    return EEGRecord(
+        session_id=session_id,
+        timestamp=timestamp,
+        timestamp_raw=timestamp_raw,
+        channels=channels,
+        processed=processed,
+        sample_rate=sample_rate,
+        save_to_db=bool(payload.get("save_to_db", False)),
+        timings=_timings(payload.get("timings")),
+    )
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def _timings(value: Any) -> Optional[Dict[str, float]]:
+    """Numeric stage timings only; anything else is dropped (timings are optional)"""
+    if not isinstance(value, dict):
+        return None
+    timings = {str(stage): _number(ms) for stage, ms in value.items()}
+    return {stage: ms for stage, ms in timings.items() if ms is not None} or None
+
+
+def _text(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) else None
@@ -8,10 +8,13 @@ from typing import Dict, Any, List
 import logging
 
 from app.api.websocket_manager import manager
-from app.schemas.eeg import EEGStreamData
 from app.db.database import get_db
 from app.db.models import EEGData
+from app.core import cache_events
 from app.core.data_buffer import AsyncDataBuffer
+from app.core.eeg_ingest import EEGRecord
+from app.core.serialization import dumps_str
+from app.core.live_aggregates import live_eeg_aggregates
 
 logger = logging.getLogger(__name__)
 
@@ -25,48 +28,30 @@ logger = logging.getLogger(__name__)
 _eeg_buffer: AsyncDataBuffer = None
 
 
-async def _batch_flush_eeg_to_db(eeg_data_list: List[EEGStreamData]):
+async def _batch_flush_eeg_to_db(records: List[EEGRecord]):
     """
     Batch flush EEG data to TimescaleDB
     
     This is the callback for AsyncDataBuffer.
-    Performs bulk insert for better performance.
+    Performs a single bulk INSERT of plain column mappings (no ORM objects).
     
     Args:
-        eeg_data_list: List of EEG data to insert
+        records: Buffered EEG records to insert
     """
-    if not eeg_data_list:
+    if not records:
         return
     
     db = next(get_db())
     
     try:
-        # Convert EEGStreamData to EEGData models
-        eeg_records = []
-        for data in eeg_data_list:
-            eeg_record = EEGData(
-                session_id=data.session_id,
-                timestamp=data.timestamp,
-                sample_rate=data.sample_rate,
-                tp9=data.channels.get("TP9"),
-                af7=data.channels.get("AF7"),
-                af8=data.channels.get("AF8"),
-                tp10=data.channels.get("TP10"),
-                # Processed metrics
-                theta_power=data.processed.get("theta_power") if data.processed else None,
-                alpha_power=data.processed.get("alpha_power") if data.processed else None,
-                beta_power=data.processed.get("beta_power") if data.processed else None,
-                gamma_power=data.processed.get("gamma_power") if data.processed else None,
-                theta_alpha_ratio=data.processed.get("theta_alpha_ratio") if data.processed else None,
-                fatigue_score=data.processed.get("fatigue_score") if data.processed else None
-            )
-            eeg_records.append(eeg_record)
-        
-        # Bulk insert (much faster than individual inserts)
-        db.bulk_save_objects(eeg_records)
+        db.bulk_insert_mappings(EEGData, [record.to_mapping() for record in records])
         db.commit()
         
-        logger.info(f"Batch inserted {len(eeg_records)} EEG records to database")
+        logger.info(f"Batch inserted {len(records)} EEG records to database")
+
+        # Reports over these sessions' EEG are stale (coalesced per session)
+        for session_id in {record.session_id for record in records}:
+            cache_events.emit_debounced(cache_events.EEG_FLUSHED, session_id=session_id)
         
     except Exception as e:
         logger.error(f"Error batch saving EEG data to database: {e}", exc_info=True)
@@ -127,7 +112,9 @@ def get_eeg_buffer_stats() -> dict:
         Dictionary with buffer stats
     """
     buffer = get_eeg_buffer()
-    return buffer.get_stats()
+    stats = buffer.get_stats()
+    stats["live_aggregates"] = live_eeg_aggregates.stats()
+    return stats
 
 
 # ============================================================================
@@ -155,9 +142,22 @@ async def relay_eeg_to_clients(session_id: str, data: Dict[str, Any]) -> int:
         "channels": data.get("channels"),
         "processed": data.get("processed")
     }
+    return await relay_eeg_frame(session_id, dumps_str(message))
+
+
+async def relay_eeg_frame(session_id: str, frame: str) -> int:
+    """
+    Relay an already-encoded EEG message (see `EEGRecord.relay_frame`)
+    
+    Args:
+        session_id: Session UUID as string
+        frame: JSON text frame, sent to every client as-is
     
+    Returns:
+        Number of clients that received the data
+    """
     # Broadcast to all clients connected to this session
-    await manager.broadcast_to_session(session_id, message)
+    await manager.broadcast_text_to_session(session_id, frame)
     
     # Return count of notified clients
     if session_id in manager.session_connections:
@@ -175,7 +175,7 @@ async def relay_eeg_to_clients(session_id: str, data: Dict[str, Any]) -> int:
     return 0
 
 
-async def save_eeg_to_database(data: EEGStreamData):
+async def save_eeg_to_database(record: EEGRecord):
     """
     Save EEG data to TimescaleDB using batch insertion
     
@@ -187,12 +187,15 @@ async def save_eeg_to_database(data: EEGStreamData):
     - 1 second has passed since last flush
     
     Args:
-        data: EEG stream data to save
+        record: Parsed EEG sample to save
     """
     try:
         # Add to buffer (non-blocking)
         buffer = get_eeg_buffer()
-        await buffer.add(data)
+        await buffer.add(record)
+
+        # Keep per-minute live aggregates for the in-progress session
+        live_eeg_aggregates.add(str(record.session_id), record.timestamp, record.processed)
         
     except Exception as e:
         logger.error(f"Error buffering EEG data: {e}", exc_info=True)
@@ -158,6 +158,13 @@ class CacheUnavailableError(FumoriveException):
     error_code = "CACHE_UNAVAILABLE"
 
 
+class PasswordHasherBusyError(FumoriveException):
+    """bcrypt worker pool queue is full (login storm)."""
+    message = "Authentication service is busy. Please retry shortly."
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    error_code = "AUTH_BUSY"
+
+
 class ExternalServiceError(FumoriveException):
     """Third-party service (Firebase, etc.) returned an error."""
     message = "An external service is unavailable."
@@ -0,0 +1,399 @@
+"""
+Background Export Jobs
+Runs session data exports in a worker pool and keeps the finished files in a
+local content-addressed cache.
+
+Flow:
+  POST /sessions/{id}/export/jobs  -> job queued, returns job_id
+  GET  /sessions/export/jobs/{id}  -> poll status
+  GET  /sessions/export/jobs/{id}/download -> file (Range supported)
+
+Artifacts are keyed by (session_id, data version, data_type, format, time
+range) and stored under `<cache_dir>/<session_id>/`. Only completed sessions
+are cached; the data version is the session's `summarized_at`, which moves
+whenever its data changes after completion (alert acknowledged/deleted), so
+an edited session gets a new key instead of a stale file. Deleting a session
+removes its directory, and the cache is bounded by age and total size
+(least recently served files go first). Exports of active sessions are
+written per job and removed once the job expires.
+
+Job metadata is mirrored to `<cache_dir>/jobs/<job_id>.json` so any worker
+process sharing the cache directory can answer status and download calls.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+
+logger = logging.getLogger("fumorive.export")
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+# Minimum seconds between two scans of the artifact cache for eviction
+_SWEEP_INTERVAL = 60.0
+
+
+@dataclass
+class ExportJob:
+    """State of a single export job"""
+    id: str
+    session_id: str
+    user_id: str
+    data_type: str
+    format: str
+    start_time: Optional[str]
+    end_time: Optional[str]
+    cache_key: str
+    filename: str
+    cacheable: bool
+    status: str = JOB_PENDING
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+    size_bytes: Optional[int] = None
+    cache_hit: bool = False
+    error: Optional[str] = None
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES.get(self.format, "application/octet-stream")
+
+    def to_dict(self) -> dict:
+        """Public representation returned by the status endpoint"""
+        def _iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts else None
+
+        return {
+            "job_id": self.id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "data_type": self.data_type,
+            "format": self.format,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "filename": self.filename,
+            "size_bytes": self.size_bytes,
+            "cache_hit": self.cache_hit,
+            "created_at": _iso(self.created_at),
+            "finished_at": _iso(self.finished_at),
+            "error": self.error,
+        }
+
+
+def artifact_key(
+    session_id,
+    data_type: str,
+    fmt: str,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    version: Optional[datetime] = None,
+) -> str:
+    """
+    Content address for an export: sha256 over the export parameters and
+    the session's data version (`summarized_at`)
+    """
+    parts = [
+        str(session_id),
+        version.isoformat() if version else "",
+        data_type,
+        fmt,
+        start_time.isoformat() if start_time else "",
+        end_time.isoformat() if end_time else "",
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ExportJobManager:
+    """
+    Worker pool + artifact cache for session exports.
+
+    Each job opens its own DB session, so no request-scoped connection is
+    held while the export is built or downloaded.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_workers: int,
+        job_ttl_seconds: int,
+        max_cache_bytes: int = 0,
+        max_artifact_age_seconds: int = 0,
+    ):
+        self._cache_dir = os.path.abspath(cache_dir)
+        self._jobs_dir = os.path.join(self._cache_dir, "jobs")
+        self._max_workers = max(1, max_workers)
+        self._job_ttl = job_ttl_seconds
+        self._max_cache_bytes = max_cache_bytes  # 0 = unbounded
+        self._max_artifact_age = max_artifact_age_seconds  # 0 = no age limit
+        self._last_sweep = 0.0
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ---------- lifecycle ----------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                os.makedirs(self._jobs_dir, exist_ok=True)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="export-worker",
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for running exports to finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # ---------- paths ----------
+
+    def _cache_path(self, session_id, cache_key: str, fmt: str) -> str:
+        return os.path.join(self._cache_dir, str(session_id), f"{cache_key}.{fmt}")
+
+    def _artifact_path(self, job: ExportJob) -> str:
+        if job.cacheable:
+            return self._cache_path(job.session_id, job.cache_key, job.format)
+        return os.path.join(self._jobs_dir, f"{job.id}.{job.format}")
+
+    def cached_artifact(self, session_id, cache_key: str, fmt: str) -> Optional[str]:
+        """Return path of a cached artifact for a completed session, if present"""
+        path = self._cache_path(session_id, cache_key, fmt)
+        try:
+            os.utime(path)  # mtime = last served, for LRU eviction
+        except OSError:
+            return None
+        return path
+
+    def store_artifact(self, session_id, cache_key: str, fmt: str, content: bytes) -> str:
+        """Write an artifact into the content-addressed cache"""
+        path = self._cache_path(session_id, cache_key, fmt)
+        self._write_atomic(path, content)
+        self._sweep_cache()
+        return path
+
+    def delete_session_artifacts(self, session_id) -> None:
+        """Remove every cached artifact of a session (session deleted)"""
+        shutil.rmtree(os.path.join(self._cache_dir, str(session_id)), ignore_errors=True)
+
+    @staticmethod
+    def _write_atomic(path: str, content: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    # ---------- job registry ----------
+
+    def _save(self, job: ExportJob) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._write_atomic(
+                os.path.join(self._jobs_dir, f"{job.id}.json"),
+                json.dumps(asdict(job)).encode("utf-8"),
+            )
+        except OSError as e:
+            logger.warning("Could not persist export job", extra={"job_id": job.id, "error": str(e)})
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Look up a job in memory, falling back to the shared job directory"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+        try:
+            with open(os.path.join(self._jobs_dir, f"{job_id}.json"), "rb") as f:
+                return ExportJob(**json.loads(f.read()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def artifact_path(self, job: ExportJob) -> Optional[str]:
+        """Path of a finished job's file, or None if it is not available"""
+        if job.status != JOB_COMPLETED:
+            return None
+        path = self._artifact_path(job)
+        return path if os.path.isfile(path) else None
+
+    def submit(
+        self,
+        *,
+        session_id,
+        user_id,
+        data_type: str,
+        fmt: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        filename: str,
+        cacheable: bool,
+        builder: Callable,
+        version: Optional[datetime] = None,
+    ) -> ExportJob:
+        """
+        Queue an export.
+
+        `builder(db) -> bytes` produces the file content; it runs in the
+        worker pool with a fresh DB session. When the session is cacheable
+        and the artifact for its data `version` already exists, the job
+        completes immediately.
+        """
+        self._prune()
+
+        job = ExportJob(
+            id=str(uuid.uuid4()),
+            session_id=str(session_id),
+            user_id=str(user_id),
+            data_type=data_type,
+            format=fmt,
+            start_time=start_time.isoformat() if start_time else None,
+            end_time=end_time.isoformat() if end_time else None,
+            cache_key=artifact_key(session_id, data_type, fmt, start_time, end_time, version),
+            filename=filename,
+            cacheable=cacheable,
+            created_at=time.time(),
+        )
+
+        if cacheable:
+            path = self.cached_artifact(job.session_id, job.cache_key, fmt)
+            if path:
+                job.status = JOB_COMPLETED
+                job.cache_hit = True
+                job.size_bytes = os.path.getsize(path)
+                job.finished_at = time.time()
+                self._save(job)
+                return job
+
+        executor = self._get_executor()
+        self._save(job)
+        executor.submit(self._run, job, builder)
+        return job
+
+    def _run(self, job: ExportJob, builder: Callable) -> None:
+        job.status = JOB_RUNNING
+        self._save(job)
+
+        db = SessionLocal()
+        try:
+            content = builder(db)
+            self._write_atomic(self._artifact_path(job), content)
+            job.size_bytes = len(content)
+            job.status = JOB_COMPLETED
+            if job.cacheable:
+                self._sweep_cache()
+        except Exception as e:
+            logger.exception("Export job failed", extra={"job_id": job.id, "session_id": job.session_id})
+            job.status = JOB_FAILED
+            job.error = str(e)
+        finally:
+            db.close()
+            job.finished_at = time.time()
+            self._save(job)
+
+    def _prune(self) -> None:
+        """Forget expired jobs and delete their per-job artifacts"""
+        cutoff = time.time() - self._job_ttl
+        with self._lock:
+            expired = [
+                j for j in self._jobs.values()
+                if j.finished_at is not None and j.finished_at < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+
+        for job in expired:
+            paths = [os.path.join(self._jobs_dir, f"{job.id}.json")]
+            if not job.cacheable:
+                paths.append(self._artifact_path(job))
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        self._sweep_cache()
+
+    def _cached_files(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every cached artifact"""
+        files = []
+        for entry in os.scandir(self._cache_dir):
+            if not entry.is_dir() or entry.path == self._jobs_dir:
+                continue
+            for item in os.scandir(entry.path):
+                if item.name.endswith(".tmp"):
+                    continue
+                try:
+                    st = item.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, item.path))
+        return files
+
+    def _sweep_cache(self) -> None:
+        """
+        Evict cached artifacts older than the age limit, then the least
+        recently served ones until the cache fits its size limit.
+        Runs at most once per _SWEEP_INTERVAL.
+        """
+        if not (self._max_cache_bytes or self._max_artifact_age):
+            return
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < _SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+
+        try:
+            files = sorted(self._cached_files())
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in files)
+        cutoff = now - self._max_artifact_age if self._max_artifact_age else None
+        for mtime, size, path in files:
+            expired = cutoff is not None and mtime < cutoff
+            too_big = self._max_cache_bytes and total > self._max_cache_bytes
+            if not (expired or too_big):
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+# Global instance
+export_jobs = ExportJobManager(
+    cache_dir=settings.EXPORT_CACHE_DIR,
+    max_workers=settings.EXPORT_WORKERS,
+    job_ttl_seconds=settings.EXPORT_JOB_TTL_SECONDS,
+    max_cache_bytes=settings.EXPORT_CACHE_MAX_MB * 1024 * 1024,
+    max_artifact_age_seconds=settings.EXPORT_CACHE_MAX_AGE_SECONDS,
+)
@@ -0,0 +1,197 @@
+"""
+Live EEG Aggregates
+In-memory per-minute buckets for sessions that are still streaming.
+
+The `eeg_1min_agg` / `eeg_5min_agg` continuous aggregates are refreshed on a
+schedule and lag ingest by up to a minute or more. This module keeps running
+sums for the most recent minutes of every active session, fed by
+`save_eeg_to_database`, so aggregate endpoints can merge them with the
+materialized rows without scanning `eeg_data`.
+
+Each worker process only sees the samples it ingested itself; merging keeps
+whichever side of a bucket holds more samples.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core.agg_router import align_down
+
+logger = logging.getLogger(__name__)
+
+# Stream field -> aggregate column (same names as eeg_1min_agg)
+_FIELDS = {
+    "delta_power":       "avg_delta",
+    "theta_power":       "avg_theta",
+    "alpha_power":       "avg_alpha",
+    "beta_power":        "avg_beta",
+    "gamma_power":       "avg_gamma",
+    "theta_alpha_ratio": "avg_theta_alpha_ratio",
+    "eeg_fatigue_score": "avg_fatigue_score",
+    "signal_quality":    "avg_signal_quality",
+}
+
+_MINUTE = timedelta(minutes=1)
+
+
+class _MinuteBucket:
+    """Running sums for one session-minute"""
+    __slots__ = ("sums", "counts", "sample_count")
+
+    def __init__(self):
+        self.sums = dict.fromkeys(_FIELDS, 0.0)
+        self.counts = dict.fromkeys(_FIELDS, 0)
+        self.sample_count = 0
+
+    def add(self, values: dict) -> None:
+        self.sample_count += 1
+        for field in _FIELDS:
+            value = values.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.sums[field] += value
+                self.counts[field] += 1
+
+
+def _minute_floor(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.replace(second=0, microsecond=0)
+
+
+class LiveEEGAggregator:
+    """
+    Rolling per-session, per-minute EEG aggregates.
+
+    Memory is bounded: each session keeps at most `retention_minutes`
+    buckets, and sessions idle for `idle_timeout` seconds are dropped.
+    """
+
+    def __init__(self, retention_minutes: int = 180, idle_timeout: float = 600.0):
+        self._retention = retention_minutes
+        self._idle_timeout = idle_timeout
+        self._sessions: Dict[str, "OrderedDict[datetime, _MinuteBucket]"] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, timestamp: datetime, values: dict) -> None:
+        """Fold one EEG sample (processed metrics) into its minute bucket"""
+        minute = _minute_floor(timestamp)
+        with self._lock:
+            buckets = self._sessions.get(session_id)
+            if buckets is None:
+                buckets = self._sessions[session_id] = OrderedDict()
+            bucket = buckets.get(minute)
+            if bucket is None:
+                bucket = buckets[minute] = _MinuteBucket()
+                # Samples normally arrive in order; keep the dict sorted anyway
+                if len(buckets) > 1 and next(reversed(buckets)) != minute:
+                    for key in sorted(buckets):
+                        buckets.move_to_end(key)
+                while len(buckets) > self._retention:
+                    buckets.popitem(last=False)
+            bucket.add(values)
+            self._last_seen[session_id] = time.monotonic()
+
+    def drop(self, session_id: str) -> None:
+        """Forget a session (called when it completes)"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+
+    def prune(self) -> int:
+        """Drop sessions that stopped streaming; returns how many were removed"""
+        cutoff = time.monotonic() - self._idle_timeout
+        with self._lock:
+            idle = [sid for sid, seen in self._last_seen.items() if seen < cutoff]
+            for sid in idle:
+                self._sessions.pop(sid, None)
+                self._last_seen.pop(sid, None)
+        return len(idle)
+
+    def rows(
+        self,
+        session_id: str,
+        bucket: timedelta = _MINUTE,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> List[dict]:
+        """
+        Live buckets shaped like continuous-aggregate rows.
+
+        `bucket` must be a whole number of minutes; minute buckets are rolled
+        up with sample-weighted averages.
+        """
+        self.prune()
+        with self._lock:
+            buckets = self._sessions.get(session_id)
+            if not buckets:
+                return []
+            snapshot = [(minute, b.sample_count, dict(b.sums), dict(b.counts))
+                        for minute, b in buckets.items()]
+
+        merged: "OrderedDict[datetime, list]" = OrderedDict()
+        for minute, samples, sums, counts in snapshot:
+            key = align_down(minute, bucket)
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = [0, dict.fromkeys(_FIELDS, 0.0), dict.fromkeys(_FIELDS, 0)]
+            entry[0] += samples
+            for field in _FIELDS:
+                entry[1][field] += sums[field]
+                entry[2][field] += counts[field]
+
+        start = _minute_floor(start_time) if start_time else None
+        end = end_time.replace(tzinfo=timezone.utc) if end_time and end_time.tzinfo is None else end_time
+
+        result = []
+        for key, (samples, sums, counts) in merged.items():
+            if start is not None and key < start:
+                continue
+            if end is not None and key > end:
+                continue
+            row = {"bucket": key, "sample_count": samples}
+            for field, column in _FIELDS.items():
+                row[column] = sums[field] / counts[field] if counts[field] else None
+            result.append(row)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "buckets": sum(len(b) for b in self._sessions.values()),
+            }
+
+
+def merge_aggregate_rows(materialized: List[dict], live: List[dict]) -> List[dict]:
+    """
+    Merge materialized aggregate rows with live rows by bucket.
+
+    Both sides can hold a partial bucket (view refreshed mid-minute, worker
+    restarted mid-minute); the one with more samples wins. Result is
+    ordered by bucket.
+    """
+    if not live:
+        return materialized
+
+    def _key(ts: datetime) -> datetime:
+        return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+    by_bucket = {_key(row["bucket"]): row for row in materialized}
+    for row in live:
+        key = _key(row["bucket"])
+        current = by_bucket.get(key)
+        if current is None or (row["sample_count"] or 0) > (current.get("sample_count") or 0):
+            if current is not None:
+                # Keep any column the live side does not track
+                row = {**current, **{k: v for k, v in row.items() if k in current or k == "bucket"}}
+            by_bucket[key] = row
+    return [by_bucket[k] for k in sorted(by_bucket)]
+
+
+# Global instance
+live_eeg_aggregates = LiveEEGAggregator()
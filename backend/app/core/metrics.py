@@ -1,25 +1,148 @@
 """
 In-process Application Metrics
-Thread-safe counters and rolling response-time window.
+Thread-safe counters and per-route streaming latency sketches.
 
 Used by GET /api/v1/health/metrics for lightweight production monitoring
 without requiring a full Prometheus/Grafana stack.
 
+Latencies go into log-bucket quantile sketches (DDSketch-style, 1 %
+relative error, bounded bucket range) kept per route in a ring of 10-second
+slots. The 1m / 5m / 15m windows merge the newest 6 / 30 / 90 slots, so
+memory and scrape cost are fixed regardless of traffic.
+
+Completed slots are published to Redis (HINCRBY per bucket, so sketches from
+all workers add up) and `cluster_snapshot()` reads the merged view back.
+
 Week 7 — Health Monitoring Setup
 """
 
+import logging
+import math
 import threading
 import time
-from collections import deque
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
 
 # ============================================
 # CONFIGURATION
 # ============================================
 
-_WINDOW_SIZE      = 1_000   # Keep last N response times in memory
 _SLOW_THRESHOLD_MS = 500    # Requests slower than this are flagged
+_SLOT_SECONDS      = 10     # Resolution of the time-decayed windows
+_WINDOWS           = {"1m": 6, "5m": 30, "15m": 90}   # window -> slots
+_MAX_ROUTES        = 200    # Further routes are folded into "other"
+_OTHER_ROUTE       = "other"
+
+_RELATIVE_ACCURACY = 0.01
+_GAMMA             = (1 + _RELATIVE_ACCURACY) / (1 - _RELATIVE_ACCURACY)
+_LOG_GAMMA         = math.log(_GAMMA)
+_MIN_MS            = 0.01                # Values below share the lowest bucket
+_MAX_MS            = 300_000.0           # ... and above share the highest
+
+_REDIS_PREFIX      = "metrics:sk:"
+_REDIS_TTL         = _SLOT_SECONDS * max(_WINDOWS.values()) + 60
+
+
+# ============================================
+# QUANTILE SKETCH
+# ============================================
+
+class LatencySketch:
+    """
+    Mergeable quantile sketch over log-spaced buckets.
+
+    Any quantile is within 1 % (relative) of the true value for latencies
+    between 0.01 ms and 5 minutes; at most ~1 400 buckets ever exist.
+    """
+    __slots__ = ("buckets", "count", "total_ms")
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, value_ms: float) -> None:
+        index = math.ceil(math.log(min(max(value_ms, _MIN_MS), _MAX_MS)) / _LOG_GAMMA)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+
+    def merge(self, other: "LatencySketch") -> None:
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.total_ms += other.total_ms
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * _GAMMA ** index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.buckets) / (_GAMMA + 1)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean":  round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50":   round(self.quantile(0.50), 1),
+            "p95":   round(self.quantile(0.95), 1),
+            "p99":   round(self.quantile(0.99), 1),
+        }
+
+
+class _Slot:
+    """One route's requests during one 10-second slot"""
+    __slots__ = ("slot_id", "sketch", "errors_4xx", "errors_5xx")
+
+    def __init__(self, slot_id: int) -> None:
+        self.slot_id = slot_id
+        self.sketch = LatencySketch()
+        self.errors_4xx = 0
+        self.errors_5xx = 0
+
+    def copy(self) -> "_Slot":
+        clone = _Slot(self.slot_id)
+        clone.sketch.merge(self.sketch)
+        clone.errors_4xx = self.errors_4xx
+        clone.errors_5xx = self.errors_5xx
+        return clone
+
 
+def _current_slot() -> int:
+    return int(time.time() // _SLOT_SECONDS)
+
+
+def _window_summaries(slots: List[_Slot], now_slot: int) -> Dict[str, Dict[str, Any]]:
+    """1m / 5m / 15m summaries in one newest-to-oldest pass over the slots"""
+    sketch = LatencySketch()
+    errors_4xx = errors_5xx = 0
+    result: Dict[str, Dict[str, Any]] = {}
+    ordered = sorted(slots, key=lambda slot: slot.slot_id, reverse=True)
+    i = 0
+    for name, n_slots in sorted(_WINDOWS.items(), key=lambda item: item[1]):
+        while i < len(ordered) and now_slot - ordered[i].slot_id < n_slots:
+            sketch.merge(ordered[i].sketch)
+            errors_4xx += ordered[i].errors_4xx
+            errors_5xx += ordered[i].errors_5xx
+            i += 1
+        summary = sketch.summary()
+        summary["4xx"] = errors_4xx
+        summary["5xx"] = errors_5xx
+        summary["rps"] = round(sketch.count / (n_slots * _SLOT_SECONDS), 2)
+        result[name] = summary
+    return result
+
+
+# ============================================
+# METRICS STORE
+# ============================================
 
 class _AppMetrics:
     """
@@ -35,14 +158,16 @@ class _AppMetrics:
         self.total_requests:  int = 0
         self.errors_4xx:      int = 0
         self.errors_5xx:      int = 0
-        self.slow_requests:   int = 0   # P95 > _SLOW_THRESHOLD_MS
+        self.slow_requests:   int = 0   # Requests over _SLOW_THRESHOLD_MS
 
-        # Rolling window of response times (seconds)
-        self._response_times: deque = deque(maxlen=_WINDOW_SIZE)
+        # Per-route ring of slots, newest last (at most 90 per route)
+        self._routes: Dict[str, List[_Slot]] = {}
+        self._route_hits: Dict[str, int] = {}
 
-        # Per-path aggregates (top 20 hottest paths)
-        self._path_counts: Dict[str, int] = {}
-        self._MAX_PATHS = 20
+        # Redis publisher
+        self._published_upto = _current_slot()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
 
     # ----------------------------------------------------------------
     # WRITE — called per-request from HTTP middleware
@@ -55,23 +180,40 @@ class _AppMetrics:
         Args:
             duration_s:  Wall-clock duration in seconds
             status_code: HTTP response status code
-            path:        Normalised URL path (already stripped of IDs)
+            path:        Route template, e.g. "GET /api/v1/sessions/{session_id}"
         """
+        duration_ms = duration_s * 1000
         with self._lock:
+            # Read the clock under the lock so slots are only ever appended in order
+            slot_id = _current_slot()
             self.total_requests += 1
-            self._response_times.append(duration_s)
 
             if 400 <= status_code < 500:
                 self.errors_4xx += 1
             elif status_code >= 500:
                 self.errors_5xx += 1
 
-            if duration_s * 1000 > _SLOW_THRESHOLD_MS:
+            if duration_ms > _SLOW_THRESHOLD_MS:
                 self.slow_requests += 1
 
-            # Track top paths (cap at _MAX_PATHS to prevent unbounded growth)
-            if path and (path in self._path_counts or len(self._path_counts) < self._MAX_PATHS):
-                self._path_counts[path] = self._path_counts.get(path, 0) + 1
+            route = path or _OTHER_ROUTE
+            if route not in self._routes and len(self._routes) >= _MAX_ROUTES:
+                route = _OTHER_ROUTE
+            slots = self._routes.get(route)
+            if slots is None:
+                slots = self._routes[route] = []
+            if not slots or slots[-1].slot_id != slot_id:
+                slots.append(_Slot(slot_id))
+                # Drop slots that fell out of the longest window
+                while slot_id - slots[0].slot_id >= _WINDOWS["15m"]:
+                    slots.pop(0)
+            slot = slots[-1]
+            slot.sketch.add(duration_ms)
+            if 400 <= status_code < 500:
+                slot.errors_4xx += 1
+            elif status_code >= 500:
+                slot.errors_5xx += 1
+            self._route_hits[route] = self._route_hits.get(route, 0) + 1
 
     # ----------------------------------------------------------------
     # READ — called by /health/metrics endpoint
@@ -80,28 +222,25 @@ class _AppMetrics:
     def snapshot(self) -> Dict[str, Any]:
         """Return a point-in-time snapshot (safe to serialise as JSON)."""
         with self._lock:
-            times = list(self._response_times)
-            path_counts = dict(self._path_counts)
+            # Only each route's newest slot is still written; copy just that
+            # one so the merging below can run without holding the lock
+            now_slot = _current_slot()
+            routes = {
+                route: slots[:-1] + [slots[-1].copy()]
+                for route, slots in self._routes.items()
+            }
+            route_hits = dict(self._route_hits)
             errors_4xx = self.errors_4xx
             errors_5xx = self.errors_5xx
             slow = self.slow_requests
             total = self.total_requests
 
         uptime = time.time() - self._started_at
-
-        if times:
-            sorted_t = sorted(times)
-            n = len(sorted_t)
-            mean  = sum(sorted_t) / n
-            p50   = sorted_t[int(n * 0.50)]
-            p95   = sorted_t[min(int(n * 0.95), n - 1)]
-            p99   = sorted_t[min(int(n * 0.99), n - 1)]
-            rps   = n / max(uptime, 1)  # rolling-window RPS (approximate)
-        else:
-            mean = p50 = p95 = p99 = rps = 0.0
+        windows = _window_summaries([slot for slots in routes.values() for slot in slots], now_slot)
+        recent = windows["5m"]
 
         # Top 10 paths by hit count
-        top_paths = sorted(path_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_paths = sorted(route_hits.items(), key=lambda x: x[1], reverse=True)[:10]
 
         return {
             "uptime_seconds":   round(uptime, 1),
@@ -118,18 +257,127 @@ class _AppMetrics:
                 "pct":          round(slow / max(total, 1) * 100, 2),
             },
             "response_time_ms": {
-                "mean": round(mean * 1000, 1),
-                "p50":  round(p50  * 1000, 1),
-                "p95":  round(p95  * 1000, 1),
-                "p99":  round(p99  * 1000, 1),
+                "window": "5m",
+                "mean": recent["mean"],
+                "p50":  recent["p50"],
+                "p95":  recent["p95"],
+                "p99":  recent["p99"],
             },
             "throughput": {
-                "approx_rps":    round(rps, 2),
-                "window_samples": len(times),
+                "approx_rps":    windows["1m"]["rps"],
+                "window_samples": recent["count"],
             },
+            "windows": windows,
+            "routes": {route: _window_summaries(slots, now_slot) for route, slots in routes.items()},
             "top_paths": [{"path": p, "hits": c} for p, c in top_paths],
         }
 
+    # ----------------------------------------------------------------
+    # CLUSTER — completed slots shared via Redis
+    # ----------------------------------------------------------------
+
+    def publish(self) -> bool:
+        """
+        Push every completed, unpublished slot to Redis; False if Redis is down.
+
+        Completed slots are never written again, so they are read without the lock.
+        """
+        r = get_redis()
+        if not r:
+            return False
+        now_slot = _current_slot()
+        with self._lock:
+            pending = [
+                (route, slot)
+                for route, slots in self._routes.items()
+                for slot in slots
+                if self._published_upto <= slot.slot_id < now_slot
+            ]
+        try:
+            pipe = r.pipeline(transaction=False)
+            for route, slot in pending:
+                key = f"{_REDIS_PREFIX}{slot.slot_id}:{route}"
+                for index, n in slot.sketch.buckets.items():
+                    pipe.hincrby(key, f"b{index}", n)
+                pipe.hincrby(key, "count", slot.sketch.count)
+                pipe.hincrbyfloat(key, "total_ms", slot.sketch.total_ms)
+                pipe.hincrby(key, "4xx", slot.errors_4xx)
+                pipe.hincrby(key, "5xx", slot.errors_5xx)
+                pipe.expire(key, _REDIS_TTL)
+                pipe.sadd(f"{_REDIS_PREFIX}{slot.slot_id}", route)
+                pipe.expire(f"{_REDIS_PREFIX}{slot.slot_id}", _REDIS_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Metrics publish failed: {e}")
+            return False
+        self._published_upto = now_slot
+        return True
+
+    def cluster_snapshot(self) -> Dict[str, Any]:
+        """Windows and per-route summaries merged across all workers (completed slots only)"""
+        r = get_redis()
+        if not r:
+            return {"status": "unavailable"}
+        now_slot = _current_slot()
+        slot_ids = list(range(now_slot - _WINDOWS["15m"], now_slot))
+        try:
+            pipe = r.pipeline(transaction=False)
+            for slot_id in slot_ids:
+                pipe.smembers(f"{_REDIS_PREFIX}{slot_id}")
+            keys: List[Tuple[int, str]] = [
+                (slot_id, route)
+                for slot_id, members in zip(slot_ids, pipe.execute())
+                for route in members
+            ]
+            pipe = r.pipeline(transaction=False)
+            for slot_id, route in keys:
+                pipe.hgetall(f"{_REDIS_PREFIX}{slot_id}:{route}")
+            hashes = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Metrics cluster read failed: {e}")
+            return {"status": "unavailable"}
+
+        routes: Dict[str, List[_Slot]] = {}
+        for (slot_id, route), fields in zip(keys, hashes):
+            routes.setdefault(route, []).append(_slot_from_hash(slot_id, fields))
+
+        # Windows end at the last completed slot
+        end_slot = now_slot - 1
+        return {
+            "status": "ok",
+            "windows": _window_summaries([slot for slots in routes.values() for slot in slots], end_slot),
+            "routes": {route: _window_summaries(slots, end_slot) for route, slots in routes.items()},
+        }
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-publish", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(_SLOT_SECONDS - time.time() % _SLOT_SECONDS + 0.1):
+            self.publish()
+
+
+def _slot_from_hash(slot_id: int, fields: Dict[str, str]) -> _Slot:
+    slot = _Slot(slot_id)
+    for name, value in fields.items():
+        if name.startswith("b"):
+            slot.sketch.buckets[int(name[1:])] = int(value)
+    slot.sketch.count = int(fields.get("count", 0))
+    slot.sketch.total_ms = float(fields.get("total_ms", 0.0))
+    slot.errors_4xx = int(fields.get("4xx", 0))
+    slot.errors_5xx = int(fields.get("5xx", 0))
+    return slot
+
 
 # ============================================
 # MODULE-LEVEL SINGLETON
@@ -2,46 +2,194 @@
 Password Hashing Utilities
 Secure password hashing using bcrypt (direct implementation)
 Week 2, Wednesday - Fixed bcrypt compatibility
+
+bcrypt is deliberately slow (~250 ms at cost 12). Async endpoints must use
+`hash_password_async` / `verify_password_async`, which run on a bounded
+worker pool so a login storm cannot block the event loop (and with it the
+WebSocket relays). The sync functions remain for scripts and tests.
 """
 
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
 
+from app.core.config import settings
+from app.core.exceptions import PasswordHasherBusyError
+
 
 def hash_password(password: str) -> str:
     """
     Hash a plain text password using bcrypt
-    
+
     Args:
         password: Plain text password
-    
+
     Returns:
         Hashed password string
     """
     # Convert password to bytes
     password_bytes = password.encode('utf-8')
-    
-    # Generate salt and hash password
-    salt = bcrypt.gensalt()
+
+    # Generate salt (configured cost factor) and hash password
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
-    
+
     # Return as string
     return hashed.decode('utf-8')
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
     """
     Verify a password against its hash
-    
+
     Args:
         plain_password: Plain text password to verify
-        hashed_password: Hashed password from database
-    
+        hashed_password: Hashed password from database (None for OAuth users)
+
     Returns:
         True if password matches, False otherwise
     """
+    if not hashed_password:
+        return False
+
     # Convert to bytes
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
-    
+
     # Check password
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    try:
+        return bcrypt.checkpw(password_bytes, hashed_bytes)
+    except ValueError:
+        # Malformed hash
+        return False
+
+
+def needs_rehash(hashed_password: Optional[str]) -> bool:
+    """
+    True if the hash was made with a different cost factor than
+    BCRYPT_ROUNDS (hash format: $2b$<cost>$<salt+hash>).
+    """
+    if not hashed_password:
+        return False
+    parts = hashed_password.split("$")
+    try:
+        return int(parts[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+# ============================================
+# WORKER POOL
+# ============================================
+
+class _PasswordHasher:
+    """
+    Bounded thread pool for bcrypt (bcrypt releases the GIL while hashing).
+
+    At most `workers` hashes run at once; beyond `max_pending` in-flight
+    operations new ones are rejected instead of queueing without bound.
+    Queue wait and run time are kept for the last N operations.
+    """
+
+    _WINDOW = 500
+
+    def __init__(self, workers: int, max_pending: int):
+        self._workers = max(1, workers)
+        self._max_pending = max(self._workers, max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_waits: deque = deque(maxlen=self._WINDOW)
+        self._run_times: deque = deque(maxlen=self._WINDOW)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers, thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusyError()
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def _timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_waits.append(started - submitted)
+                    self._run_times.append(finished - started)
+
+        def _release(_future):
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+        # The slot is freed when the bcrypt job ends (or is cancelled before
+        # it starts), not when the awaiting request goes away
+        try:
+            future = self._get_executor().submit(_timed)
+        except BaseException:
+            _release(None)
+            raise
+        future.add_done_callback(_release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            runs = sorted(self._run_times)
+            pending, completed, rejected = self._pending, self._completed, self._rejected
+
+        def _pct(values, q):
+            return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 1) if values else 0.0
+
+        return {
+            "workers":     self._workers,
+            "max_pending": self._max_pending,
+            "pending":     pending,
+            "completed":   completed,
+            "rejected":    rejected,
+            "cost_factor": settings.BCRYPT_ROUNDS,
+            "queue_wait_ms": {"p50": _pct(waits, 0.50), "p95": _pct(waits, 0.95), "max": _pct(waits, 1.0)},
+            "hash_time_ms":  {"p50": _pct(runs, 0.50), "p95": _pct(runs, 0.95), "max": _pct(runs, 1.0)},
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = _PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password` on the bcrypt worker pool"""
+    return await password_hasher.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """`verify_password` on the bcrypt worker pool"""
+    if not hashed_password:
+        return False
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
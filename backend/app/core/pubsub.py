@@ -0,0 +1,115 @@
+"""
+Redis Pub/Sub Listener
+One background thread per worker delivering cross-process invalidation
+messages (auth principals, token revocations, read-through cache entries).
+
+Modules register a handler per channel at import time; `start_listener()`
+is called once on application startup. After every (re)subscribe the
+`on_resubscribe` hooks run, since messages published while disconnected
+are lost.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, Callable[[str], None]] = {}
+_resubscribe_hooks: List[Callable[[], None]] = []
+
+
+def register(
+    channel: str,
+    handler: Callable[[str], None],
+    on_resubscribe: Optional[Callable[[], None]] = None,
+) -> None:
+    """Deliver messages on `channel` to `handler` (register before start_listener)"""
+    _handlers[channel] = handler
+    if on_resubscribe is not None:
+        _resubscribe_hooks.append(on_resubscribe)
+
+
+def publish(channel: str, message: str) -> None:
+    """Best-effort publish; a missing Redis just means no other workers hear it"""
+    r = get_redis()
+    if not r:
+        return
+    try:
+        r.publish(channel, message)
+    except Exception as e:
+        logger.warning(f"Publish to {channel} failed: {e}")
+
+
+class _Listener:
+    """Background thread dispatching messages to registered handlers"""
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="redis-pubsub", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            r = get_redis()
+            if not r or not _handlers:
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(*_handlers)
+                # Messages may have been missed while unsubscribed
+                for hook in _resubscribe_hooks:
+                    try:
+                        hook()
+                    except Exception as e:
+                        logger.warning(f"Pub/sub resubscribe hook failed: {e}")
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message or message.get("type") != "message":
+                        continue
+                    handler = _handlers.get(message["channel"])
+                    if handler is not None:
+                        try:
+                            handler(message["data"])
+                        except Exception as e:
+                            logger.warning(f"Pub/sub handler for {message['channel']} failed: {e}")
+            except Exception as e:
+                logger.warning(f"Pub/sub listener disconnected: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+_listener = _Listener()
+
+
+def start_listener() -> None:
+    """Call on application startup (after Redis is initialized)"""
+    _listener.start()
+
+
+def stop_listener() -> None:
+    """Call on application shutdown"""
+    _listener.stop()
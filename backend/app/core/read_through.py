@@ -0,0 +1,315 @@
+"""
+Read-Through Cache
+Two-tier cache decorator for read-mostly lookups.
+
+    L1  in-process LRU (per worker, short TTL)
+    L2  Redis (shared, longer TTL)
+    source  the decorated function (usually a DB query)
+
+Usage:
+
+    @read_through("session", ttl=300, key=lambda db, sid: str(sid),
+                  tags=lambda value, db, sid: [f"session:{sid}"])
+    def load_session(db, sid) -> Optional[dict]: ...
+
+    invalidate_tags("session:<id>")   # after a write
+
+- Values must be JSON-serialisable; they are normalised through JSON so L1
+  and L2 hits return identical types. `None` results are not cached.
+- Concurrent misses for the same key (threadpool endpoints, background jobs)
+  are collapsed into one load (single-flight). A caller on the event loop
+  thread never blocks waiting for another thread's load; it loads itself.
+- Tag invalidation drops L1 entries here, L2 entries in Redis, and L1 entries
+  in every other worker via the `cache:invalidate` pub/sub channel.
+- A load that overlaps an invalidation of one of its tags returns its result
+  but does not store it, so a stale read cannot repopulate the cache after a
+  write. Invalidations of unrelated tags do not affect it.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core import pubsub
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+_KEY_PREFIX = "rt:"
+_TAG_PREFIX = "rt:tag:"
+
+
+# ============================================
+# L1 — IN-PROCESS LRU
+# ============================================
+
+class _LocalCache:
+    """LRU of full key -> (value, expires_at, tags) with a tag index"""
+
+    # Invalidated tags remembered for the overlap check
+    _MAX_INVALIDATED = 4096
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped on every invalidation
+        # tag -> generation of its last invalidation (oldest first)
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        # Loads that started before this may overlap a forgotten invalidation
+        self._floor = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: str, value: Any, ttl: float, tags: Tuple[str, ...], generation: int) -> bool:
+        """Store unless one of `tags` was invalidated after `generation` was read"""
+        with self._lock:
+            if generation < self._floor or any(
+                self._invalidated.get(tag, 0) > generation for tag in tags
+            ):
+                return False
+            self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                self._invalidated[tag] = self.generation
+                self._invalidated.move_to_end(tag)
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+            while len(self._invalidated) > self._MAX_INVALIDATED:
+                _, forgotten = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, forgotten)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._floor = self.generation
+            self._invalidated.clear()
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+_l1 = _LocalCache(max_entries=4096)
+
+
+# ============================================
+# SINGLE-FLIGHT
+# ============================================
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+_inflight: Dict[str, _Flight] = {}
+_inflight_lock = threading.Lock()
+
+
+# ============================================
+# STATS
+# ============================================
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(namespace: str, field: str) -> None:
+    ns = _stats.setdefault(namespace, {"l1_hits": 0, "l2_hits": 0, "misses": 0, "coalesced": 0})
+    ns[field] += 1
+
+
+def read_through_stats() -> dict:
+    return {"l1_entries": len(_l1), "namespaces": {k: dict(v) for k, v in _stats.items()}}
+
+
+# ============================================
+# DECORATOR
+# ============================================
+
+def _normalise(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+def read_through(
+    namespace: str,
+    ttl: int,
+    *,
+    key: Callable[..., str],
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    l1_ttl: float = 30.0,
+):
+    """
+    Cache the decorated function's result in L1 (l1_ttl seconds) and Redis
+    (ttl seconds).
+
+    Args:
+        namespace: Key prefix, also used for stats
+        ttl: Redis TTL in seconds
+        key: Builds the cache key from the call arguments
+        tags: Builds invalidation tags from (value, *args, **kwargs)
+        l1_ttl: In-process TTL; bounds staleness if an invalidation is missed
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            full_key = f"{namespace}:{key(*args, **kwargs)}"
+
+            hit, value = _l1.get(full_key)
+            if hit:
+                _count(namespace, "l1_hits")
+                return value
+
+            with _inflight_lock:
+                flight = _inflight.get(full_key)
+                leader = flight is None
+                if leader:
+                    flight = _inflight[full_key] = _Flight()
+
+            if not leader:
+                if _on_event_loop():
+                    # Blocking here would stall every request on the loop
+                    value, _ = _load(full_key, fn, args, kwargs, namespace)
+                    return value
+                _count(namespace, "coalesced")
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+
+            try:
+                generation = _l1.generation
+                value, from_l2 = _load(full_key, fn, args, kwargs, namespace)
+                if value is not None:
+                    value_tags = tuple(tags(value, *args, **kwargs)) if tags else ()
+                    if _l1.put(full_key, value, min(l1_ttl, ttl), value_tags, generation) and not from_l2:
+                        _store_l2(full_key, value, ttl, value_tags)
+                flight.value = value
+                return value
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(full_key, None)
+                flight.done.set()
+
+        return wrapper
+    return decorator
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _load(full_key: str, fn, args, kwargs, namespace: str) -> Tuple[Any, bool]:
+    r = get_redis()
+    if r is not None:
+        try:
+            raw = r.get(_KEY_PREFIX + full_key)
+            if raw is not None:
+                _count(namespace, "l2_hits")
+                return json.loads(raw), True
+        except Exception as e:
+            logger.debug(f"Read-through L2 get failed: {e}")
+
+    _count(namespace, "misses")
+    value = fn(*args, **kwargs)
+    return (_normalise(value) if value is not None else None), False
+
+
+def _store_l2(full_key: str, value: Any, ttl: int, value_tags: Tuple[str, ...]) -> None:
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.setex(_KEY_PREFIX + full_key, ttl, json.dumps(value, default=str))
+        for tag in value_tags:
+            pipe.sadd(_TAG_PREFIX + tag, full_key)
+            pipe.expire(_TAG_PREFIX + tag, ttl)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Read-through L2 set failed: {e}")
+
+
+# ============================================
+# INVALIDATION
+# ============================================
+
+def invalidate_tags(*tags: str) -> None:
+    """Drop every cached value carrying any of `tags`, in all tiers and workers"""
+    tags = tuple(t for t in tags if t)
+    if not tags:
+        return
+    _l1.invalidate(tags)
+
+    r = get_redis()
+    if r is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(_TAG_PREFIX + tag)
+            members: List[str] = [m for group in pipe.execute() for m in group]
+            pipe = r.pipeline(transaction=False)
+            if members:
+                pipe.delete(*(_KEY_PREFIX + m for m in members))
+            pipe.delete(*(_TAG_PREFIX + t for t in tags))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Read-through L2 invalidation failed: {e}")
+
+    pubsub.publish(INVALIDATION_CHANNEL, "\t".join(tags))
+
+
+def _apply_invalidation(message: str) -> None:
+    _l1.invalidate(message.split("\t"))
+
+
+pubsub.register(INVALIDATION_CHANNEL, _apply_invalidation, on_resubscribe=_l1.clear)
@@ -2,63 +2,212 @@
 Redis Connection Manager
 Handles Redis connection pool and provides connection access
 Week 2, Wednesday - Redis Session Caching
+
+Health handling:
+- `get_redis()` never pings. Commands that fail with a connection/timeout
+  error trip a circuit breaker; while it is open `get_redis()` returns None
+  and callers degrade (cache miss, no blacklist check) without waiting on
+  socket timeouts.
+- A background monitor thread pings only while the circuit is open (or the
+  client was never initialized) and closes it once Redis answers again.
 """
 
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 import redis
-from typing import Optional
+import redis.asyncio as aioredis
+
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
 
 # Global Redis connection pool
 _redis_pool: Optional[redis.ConnectionPool] = None
 _redis_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+_CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+
+# ============================================
+# CIRCUIT BREAKER
+# ============================================
+
+class _CircuitBreaker:
+    """Open after consecutive connection failures; probe in the background"""
+
+    def __init__(self, failure_threshold: int):
+        self._threshold = max(1, failure_threshold)
+        self._failures = 0
+        self._open = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def record_success(self) -> None:
+        if self._failures or self._open:
+            with self._lock:
+                was_open = self._open
+                self._failures = 0
+                self._open = False
+            if was_open:
+                logger.info("Redis circuit closed: connection restored")
+
+    def record_failure(self, error: Exception) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._open or self._failures < self._threshold:
+                return
+            self._open = True
+        logger.warning(f"Redis circuit opened after {self._failures} failures: {error}")
+        _monitor.wake()
+
+    def state(self) -> dict:
+        return {"open": self._open, "consecutive_failures": self._failures}
+
+
+_breaker = _CircuitBreaker(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD)
+
+
+class _BreakerRedis(redis.Redis):
+    """Redis client that reports connection errors to the circuit breaker"""
+
+    def execute_command(self, *args, **options):
+        try:
+            result = super().execute_command(*args, **options)
+        except _CONNECTION_ERRORS as e:
+            _breaker.record_failure(e)
+            raise
+        _breaker.record_success()
+        return result
+
+
+def _build_pool() -> redis.ConnectionPool:
+    return redis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,  # Auto-decode bytes to strings
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        # Ping only connections idle longer than this, on checkout
+        health_check_interval=settings.REDIS_IDLE_CHECK_INTERVAL,
+    )
 
 
+# ============================================
+# BACKGROUND HEALTH MONITOR
+# ============================================
+
+class _HealthMonitor:
+    """Probe Redis while the circuit is open or the client is missing"""
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="redis-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        global _redis_pool, _redis_client
+        interval = settings.REDIS_HEALTH_CHECK_INTERVAL
+        while not self._stop.is_set():
+            if _redis_client is not None and not _breaker.is_open:
+                # Healthy: sleep until a failure wakes us up
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            try:
+                if _redis_client is None:
+                    pool = _build_pool()
+                    client = _BreakerRedis(connection_pool=pool)
+                    client.ping()
+                    _redis_pool, _redis_client = pool, client
+                    logger.info("Redis connected by health monitor")
+                else:
+                    # Drop sockets that died with the server before probing
+                    _redis_pool.disconnect(inuse_connections=False)
+                    _redis_client.ping()
+                _breaker.record_success()
+            except Exception as e:
+                logger.debug(f"Redis health probe failed: {e}")
+                self._stop.wait(interval)
+
+
+_monitor = _HealthMonitor()
+
+
+# ============================================
+# LIFECYCLE
+# ============================================
+
 def init_redis() -> redis.Redis:
     """
     Initialize Redis connection pool
     Call this on application startup
-    
+
     Returns:
         Redis client instance
     """
     global _redis_pool, _redis_client
-    
+
     try:
         # Create connection pool
-        _redis_pool = redis.ConnectionPool.from_url(
-            settings.REDIS_URL,
-            decode_responses=True,  # Auto-decode bytes to strings
-            max_connections=10,
-            socket_connect_timeout=5,
-            socket_keepalive=True
-        )
-        
+        _redis_pool = _build_pool()
+
         # Create Redis client
-        _redis_client = redis.Redis(connection_pool=_redis_pool)
-        
+        _redis_client = _BreakerRedis(connection_pool=_redis_pool)
+
         # Test connection
         _redis_client.ping()
         print(f"[OK] Redis connected: {settings.REDIS_URL}")
-        
+
         return _redis_client
-        
+
     except redis.ConnectionError as e:
         print(f"[WARN]  Redis connection failed: {e}")
-        print("    Application will run without Redis caching")
+        print("    Application will run without Redis caching until it becomes reachable")
+        _redis_client = None
+        _redis_pool = None
         return None
     except Exception as e:
         print(f"[WARN]  Redis initialization error: {e}")
+        _redis_client = None
+        _redis_pool = None
         return None
+    finally:
+        _monitor.start()
 
 
 def get_redis() -> Optional[redis.Redis]:
     """
-    Get Redis client instance with lazy reconnect.
+    Get Redis client instance.
 
-    If the previous connection is stale (Redis was restarted or temporarily
-    unavailable), this function attempts a single reconnect before returning
-    None so callers can degrade gracefully instead of raising HTTP 500.
+    No round-trip is made here: returns None while Redis is known to be
+    down (circuit open or never connected) so callers can degrade
+    gracefully instead of raising HTTP 500.
 
     Returns:
         Redis client if connected, None otherwise
@@ -68,37 +217,81 @@ def get_redis() -> Optional[redis.Redis]:
         if r:
             r.set('key', 'value')
     """
-    global _redis_client, _redis_pool
-
-    if _redis_client is None:
+    if _redis_client is None or _breaker.is_open:
         return None
+    return _redis_client
+
+
+@contextmanager
+def redis_pipeline(transaction: bool = False) -> Iterator[Optional[redis.client.Pipeline]]:
+    """
+    Batch several commands into one round-trip.
 
-    # Verify the connection is still alive; attempt one silent reconnect if not
+    Yields None when Redis is unavailable. Commands queued inside the block
+    are sent on exit; use `pipe.execute()` inside the block to read results.
+
+    Example:
+        with redis_pipeline() as pipe:
+            if pipe:
+                pipe.get('a')
+                pipe.get('b')
+                a, b = pipe.execute()
+    """
+    r = get_redis()
+    if r is None:
+        yield None
+        return
+    pipe = r.pipeline(transaction=transaction)
     try:
-        _redis_client.ping()
-        return _redis_client
-    except (redis.ConnectionError, redis.TimeoutError):
-        print("[WARN]  Redis ping failed – attempting reconnect...")
-        try:
-            _redis_pool = redis.ConnectionPool.from_url(
-                settings.REDIS_URL,
-                decode_responses=True,
-                max_connections=10,
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-            )
-            _redis_client = redis.Redis(connection_pool=_redis_pool)
-            _redis_client.ping()
-            print("[OK] Redis reconnected successfully")
-            return _redis_client
-        except Exception as reconnect_err:
-            print(f"[WARN]  Redis reconnect failed: {reconnect_err} – running without cache")
-            _redis_client = None
-            _redis_pool = None
-            return None
-    except Exception as e:
-        print(f"[WARN]  Redis unexpected error in get_redis: {e}")
+        yield pipe
+        if pipe.command_stack:
+            pipe.execute()
+    except _CONNECTION_ERRORS as e:
+        _breaker.record_failure(e)
+        raise
+    finally:
+        pipe.reset()
+
+
+def get_async_redis() -> Optional[aioredis.Redis]:
+    """
+    Get the asyncio Redis client (for use inside async endpoints).
+
+    Shares the circuit breaker with the sync client; returns None while
+    Redis is unavailable.
+    """
+    global _async_client
+
+    if _redis_client is None or _breaker.is_open:
         return None
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=settings.REDIS_IDLE_CHECK_INTERVAL,
+        )
+    return _async_client
+
+
+def record_redis_failure(error: Exception) -> None:
+    """Report a connection error seen outside the sync client (e.g. async)"""
+    if isinstance(error, _CONNECTION_ERRORS):
+        _breaker.record_failure(error)
+
+
+async def close_async_redis():
+    """Close the asyncio client; call on application shutdown"""
+    global _async_client
+
+    if _async_client is not None:
+        try:
+            await _async_client.aclose()
+        except Exception as e:
+            print(f"[WARN]  Error closing async Redis: {e}")
+        _async_client = None
 
 
 def close_redis():
@@ -107,20 +300,22 @@ def close_redis():
     Call this on application shutdown
     """
     global _redis_pool, _redis_client
-    
+
+    _monitor.stop()
+
     if _redis_client:
         try:
             _redis_client.close()
             print("[OK] Redis connection closed")
         except Exception as e:
             print(f"[WARN]  Error closing Redis: {e}")
-    
+
     if _redis_pool:
         try:
             _redis_pool.disconnect()
         except Exception as e:
             print(f"[WARN]  Error disconnecting Redis pool: {e}")
-    
+
     _redis_pool = None
     _redis_client = None
 
@@ -128,31 +323,33 @@ def close_redis():
 def redis_health_check() -> dict:
     """
     Check Redis connection health
-    
+
     Returns:
         dict with status and info
     """
     r = get_redis()
-    
+
     if not r:
         return {
             "status": "disconnected",
-            "message": "Redis client not initialized"
+            "message": "Redis client not initialized or circuit open",
+            "circuit": _breaker.state(),
         }
-    
+
     try:
         # Test connection
         r.ping()
-        
+
         # Get Redis info
         info = r.info("server")
-        
+
         return {
             "status": "connected",
             "redis_version": info.get("redis_version", "unknown"),
-            "uptime_seconds": info.get("uptime_in_seconds", 0)
+            "uptime_seconds": info.get("uptime_in_seconds", 0),
+            "circuit": _breaker.state(),
         }
-        
+
     except redis.ConnectionError:
         return {
             "status": "error",
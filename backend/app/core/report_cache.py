@@ -0,0 +1,332 @@
+"""
+Report Cache
+Stampede-protected cache for heavy reporting queries.
+
+Entries are stored in Redis as {"v": value, "t": computed_at} and live for
+`ttl + stale_ttl` seconds:
+
+    age < ttl                  fresh   served as-is; hot keys are refreshed
+                                       ahead of expiry in the background
+    ttl <= age < ttl+stale     stale   served immediately, one background
+                                       refresh is started
+    missing                            computed once; concurrent requests
+                                       for the key await the same result
+
+Coalescing is per worker (one in-flight future per key) and across workers
+(a short Redis NX lock holding a per-holder token, released when the
+recompute ends; workers that lose the race serve stale data or poll briefly
+for the winner's result).
+
+Each tag has a generation counter (`<prefix>gen:<tag>`) that invalidate_tags
+increments. A recompute reads the generations of its tags before it starts
+and does not store its result if any of them moved, so a report computed
+from pre-invalidation data cannot overwrite the invalidation.
+
+Invalidations that cannot reach Redis (circuit open, command failed) are
+remembered and replayed before the next cache operation once Redis is
+reachable again, so a write made during an outage cannot leave an
+hours-long report stale. If too many tags pile up, every report is dropped
+instead.
+
+`compute` callables are synchronous, run in the threadpool and must open
+their own DB session — background refreshes outlive the request. Results
+must be JSON-serialisable; `None` is returned but never stored.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger("fumorive.report_cache")
+
+_LOCK_TTL = 60            # Seconds a recompute may hold the cross-worker lock
+_WAIT_FOR_PEER = 5.0      # Max seconds to poll for another worker's result
+_REFRESH_AHEAD = 0.8      # Refresh hot keys once 80% of their TTL has elapsed
+_HOT_HITS = 3             # Hits within one TTL that make a key "hot"
+_GEN_TTL = 86400          # Tag generations outlive any recompute by far
+_MAX_MISSED_TAGS = 10_000 # Beyond this, replay drops every report instead
+
+# Delete the lock only if it still holds our token
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class ReportCache:
+    """Redis-backed report cache with coalescing and stale-while-revalidate"""
+
+    def __init__(self, prefix: str = "report:"):
+        self._prefix = prefix
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._hits: Dict[str, list] = {}   # key -> [window_start, count]
+        self._missed: Set[str] = set()      # tags whose invalidation did not reach Redis
+        self._missed_all = False            # too many missed tags: drop everything
+        self._missed_lock = threading.Lock()
+        self.stats = {
+            "fresh": 0, "stale": 0, "miss": 0, "refreshes": 0, "coalesced": 0, "discarded": 0,
+        }
+
+    # ---------------- public ----------------
+
+    async def get(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        *,
+        ttl: int,
+        stale_ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Return the cached report for `key`, computing it at most once"""
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        tags = tuple(tags)
+        if self._missed or self._missed_all:
+            self._replay_missed()
+        envelope = self._read(key)
+
+        if envelope is not None:
+            age = time.time() - envelope["t"]
+            if age < ttl:
+                self.stats["fresh"] += 1
+                if self._is_hot(key, ttl) and age >= ttl * _REFRESH_AHEAD:
+                    self._refresh_in_background(key, compute, ttl, stale_ttl, tags)
+                return envelope["v"]
+            if age < ttl + stale_ttl:
+                self.stats["stale"] += 1
+                self._refresh_in_background(key, compute, ttl, stale_ttl, tags)
+                return envelope["v"]
+
+        self.stats["miss"] += 1
+        return await self._refresh(key, compute, ttl, stale_ttl, tags, wait_for_peer=True)
+
+    def invalidate(self, *keys: str) -> None:
+        r = get_redis()
+        if not r or not keys:
+            return
+        try:
+            r.delete(*(self._prefix + k for k in keys))
+        except Exception as e:
+            logger.warning(f"Report cache invalidation failed: {e}")
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """Drop every report stored with any of `tags` (replayed later if Redis is down)"""
+        if not tags:
+            return
+        r = get_redis()
+        if not r:
+            self._remember_missed(tags)
+            return
+        if self._missed or self._missed_all:
+            self._replay_missed()
+        try:
+            pipe = r.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(f"{self._prefix}tag:{tag}")
+            keys = {k for group in pipe.execute() for k in group}
+            pipe = r.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(f"{self._prefix}gen:{tag}")
+                pipe.expire(f"{self._prefix}gen:{tag}", _GEN_TTL)
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(*(f"{self._prefix}tag:{t}" for t in tags))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Report cache tag invalidation failed: {e}")
+            self._remember_missed(tags)
+
+    def _remember_missed(self, tags: Iterable[str]) -> None:
+        with self._missed_lock:
+            if not self._missed_all:
+                self._missed.update(tags)
+                if len(self._missed) > _MAX_MISSED_TAGS:
+                    self._missed_all = True
+                    self._missed.clear()
+
+    def _replay_missed(self) -> None:
+        """Apply invalidations that failed while Redis was unreachable"""
+        r = get_redis()
+        if not r:
+            return
+        with self._missed_lock:
+            tags, self._missed = self._missed, set()
+            drop_all, self._missed_all = self._missed_all, False
+        if drop_all:
+            try:
+                keys = list(r.scan_iter(match=f"{self._prefix}*", count=1000))
+                if keys:
+                    r.delete(*keys)
+                logger.info(f"Report cache dropped {len(keys)} keys after missed invalidations")
+            except Exception as e:
+                logger.warning(f"Report cache reset failed: {e}")
+                with self._missed_lock:
+                    self._missed_all = True
+            return
+        if tags:
+            logger.info(f"Replaying {len(tags)} missed report cache invalidations")
+            self.invalidate_tags(*tags)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "inflight": len(self._inflight),
+            "hot_keys": len(self._hits),
+            "missed_invalidations": len(self._missed),
+        }
+
+    # ---------------- internals ----------------
+
+    def _read(self, key: str) -> Optional[dict]:
+        r = get_redis()
+        if not r:
+            return None
+        try:
+            raw = r.get(self._prefix + key)
+            return json.loads(raw) if raw else None
+        except Exception:
+            return None
+
+    def _generations(self, tags: tuple) -> Optional[List[Optional[str]]]:
+        r = get_redis()
+        if not r or not tags:
+            return None
+        try:
+            return r.mget([f"{self._prefix}gen:{tag}" for tag in tags])
+        except Exception:
+            return None
+
+    def _write(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        stale_ttl: int,
+        tags: tuple,
+        generations: Optional[List[Optional[str]]],
+    ) -> None:
+        r = get_redis()
+        if not r or value is None:
+            return
+        if self._generations(tags) != generations:
+            # A tag was invalidated while computing: the result may predate it
+            self.stats["discarded"] += 1
+            return
+        full_key = self._prefix + key
+        try:
+            pipe = r.pipeline(transaction=False)
+            pipe.setex(full_key, ttl + stale_ttl, json.dumps({"v": value, "t": time.time()}, default=str))
+            for tag in tags:
+                pipe.sadd(f"{self._prefix}tag:{tag}", full_key)
+                pipe.expire(f"{self._prefix}tag:{tag}", ttl + stale_ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Report cache write failed: {e}")
+
+    def _try_lock(self, key: str) -> Optional[str]:
+        """
+        Take the cross-worker recompute lock. Returns its token, "" when
+        there is no Redis to coordinate through, or None if it is held.
+        """
+        r = get_redis()
+        if not r:
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            return token if r.set(f"{self._prefix}lock:{key}", token, nx=True, ex=_LOCK_TTL) else None
+        except Exception:
+            return ""
+
+    def _unlock(self, key: str, token: Optional[str]) -> None:
+        r = get_redis()
+        if not r or not token:
+            return
+        try:
+            r.eval(_RELEASE_LOCK, 1, f"{self._prefix}lock:{key}", token)
+        except Exception as e:
+            logger.debug(f"Report cache unlock failed: {e}")
+
+    def _is_hot(self, key: str, ttl: int) -> bool:
+        now = time.monotonic()
+        window = self._hits.get(key)
+        if window is None or now - window[0] > ttl:
+            window = self._hits[key] = [now, 0]
+            if len(self._hits) > 10_000:
+                # Forget counters of keys not seen within their window
+                self._hits = {k: w for k, w in self._hits.items() if now - w[0] <= ttl}
+                self._hits[key] = window
+        window[1] += 1
+        return window[1] >= _HOT_HITS
+
+    async def _refresh(self, key, compute, ttl, stale_ttl, tags, wait_for_peer: bool) -> Any:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        token = None
+        try:
+            token = self._try_lock(key)
+            if token is None:
+                # Another worker is recomputing this key
+                if not wait_for_peer:
+                    future.set_result(None)
+                    return None
+                value = await self._wait_for_peer(key)
+                if value is not None:
+                    future.set_result(value)
+                    return value
+
+            self.stats["refreshes"] += 1
+            generations = self._generations(tags)
+            value = await run_in_threadpool(compute)
+            self._write(key, value, ttl, stale_ttl, tags, generations)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters re-raise it themselves
+            raise
+        finally:
+            self._unlock(key, token)
+            self._inflight.pop(key, None)
+
+    async def _wait_for_peer(self, key: str) -> Optional[Any]:
+        deadline = time.monotonic() + _WAIT_FOR_PEER
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            envelope = self._read(key)
+            if envelope is not None:
+                return envelope["v"]
+        return None
+
+    def _refresh_in_background(self, key, compute, ttl, stale_ttl, tags) -> None:
+        if key in self._inflight:
+            return
+
+        async def _run():
+            try:
+                await self._refresh(key, compute, ttl, stale_ttl, tags, wait_for_peer=False)
+            except Exception as e:
+                logger.warning(f"Background report refresh failed for {key}: {e}")
+
+        task = asyncio.get_running_loop().create_task(_run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+# Global instance
+report_cache = ReportCache()
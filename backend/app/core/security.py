@@ -4,13 +4,16 @@ Functions for creating and verifying JWT tokens
 Week 2, Tuesday - Authentication Implementation
 """
 
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -30,7 +33,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    # jti: unique id used as the blacklist key on logout
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -47,7 +51,7 @@ def create_refresh_token(data: dict) -> str:
     """
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -64,23 +68,16 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
         Decoded token payload if valid, None otherwise
     """
     try:
-        print(f"[SEARCH] Verifying {token_type} token...")
-        print(f"[SEARCH] Token (first 50 chars): {token[:50]}...")
-        
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        print(f"[OK] Token decoded successfully")
-        print(f"[LIST] Payload type: {payload.get('type')}")
-        print(f"[LIST] Expected type: {token_type}")
         
         # Verify token type
         if payload.get("type") != token_type:
-            print(f"[ERR] Token type mismatch! Got {payload.get('type')}, expected {token_type}")
+            logger.debug(f"Token type mismatch: got {payload.get('type')}, expected {token_type}")
             return None
         
-        print(f"[OK] Token verified successfully")
         return payload
     except JWTError as e:
-        print(f"[ERR] JWT Error: {str(e)}")
+        logger.debug(f"JWT verification failed: {e}")
         return None
 
 
@@ -0,0 +1,99 @@
+"""
+Fast JSON Serialization
+orjson-backed encoding for API responses, WebSocket frames and log lines,
+with a stdlib `json` fallback when orjson is not installed.
+
+- `dumps()` / `dumps_str()`  encode plain data (dicts, lists, datetimes, UUIDs)
+- `model_to_bytes()`         Pydantic model straight to JSON bytes (Rust
+                             serializer, no jsonable_encoder pass)
+- `FastJSONResponse`         app-wide default response class; routes on hot
+                             paths can return `FastJSONResponse(model)` to
+                             skip FastAPI's validate + encode round trip
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+)
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles natively (plus datetimes/UUIDs for stdlib)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if hasattr(obj, "tolist"):  # numpy arrays / scalars
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _chain(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    if default is None:
+        return _default
+
+    def _fallback(obj: Any) -> Any:
+        try:
+            return _default(obj)
+        except TypeError:
+            return default(obj)
+    return _fallback
+
+
+def dumps(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode `obj` as compact UTF-8 JSON bytes.
+
+    Args:
+        obj: Data to encode
+        default: Last-resort converter for otherwise unsupported types
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_chain(default), option=_ORJSON_OPTIONS)
+    return json.dumps(
+        obj, default=_chain(default), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_str(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """`dumps()` for text consumers (WebSocket text frames, log lines)"""
+    return dumps(obj, default=default).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def model_to_bytes(model: BaseModel) -> bytes:
+    """Serialize a Pydantic model directly to JSON bytes (aliases, like FastAPI)"""
+    return model.__pydantic_serializer__.to_json(model, by_alias=True)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, or pydantic-core for models"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return model_to_bytes(content)
+        return dumps(content)
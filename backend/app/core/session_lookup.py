@@ -0,0 +1,152 @@
+"""
+Cached Session Lookups
+Read-through cached session metadata, session lists and ownership checks.
+
+Tags:
+- `session:<id>`           one session's metadata
+- `user-sessions:<user>`   every cached list page of a user's sessions
+
+Any write to a session must emit a cache event (app/core/cache_events.py),
+which maps it to these tags.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.read_through import read_through
+from app.db.models import User, Session as DBSession
+
+_SESSION_TTL = 300   # 5 minutes for individual session metadata
+_SESSION_LIST_TTL = 60  # 1 minute for session list (changes more often)
+
+
+@dataclass
+class SessionRef:
+    """Detached, read-only view of a session row (SessionResponse fields)"""
+    id: UUID
+    user_id: UUID
+    session_name: str
+    session_status: str
+    started_at: datetime
+    alert_count: int = 0
+    device_type: Optional[str] = None
+    calibration_data: Optional[Dict[str, Any]] = None
+    settings: Optional[Dict[str, Any]] = None
+    ended_at: Optional[datetime] = None
+    duration_seconds: Optional[int] = None
+    avg_fatigue_score: Optional[float] = None
+    max_fatigue_score: Optional[float] = None
+    summarized_at: Optional[datetime] = None  # data version of a completed session
+
+    @classmethod
+    def from_cached(cls, data: dict) -> "SessionRef":
+        return cls(
+            **{**data,
+               "id": UUID(data["id"]),
+               "user_id": UUID(data["user_id"]),
+               "started_at": _parse_dt(data["started_at"]),
+               "ended_at": _parse_dt(data.get("ended_at")),
+               "summarized_at": _parse_dt(data.get("summarized_at"))}
+        )
+
+
+_SESSION_FIELDS = tuple(f.name for f in fields(SessionRef))
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _session_dict(session: DBSession) -> dict:
+    data = {name: getattr(session, name) for name in _SESSION_FIELDS}
+    data["alert_count"] = data["alert_count"] or 0
+    for name in ("started_at", "ended_at", "summarized_at"):
+        if data[name] is not None:
+            data[name] = data[name].isoformat()
+    return data
+
+
+# ============================================
+# LOOKUPS
+# ============================================
+
+@read_through(
+    "session", _SESSION_TTL,
+    key=lambda db, session_id: str(session_id),
+    tags=lambda value, db, session_id: [f"session:{session_id}"],
+)
+def _load_session(db: Session, session_id: UUID) -> Optional[dict]:
+    session = db.query(DBSession).filter(DBSession.id == session_id).first()
+    return _session_dict(session) if session else None
+
+
+def get_session_ref(db: Session, session_id: UUID) -> Optional[SessionRef]:
+    """Session metadata via L1 / Redis / DB, or None if it does not exist"""
+    data = _load_session(db, session_id)
+    return SessionRef.from_cached(data) if data else None
+
+
+def get_owned_session(
+    db: Session,
+    session_id: UUID,
+    current_user: User,
+    action: str = "access",
+) -> SessionRef:
+    """
+    Cached session lookup plus ownership check (owner or admin).
+
+    Raises:
+        HTTPException 404 if the session does not exist, 403 if not owned
+    """
+    session = get_session_ref(db, session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    if session.user_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this session"
+        )
+    return session
+
+
+@read_through(
+    "session-list", _SESSION_LIST_TTL,
+    key=lambda db, user_id, status, page, page_size: f"{user_id}:{status or '*'}:{page}:{page_size}",
+    tags=lambda value, db, user_id, *args: [f"user-sessions:{user_id}"],
+)
+def list_user_sessions(
+    db: Session,
+    user_id: UUID,
+    status: Optional[str],
+    page: int,
+    page_size: int,
+) -> dict:
+    """One page of a user's sessions, newest first (SessionListResponse shape)"""
+    query = db.query(DBSession).filter(DBSession.user_id == user_id)
+
+    # Apply status filter if provided
+    if status:
+        query = query.filter(DBSession.session_status == status)
+
+    # Get total count
+    total = query.count()
+
+    # Apply pagination
+    offset = (page - 1) * page_size
+    sessions = query.order_by(DBSession.started_at.desc()).offset(offset).limit(page_size).all()
+
+    return {
+        "total": total,
+        "sessions": [_session_dict(s) for s in sessions],
+        "page": page,
+        "page_size": page_size,
+    }
+
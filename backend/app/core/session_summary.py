@@ -0,0 +1,309 @@
+"""
+Session Summary Materialization
+Computes per-session aggregates once, when a session is completed, and stores
+them on `sessions.summary` (JSONB) together with avg/max fatigue score.
+
+Reporting endpoints read the stored summary instead of re-scanning the raw
+hypertables on every request. Alert writes on a completed session schedule
+a debounced re-materialization (resummarize_debounced), so acknowledging or
+deleting alerts afterwards does not leave the stored summary stale.
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core import cache_events
+from app.db.database import SessionLocal
+from app.db.models import Session as DBSession, EEGData, FaceDetectionEvent, GameEvent, Alert
+
+logger = logging.getLogger("fumorive.summary")
+
+# Bump when the summary layout changes; older summaries are recomputed
+SUMMARY_VERSION = 1
+
+# Seconds an alert edit waits before the summary is recomputed (bulk acks fold in)
+RESUMMARIZE_DELAY = 5.0
+
+
+def _round(value, digits: int):
+    return round(float(value), digits) if value is not None else None
+
+
+def _eeg_summary(db: Session, session_id: UUID) -> dict:
+    row = db.query(
+        func.avg(EEGData.delta_power).label("avg_delta"),
+        func.avg(EEGData.theta_power).label("avg_theta"),
+        func.avg(EEGData.alpha_power).label("avg_alpha"),
+        func.avg(EEGData.beta_power).label("avg_beta"),
+        func.avg(EEGData.gamma_power).label("avg_gamma"),
+        func.avg(EEGData.theta_alpha_ratio).label("avg_theta_alpha_ratio"),
+        func.avg(EEGData.beta_alpha_ratio).label("avg_beta_alpha_ratio"),
+        func.avg(EEGData.eeg_fatigue_score).label("avg_fatigue"),
+        func.max(EEGData.eeg_fatigue_score).label("max_fatigue"),
+        func.avg(EEGData.signal_quality).label("avg_signal_quality"),
+        func.count(EEGData.id).label("total_samples"),
+    ).filter(EEGData.session_id == session_id).one()
+
+    state_rows = db.query(
+        EEGData.cognitive_state,
+        func.count(EEGData.id),
+    ).filter(
+        EEGData.session_id == session_id,
+        EEGData.cognitive_state.isnot(None),
+    ).group_by(EEGData.cognitive_state).all()
+
+    return {
+        "avg_delta":             _round(row.avg_delta, 4),
+        "avg_theta":             _round(row.avg_theta, 4),
+        "avg_alpha":             _round(row.avg_alpha, 4),
+        "avg_beta":              _round(row.avg_beta, 4),
+        "avg_gamma":             _round(row.avg_gamma, 4),
+        "avg_theta_alpha_ratio": _round(row.avg_theta_alpha_ratio, 4),
+        "avg_beta_alpha_ratio":  _round(row.avg_beta_alpha_ratio, 4),
+        "avg_fatigue_score":     _round(row.avg_fatigue, 2),
+        "max_fatigue_score":     _round(row.max_fatigue, 2),
+        "avg_signal_quality":    _round(row.avg_signal_quality, 3),
+        "total_samples":         int(row.total_samples or 0),
+        "cognitive_states":      {state: int(cnt) for state, cnt in state_rows},
+    }
+
+
+def _fatigue_distribution(db: Session, session_id: UUID) -> dict:
+    """Minutes per 10-point fatigue bucket (same buckets as the detail report)"""
+    rows = db.execute(text("""
+        SELECT
+            width_bucket(m.avg_fatigue, 0, 101, 10) - 1 AS bucket,
+            COUNT(*) AS cnt
+        FROM (
+            SELECT time_bucket('1 minute', timestamp) AS minute,
+                   AVG(eeg_fatigue_score)             AS avg_fatigue
+            FROM eeg_data
+            WHERE session_id = :sid AND eeg_fatigue_score IS NOT NULL
+            GROUP BY minute
+        ) m
+        GROUP BY bucket
+        ORDER BY bucket
+    """), {"sid": str(session_id)}).fetchall()
+    return {f"{b * 10}-{b * 10 + 9}": int(c) for b, c in rows if b is not None}
+
+
+def _face_summary(db: Session, session_id: UUID) -> dict:
+    row = db.query(
+        func.count(FaceDetectionEvent.id).label("total_events"),
+        func.avg(FaceDetectionEvent.blink_rate).label("avg_blink_rate"),
+        func.max(FaceDetectionEvent.blink_count).label("max_blink_count"),
+        func.count(FaceDetectionEvent.id).filter(FaceDetectionEvent.eyes_closed == True).label("eyes_closed_count"),
+        func.count(FaceDetectionEvent.id).filter(FaceDetectionEvent.yawning == True).label("yawn_count"),
+        func.avg(FaceDetectionEvent.face_fatigue_score).label("avg_fatigue"),
+        func.max(FaceDetectionEvent.face_fatigue_score).label("max_fatigue"),
+        func.avg(FaceDetectionEvent.head_yaw).label("avg_yaw"),
+        func.avg(FaceDetectionEvent.head_pitch).label("avg_pitch"),
+        func.avg(FaceDetectionEvent.head_roll).label("avg_roll"),
+        func.stddev(FaceDetectionEvent.head_yaw).label("std_yaw"),
+        func.stddev(FaceDetectionEvent.head_pitch).label("std_pitch"),
+        func.stddev(FaceDetectionEvent.head_roll).label("std_roll"),
+        func.min(FaceDetectionEvent.timestamp).label("first_timestamp"),
+        func.max(FaceDetectionEvent.timestamp).label("last_timestamp"),
+    ).filter(FaceDetectionEvent.session_id == session_id).one()
+
+    total = int(row.total_events or 0)
+    duration = None
+    if row.first_timestamp and row.last_timestamp:
+        duration = (row.last_timestamp - row.first_timestamp).total_seconds()
+
+    return {
+        "total_events":           total,
+        "duration_seconds":       duration,
+        "avg_blink_rate":         _round(row.avg_blink_rate, 2),
+        "total_blinks":           int(row.max_blink_count or 0),
+        "eyes_closed_count":      int(row.eyes_closed_count or 0),
+        "eyes_closed_percentage": _round(row.eyes_closed_count / total * 100, 2) if total else None,
+        "yawn_count":             int(row.yawn_count or 0),
+        "avg_fatigue_score":      _round(row.avg_fatigue, 2),
+        "max_fatigue_score":      _round(row.max_fatigue, 2),
+        "head_movement": {
+            "avg_yaw":   _round(row.avg_yaw, 3) or 0,
+            "avg_pitch": _round(row.avg_pitch, 3) or 0,
+            "avg_roll":  _round(row.avg_roll, 3) or 0,
+            "std_yaw":   _round(row.std_yaw, 3) or 0,
+            "std_pitch": _round(row.std_pitch, 3) or 0,
+            "std_roll":  _round(row.std_roll, 3) or 0,
+        },
+    }
+
+
+def _alert_summary(db: Session, session_id: UUID) -> dict:
+    rows = db.query(
+        Alert.alert_level,
+        func.count(Alert.id).label("count"),
+        func.count(Alert.id).filter(Alert.acknowledged == True).label("acknowledged"),
+        func.max(Alert.fatigue_score).label("max_fatigue"),
+    ).filter(Alert.session_id == session_id).group_by(Alert.alert_level).all()
+
+    breakdown = {row.alert_level: int(row.count) for row in rows}
+    max_scores = [row.max_fatigue for row in rows if row.max_fatigue is not None]
+    return {
+        "total":        sum(breakdown.values()),
+        "breakdown":    breakdown,
+        "acknowledged": sum(int(row.acknowledged) for row in rows),
+        "max_fatigue_score": _round(max(max_scores), 2) if max_scores else None,
+    }
+
+
+def _game_summary(db: Session, session_id: UUID) -> dict:
+    row = db.query(
+        func.count(GameEvent.id).label("total_events"),
+        func.avg(GameEvent.speed).label("avg_speed"),
+        func.max(GameEvent.speed).label("max_speed"),
+        func.avg(func.abs(GameEvent.lane_deviation)).label("avg_abs_lane_deviation"),
+    ).filter(GameEvent.session_id == session_id).one()
+
+    type_rows = db.query(
+        GameEvent.event_type,
+        func.count(GameEvent.id),
+    ).filter(GameEvent.session_id == session_id).group_by(GameEvent.event_type).all()
+
+    return {
+        "total_events":           int(row.total_events or 0),
+        "avg_speed":              _round(row.avg_speed, 2),
+        "max_speed":              _round(row.max_speed, 2),
+        "avg_abs_lane_deviation": _round(row.avg_abs_lane_deviation, 3),
+        "event_types":            {etype or "unknown": int(cnt) for etype, cnt in type_rows},
+    }
+
+
+def compute_session_summary(db: Session, session_id: UUID) -> dict:
+    """Run all aggregate queries for one session and return the summary dict"""
+    return {
+        "version":              SUMMARY_VERSION,
+        "computed_at":          datetime.now(timezone.utc).isoformat(),
+        "eeg":                  _eeg_summary(db, session_id),
+        "face":                 _face_summary(db, session_id),
+        "alerts":               _alert_summary(db, session_id),
+        "game":                 _game_summary(db, session_id),
+        "fatigue_distribution": _fatigue_distribution(db, session_id),
+    }
+
+
+def get_stored_summary(session: DBSession) -> Optional[dict]:
+    """Return the materialized summary if it is present and current"""
+    summary = getattr(session, "summary", None)
+    if not summary or summary.get("version") != SUMMARY_VERSION:
+        return None
+    return summary
+
+
+def materialize_session_summary(db: Session, session: DBSession) -> dict:
+    """
+    Compute and store the summary on the session row.
+
+    Session-level avg/max fatigue come from EEG when the session has EEG
+    samples, otherwise from face detection.
+    """
+    summary = compute_session_summary(db, session.id)
+
+    eeg, face = summary["eeg"], summary["face"]
+    if eeg["total_samples"] and eeg["avg_fatigue_score"] is not None:
+        session.avg_fatigue_score = eeg["avg_fatigue_score"]
+        session.max_fatigue_score = eeg["max_fatigue_score"]
+    elif face["total_events"] and face["avg_fatigue_score"] is not None:
+        session.avg_fatigue_score = face["avg_fatigue_score"]
+        session.max_fatigue_score = face["max_fatigue_score"]
+
+    session.alert_count = summary["alerts"]["total"]
+    session.summary = summary
+    session.summarized_at = datetime.now(timezone.utc)
+    db.commit()
+    return summary
+
+
+def finalize_session(session_id: UUID) -> None:
+    """
+    Session-finalization job run after complete/end.
+
+    Uses its own DB session so it can run as a background task after the
+    response has been sent.
+    """
+    db = SessionLocal()
+    try:
+        session = db.query(DBSession).filter(DBSession.id == session_id).first()
+        if session is None or session.session_status != "completed":
+            return
+        materialize_session_summary(db, session)
+        # avg/max fatigue and alert_count changed
+        cache_events.emit(cache_events.SESSION_SUMMARIZED, session_id=session.id, user_id=session.user_id)
+        logger.info("Session summary materialized", extra={"session_id": str(session_id)})
+    except Exception as e:
+        db.rollback()
+        logger.error("Session summary failed", extra={"session_id": str(session_id), "error": str(e)})
+    finally:
+        db.close()
+
+
+async def finalize_session_async(session_id: UUID) -> None:
+    """
+    Flush buffered EEG samples, release live aggregates, then materialize
+    the summary off the event loop.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.core.eeg_relay import get_eeg_buffer
+    from app.core.live_aggregates import live_eeg_aggregates
+
+    try:
+        await get_eeg_buffer().flush()
+    except Exception as e:
+        logger.warning("EEG buffer flush before finalization failed", extra={"error": str(e)})
+
+    # Live buckets are only needed while the session is streaming
+    live_eeg_aggregates.drop(str(session_id))
+
+    await run_in_threadpool(finalize_session, session_id)
+
+
+# ============================================
+# RE-SUMMARIZE AFTER LATE WRITES
+# ============================================
+
+_resummarize_pending: Dict[str, threading.Timer] = {}
+_resummarize_lock = threading.Lock()
+
+
+def resummarize_debounced(session_id: UUID, delay: float = RESUMMARIZE_DELAY) -> None:
+    """
+    Recompute the stored summary of a completed session after its alerts
+    changed.
+
+    Trailing edge: the first call arms a timer and later calls within
+    `delay` are folded into it. Sessions that are not completed are left
+    alone by finalize_session, so callers need not check the status.
+    """
+    key = str(session_id)
+    with _resummarize_lock:
+        if key in _resummarize_pending:
+            return
+        timer = threading.Timer(delay, _resummarize, args=(key, session_id))
+        timer.daemon = True
+        _resummarize_pending[key] = timer
+    timer.start()
+
+
+def _resummarize(key: str, session_id: UUID) -> None:
+    with _resummarize_lock:
+        _resummarize_pending.pop(key, None)
+    finalize_session(session_id)
+
+
+def flush_resummarize() -> None:
+    """Run every armed re-summarize timer now (application shutdown)"""
+    with _resummarize_lock:
+        pending = list(_resummarize_pending.values())
+        _resummarize_pending.clear()
+    for timer in pending:
+        timer.cancel()
+        _resummarize(*timer.args)
@@ -0,0 +1,259 @@
+"""
+Token Blacklist
+Revoked JWTs keyed by `jti` (sha256 of the token for tokens without one),
+with an in-process Bloom filter in front of Redis.
+
+Redis layout:
+- `blacklist:<id>`   string, expires when the token would have expired
+- `blacklist:ids`    sorted set id -> token exp (unix seconds); used to
+                     rebuild Bloom filters and for O(log N) stats
+
+Each worker keeps a Bloom filter of revoked ids. A negative answer (the
+common case) means "definitely not revoked" and skips Redis entirely; only
+a positive answer is confirmed with EXISTS. The filter is rebuilt from
+`blacklist:ids` every BLACKLIST_SYNC_INTERVAL seconds and updated
+immediately from revocations published on the `auth:invalidate` channel.
+Until the first successful sync every check goes to Redis.
+
+Tokens without a jti (issued before it was added) bypass the Bloom filter:
+revocations made before the jti rollout are stored as `blacklist:<token>`
+and are not in `blacklist:ids`, so for those tokens both the legacy key and
+`blacklist:<sha256>` are checked in Redis. This lasts until the last legacy
+refresh token has expired (REFRESH_TOKEN_EXPIRE_DAYS after the rollout).
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from jose import jwt
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BLACKLIST_PREFIX = "blacklist:"
+BLACKLIST_IDS_KEY = "blacklist:ids"
+
+
+# ============================================
+# BLOOM FILTER
+# ============================================
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one sha256)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+# ============================================
+# TOKEN IDS
+# ============================================
+
+def _token_jti(token: str, claims: Optional[dict]) -> Optional[str]:
+    if claims is None:
+        try:
+            claims = jwt.get_unverified_claims(token)
+        except Exception:
+            claims = {}
+    jti = claims.get("jti")
+    return str(jti) if jti else None
+
+
+def token_id(token: str, claims: Optional[dict] = None) -> str:
+    """
+    Blacklist id of a token: its `jti` claim, or sha256 of the token for
+    tokens issued before jti was added.
+    """
+    return _token_jti(token, claims) or hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_exp(token: str, claims: Optional[dict]) -> Optional[float]:
+    if claims is None:
+        try:
+            claims = jwt.get_unverified_claims(token)
+        except Exception:
+            return None
+    exp = claims.get("exp")
+    if isinstance(exp, datetime):
+        return exp.replace(tzinfo=exp.tzinfo or timezone.utc).timestamp()
+    return float(exp) if exp is not None else None
+
+
+# ============================================
+# BLACKLIST
+# ============================================
+
+class TokenBlacklist:
+    """Redis-backed blacklist with a local Bloom filter"""
+
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float):
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._sync_interval = sync_interval
+        self._bloom: Optional[BloomFilter] = None  # None until first sync
+        self._recent: set = set()  # Local revocations since the last sync
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.bloom_negatives = 0
+        self.redis_checks = 0
+
+    # ---------------- writes ----------------
+
+    def revoke(self, token: str, claims: Optional[dict] = None, fallback_ttl: int = 0) -> Optional[str]:
+        """
+        Blacklist a token until it expires. Returns the id, or None if
+        Redis is unavailable.
+        """
+        tid = token_id(token, claims)
+        self.add_local(tid)
+
+        r = get_redis()
+        if not r:
+            return None
+
+        exp = _token_exp(token, claims)
+        now = time.time()
+        if exp is None:
+            exp = now + fallback_ttl
+        ttl = max(1, int(math.ceil(exp - now)))
+
+        pipe = r.pipeline(transaction=False)
+        pipe.setex(f"{TOKEN_BLACKLIST_PREFIX}{tid}", ttl, "1")
+        pipe.zadd(BLACKLIST_IDS_KEY, {tid: exp})
+        pipe.zremrangebyscore(BLACKLIST_IDS_KEY, "-inf", now)
+        pipe.execute()
+        return tid
+
+    def add_local(self, tid: str) -> None:
+        """Record a revocation in this worker's Bloom filter"""
+        with self._lock:
+            self._recent.add(tid)
+            if self._bloom is not None:
+                self._bloom.add(tid)
+
+    # ---------------- reads ----------------
+
+    def is_revoked(self, token: str, claims: Optional[dict] = None) -> bool:
+        jti = _token_jti(token, claims)
+        if jti is not None:
+            keys = [f"{TOKEN_BLACKLIST_PREFIX}{jti}"]
+            bloom = self._bloom
+            if bloom is not None and jti not in bloom:
+                self.bloom_negatives += 1
+                return False
+        else:
+            # Legacy token: may have been revoked under the raw-token key,
+            # which the Bloom filter never saw
+            keys = [
+                f"{TOKEN_BLACKLIST_PREFIX}{token_id(token, {})}",
+                f"{TOKEN_BLACKLIST_PREFIX}{token}",
+            ]
+
+        r = get_redis()
+        if not r:
+            # If Redis not available, cannot confirm
+            # Fallback: allow token (less secure but maintains functionality)
+            return False
+        self.redis_checks += 1
+        return r.exists(*keys) > 0
+
+    def count(self) -> Optional[int]:
+        """Number of revoked, not yet expired tokens (ZCOUNT, no KEYS scan)"""
+        r = get_redis()
+        if not r:
+            return None
+        return r.zcount(BLACKLIST_IDS_KEY, time.time(), "+inf")
+
+    def stats(self) -> dict:
+        bloom = self._bloom
+        return {
+            "bloom_ready":     bloom is not None,
+            "bloom_entries":   bloom.count if bloom else 0,
+            "bloom_bits":      bloom.num_bits if bloom else 0,
+            "bloom_negatives": self.bloom_negatives,
+            "redis_checks":    self.redis_checks,
+        }
+
+    # ---------------- sync ----------------
+
+    def sync(self) -> bool:
+        """Rebuild the Bloom filter from `blacklist:ids`"""
+        r = get_redis()
+        if not r:
+            return False
+        try:
+            now = time.time()
+            r.zremrangebyscore(BLACKLIST_IDS_KEY, "-inf", now)
+            ids = r.zrangebyscore(BLACKLIST_IDS_KEY, now, "+inf")
+        except Exception as e:
+            logger.warning(f"Blacklist sync failed: {e}")
+            return False
+
+        bloom = BloomFilter(max(self._capacity, len(ids) * 2), self._error_rate)
+        for tid in ids:
+            bloom.add(tid)
+        with self._lock:
+            # Keep ids revoked locally while the snapshot was being read
+            for tid in self._recent:
+                bloom.add(tid)
+            self._recent.clear()
+            self._bloom = bloom
+        return True
+
+    def invalidate_local(self) -> None:
+        """Forget the Bloom filter (e.g. missed pub/sub messages) until next sync"""
+        with self._lock:
+            self._bloom = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="blacklist-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.sync():
+                self.invalidate_local()
+            self._stop.wait(self._sync_interval)
+
+
+# Global instance
+token_blacklist = TokenBlacklist(
+    capacity=settings.BLACKLIST_BLOOM_CAPACITY,
+    error_rate=settings.BLACKLIST_BLOOM_ERROR_RATE,
+    sync_interval=settings.BLACKLIST_SYNC_INTERVAL,
+)
@@ -67,6 +67,8 @@ class Session(Base):
     avg_fatigue_score = Column(Float, nullable=True)
     max_fatigue_score = Column(Float, nullable=True)
     alert_count = Column(Integer, default=0)
+    summary = Column(JSONB, nullable=True)  # Aggregates materialized on completion
+    summarized_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="sessions")
@@ -48,6 +48,11 @@ class EEGStreamData(BaseModel):
         default=False,
         description="Whether to save this data point to database"
     )
+    # Loosely typed on purpose: malformed timings are dropped, not a 422
+    timings: Optional[Any] = Field(
+        default=None,
+        description="Optional per-stage processing times in ms (server.py --send-timings)"
+    )
     
     model_config = {
         "json_schema_extra": {
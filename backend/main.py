@@ -3,22 +3,21 @@ FastAPI Backend Application
 Main application entry point with all routes and middleware
 """
 
-import re
 import time
 import uuid
 import logging
-import json
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
 from app.core.config import settings
-from app.core.redis import init_redis, close_redis
+from app.core.redis import init_redis, close_redis, close_async_redis
 from app.core.firebase import init_firebase
 from app.core.error_handlers import register_exception_handlers
 from app.core.rate_limiter import limiter, rate_limit_exceeded_handler
 from app.core.security_headers import SecurityHeadersMiddleware
 from app.core.metrics import app_metrics
+from app.core.serialization import FastJSONResponse, dumps_str
 from app.api.routes.auth import router as auth_router
 from app.api.routes.sessions import router as sessions_router
 from app.api.routes.websocket import router as websocket_router
@@ -61,7 +60,7 @@ class _JsonFormatter(logging.Formatter):
                 base[key] = val
         if record.exc_info:
             base["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(base, default=str, ensure_ascii=False)
+        return dumps_str(base, default=str)
 
 
 def _configure_logging() -> None:
@@ -107,6 +106,7 @@ Real-time fatigue detection system using:
     """,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse,
     contact={
         "name": "Fumorive Team",
     },
@@ -201,12 +201,14 @@ async def log_requests(request: Request, call_next):
     duration_ms = (time.time() - start_time) * 1000
     duration_s  = duration_ms / 1000
 
-    # Normalise path for metrics grouping (strip UUIDs and numeric IDs)
-    norm_path = re.sub(
-        r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
-        "{id}", request.url.path
-    )
-    norm_path = re.sub(r"/\d+", "/{id}", norm_path)
+    # Group metrics by route template ("GET /api/v1/sessions/{session_id}");
+    # requests no route matched (404s, scanners) share one key per method so
+    # they cannot use up the route table
+    route = request.scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        norm_path = f"{request.method} {route.path}"
+    else:
+        norm_path = f"{request.method} <unmatched>"
 
     # Record in-process metrics
     app_metrics.record(duration_s, response.status_code, norm_path)
@@ -329,6 +331,13 @@ async def startup_event():
     print("\n[REDIS] Initializing Redis...")
     init_redis()
 
+    # Evict cached auth principals when other workers publish logouts
+    from app.core.pubsub import start_listener
+    from app.core.token_blacklist import token_blacklist
+    start_listener()
+    token_blacklist.start()
+    app_metrics.start()
+
     # Initialize Firebase (OAuth)
     print("\n[FIREBASE] Initializing Firebase...")
     init_firebase()
@@ -363,8 +372,31 @@ async def shutdown_event():
     except Exception as e:
         print(f"[EEG] Failed to stop EEG buffer: {e}")
 
+    # Let running export jobs finish writing their artifacts
+    print("\n[EXPORT] Stopping export workers...")
+    from app.core.export_jobs import export_jobs
+    export_jobs.shutdown()
+
+    from app.core.password import password_hasher
+    password_hasher.shutdown()
+
+    # Recompute summaries of recently edited sessions (emits cache events)
+    from app.core.session_summary import flush_resummarize
+    flush_resummarize()
+
+    # Deliver debounced cache invalidations before Redis goes away
+    from app.core.cache_events import flush_pending
+    flush_pending()
+
+    from app.core.pubsub import stop_listener
+    from app.core.token_blacklist import token_blacklist
+    stop_listener()
+    token_blacklist.stop()
+    app_metrics.stop()
+
     # Close Redis connection
     print("\n[REDIS] Closing Redis connection...")
+    await close_async_redis()
     close_redis()
 
     print("=" * 60)
@@ -0,0 +1,23 @@
+-- =============================================================================
+-- Migration 005: Materialized Session Summary
+-- Date: 2026-10-19
+-- Purpose:
+--   Store per-session aggregates (EEG band averages, fatigue distribution,
+--   face / alert / game statistics) on the sessions row when a session is
+--   completed. Reporting endpoints read this column instead of scanning the
+--   raw hypertables.
+--
+--   Populated by app/core/session_summary.py after complete / end.
+--   Note: the `session_summaries` materialized view from migration 003 is
+--   left untouched.
+--
+-- Safe to re-run: uses IF NOT EXISTS.
+-- =============================================================================
+
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS summary JSONB;
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS summarized_at TIMESTAMPTZ;
+
+-- Completed sessions still waiting for a summary (backfill / retry scans)
+CREATE INDEX IF NOT EXISTS idx_sessions_unsummarized
+    ON sessions (ended_at)
+    WHERE session_status = 'completed' AND summary IS NULL;
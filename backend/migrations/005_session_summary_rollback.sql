@@ -0,0 +1,5 @@
+-- Rollback Migration 005: Materialized Session Summary
+
+DROP INDEX IF EXISTS idx_sessions_unsummarized;
+ALTER TABLE sessions DROP COLUMN IF EXISTS summarized_at;
+ALTER TABLE sessions DROP COLUMN IF EXISTS summary;
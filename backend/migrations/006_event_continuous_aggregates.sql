@@ -0,0 +1,319 @@
+-- =============================================================================
+-- Migration 006: Continuous Aggregates for Face, Game and Alert Hypertables
+-- Date: 2026-10-19
+-- Purpose:
+--   1-minute / 1-hour / 1-day continuous aggregates for face_detection_events,
+--   game_events and alerts, so dashboard queries over long ranges read
+--   pre-bucketed rows instead of raw events.
+--
+--   Aggregates store SUMs and COUNTs (not AVGs) so any view can be rolled up
+--   further with time_bucket() without weighting errors:
+--       avg = SUM(x_sum) / SUM(x_n)
+--
+--   Views use real-time aggregation (materialized_only = false): the
+--   not-yet-materialized tail is computed from raw rows at query time.
+--
+--   The query router (app/core/agg_router.py) picks the coarsest view that
+--   fits the requested resolution and range.
+--
+-- Prerequisites: Migration 003 (hypertables) must have been applied.
+-- Refresh windows stay well inside the 90-day raw retention policy, so
+-- aggregates keep history after raw chunks are dropped.
+-- =============================================================================
+
+
+-- ============================================================
+-- 1. FACE DETECTION EVENTS
+-- ============================================================
+
+DROP MATERIALIZED VIEW IF EXISTS face_1min_agg CASCADE;
+
+CREATE MATERIALIZED VIEW face_1min_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 minute', timestamp)           AS bucket,
+    session_id,
+    COUNT(*)                                     AS event_count,
+    SUM(CASE WHEN eyes_closed THEN 1 ELSE 0 END) AS eyes_closed_count,
+    SUM(CASE WHEN yawning THEN 1 ELSE 0 END)     AS yawn_count,
+    SUM(blink_rate)                              AS blink_rate_sum,
+    COUNT(blink_rate)                            AS blink_rate_n,
+    MAX(blink_count)                             AS max_blink_count,
+    SUM(face_fatigue_score)                      AS fatigue_sum,
+    COUNT(face_fatigue_score)                    AS fatigue_n,
+    MAX(face_fatigue_score)                      AS max_fatigue,
+    SUM(head_yaw)                                AS head_yaw_sum,
+    SUM(head_pitch)                              AS head_pitch_sum,
+    SUM(head_roll)                               AS head_roll_sum,
+    COUNT(head_yaw)                              AS head_pose_n
+FROM face_detection_events
+GROUP BY bucket, session_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'face_1min_agg',
+    start_offset      => INTERVAL '2 hours',
+    end_offset        => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_face_1min_agg_session_bucket
+    ON face_1min_agg (session_id, bucket DESC);
+
+DROP MATERIALIZED VIEW IF EXISTS face_1hour_agg CASCADE;
+
+CREATE MATERIALIZED VIEW face_1hour_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 hour', timestamp)             AS bucket,
+    session_id,
+    COUNT(*)                                     AS event_count,
+    SUM(CASE WHEN eyes_closed THEN 1 ELSE 0 END) AS eyes_closed_count,
+    SUM(CASE WHEN yawning THEN 1 ELSE 0 END)     AS yawn_count,
+    SUM(blink_rate)                              AS blink_rate_sum,
+    COUNT(blink_rate)                            AS blink_rate_n,
+    MAX(blink_count)                             AS max_blink_count,
+    SUM(face_fatigue_score)                      AS fatigue_sum,
+    COUNT(face_fatigue_score)                    AS fatigue_n,
+    MAX(face_fatigue_score)                      AS max_fatigue,
+    SUM(head_yaw)                                AS head_yaw_sum,
+    SUM(head_pitch)                              AS head_pitch_sum,
+    SUM(head_roll)                               AS head_roll_sum,
+    COUNT(head_yaw)                              AS head_pose_n
+FROM face_detection_events
+GROUP BY bucket, session_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'face_1hour_agg',
+    start_offset      => INTERVAL '2 days',
+    end_offset        => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_face_1hour_agg_session_bucket
+    ON face_1hour_agg (session_id, bucket DESC);
+
+DROP MATERIALIZED VIEW IF EXISTS face_1day_agg CASCADE;
+
+CREATE MATERIALIZED VIEW face_1day_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 day', timestamp)              AS bucket,
+    session_id,
+    COUNT(*)                                     AS event_count,
+    SUM(CASE WHEN eyes_closed THEN 1 ELSE 0 END) AS eyes_closed_count,
+    SUM(CASE WHEN yawning THEN 1 ELSE 0 END)     AS yawn_count,
+    SUM(blink_rate)                              AS blink_rate_sum,
+    COUNT(blink_rate)                            AS blink_rate_n,
+    MAX(blink_count)                             AS max_blink_count,
+    SUM(face_fatigue_score)                      AS fatigue_sum,
+    COUNT(face_fatigue_score)                    AS fatigue_n,
+    MAX(face_fatigue_score)                      AS max_fatigue,
+    SUM(head_yaw)                                AS head_yaw_sum,
+    SUM(head_pitch)                              AS head_pitch_sum,
+    SUM(head_roll)                               AS head_roll_sum,
+    COUNT(head_yaw)                              AS head_pose_n
+FROM face_detection_events
+GROUP BY bucket, session_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'face_1day_agg',
+    start_offset      => INTERVAL '7 days',
+    end_offset        => INTERVAL '1 day',
+    schedule_interval => INTERVAL '6 hours',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_face_1day_agg_session_bucket
+    ON face_1day_agg (session_id, bucket DESC);
+
+
+-- ============================================================
+-- 2. GAME EVENTS
+-- ============================================================
+
+DROP MATERIALIZED VIEW IF EXISTS game_1min_agg CASCADE;
+
+CREATE MATERIALIZED VIEW game_1min_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 minute', timestamp)           AS bucket,
+    session_id, event_type,
+    COUNT(*)                                     AS event_count,
+    SUM(speed)                                   AS speed_sum,
+    COUNT(speed)                                 AS speed_n,
+    MAX(speed)                                   AS max_speed,
+    SUM(ABS(lane_deviation))                     AS lane_dev_abs_sum,
+    COUNT(lane_deviation)                        AS lane_dev_n
+FROM game_events
+GROUP BY bucket, session_id, event_type
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'game_1min_agg',
+    start_offset      => INTERVAL '2 hours',
+    end_offset        => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_game_1min_agg_session_bucket
+    ON game_1min_agg (session_id, bucket DESC);
+
+DROP MATERIALIZED VIEW IF EXISTS game_1hour_agg CASCADE;
+
+CREATE MATERIALIZED VIEW game_1hour_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 hour', timestamp)             AS bucket,
+    session_id, event_type,
+    COUNT(*)                                     AS event_count,
+    SUM(speed)                                   AS speed_sum,
+    COUNT(speed)                                 AS speed_n,
+    MAX(speed)                                   AS max_speed,
+    SUM(ABS(lane_deviation))                     AS lane_dev_abs_sum,
+    COUNT(lane_deviation)                        AS lane_dev_n
+FROM game_events
+GROUP BY bucket, session_id, event_type
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'game_1hour_agg',
+    start_offset      => INTERVAL '2 days',
+    end_offset        => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_game_1hour_agg_session_bucket
+    ON game_1hour_agg (session_id, bucket DESC);
+
+DROP MATERIALIZED VIEW IF EXISTS game_1day_agg CASCADE;
+
+CREATE MATERIALIZED VIEW game_1day_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 day', timestamp)              AS bucket,
+    session_id, event_type,
+    COUNT(*)                                     AS event_count,
+    SUM(speed)                                   AS speed_sum,
+    COUNT(speed)                                 AS speed_n,
+    MAX(speed)                                   AS max_speed,
+    SUM(ABS(lane_deviation))                     AS lane_dev_abs_sum,
+    COUNT(lane_deviation)                        AS lane_dev_n
+FROM game_events
+GROUP BY bucket, session_id, event_type
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'game_1day_agg',
+    start_offset      => INTERVAL '7 days',
+    end_offset        => INTERVAL '1 day',
+    schedule_interval => INTERVAL '6 hours',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_game_1day_agg_session_bucket
+    ON game_1day_agg (session_id, bucket DESC);
+
+
+-- ============================================================
+-- 3. ALERTS
+-- ============================================================
+
+DROP MATERIALIZED VIEW IF EXISTS alert_1min_agg CASCADE;
+
+CREATE MATERIALIZED VIEW alert_1min_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 minute', timestamp)           AS bucket,
+    session_id, alert_level, trigger_reason,
+    COUNT(*)                                     AS alert_count,
+    SUM(CASE WHEN acknowledged THEN 1 ELSE 0 END) AS acknowledged_count,
+    SUM(fatigue_score)                           AS fatigue_sum,
+    MAX(fatigue_score)                           AS max_fatigue
+FROM alerts
+GROUP BY bucket, session_id, alert_level, trigger_reason
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'alert_1min_agg',
+    start_offset      => INTERVAL '2 hours',
+    end_offset        => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_1min_agg_session_bucket
+    ON alert_1min_agg (session_id, bucket DESC);
+
+DROP MATERIALIZED VIEW IF EXISTS alert_1hour_agg CASCADE;
+
+CREATE MATERIALIZED VIEW alert_1hour_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 hour', timestamp)             AS bucket,
+    session_id, alert_level, trigger_reason,
+    COUNT(*)                                     AS alert_count,
+    SUM(CASE WHEN acknowledged THEN 1 ELSE 0 END) AS acknowledged_count,
+    SUM(fatigue_score)                           AS fatigue_sum,
+    MAX(fatigue_score)                           AS max_fatigue
+FROM alerts
+GROUP BY bucket, session_id, alert_level, trigger_reason
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'alert_1hour_agg',
+    start_offset      => INTERVAL '2 days',
+    end_offset        => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_1hour_agg_session_bucket
+    ON alert_1hour_agg (session_id, bucket DESC);
+
+DROP MATERIALIZED VIEW IF EXISTS alert_1day_agg CASCADE;
+
+CREATE MATERIALIZED VIEW alert_1day_agg
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket('1 day', timestamp)              AS bucket,
+    session_id, alert_level, trigger_reason,
+    COUNT(*)                                     AS alert_count,
+    SUM(CASE WHEN acknowledged THEN 1 ELSE 0 END) AS acknowledged_count,
+    SUM(fatigue_score)                           AS fatigue_sum,
+    MAX(fatigue_score)                           AS max_fatigue
+FROM alerts
+GROUP BY bucket, session_id, alert_level, trigger_reason
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy(
+    'alert_1day_agg',
+    start_offset      => INTERVAL '7 days',
+    end_offset        => INTERVAL '1 day',
+    schedule_interval => INTERVAL '6 hours',
+    if_not_exists     => TRUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_1day_agg_session_bucket
+    ON alert_1day_agg (session_id, bucket DESC);
+
+
+-- ============================================================
+-- INITIAL POPULATE
+-- ============================================================
+
+CALL refresh_continuous_aggregate('face_1min_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('face_1hour_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('face_1day_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('game_1min_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('game_1hour_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('game_1day_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('alert_1min_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('alert_1hour_agg', NULL, NULL);
+CALL refresh_continuous_aggregate('alert_1day_agg', NULL, NULL);
@@ -0,0 +1,11 @@
+-- Rollback Migration 006: Continuous Aggregates for Face, Game and Alert Hypertables
+
+DROP MATERIALIZED VIEW IF EXISTS face_1min_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS face_1hour_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS face_1day_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS game_1min_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS game_1hour_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS game_1day_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS alert_1min_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS alert_1hour_agg CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS alert_1day_agg CASCADE;
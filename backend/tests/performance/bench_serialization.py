@@ -0,0 +1,142 @@
+"""
+Fumorive Backend - JSON Serialization Microbenchmark
+
+Compares encoders on representative playback payloads:
+    - PaginatedEEGResponse  (page of 1000 EEG samples)
+    - TimelineResponse      (page of 1000 mixed EEG/face/game/alert events)
+    - WebSocket EEG frame   (one relay message fanned out to 20 clients)
+
+Encoders:
+    fastapi-default   jsonable_encoder + json.dumps (FastAPI's JSONResponse path)
+    fast-dumps        app.core.serialization.dumps on model_dump()
+    model-to-bytes    app.core.serialization.model_to_bytes (pydantic-core)
+
+Usage:
+    cd backend
+    python tests/performance/bench_serialization.py
+    python tests/performance/bench_serialization.py --rows 5000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from app.core import serialization  # noqa: E402
+from app.schemas.eeg import (  # noqa: E402
+    EEGDataResponse, PaginatedEEGResponse, TimelineEvent, TimelineResponse,
+)
+
+
+def _fastapi_default(model) -> bytes:
+    return json.dumps(
+        jsonable_encoder(model), ensure_ascii=False, allow_nan=False,
+        indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def build_eeg_page(rows: int) -> PaginatedEEGResponse:
+    session_id = uuid.uuid4()
+    start = datetime.now(timezone.utc)
+    data = [
+        EEGDataResponse(
+            id=i,
+            session_id=session_id,
+            timestamp=start + timedelta(milliseconds=4 * i),
+            raw_channels={ch: random.uniform(-100, 100) for ch in ("TP9", "AF7", "AF8", "TP10")},
+            delta_power=random.random(),
+            theta_power=random.random(),
+            alpha_power=random.random(),
+            beta_power=random.random(),
+            gamma_power=random.random(),
+            theta_alpha_ratio=random.uniform(0.5, 2.0),
+            beta_alpha_ratio=random.uniform(0.5, 2.0),
+            signal_quality=random.random(),
+            cognitive_state=random.choice(["alert", "drowsy", "fatigued"]),
+            eeg_fatigue_score=random.uniform(0, 100),
+        )
+        for i in range(rows)
+    ]
+    return PaginatedEEGResponse(total=rows * 10, page=1, page_size=rows, has_next=True, data=data)
+
+
+def build_timeline_page(rows: int) -> TimelineResponse:
+    start = datetime.now(timezone.utc)
+    payloads = {
+        "eeg":   lambda: {"theta_alpha_ratio": random.uniform(0.5, 2.0), "fatigue_score": random.uniform(0, 100)},
+        "face":  lambda: {"eyes_closed": random.random() < 0.1, "yawning": False, "blink_rate": random.uniform(5, 30)},
+        "game":  lambda: {"event_type": "lane_change", "speed": random.uniform(40, 120), "lane_deviation": random.random()},
+        "alert": lambda: {"alert_level": "warning", "fatigue_score": random.uniform(60, 90), "trigger_reason": "eeg"},
+    }
+    events = []
+    for i in range(rows):
+        kind = random.choice(list(payloads))
+        events.append(TimelineEvent(type=kind, timestamp=start + timedelta(milliseconds=50 * i), data=payloads[kind]()))
+    return TimelineResponse(total=rows * 10, page=1, page_size=rows, has_next=True, events=events)
+
+
+def build_ws_frame() -> dict:
+    return {
+        "type": "eeg_data",
+        "session_id": str(uuid.uuid4()),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "data": {
+            "raw_channels": {ch: random.uniform(-100, 100) for ch in ("TP9", "AF7", "AF8", "TP10")},
+            "processed": {"theta_alpha_ratio": 1.2, "fatigue_score": 42.0, "signal_quality": 0.93},
+        },
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-`repeat` wall time of one call, in milliseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetitions, best is reported (default: 10)")
+    parser.add_argument("--clients", type=int, default=20, help="WebSocket fan-out (default: 20)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    payloads = {
+        "PaginatedEEGResponse": build_eeg_page(args.rows),
+        "TimelineResponse": build_timeline_page(args.rows),
+    }
+
+    print(f"JSON backend: {serialization.BACKEND}   rows/page: {args.rows}   best of {args.repeat}\n")
+    print(f"{'payload':<22} {'encoder':<16} {'ms':>9} {'speedup':>8} {'KiB':>8}")
+    print("-" * 67)
+    for name, model in payloads.items():
+        encoders = {
+            "fastapi-default": lambda m=model: _fastapi_default(m),
+            "fast-dumps":      lambda m=model: serialization.dumps(m.model_dump()),
+            "model-to-bytes":  lambda m=model: serialization.model_to_bytes(m),
+        }
+        baseline = None
+        for label, fn in encoders.items():
+            ms = _time(fn, args.repeat)
+            baseline = baseline or ms
+            size = len(fn()) / 1024
+            print(f"{name:<22} {label:<16} {ms:>9.2f} {baseline / ms:>7.1f}x {size:>8.1f}")
+        print()
+
+    frame = build_ws_frame()
+    per_client = _time(lambda: [json.dumps(frame) for _ in range(args.clients)], args.repeat * 100)
+    once = _time(lambda: serialization.dumps_str(frame), args.repeat * 100)
+    print(f"WebSocket frame x{args.clients} clients")
+    print(f"  encode per client (send_json):  {per_client * 1000:>8.1f} us")
+    print(f"  encode once (broadcast):        {once * 1000:>8.1f} us   {per_client / once:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
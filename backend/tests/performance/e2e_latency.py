@@ -0,0 +1,405 @@
+"""
+Fumorive Backend - End-to-End EEG Relay Latency Harness
+
+Measures the latency the live dashboard actually sees:
+    producer --POST /api/v1/eeg/stream--> FastAPI --ConnectionManager--> WebSocket client
+
+Runs fully offline, no Postgres or Redis needed:
+    - the real app (main:app) is served by uvicorn in a child process
+    - a SQLite file stands in for Postgres/TimescaleDB (users, sessions, eeg_data)
+    - fakeredis stands in for Redis (if not installed, Redis stays disabled and
+      the app degrades exactly as it does in production without Redis)
+    - the stream rate limit is raised so the harness measures the relay, not slowapi
+
+N producers post synthetic samples on the trusted X-EEG-API-Key path (what
+eeg-processing/server.py uses), one session each, at --rate Hz. M WebSocket
+consumers are spread round-robin over those sessions. Every sample carries a
+monotonic send stamp in `processed` (relayed untouched), so:
+
+    relay latency = consumer receive time - producer stamp   (same host clock)
+    drop rate     = samples accepted by the API but never seen by a subscriber
+
+Results (p50/p95/p99, throughput, drop rate, config) are written as JSON.
+
+Usage:
+    cd backend
+    python tests/performance/e2e_latency.py
+    python tests/performance/e2e_latency.py --producers 4 --consumers 20 --rate 50 --duration 30
+    python tests/performance/e2e_latency.py --save-to-db --output tests/performance/e2e_db.json
+
+    # CI gate: exit 1 if p99 or drop rate exceed the limits
+    python tests/performance/e2e_latency.py --max-p99-ms 50 --max-drop-rate 0.001
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Set
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, BACKEND_ROOT)
+
+API_PREFIX = "/api/v1"
+STREAM_PATH = f"{API_PREFIX}/eeg/stream"
+EEG_API_KEY = "fumorive-e2e-harness-key"
+CHANNELS = ("TP9", "AF7", "AF8", "TP10")
+
+
+# ==================== Server (child process) ====================
+
+def serve(port: int, db_path: str, session_ids: List[str]) -> None:
+    """Run main:app on SQLite + fakeredis. Called in the child process."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "ENVIRONMENT": "benchmark",
+        "EEG_INTERNAL_KEY": EEG_API_KEY,
+        "LIMIT_STREAM": "1000000/minute",
+    })
+
+    import logging
+    from sqlalchemy.dialects.postgresql import JSONB, UUID
+    from sqlalchemy.ext.compiler import compiles
+
+    # Postgres column types as their SQLite equivalents (DDL only)
+    @compiles(JSONB, "sqlite")
+    def _jsonb_as_json(type_, compiler, **kw):
+        return "JSON"
+
+    @compiles(UUID, "sqlite")
+    def _uuid_as_char(type_, compiler, **kw):
+        return "CHAR(32)"
+
+    import uvicorn
+    import main
+    from app.core import redis as redis_module
+    from app.db.database import SessionLocal, engine
+    from app.db.models import EEGData, Session, User
+
+    try:
+        import fakeredis
+        redis_module._redis_client = fakeredis.FakeRedis(decode_responses=True)
+        redis_module._async_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        print("[E2E] Redis: fakeredis")
+    except ImportError:
+        print("[E2E] Redis: disabled (pip install fakeredis to enable)")
+    main.init_redis = redis_module.get_redis  # keep the injected client
+
+    User.metadata.create_all(engine, tables=[User.__table__, Session.__table__, EEGData.__table__])
+    db = SessionLocal()
+    try:
+        user = User(email="e2e@fumorive.local", full_name="E2E Harness", role="researcher")
+        db.add(user)
+        db.flush()
+        for sid in session_ids:
+            db.add(Session(id=uuid.UUID(sid), user_id=user.id, session_name="e2e", device_type="synthetic"))
+        db.commit()
+    finally:
+        db.close()
+
+    # One JSON log line per request would dominate the measurement
+    logging.getLogger("fumorive").setLevel(logging.WARNING)
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning", ws="websockets")
+
+
+# ==================== Load generation ====================
+
+class Stats:
+    """Shared counters for one run"""
+
+    def __init__(self, session_ids: List[str]):
+        self.accepted: Dict[str, Set[int]] = {sid: set() for sid in session_ids}
+        self.post_errors = 0
+        self.post_ms: List[float] = []
+        self.relay_ms: List[float] = []
+        self.received: List[Dict[str, Set[int]]] = []  # per consumer: session -> seqs
+        self.late_starts = 0  # ticks where a producer was already behind schedule
+
+
+def build_sample(session_id: str, producer: int, seq: int, save_to_db: bool) -> dict:
+    """Synthetic EEG sample in the shape eeg-processing/server.py sends"""
+    theta, alpha = random.uniform(0.2, 0.8), random.uniform(0.2, 0.8)
+    return {
+        "session_id": session_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "sample_rate": 256,
+        "channels": {ch: random.uniform(-100, 100) for ch in CHANNELS},
+        "processed": {
+            "theta_power": theta,
+            "alpha_power": alpha,
+            "theta_alpha_ratio": theta / alpha,
+            "eeg_fatigue_score": random.uniform(0, 100),
+            "cognitive_state": "alert",
+            "bench_producer": producer,
+            "bench_seq": seq,
+        },
+        "save_to_db": save_to_db,
+    }
+
+
+async def produce(client, producer: int, session_id: str, args, stats: Stats) -> None:
+    """Post samples at a fixed rate (open loop: a slow response does not delay the schedule)"""
+    interval = 1.0 / args.rate
+    start = time.monotonic()
+    pending = set()
+
+    async def post(seq: int) -> None:
+        body = build_sample(session_id, producer, seq, args.save_to_db)
+        body["processed"]["bench_sent_ns"] = time.monotonic_ns()
+        sent = time.perf_counter()
+        try:
+            response = await client.post(STREAM_PATH, content=json.dumps(body))
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        stats.post_ms.append((time.perf_counter() - sent) * 1000)
+        if ok:
+            stats.accepted[session_id].add(seq)
+        else:
+            stats.post_errors += 1
+
+    for seq in range(int(args.duration * args.rate)):
+        delay = start + seq * interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -interval:
+            stats.late_starts += 1
+        task = asyncio.create_task(post(seq))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+
+async def consume(url: str, received: Dict[str, Set[int]], stats: Stats,
+                  ready: asyncio.Event, stop: asyncio.Event) -> None:
+    """Subscribe to one session and record relay latency of every eeg_data frame"""
+    import websockets
+
+    async with websockets.connect(url, max_queue=None) as ws:
+        await ws.recv()  # "connection" welcome message
+        ready.set()
+        while not stop.is_set():
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=0.2)
+            except asyncio.TimeoutError:
+                continue
+            now = time.monotonic_ns()
+            frame = json.loads(message)
+            processed = frame.get("processed") or {}
+            if frame.get("type") != "eeg_data" or "bench_sent_ns" not in processed:
+                continue
+            stats.relay_ms.append((now - processed["bench_sent_ns"]) / 1e6)
+            received.setdefault(frame["session_id"], set()).add(processed["bench_seq"])
+
+
+# ==================== Reporting ====================
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": round(percentile(ordered, 0.50), 3),
+        "p95": round(percentile(ordered, 0.95), 3),
+        "p99": round(percentile(ordered, 0.99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+        "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+    }
+
+
+def build_report(args, stats: Stats, session_ids: List[str], elapsed: float) -> dict:
+    expected = delivered = 0
+    for index, received in enumerate(stats.received):
+        sid = session_ids[index % len(session_ids)]
+        accepted = stats.accepted[sid]
+        expected += len(accepted)
+        delivered += len(accepted & received.get(sid, set()))
+
+    attempted = int(args.duration * args.rate) * args.producers
+    accepted_total = sum(len(seqs) for seqs in stats.accepted.values())
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "producers": args.producers,
+            "consumers": args.consumers,
+            "rate_hz": args.rate,
+            "duration_s": args.duration,
+            "save_to_db": args.save_to_db,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "sqlite",
+        },
+        "relay_latency_ms": summarize(stats.relay_ms),
+        "post_latency_ms": summarize(stats.post_ms),
+        "throughput": {
+            "posted_per_s": round(accepted_total / elapsed, 1),
+            "frames_delivered_per_s": round(len(stats.relay_ms) / elapsed, 1),
+            "load_elapsed_s": round(elapsed, 2),
+        },
+        "delivery": {
+            "attempted": attempted,
+            "accepted": accepted_total,
+            "post_errors": stats.post_errors,
+            "expected_frames": expected,
+            "delivered_frames": delivered,
+            "drop_rate": round(1 - delivered / expected, 6) if expected else 0.0,
+            "producer_late_ticks": stats.late_starts,
+        },
+    }
+
+
+# ==================== Orchestration ====================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_live(client, server: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Server process exited during startup (see server log)")
+        try:
+            if (await client.get("/health/live")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server not live after {timeout:.0f}s")
+
+
+async def run(args, base_url: str, session_ids: List[str], server: subprocess.Popen) -> dict:
+    import httpx
+
+    stats = Stats(session_ids)
+    ws_base = base_url.replace("http://", "ws://", 1)
+    limits = httpx.Limits(max_connections=args.producers * 8, max_keepalive_connections=args.producers * 8)
+    headers = {"X-EEG-API-Key": EEG_API_KEY, "Content-Type": "application/json"}
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=10.0) as client:
+        await _wait_until_live(client, server)
+
+        stop = asyncio.Event()
+        consumers = []
+        for index in range(args.consumers):
+            sid = session_ids[index % len(session_ids)]
+            received: Dict[str, Set[int]] = {}
+            stats.received.append(received)
+            ready = asyncio.Event()
+            url = f"{ws_base}{API_PREFIX}/ws/session/{sid}"
+            consumers.append((ready, asyncio.create_task(consume(url, received, stats, ready, stop))))
+        await asyncio.wait_for(asyncio.gather(*(ready.wait() for ready, _ in consumers)), timeout=30)
+
+        started = time.monotonic()
+        await asyncio.gather(*(
+            produce(client, index, sid, args, stats) for index, sid in enumerate(session_ids)
+        ))
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(args.drain)
+
+        stop.set()
+        await asyncio.gather(*(task for _, task in consumers), return_exceptions=True)
+
+    return build_report(args, stats, session_ids, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--producers", type=int, default=2, help="EEG producers / sessions (default: 2)")
+    parser.add_argument("--consumers", type=int, default=10, help="WebSocket consumers (default: 10)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Samples per second per producer (default: 20)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load (default: 10)")
+    parser.add_argument("--drain", type=float, default=2.0, help="Seconds to wait for in-flight frames (default: 2)")
+    parser.add_argument("--save-to-db", action="store_true", help="Also buffer samples into eeg_data (SQLite)")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "e2e_latency.json"),
+                        help="JSON artifact path (default: tests/performance/e2e_latency.json)")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit 1 if relay p99 exceeds this")
+    parser.add_argument("--max-drop-rate", type=float, help="Exit 1 if drop rate exceeds this")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--sessions", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        os.chdir(BACKEND_ROOT)
+        serve(args.serve, args.db, args.sessions.split(","))
+        return
+
+    random.seed(0)
+    session_ids = [str(uuid.uuid4()) for _ in range(args.producers)]
+    port = _free_port()
+    workdir = tempfile.mkdtemp(prefix="fumorive-e2e-")
+    log_path = os.path.join(workdir, "server.log")
+
+    print(f"E2E relay latency: {args.producers} producers x {args.rate:g} Hz -> "
+          f"{args.consumers} consumers, {args.duration:g}s")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", str(port),
+             "--db", os.path.join(workdir, "e2e.db"), "--sessions", ",".join(session_ids)],
+            cwd=BACKEND_ROOT, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            report = asyncio.run(run(args, f"http://127.0.0.1:{port}", session_ids, server))
+        except Exception:
+            print(f"Run failed; server log: {log_path}")
+            raise
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    with open(log_path) as log:
+        report["environment"]["redis"] = "fakeredis" if "Redis: fakeredis" in log.read() else "disabled"
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    relay, delivery = report["relay_latency_ms"], report["delivery"]
+    print(f"  relay latency ms   p50 {relay['p50']:.2f}   p95 {relay['p95']:.2f}   p99 {relay['p99']:.2f}   max {relay['max']:.2f}")
+    print(f"  POST latency ms    p50 {report['post_latency_ms']['p50']:.2f}   p99 {report['post_latency_ms']['p99']:.2f}")
+    print(f"  throughput         {report['throughput']['posted_per_s']} samples/s in, "
+          f"{report['throughput']['frames_delivered_per_s']} frames/s out")
+    print(f"  delivery           {delivery['delivered_frames']}/{delivery['expected_frames']} "
+          f"(drop rate {delivery['drop_rate']:.4%}, {delivery['post_errors']} POST errors)")
+    print(f"  report             {args.output}")
+
+    failed = []
+    if args.max_p99_ms is not None and relay["p99"] > args.max_p99_ms:
+        failed.append(f"p99 {relay['p99']:.2f} ms > {args.max_p99_ms} ms")
+    if args.max_drop_rate is not None and delivery["drop_rate"] > args.max_drop_rate:
+        failed.append(f"drop rate {delivery['drop_rate']:.4%} > {args.max_drop_rate:.4%}")
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Continuous aggregate router tests.
+
+Tests for:
+- pick_view: coarsest aggregate for a resolution / range
+- align_down / align_up: time_bucket-compatible boundaries
+- resolution_for_range: bucket size for a max point count
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.agg_router import (
+    RESOLUTIONS, align_down, align_up, pick_view, resolution_for_range
+)
+
+UTC = timezone.utc
+
+
+@pytest.mark.unit
+def test_pick_view_uses_coarsest_aligned_aggregate():
+    """Daily resolution over day-aligned range reads the 1-day view."""
+    view = pick_view("alert", RESOLUTIONS["1 day"], datetime(2026, 1, 1, tzinfo=UTC))
+    assert view.name == "alert_1day_agg"
+
+
+@pytest.mark.unit
+def test_pick_view_falls_back_when_range_is_not_aligned():
+    """A range starting mid-day cannot use daily buckets."""
+    start = datetime(2026, 1, 1, 3, tzinfo=UTC)
+    view = pick_view("alert", RESOLUTIONS["1 day"], start)
+    assert view.name == "alert_1hour_agg"
+
+
+@pytest.mark.unit
+def test_pick_view_requires_bucket_to_divide_resolution():
+    """6-hour buckets roll up from hourly rows, not daily ones."""
+    view = pick_view("face", RESOLUTIONS["6 hours"])
+    assert view.name == "face_1hour_agg"
+
+    view = pick_view("eeg", RESOLUTIONS["1 hour"])
+    assert view.name == "eeg_5min_agg"
+
+
+@pytest.mark.unit
+def test_pick_view_returns_none_below_finest_bucket():
+    """Sub-minute resolutions must go to the raw hypertable."""
+    assert pick_view("game", timedelta(seconds=10)) is None
+
+
+@pytest.mark.unit
+def test_alignment_matches_time_bucket_origin():
+    """Weeks start on Monday like TimescaleDB's time_bucket."""
+    ts = datetime(2026, 1, 1, 3, 7, 9, tzinfo=UTC)  # Thursday
+    assert align_down(ts, RESOLUTIONS["1 week"]) == datetime(2025, 12, 29, tzinfo=UTC)
+    assert align_up(ts, RESOLUTIONS["1 day"]) == datetime(2026, 1, 2, tzinfo=UTC)
+    assert align_up(datetime(2026, 1, 2, tzinfo=UTC), RESOLUTIONS["1 day"]) == datetime(2026, 1, 2, tzinfo=UTC)
+
+
+@pytest.mark.unit
+def test_resolution_for_range_respects_max_points():
+    """Two months at <= 500 points needs 6-hour buckets."""
+    label, width = resolution_for_range(datetime(2026, 1, 1), datetime(2026, 3, 1), 500)
+    assert label == "6 hours"
+    assert width == timedelta(hours=6)
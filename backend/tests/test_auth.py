@@ -173,6 +173,34 @@ def test_login_inactive_user(client: TestClient, db: Session):
     assert response.status_code in [401, 403]
 
 
+@pytest.mark.api
+@pytest.mark.auth
+def test_login_rehashes_outdated_cost_factor(client: TestClient, db: Session):
+    """A hash made with a different bcrypt cost is upgraded on login."""
+    import bcrypt
+    from app.core.password import needs_rehash
+
+    user = User(
+        email="oldhash@example.com",
+        full_name="Old Hash User",
+        hashed_password=bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=4)).decode(),
+        role="student",
+        is_active=True
+    )
+    db.add(user)
+    db.commit()
+    assert needs_rehash(user.hashed_password)
+
+    response = client.post(
+        "/api/v1/auth/login/json",
+        json={"email": "oldhash@example.com", "password": "password123"}
+    )
+
+    assert response.status_code == 200
+    db.refresh(user)
+    assert not needs_rehash(user.hashed_password)
+
+
 # ==================== Token Refresh Tests ====================
 
 @pytest.mark.api
@@ -231,3 +259,20 @@ def test_google_oauth_new_user(client: TestClient, db: Session):
 def test_google_oauth_existing_user(client: TestClient, test_oauth_user: User):
     """Test Google OAuth for existing OAuth user."""
     pytest.skip("Requires Firebase mock - implement later")
+
+
+# ==================== Logout Tests ====================
+
+@pytest.mark.api
+@pytest.mark.auth
+def test_logout_evicts_cached_principal(client: TestClient, auth_headers: dict):
+    """Logout drops the token from the in-process principal cache."""
+    from app.core.auth_cache import principal_cache
+
+    token = auth_headers["Authorization"].split(" ", 1)[1]
+    assert client.get("/api/v1/users/me", headers=auth_headers).status_code == 200
+    assert principal_cache.get(token) is not None
+
+    response = client.post("/api/v1/auth/logout", headers=auth_headers)
+    assert response.status_code == 200
+    assert principal_cache.get(token) is None
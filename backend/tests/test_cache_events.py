@@ -0,0 +1,51 @@
+"""
+Cache invalidation event tests.
+
+Tests for:
+- tags_for: event -> tag dependency map
+- emit_debounced: bursts of events collapse into one trailing emit
+"""
+
+import time
+from uuid import uuid4
+
+import pytest
+
+from app.core import cache_events
+
+
+@pytest.mark.unit
+def test_session_completed_invalidates_session_and_user_reports():
+    """Completing a session drops its metadata, list pages and session reports."""
+    sid, uid = uuid4(), uuid4()
+    tags = cache_events.tags_for(cache_events.SESSION_COMPLETED, sid, uid)
+
+    assert f"session:{sid}" in tags
+    assert f"user-sessions:{uid}" in tags
+    assert f"reports:user:{uid}:sessions" in tags
+    assert "reports:all:sessions" in tags
+    assert not any(tag.endswith(":alerts") for tag in tags)
+
+
+@pytest.mark.unit
+def test_report_tags_match_event_tags():
+    """Tags a report is stored under are the ones the matching event drops."""
+    sid, uid = uuid4(), uuid4()
+    tags = cache_events.tags_for(cache_events.ALERT_UPDATED, sid, uid)
+
+    assert set(cache_events.report_tags(str(uid), ["alerts"])) <= set(tags)
+    assert set(cache_events.report_tags(None, ["alerts"])) <= set(tags)
+
+
+@pytest.mark.unit
+def test_debounced_events_are_coalesced(monkeypatch):
+    """A burst of EEG flushes for one session produces a single emit."""
+    emitted = []
+    monkeypatch.setattr(cache_events, "emit", lambda event, **kw: emitted.append((event, kw)))
+    sid, uid = uuid4(), uuid4()
+
+    for _ in range(20):
+        cache_events.emit_debounced(cache_events.EEG_FLUSHED, session_id=sid, user_id=uid, delay=0.05)
+    time.sleep(0.2)
+
+    assert emitted == [(cache_events.EEG_FLUSHED, {"session_id": sid, "user_id": uid})]
@@ -0,0 +1,110 @@
+"""
+EEG ingest record tests.
+
+Tests for:
+- parse_eeg_record: trusted fast-path parsing and rejection of bad bodies
+- EEGRecord.to_mapping: eeg_data column mapping for bulk inserts
+- EEGRecord.relay_frame: same WebSocket message on both ingest paths
+- Optional pipeline timings (EEG server --send-timings)
+"""
+
+import json
+from uuid import UUID
+
+import pytest
+
+from app.core.eeg_ingest import EEGRecord, parse_eeg_record
+from app.schemas.eeg import EEGStreamData
+
+SAMPLE = {
+    "session_id": "123e4567-e89b-12d3-a456-426614174000",
+    "timestamp": "2026-01-19T12:00:00.123Z",
+    "sample_rate": 256,
+    "channels": {"TP9": 0.123, "AF7": 0.456, "AF8": 0.789, "TP10": 0.234},
+    "processed": {
+        "theta_power": 0.45,
+        "alpha_power": 0.67,
+        "theta_alpha_ratio": 0.67,
+        "eeg_fatigue_score": 32.5,
+        "cognitive_state": "alert",
+    },
+    "save_to_db": True,
+}
+
+
+@pytest.mark.unit
+def test_parse_trusted_body():
+    """A well-formed body becomes a record with typed session id and timestamp."""
+    record = parse_eeg_record(json.dumps(SAMPLE).encode())
+
+    assert record.session_id == UUID(SAMPLE["session_id"])
+    assert record.timestamp.tzinfo is not None
+    assert record.timestamp_raw == SAMPLE["timestamp"]
+    assert record.save_to_db is True
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"[]",
+    json.dumps({**SAMPLE, "session_id": "nope"}).encode(),
+    json.dumps({k: v for k, v in SAMPLE.items() if k != "timestamp"}).encode(),
+    json.dumps({**SAMPLE, "channels": [1, 2, 3]}).encode(),
+])
+def test_parse_rejects_unusable_bodies(body):
+    """Bodies that cannot be stored raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_eeg_record(body)
+
+
+@pytest.mark.unit
+def test_to_mapping_uses_eeg_data_columns():
+    """Metrics map onto eeg_data columns; non-numeric metrics are dropped."""
+    record = parse_eeg_record(json.dumps(
+        {**SAMPLE, "processed": {**SAMPLE["processed"], "signal_quality": "good"}}
+    ).encode())
+    row = record.to_mapping()
+
+    assert row["raw_channels"] == SAMPLE["channels"]
+    assert row["theta_power"] == 0.45
+    assert row["eeg_fatigue_score"] == 32.5
+    assert row["cognitive_state"] == "alert"
+    assert row["signal_quality"] is None
+    assert row["delta_power"] is None
+
+
+@pytest.mark.unit
+def test_both_paths_relay_the_same_frame():
+    """Validated and trusted ingest produce identical WebSocket messages."""
+    trusted = parse_eeg_record(json.dumps(SAMPLE).encode())
+    validated = EEGRecord.from_stream_data(EEGStreamData(**SAMPLE))
+
+    assert json.loads(trusted.relay_frame()) == json.loads(validated.relay_frame())
+    assert json.loads(trusted.relay_frame())["type"] == "eeg_data"
+
+
+@pytest.mark.unit
+def test_timings_are_optional_and_numeric():
+    """Stage timings are kept when numeric, dropped otherwise, on both paths."""
+    timings = {"acquire": 2001.5, "preprocess": 1.2, "send": 14.0}
+    trusted = parse_eeg_record(json.dumps({**SAMPLE, "timings": timings}).encode())
+    validated = EEGRecord.from_stream_data(EEGStreamData(**SAMPLE, timings=timings))
+
+    assert trusted.timings == timings
+    assert validated.timings == timings
+    assert parse_eeg_record(json.dumps(SAMPLE).encode()).timings is None
+    assert parse_eeg_record(json.dumps({**SAMPLE, "timings": [1, 2]}).encode()).timings is None
+    assert parse_eeg_record(
+        json.dumps({**SAMPLE, "timings": {"send": "slow", "analyze": 0.4}}).encode()
+    ).timings == {"analyze": 0.4}
+    assert "timings" not in json.loads(trusted.relay_frame())
+
+
+@pytest.mark.unit
+def test_malformed_timings_do_not_reject_validated_sample():
+    """On the JWT (pydantic) path bad timings are dropped, the sample is kept."""
+    data = EEGStreamData(**SAMPLE, timings={"send": "slow", "analyze": 0.4})
+    assert EEGRecord.from_stream_data(data).timings == {"analyze": 0.4}
+
+    data = EEGStreamData(**SAMPLE, timings="n/a")
+    assert EEGRecord.from_stream_data(data).timings is None
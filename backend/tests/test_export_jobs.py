@@ -0,0 +1,65 @@
+"""
+Export artifact cache tests.
+
+Tests for:
+- artifact_key: data version is part of the key
+- ExportJobManager: per-session delete, age and size eviction
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.core import export_jobs as export_jobs_module
+from app.core.export_jobs import ExportJobManager, artifact_key
+
+
+@pytest.mark.unit
+def test_new_data_version_gets_new_key():
+    """Re-summarizing a session (alert edited) must not serve the old file."""
+    sid = uuid4()
+    v1 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    v2 = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+    assert artifact_key(sid, "all", "csv", None, None, v1) != artifact_key(sid, "all", "csv", None, None, v2)
+    assert artifact_key(sid, "all", "csv", None, None, v1) == artifact_key(sid, "all", "csv", None, None, v1)
+
+
+@pytest.mark.unit
+def test_delete_session_artifacts(tmp_path):
+    manager = ExportJobManager(str(tmp_path), max_workers=1, job_ttl_seconds=60)
+    sid, other = uuid4(), uuid4()
+    manager.store_artifact(sid, "a" * 64, "csv", b"x")
+    manager.store_artifact(other, "b" * 64, "csv", b"y")
+
+    manager.delete_session_artifacts(sid)
+
+    assert manager.cached_artifact(sid, "a" * 64, "csv") is None
+    assert manager.cached_artifact(other, "b" * 64, "csv") is not None
+
+
+@pytest.mark.unit
+def test_eviction_by_age_then_least_recently_served(tmp_path, monkeypatch):
+    manager = ExportJobManager(
+        str(tmp_path), max_workers=1, job_ttl_seconds=60,
+        max_cache_bytes=250, max_artifact_age_seconds=3600,
+    )
+    sid = uuid4()
+    paths = {
+        key: manager.store_artifact(sid, key * 64, "csv", b"x" * 100)
+        for key in ("a", "b", "c")
+    }
+    now = time.time()
+    os.utime(paths["a"], (now - 7200, now - 7200))  # past the age limit
+    os.utime(paths["b"], (now - 60, now - 60))
+    os.utime(paths["c"], (now - 120, now - 120))
+    manager.cached_artifact(sid, "c" * 64, "csv")  # served -> most recent
+
+    monkeypatch.setattr(export_jobs_module, "_SWEEP_INTERVAL", 0.0)
+    manager.store_artifact(sid, "d" * 64, "csv", b"x" * 100)
+
+    remaining = {key for key in "abcd" if manager.cached_artifact(sid, key * 64, "csv")}
+    assert remaining == {"c", "d"}
@@ -0,0 +1,63 @@
+"""
+Live EEG aggregator tests.
+
+Tests for:
+- LiveEEGAggregator: per-minute buckets and 5-minute roll-up
+- merge_aggregate_rows: live rows fill in and replace partial view rows
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.live_aggregates import LiveEEGAggregator, merge_aggregate_rows
+
+UTC = timezone.utc
+SID = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.mark.unit
+def test_rows_average_per_minute_and_roll_up():
+    """Samples land in minute buckets; 5-minute rows are sample-weighted."""
+    agg = LiveEEGAggregator()
+    base = datetime(2026, 1, 1, 10, 0, 5, tzinfo=UTC)
+    agg.add(SID, base, {"eeg_fatigue_score": 40.0, "cognitive_state": "alert"})
+    agg.add(SID, base + timedelta(seconds=10), {"eeg_fatigue_score": 60.0})
+    agg.add(SID, base + timedelta(minutes=1), {"eeg_fatigue_score": 80.0})
+
+    rows = agg.rows(SID)
+    assert [r["bucket"] for r in rows] == [base.replace(second=0), base.replace(minute=1, second=0)]
+    assert rows[0]["avg_fatigue_score"] == 50.0
+    assert rows[0]["sample_count"] == 2
+    assert rows[0]["avg_alpha"] is None
+
+    (five,) = agg.rows(SID, timedelta(minutes=5))
+    assert five["sample_count"] == 3
+    assert five["avg_fatigue_score"] == pytest.approx(60.0)
+
+
+@pytest.mark.unit
+def test_retention_and_drop():
+    """Old minutes are evicted; drop() forgets the session."""
+    agg = LiveEEGAggregator(retention_minutes=2)
+    base = datetime(2026, 1, 1, 10, 0, tzinfo=UTC)
+    for minute in range(4):
+        agg.add(SID, base + timedelta(minutes=minute), {"eeg_fatigue_score": 1.0})
+    assert len(agg.rows(SID)) == 2
+
+    agg.drop(SID)
+    assert agg.rows(SID) == []
+
+
+@pytest.mark.unit
+def test_merge_prefers_fuller_bucket():
+    """A bucket the view already holds in full is kept; newer ones are appended."""
+    t0 = datetime(2026, 1, 1, 10, 0, tzinfo=UTC)
+    t1 = t0 + timedelta(minutes=1)
+    materialized = [{"bucket": t0, "avg_fatigue_score": 10.0, "sample_count": 60}]
+    live = [
+        {"bucket": t0, "avg_fatigue_score": 99.0, "sample_count": 5},
+        {"bucket": t1, "avg_fatigue_score": 20.0, "sample_count": 30},
+    ]
+    merged = merge_aggregate_rows(materialized, live)
+    assert [r["avg_fatigue_score"] for r in merged] == [10.0, 20.0]
@@ -0,0 +1,77 @@
+"""
+Application metrics tests.
+
+Tests for:
+- LatencySketch: quantiles within the relative-error bound, merging
+- _AppMetrics: per-route windows and the route cardinality cap
+"""
+
+import random
+
+import pytest
+
+from app.core import metrics
+from app.core.metrics import LatencySketch, _AppMetrics
+
+
+@pytest.mark.unit
+def test_sketch_quantiles_within_relative_error():
+    """p50 / p95 / p99 stay within 1 % of the exact order statistic."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1) for _ in range(20_000)]
+    sketch = LatencySketch()
+    for v in values:
+        sketch.add(v)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) / exact <= 0.0101
+
+
+@pytest.mark.unit
+def test_merged_sketches_equal_one_sketch():
+    """Merging per-worker sketches gives the same answer as one sketch."""
+    rng = random.Random(3)
+    values = [rng.uniform(1, 500) for _ in range(5_000)]
+    whole, left, right = LatencySketch(), LatencySketch(), LatencySketch()
+    for i, v in enumerate(values):
+        whole.add(v)
+        (left if i % 2 else right).add(v)
+    left.merge(right)
+
+    assert left.buckets == whole.buckets
+    assert left.quantile(0.99) == whole.quantile(0.99)
+
+
+@pytest.mark.unit
+def test_snapshot_reports_per_route_windows():
+    """Each route gets its own 1m / 5m / 15m percentiles and error counts."""
+    m = _AppMetrics()
+    for _ in range(99):
+        m.record(0.010, 200, "GET /api/v1/sessions")
+    m.record(0.900, 500, "GET /api/v1/sessions")
+    m.record(0.002, 200, "GET /api/v1/health/live")
+
+    snap = m.snapshot()
+    sessions = snap["routes"]["GET /api/v1/sessions"]
+    assert set(sessions) == {"1m", "5m", "15m"}
+    assert sessions["1m"]["count"] == 100
+    assert sessions["1m"]["5xx"] == 1
+    assert sessions["1m"]["p50"] == pytest.approx(10, rel=0.02)
+    assert sessions["1m"]["p99"] >= sessions["1m"]["p50"]
+    assert snap["windows"]["15m"]["count"] == 101
+    assert snap["slow_requests"]["count"] == 1
+
+
+@pytest.mark.unit
+def test_route_cardinality_is_capped(monkeypatch):
+    """Routes beyond the cap are folded into "other" instead of dropped."""
+    monkeypatch.setattr(metrics, "_MAX_ROUTES", 3)
+    m = _AppMetrics()
+    for i in range(5):
+        m.record(0.001, 404, f"GET /unmatched/{i}")
+
+    routes = m.snapshot()["routes"]
+    assert len(routes) == 4
+    assert routes["other"]["1m"]["count"] == 2
@@ -0,0 +1,126 @@
+"""
+Read-through cache tests.
+
+Tests for:
+- read_through: L1 hits, None not cached, single-flight of concurrent misses
+- invalidate_tags: tagged entries are reloaded; loads overlapping an
+  invalidation of their own tags are not stored, others are
+
+Runs without Redis (L2 is skipped when get_redis() returns None).
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.read_through import invalidate_tags, read_through
+
+
+@pytest.mark.unit
+def test_repeat_calls_hit_l1_until_tag_invalidated():
+    """Second call is served from memory; invalidation forces a reload."""
+    calls = []
+
+    @read_through("test-l1", 60, key=lambda item_id: item_id,
+                  tags=lambda value, item_id: [f"item:{item_id}"])
+    def load(item_id):
+        calls.append(item_id)
+        return {"id": item_id, "version": len(calls)}
+
+    assert load("a") == {"id": "a", "version": 1}
+    assert load("a") == {"id": "a", "version": 1}
+    assert calls == ["a"]
+
+    invalidate_tags("item:a")
+    assert load("a") == {"id": "a", "version": 2}
+
+
+@pytest.mark.unit
+def test_none_is_not_cached():
+    """Missing rows are looked up again on the next call."""
+    calls = []
+
+    @read_through("test-none", 60, key=lambda item_id: item_id)
+    def load(item_id):
+        calls.append(item_id)
+        return None
+
+    assert load("x") is None
+    assert load("x") is None
+    assert len(calls) == 2
+
+
+@pytest.mark.unit
+def test_concurrent_misses_are_coalesced():
+    """Threads missing the same key share one load."""
+    calls = []
+    gate = threading.Event()
+
+    @read_through("test-flight", 60, key=lambda item_id: item_id)
+    def load(item_id):
+        calls.append(item_id)
+        gate.wait(1)
+        return {"id": item_id}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(load("k"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["k"]
+    assert results == [{"id": "k"}] * 5
+
+
+@pytest.mark.unit
+def test_only_overlapping_invalidation_of_own_tags_skips_store():
+    """Writes to unrelated data during a load do not stop it from being cached."""
+    calls = []
+
+    @read_through("test-overlap", 60, key=lambda item_id, other: item_id,
+                  tags=lambda value, item_id, other: [f"item:{item_id}"])
+    def load(item_id, other):
+        calls.append(item_id)
+        invalidate_tags(f"item:{other}")
+        return {"id": item_id}
+
+    load("a", "unrelated")
+    load("a", "unrelated")
+    assert calls == ["a"]
+
+    load("b", "b")  # its own tag was invalidated mid-load
+    load("b", "b")
+    assert calls == ["a", "b", "b"]
+
+
+@pytest.mark.unit
+def test_follower_on_event_loop_does_not_wait():
+    """A miss on the event loop thread loads itself instead of blocking on another load."""
+    gate = threading.Event()
+
+    @read_through("test-loop", 60, key=lambda item_id: item_id)
+    def load(item_id):
+        if threading.current_thread() is not threading.main_thread():
+            gate.wait(2)
+        return {"id": item_id}
+
+    leader = threading.Thread(target=load, args=("k",))
+    leader.start()
+    time.sleep(0.05)
+
+    async def on_loop():
+        start = time.monotonic()
+        value = load("k")
+        return value, time.monotonic() - start
+
+    value, elapsed = asyncio.run(on_loop())
+    gate.set()
+    leader.join()
+
+    assert value == {"id": "k"}
+    assert elapsed < 0.5
@@ -0,0 +1,223 @@
+"""
+Report cache tests.
+
+Tests for:
+- ReportCache.get: coalescing of concurrent misses, stale-while-revalidate
+- ReportCache.invalidate_tags: tagged reports are recomputed, and recomputes
+  overlapping the invalidation are not stored
+- cross-worker lock: released when a recompute ends, whatever the outcome
+- invalidations made while Redis is unreachable are replayed once it is back
+
+Redis is replaced by a small in-memory fake.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import app.core.report_cache as report_cache_module
+from app.core.report_cache import ReportCache
+
+
+class _FakeRedis:
+    """Just enough of the redis-py API for the report cache"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def eval(self, script, numkeys, key, token):
+        # Only the compare-and-delete lock release is used
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def expire(self, key, ttl):
+        pass
+
+    def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        return [key for key in list(self.data) if key.startswith(prefix)]
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(report_cache_module, "get_redis", lambda: redis)
+    return redis
+
+
+@pytest.mark.unit
+def test_concurrent_misses_compute_once(fake_redis):
+    """Requests arriving during a recompute share its result."""
+    cache = ReportCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"total": 42}
+
+    async def run():
+        return await asyncio.gather(*(cache.get("k", compute, ttl=60) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [{"total": 42}] * 5
+    assert len(calls) == 1
+    assert cache.stats["coalesced"] == 4
+
+
+@pytest.mark.unit
+def test_stale_entry_is_served_then_refreshed(fake_redis):
+    """A stale report is returned immediately and replaced in the background."""
+    cache = ReportCache()
+    fake_redis.data["report:k"] = json.dumps({"v": {"version": 1}, "t": time.time() - 90})
+
+    async def run():
+        served = await cache.get("k", lambda: {"version": 2}, ttl=60, stale_ttl=60)
+        await asyncio.gather(*cache._background)
+        return served
+
+    assert asyncio.run(run()) == {"version": 1}
+    assert json.loads(fake_redis.data["report:k"])["v"] == {"version": 2}
+    assert cache.stats["stale"] == 1
+
+
+@pytest.mark.unit
+def test_invalidate_tags_forces_recompute(fake_redis):
+    """Tagged reports are dropped and computed again on the next request."""
+    cache = ReportCache()
+    versions = iter(range(1, 10))
+
+    async def get():
+        return await cache.get("k", lambda: {"version": next(versions)}, ttl=60, tags=["session:1"])
+
+    assert asyncio.run(get()) == {"version": 1}
+    assert asyncio.run(get()) == {"version": 1}
+    cache.invalidate_tags("session:1")
+    assert asyncio.run(get()) == {"version": 2}
+
+
+@pytest.mark.unit
+def test_recompute_overlapping_invalidation_is_not_stored(fake_redis):
+    """A report computed from pre-invalidation data does not overwrite the invalidation."""
+    cache = ReportCache()
+
+    def compute():
+        cache.invalidate_tags("session:1")  # a write lands mid-compute
+        return {"version": "stale"}
+
+    async def get(fn):
+        return await cache.get("k", fn, ttl=60, tags=["session:1"])
+
+    assert asyncio.run(get(compute)) == {"version": "stale"}
+    assert "report:k" not in fake_redis.data
+    assert cache.stats["discarded"] == 1
+    assert asyncio.run(get(lambda: {"version": "fresh"})) == {"version": "fresh"}
+    assert json.loads(fake_redis.data["report:k"])["v"] == {"version": "fresh"}
+
+
+@pytest.mark.unit
+def test_lock_released_when_compute_fails_or_returns_none(fake_redis):
+    """Failed or empty recomputes do not block other workers for the lock TTL."""
+    cache = ReportCache()
+
+    def fail():
+        raise RuntimeError("db down")
+
+    async def get(fn):
+        return await cache.get("k", fn, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(get(fail))
+    assert "report:lock:k" not in fake_redis.data
+
+    assert asyncio.run(get(lambda: None)) is None
+    assert "report:lock:k" not in fake_redis.data
+
+    fake_redis.data["report:lock:k"] = "other-worker"
+    cache._unlock("k", "mine")
+    assert fake_redis.data["report:lock:k"] == "other-worker"
+
+
+@pytest.mark.unit
+def test_invalidation_during_redis_outage_is_replayed(fake_redis, monkeypatch):
+    """A write made while Redis is down does not leave a long-lived report stale."""
+    cache = ReportCache()
+    versions = iter(range(1, 10))
+
+    async def get():
+        return await cache.get("k", lambda: {"version": next(versions)}, ttl=3600, tags=["session:1"])
+
+    assert asyncio.run(get()) == {"version": 1}
+
+    monkeypatch.setattr(report_cache_module, "get_redis", lambda: None)
+    cache.invalidate_tags("session:1")  # event lost to the outage
+    assert cache.snapshot()["missed_invalidations"] == 1
+
+    monkeypatch.setattr(report_cache_module, "get_redis", lambda: fake_redis)
+    assert asyncio.run(get()) == {"version": 2}
+    assert cache.snapshot()["missed_invalidations"] == 0
+
+
+@pytest.mark.unit
+def test_too_many_missed_invalidations_drop_every_report(fake_redis, monkeypatch):
+    cache = ReportCache()
+    fake_redis.data["report:a"] = json.dumps({"v": 1, "t": time.time()})
+    fake_redis.data["report:b"] = json.dumps({"v": 2, "t": time.time()})
+    fake_redis.data["other:key"] = "kept"
+
+    monkeypatch.setattr(report_cache_module, "_MAX_MISSED_TAGS", 2)
+    monkeypatch.setattr(report_cache_module, "get_redis", lambda: None)
+    cache.invalidate_tags("t1", "t2", "t3")
+
+    monkeypatch.setattr(report_cache_module, "get_redis", lambda: fake_redis)
+    assert asyncio.run(cache.get("a", lambda: {"fresh": True}, ttl=60)) == {"fresh": True}
+    assert "report:b" not in fake_redis.data
+    assert fake_redis.data["other:key"] == "kept"
@@ -0,0 +1,41 @@
+"""
+Session summary materialization tests.
+
+Tests for:
+- resummarize_debounced: alert edits on a completed session re-materialize
+  its summary once per burst
+"""
+
+import time
+from uuid import uuid4
+
+import pytest
+
+from app.core import session_summary
+
+
+@pytest.mark.unit
+def test_alert_edits_resummarize_once(monkeypatch):
+    """Acknowledging many alerts recomputes the summary once, after the burst."""
+    finalized = []
+    monkeypatch.setattr(session_summary, "finalize_session", finalized.append)
+    sid, other = uuid4(), uuid4()
+
+    for _ in range(10):
+        session_summary.resummarize_debounced(sid, delay=0.05)
+    session_summary.resummarize_debounced(other, delay=0.05)
+    time.sleep(0.2)
+
+    assert sorted(finalized, key=str) == sorted([sid, other], key=str)
+
+
+@pytest.mark.unit
+def test_flush_resummarize_runs_pending(monkeypatch):
+    finalized = []
+    monkeypatch.setattr(session_summary, "finalize_session", finalized.append)
+    sid = uuid4()
+
+    session_summary.resummarize_debounced(sid, delay=60.0)
+    session_summary.flush_resummarize()
+
+    assert finalized == [sid]
@@ -0,0 +1,74 @@
+"""
+Token blacklist tests.
+
+Tests for:
+- BloomFilter: no false negatives, bounded false positives
+- token_id: jti-keyed ids, sha256 fallback for legacy tokens
+- TokenBlacklist.is_revoked: legacy tokens revoked before the jti rollout
+"""
+
+import hashlib
+
+import pytest
+from jose import jwt
+
+from app.core import token_blacklist as token_blacklist_module
+from app.core.token_blacklist import BloomFilter, TokenBlacklist, token_id
+
+
+class FakeRedis:
+    def __init__(self, keys):
+        self.keys = set(keys)
+
+    def exists(self, *keys):
+        return sum(key in self.keys for key in keys)
+
+
+@pytest.mark.unit
+def test_bloom_filter_has_no_false_negatives():
+    """Every added id is reported as (possibly) present."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    ids = [f"jti-{i}" for i in range(1000)]
+    for tid in ids:
+        bloom.add(tid)
+    assert all(tid in bloom for tid in ids)
+
+
+@pytest.mark.unit
+def test_bloom_filter_false_positive_rate_is_bounded():
+    """Unknown ids are almost always rejected at design capacity."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    for i in range(1000):
+        bloom.add(f"revoked-{i}")
+    false_positives = sum(f"valid-{i}" in bloom for i in range(10000))
+    assert false_positives < 50
+
+
+@pytest.mark.unit
+def test_token_id_prefers_jti():
+    """Tokens with a jti are keyed by it; legacy tokens by their sha256."""
+    with_jti = jwt.encode({"sub": "a", "jti": "abc123"}, "secret", algorithm="HS256")
+    legacy = jwt.encode({"sub": "a"}, "secret", algorithm="HS256")
+
+    assert token_id(with_jti) == "abc123"
+    assert token_id(legacy) == hashlib.sha256(legacy.encode()).hexdigest()
+    assert token_id(with_jti, {"jti": "from-claims"}) == "from-claims"
+
+
+@pytest.mark.unit
+def test_legacy_revocations_survive_bloom_filter(monkeypatch):
+    """A token revoked as `blacklist:<token>` stays revoked after the filter syncs."""
+    legacy = jwt.encode({"sub": "a"}, "secret", algorithm="HS256")
+    with_jti = jwt.encode({"sub": "a", "jti": "abc123"}, "secret", algorithm="HS256")
+    fake = FakeRedis({f"blacklist:{legacy}", "blacklist:abc123"})
+    monkeypatch.setattr(token_blacklist_module, "get_redis", lambda: fake)
+
+    blacklist = TokenBlacklist(capacity=100, error_rate=0.001, sync_interval=60)
+    blacklist._bloom = BloomFilter(100, 0.001)  # synced, but empty
+
+    assert blacklist.is_revoked(legacy)
+    assert not blacklist.is_revoked(with_jti)  # Bloom negative, Redis not asked
+    assert blacklist.redis_checks == 1
+
+    blacklist.add_local("abc123")
+    assert blacklist.is_revoked(with_jti)
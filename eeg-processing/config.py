@@ -28,6 +28,9 @@ HIGHCUT_FREQ = 40.0          # Low-pass cutoff (Hz) - removes muscle artifacts
 NOTCH_FREQ = 50.0            # Power line frequency (50 Hz Indonesia, 60 Hz USA)
 FILTER_ORDER = 4             # Butterworth filter order
 
+# DSP precision: "float32" halves memory traffic (LSL already delivers float32)
+DSP_DTYPE = "float64"
+
 # ===========================
 # FEATURE EXTRACTION
 # ===========================
@@ -57,6 +60,12 @@ FOCUS_THRESHOLD = 0.8        # Alpha/Beta ratio
 CHUNK_DURATION = 2.0         # Duration of each analysis window (seconds)
 UPDATE_INTERVAL = 1.0        # Time between updates (seconds)
 
+# Streaming scheduler (eeg/scheduler.py): one analysis every HOP_SECONDS of
+# samples over the last WINDOW_SECONDS (overlap = WINDOW - HOP)
+WINDOW_SECONDS = CHUNK_DURATION
+HOP_SECONDS = UPDATE_INTERVAL
+MAX_CATCHUP_HOPS = 2         # late hops still analyzed when overloaded; older ones are skipped
+
 # ===========================
 # DATA RECORDING
 # ===========================
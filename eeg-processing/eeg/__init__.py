@@ -12,12 +12,21 @@ from .acquisition import EEGAcquisition
 from .preprocessing import EEGPreprocessor
 from .features import EEGFeatureExtractor
 from .analysis import CognitiveAnalyzer
+from .synthetic import SyntheticEEGAcquisition, ReplayEEGAcquisition, create_acquisition
+from .batch import frame_windows, rescore_recording, rescore_file, rescore_files
 
 __all__ = [
     "EEGAcquisition",
     "EEGPreprocessor", 
     "EEGFeatureExtractor",
-    "CognitiveAnalyzer"
+    "CognitiveAnalyzer",
+    "SyntheticEEGAcquisition",
+    "ReplayEEGAcquisition",
+    "create_acquisition",
+    "frame_windows",
+    "rescore_recording",
+    "rescore_file",
+    "rescore_files"
 ]
 
 __version__ = "1.0.0"
@@ -7,10 +7,32 @@ Purpose : Acquire real-time EEG data for simulator-based cognitive analysis
 
 import time
 import numpy as np
-from pylsl import StreamInlet, resolve_streams
+from pylsl import StreamInfo, StreamInlet, resolve_streams
 from typing import List, Tuple, Optional
 
 
+def resolve_eeg_streams(stream_type: str = "EEG", timeout: float = 20) -> List[StreamInfo]:
+    """
+    Resolve every LSL stream of the given type on the network.
+
+    Parameters
+    ----------
+    stream_type : str
+        LSL stream type (default: 'EEG')
+    timeout : float
+        Time (seconds) to wait for streams
+
+    Returns
+    -------
+    List[StreamInfo]
+        Matching streams, sorted by source id (then name) so the order is
+        stable between runs
+    """
+    all_streams = resolve_streams(wait_time=timeout)
+    streams = [s for s in all_streams if s.type() == stream_type]
+    return sorted(streams, key=lambda s: (s.source_id(), s.name()))
+
+
 class EEGAcquisition:
     """
     EEG Acquisition handler using LSL streams.
@@ -20,7 +42,10 @@ class EEGAcquisition:
         self,
         stream_type: str = "EEG",
         timeout: int = 20,
-        max_chunklen: int = 12
+        max_chunklen: int = 12,
+        stream_info: Optional[StreamInfo] = None,
+        source_id: Optional[str] = None,
+        dtype=np.float64
     ):
         """
         Initialize EEG acquisition.
@@ -33,10 +58,21 @@ class EEGAcquisition:
             Time (seconds) to wait for LSL stream
         max_chunklen : int
             Maximum samples per chunk pulled from LSL
+        stream_info : StreamInfo or None
+            Already resolved stream to connect to (skips resolution,
+            see resolve_eeg_streams)
+        source_id : str or None
+            Connect to the stream with this LSL source id / name
+            instead of the first one found
+        dtype : np.float32 or np.float64
+            dtype of pulled data (LSL samples are float32 on the wire)
         """
         self.stream_type = stream_type
         self.timeout = timeout
         self.max_chunklen = max_chunklen
+        self.stream_info = stream_info
+        self.source_id = source_id
+        self.dtype = np.dtype(dtype)
 
         self.inlet: Optional[StreamInlet] = None
         self.channel_labels: List[str] = []
@@ -46,23 +82,28 @@ class EEGAcquisition:
         """
         Resolve and connect to EEG LSL stream.
         """
-        print("[INFO] Resolving LSL EEG stream...")
-        print(f"[DEBUG] Searching for {self.timeout} seconds...")
-        
-        # Use resolve_streams instead of resolve_byprop
-        all_streams = resolve_streams(wait_time=self.timeout)
-        print(f"[DEBUG] Found {len(all_streams)} total stream(s)")
-        
-        # Filter by stream type
-        streams = [s for s in all_streams if s.type() == self.stream_type]
-        print(f"[DEBUG] Found {len(streams)} EEG stream(s)")
+        if self.stream_info is not None:
+            stream = self.stream_info
+        else:
+            print("[INFO] Resolving LSL EEG stream...")
+            print(f"[DEBUG] Searching for {self.timeout} seconds...")
 
-        if not streams:
-            raise RuntimeError("No EEG LSL stream found. Is muselsl stream running?")
+            # Use resolve_streams instead of resolve_byprop
+            streams = resolve_eeg_streams(self.stream_type, self.timeout)
+            print(f"[DEBUG] Found {len(streams)} EEG stream(s)")
+
+            if self.source_id is not None:
+                streams = [s for s in streams if self.source_id in (s.source_id(), s.name())]
+                if not streams:
+                    raise RuntimeError(f"No EEG LSL stream with source id / name '{self.source_id}'")
+
+            if not streams:
+                raise RuntimeError("No EEG LSL stream found. Is muselsl stream running?")
+            stream = streams[0]
 
         print("[DEBUG] Creating StreamInlet...")
         self.inlet = StreamInlet(
-            streams[0],
+            stream,
             max_chunklen=self.max_chunklen,
             recover=True
         )
@@ -113,17 +154,40 @@ class EEGAcquisition:
             chunk, timestamps = self.inlet.pull_chunk(timeout=0.5)
 
             if timestamps:
-                data_buffer.append(chunk)
+                data_buffer.append(np.asarray(chunk, dtype=self.dtype))
                 ts_buffer.append(timestamps)
 
         if not data_buffer:
-            return np.empty((0, 0)), np.empty((0,))
+            return np.empty((0, 0), dtype=self.dtype), np.empty((0,))
 
-        data = np.vstack(data_buffer)
+        data = np.concatenate(data_buffer)
         timestamps = np.hstack(ts_buffer)
 
         return data, timestamps
 
+    def pull_available(self, max_samples: int, timeout: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pull up to `max_samples`, blocking at most `timeout` seconds.
+
+        Unlike pull_chunk() this returns as soon as `max_samples` have
+        arrived (liblsl waits inside the call, no polling); timeout=0.0
+        returns only what is already queued.
+
+        Returns
+        -------
+        data : np.ndarray
+            EEG data (samples, channels), possibly empty
+        timestamps : np.ndarray
+            Corresponding timestamps
+        """
+        if self.inlet is None:
+            raise RuntimeError("EEG stream not connected. Call connect() first.")
+
+        chunk, timestamps = self.inlet.pull_chunk(timeout=timeout, max_samples=max_samples)
+        if not timestamps:
+            return np.empty((0, 0), dtype=self.dtype), np.empty((0,))
+        return np.asarray(chunk, dtype=self.dtype), np.asarray(timestamps)
+
     def get_latest_sample(self) -> Tuple[np.ndarray, float]:
         """
         Pull a single EEG sample.
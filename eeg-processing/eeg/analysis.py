@@ -311,7 +311,7 @@ class CognitiveAnalyzer:
         
         return scores
 
-    def _select_state(self, scores: Dict[str, float]) -> tuple:
+    def _select_state(self, scores: Dict[str, float], now: Optional[float] = None) -> tuple:
         """
         Select final state using full hysteresis.
 
@@ -326,9 +326,13 @@ class CognitiveAnalyzer:
            threshold AND persist for _CANDIDATE_MIN_STREAK cycles before
            becoming the new current state.
 
+        `now` defaults to the wall clock; offline re-analysis passes the
+        window's recording time so hold timers follow the recording.
+
         Returns (state_name, confidence)
         """
-        now = time.time()
+        if now is None:
+            now = time.time()
         held_secs = now - self._state_entered_at
         hyst = self.HYSTERESIS
 
@@ -405,7 +409,8 @@ class CognitiveAnalyzer:
     def analyze(
         self,
         features: Dict[str, np.ndarray],
-        signal_quality: float = 1.0
+        signal_quality: float = 1.0,
+        now: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Analyze cognitive state from EEG features.
@@ -416,6 +421,9 @@ class CognitiveAnalyzer:
             Extracted EEG features from FeatureExtractor
         signal_quality : float
             Signal quality score (0-1) from preprocessor
+        now : float or None
+            Time of the window (seconds) for the hysteresis timers,
+            defaults to time.time()
             
         Returns
         -------
@@ -446,7 +454,7 @@ class CognitiveAnalyzer:
         scores = self._compute_state_scores(metrics, variability, stability)
         
         # Step 5: Select final state
-        state, confidence = self._select_state(scores)
+        state, confidence = self._select_state(scores, now=now)
         
         # Adjust confidence by signal quality
         confidence = confidence * signal_quality
@@ -467,3 +475,117 @@ class CognitiveAnalyzer:
                 "calibrated": self.calibrated
             }
         }
+
+    # =========================
+    # BATCH ANALYSIS (OFFLINE)
+    # =========================
+    def analyze_batch(
+        self,
+        features: Dict[str, np.ndarray],
+        signal_quality: np.ndarray,
+        times: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Analyze a whole recording worth of windows at once.
+
+        Gives the same states as calling analyze() once per window with
+        now=times[i]: normalization, temporal smoothing and variability are
+        computed over the arrays in one go, and only the hysteresis (which
+        depends on its own previous decisions) is replayed window by window.
+        Smoothing/hysteresis state carries over, so consecutive batches of
+        one recording continue where the previous one stopped.
+
+        Parameters
+        ----------
+        features : dict
+            Batched features from FeatureExtractor.extract, each (windows, channels)
+        signal_quality : np.ndarray
+            Signal quality per window (windows,)
+        times : np.ndarray
+            Time of each window in seconds (windows,)
+
+        Returns
+        -------
+        dict
+            Per-window arrays: state, confidence, theta_alpha, beta_alpha,
+            alpha_beta, variability, stability, quality and score_<state>.
+            Unusable windows (quality < 0.2) get state "unknown".
+        """
+        quality = np.asarray(signal_quality, dtype=float)
+        n = len(quality)
+        states = list(self.HYSTERESIS)
+        out: Dict[str, np.ndarray] = {
+            "state": np.full(n, "unknown", dtype=object),
+            "confidence": np.zeros(n),
+            "quality": quality,
+            "variability": np.zeros(n),
+            "stability": np.zeros(n),
+        }
+        for key in ("theta_alpha", "beta_alpha", "alpha_beta"):
+            out[key] = np.zeros(n)
+        for state in states:
+            out[f"score_{state}"] = np.zeros(n)
+
+        valid = np.flatnonzero(quality >= 0.2) if features else np.array([], dtype=int)
+        if valid.size == 0:
+            return out
+
+        # Step 1: Normalize by baseline (channel mean per window)
+        smoothed = {}
+        for key in ("theta_alpha", "beta_alpha", "alpha_beta"):
+            raw = np.mean(np.asarray(features[key])[valid], axis=-1)
+            baseline = self.baseline.get(key, 1.0)
+            if baseline > 0:
+                raw = raw / baseline
+            # Step 2: Trailing median over the last history_size valid windows
+            smoothed[key] = self._trailing(self._ratio_history[key], raw, np.median)
+            out[key][valid] = smoothed[key]
+
+        # Step 3: Variability of the smoothed β/α over the last 10 windows
+        # (0.0 until at least 3 values have been seen, as in the live path)
+        warmup = max(0, 2 - len(self._variability_history))
+        variability = self._trailing(self._variability_history, smoothed["beta_alpha"], np.std)
+        variability[:warmup] = 0.0
+        out["variability"][valid] = variability
+
+        # Step 4-5: Scores and hysteresis, in recording order
+        times = np.asarray(times, dtype=float)
+        for j, i in enumerate(valid):
+            metrics = {key: float(smoothed[key][j]) for key in smoothed}
+            stability = self._compute_stability()
+            scores = self._compute_state_scores(metrics, float(variability[j]), stability)
+            state, confidence = self._select_state(scores, now=float(times[i]))
+
+            out["state"][i] = state
+            out["confidence"][i] = confidence * quality[i]
+            out["stability"][i] = stability
+            for name in states:
+                out[f"score_{name}"][i] = scores[name]
+
+        return out
+
+    @staticmethod
+    def _trailing(history: deque, values: np.ndarray, reduce) -> np.ndarray:
+        """
+        Apply `reduce` over a trailing window of `history.maxlen` values.
+
+        Equivalent to appending each value to `history` and reducing the
+        deque, but full windows are reduced in one vectorized call. The
+        deque is left holding the last values, as after the live loop.
+        """
+        size = history.maxlen
+        seq = np.concatenate([np.asarray(history, dtype=float), values])
+        offset = len(history)
+        result = np.empty(len(values))
+
+        # Windows that are not full yet (start of a recording)
+        short = min(len(values), max(0, size - offset - 1))
+        for j in range(short):
+            result[j] = reduce(seq[:offset + j + 1])
+
+        if short < len(values):
+            windows = np.lib.stride_tricks.sliding_window_view(seq, size)
+            result[short:] = reduce(windows[offset + short + 1 - size:], axis=-1)
+
+        history.extend(values.tolist())
+        return result
@@ -0,0 +1,290 @@
+"""
+batch.py
+========
+Offline batch re-analysis of recorded EEG.
+
+Purpose:
+Re-score whole recordings (e.g. after tuning thresholds or hysteresis)
+without replaying them through the live loop window by window:
+
+- frame_windows()      : every analysis window at once, as a strided view
+- rescore_recording()  : preprocess -> features -> analysis over all windows,
+                         with batched filtering / PSD and a hysteresis replay
+- rescore_file()       : the same for a CSV / XDF recording on disk
+- rescore_files()      : fan several recordings out over a process pool
+
+Results match what server.py would have produced for the same windows:
+baseline from the first `calibration_time` seconds (windows with
+quality > 0.3), then one analysis per window, with hysteresis hold
+timers driven by the recording's own timestamps.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .preprocessing import EEGPreprocessor
+from .features import EEGFeatureExtractor
+from .analysis import CognitiveAnalyzer
+from .synthetic import load_recording
+
+
+# Windows per vectorized block - bounds peak memory on long recordings
+# (256 windows of 2 s @ 256 Hz x 5 ch is ~5 MB per intermediate array)
+BLOCK_WINDOWS = 256
+
+
+# =========================
+# FRAMING
+# =========================
+def frame_windows(
+    data: np.ndarray,
+    fs: float,
+    window: float = 2.0,
+    hop: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cut a recording into analysis windows without copying.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        EEG recording (samples, channels)
+    fs : float
+        Sampling rate (Hz)
+    window : float
+        Window length (seconds)
+    hop : float or None
+        Step between window starts (seconds), defaults to `window`
+        (back-to-back windows, like the live loop)
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        (Read-only windows (windows, samples, channels), start sample of each window)
+    """
+    n = int(round(window * fs))
+    step = max(1, int(round((hop if hop is not None else window) * fs)))
+    if n <= 0 or len(data) < n:
+        return np.empty((0, max(n, 0), data.shape[1])), np.empty((0,), dtype=int)
+
+    frames = np.lib.stride_tricks.sliding_window_view(data, n, axis=0)[::step]
+    starts = np.arange(len(frames)) * step
+    return frames.transpose(0, 2, 1), starts
+
+
+# =========================
+# RE-ANALYSIS
+# =========================
+def _make_analyzer(
+    thresholds: Optional[Dict[str, Dict[str, float]]],
+    hysteresis: Optional[Dict[str, Dict[str, float]]]
+) -> CognitiveAnalyzer:
+    """CognitiveAnalyzer with per-state threshold / hysteresis overrides."""
+    analyzer = CognitiveAnalyzer()
+    for attr, overrides in (("THRESHOLDS", thresholds), ("HYSTERESIS", hysteresis)):
+        if not overrides:
+            continue
+        table = {state: dict(values) for state, values in getattr(analyzer, attr).items()}
+        for state, values in overrides.items():
+            if state not in table:
+                raise ValueError(f"Unknown state '{state}' in {attr.lower()} override")
+            table[state].update(values)
+        # Instance attribute: the class defaults stay untouched
+        setattr(analyzer, attr, table)
+    return analyzer
+
+
+def rescore_recording(
+    data: np.ndarray,
+    fs: float,
+    timestamps: Optional[np.ndarray] = None,
+    window: float = 2.0,
+    hop: Optional[float] = None,
+    thresholds: Optional[Dict[str, Dict[str, float]]] = None,
+    hysteresis: Optional[Dict[str, Dict[str, float]]] = None,
+    calibrate: bool = True,
+    calibration_time: float = 10.0,
+    preprocessing: Optional[Dict[str, Any]] = None,
+    nperseg: int = 256
+) -> Dict[str, np.ndarray]:
+    """
+    Re-run the full analysis pipeline over a recording.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        EEG recording (samples, channels)
+    fs : float
+        Sampling rate (Hz)
+    timestamps : np.ndarray or None
+        Sample timestamps (seconds), defaults to sample index / fs
+    window, hop : float
+        Analysis window and hop (seconds), see frame_windows
+    thresholds, hysteresis : dict or None
+        Per-state overrides merged into CognitiveAnalyzer.THRESHOLDS / HYSTERESIS,
+        e.g. {"fatigue": {"theta_alpha_min": 1.6}}
+    calibrate : bool
+        Take the baseline from the first `calibration_time` seconds
+    calibration_time : float
+        Calibration duration (seconds)
+    preprocessing : dict or None
+        Keyword arguments for EEGPreprocessor (lowcut, highcut, notch_freq, ...)
+    nperseg : int
+        Welch segment length
+
+    Returns
+    -------
+    dict
+        Per-window arrays from CognitiveAnalyzer.analyze_batch, plus
+        "time" (window end timestamp) and "start" (first sample index)
+    """
+    frames, starts = frame_windows(data, fs, window, hop)
+    n = frames.shape[1]
+    if timestamps is None:
+        timestamps = np.arange(len(data)) / fs
+    times = np.asarray(timestamps, dtype=float)[starts + n - 1] if len(starts) else np.empty(0)
+
+    preprocessor = EEGPreprocessor(sampling_rate=fs, **(preprocessing or {}))
+    extractor = EEGFeatureExtractor(sampling_rate=fs, nperseg=min(nperseg, n) if n else nperseg)
+    analyzer = _make_analyzer(thresholds, hysteresis)
+
+    # Live hold timers start when the analyzer is created - here, the first window
+    if len(times):
+        analyzer._state_entered_at = float(times[0])
+
+    if calibrate and len(frames):
+        # Like the live calibration: back-to-back windows, whatever the hop
+        calib = frame_windows(data, fs, window)[0][:max(1, int(calibration_time / window))]
+        clean, quality = preprocessor.process_batch(np.ascontiguousarray(calib))
+        features = extractor.extract(clean)
+        with redirect_stdout(io.StringIO()):
+            analyzer.start_calibration()
+            for i in np.flatnonzero(quality > 0.3):
+                analyzer.add_calibration_sample({k: v[i] for k, v in features.items()})
+
+    blocks = []
+    for lo in range(0, len(frames), BLOCK_WINDOWS):
+        block = np.ascontiguousarray(frames[lo:lo + BLOCK_WINDOWS])
+        clean, quality = preprocessor.process_batch(block)
+        features = extractor.extract(clean)
+        blocks.append(analyzer.analyze_batch(features, quality, times[lo:lo + BLOCK_WINDOWS]))
+
+    if blocks:
+        result = {key: np.concatenate([b[key] for b in blocks]) for key in blocks[0]}
+    else:
+        result = analyzer.analyze_batch({}, np.empty(0), np.empty(0))
+    result["time"] = times
+    result["start"] = starts
+    result["calibrated"] = np.array(analyzer.calibrated)
+    return result
+
+
+def summarize(result: Dict[str, np.ndarray], window: float = 2.0) -> Dict[str, Any]:
+    """
+    Summary of a rescored recording.
+
+    Parameters
+    ----------
+    result : dict
+        Output of rescore_recording
+    window : float
+        Analysis window (seconds); windows overlap when the hop is shorter,
+        so the duration is taken from the window end times
+
+    Returns
+    -------
+    dict
+        windows, analyzed duration, calibrated, state counts / fraction of
+        windows, number of state transitions and mean confidence per state
+    """
+    states = result["state"]
+    total = len(states)
+    times = np.asarray(result["time"], dtype=float)
+    duration = float(times[-1] - times[0]) + window if len(times) else 0.0
+    names, counts = np.unique(states.astype(str), return_counts=True) if total else ([], [])
+
+    known = states[states != "unknown"]
+    transitions = int(np.count_nonzero(known[1:] != known[:-1])) if len(known) > 1 else 0
+
+    return {
+        "windows": total,
+        "duration_s": round(duration, 1),
+        "calibrated": bool(result.get("calibrated", False)),
+        "states": {str(s): int(c) for s, c in zip(names, counts)},
+        "fractions": {str(s): round(c / total, 3) for s, c in zip(names, counts)},
+        "transitions": transitions,
+        "mean_confidence": {
+            str(s): round(float(np.mean(result["confidence"][states == s])), 3)
+            for s in names
+        },
+    }
+
+
+def rescore_file(path: str, sampling_rate: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Rescore one recording file.
+
+    Parameters
+    ----------
+    path : str
+        Recording (.csv or .xdf)
+    sampling_rate : float or None
+        Override the rate inferred from the file
+    **kwargs
+        Passed to rescore_recording
+
+    Returns
+    -------
+    dict
+        {"path", "fs", "channels", "result" (per-window arrays), "summary"}
+    """
+    data, timestamps, labels, fs = load_recording(path, sampling_rate)
+    result = rescore_recording(data, fs, timestamps, **kwargs)
+    return {
+        "path": path,
+        "fs": fs,
+        "channels": labels,
+        "result": result,
+        "summary": summarize(result, kwargs.get("window", 2.0)),
+    }
+
+
+def _rescore_job(job: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    path, kwargs = job
+    return rescore_file(path, **kwargs)
+
+
+def rescore_files(
+    paths: Sequence[str],
+    workers: Optional[int] = None,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Rescore several recordings, one process per file.
+
+    Parameters
+    ----------
+    paths : list of str
+        Recording files
+    workers : int or None
+        Worker processes (default: CPU count, 1 = run in this process)
+    **kwargs
+        Passed to rescore_file
+
+    Returns
+    -------
+    list of dict
+        rescore_file results, in the order of `paths`
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(path, kwargs) for path in paths]
+    if workers <= 1 or len(jobs) <= 1:
+        return [_rescore_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(_rescore_job, jobs))
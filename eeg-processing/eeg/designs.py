@@ -0,0 +1,170 @@
+"""
+designs.py
+==========
+Shared, memoized DSP designs for the EEG pipeline.
+
+Purpose:
+Filter coefficients, Welch windows and band -> frequency-bin maps only
+depend on a handful of parameters (sampling rate, band edges, order, Q,
+segment length). They are designed once per process and shared by every
+EEGPreprocessor / EEGFeatureExtractor, so creating processors for many
+headsets (server.py --multi) or many recordings (eeg.batch) costs nothing
+after the first one.
+
+Every design takes a `dtype` ("float64" or "float32") so a float32
+pipeline filters and integrates in float32 instead of being promoted back
+to float64 by float64 coefficients.
+
+Returned arrays are shared between instances and must not be modified.
+Windows and frequency maps are flagged read-only; SOS arrays cannot be
+(scipy's sosfilt needs a writable coefficient buffer).
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.signal import butter, get_window, iirnotch, sosfilt_zi, tf2sos
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+# =========================
+# FILTERS
+# =========================
+@lru_cache(maxsize=None)
+def bandpass_sos(
+    fs: float,
+    lowcut: float,
+    highcut: float,
+    order: int = 4,
+    dtype: str = "float64"
+) -> np.ndarray:
+    """
+    Butterworth bandpass as second-order sections.
+
+    Parameters
+    ----------
+    fs : float
+        Sampling rate (Hz)
+    lowcut, highcut : float
+        Band edges (Hz)
+    order : int
+        Filter order
+    dtype : str
+        Coefficient dtype (designed in float64, then cast)
+
+    Returns
+    -------
+    np.ndarray
+        SOS coefficients (sections, 6)
+    """
+    nyq = 0.5 * fs
+    sos = butter(order, [lowcut / nyq, highcut / nyq], btype="bandpass", output="sos")
+    return sos.astype(dtype)
+
+
+@lru_cache(maxsize=None)
+def notch_sos(fs: float, freq: float, Q: float = 30.0, dtype: str = "float64") -> np.ndarray:
+    """
+    IIR notch (power line) as a single second-order section.
+
+    Returns
+    -------
+    np.ndarray
+        SOS coefficients (1, 6)
+    """
+    b, a = iirnotch(freq / (0.5 * fs), Q=Q)
+    return tf2sos(b, a).astype(dtype)
+
+
+@lru_cache(maxsize=None)
+def bandpass_zi(
+    fs: float,
+    lowcut: float,
+    highcut: float,
+    order: int = 4,
+    dtype: str = "float64"
+) -> np.ndarray:
+    """Steady-state initial conditions of bandpass_sos (what sosfiltfilt computes per call)."""
+    return sosfilt_zi(bandpass_sos(fs, lowcut, highcut, order, dtype))
+
+
+@lru_cache(maxsize=None)
+def notch_zi(fs: float, freq: float, Q: float = 30.0, dtype: str = "float64") -> np.ndarray:
+    """Steady-state initial conditions of notch_sos."""
+    return sosfilt_zi(notch_sos(fs, freq, Q, dtype))
+
+
+def filtfilt_padlen(sos: np.ndarray) -> int:
+    """Default odd-padding length sosfiltfilt uses for `sos`."""
+    ntaps = 2 * len(sos) + 1
+    ntaps -= min(int((sos[:, 2] == 0).sum()), int((sos[:, 5] == 0).sum()))
+    return 3 * ntaps
+
+
+# =========================
+# SPECTRAL ANALYSIS
+# =========================
+@lru_cache(maxsize=None)
+def welch_window(nperseg: int, window: str = "hann", dtype: str = "float64") -> np.ndarray:
+    """
+    Welch segment window (what scipy.signal.welch builds on every call).
+
+    Returns
+    -------
+    np.ndarray
+        Window of length `nperseg`, read-only
+    """
+    return _frozen(get_window(window, nperseg).astype(dtype))
+
+
+@lru_cache(maxsize=None)
+def band_bins(
+    fs: float,
+    nperseg: int,
+    bands: Tuple[Tuple[str, float, float], ...],
+    dtype: str = "float64"
+) -> Tuple[np.ndarray, Dict[str, slice]]:
+    """
+    Frequency bins of a one-sided Welch PSD and the bin range of each band.
+
+    Parameters
+    ----------
+    fs : float
+        Sampling rate (Hz)
+    nperseg : int
+        Welch segment length
+    bands : tuple
+        ((name, low Hz, high Hz), ...) - hashable form of a band dict,
+        see band_key()
+    dtype : str
+        dtype of the returned frequencies
+
+    Returns
+    -------
+    Tuple[np.ndarray, Dict[str, slice]]
+        (PSD frequencies (read-only), {band: slice of bins with low <= f <= high})
+    """
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+    slices = {}
+    for name, low, high in bands:
+        idx = np.flatnonzero((freqs >= low) & (freqs <= high))
+        slices[name] = slice(int(idx[0]), int(idx[-1]) + 1) if idx.size else slice(0, 0)
+    return _frozen(freqs.astype(dtype)), slices
+
+
+def band_key(bands: Dict[str, Tuple[float, float]]) -> Tuple[Tuple[str, float, float], ...]:
+    """Hashable cache key for a {band: (low, high)} dict."""
+    return tuple((name, float(low), float(high)) for name, (low, high) in bands.items())
+
+
+def cache_info() -> Dict[str, Optional[object]]:
+    """lru_cache statistics per design (hits / misses / size)."""
+    return {
+        fn.__name__: fn.cache_info()
+        for fn in (bandpass_sos, notch_sos, bandpass_zi, notch_zi, welch_window, band_bins)
+    }
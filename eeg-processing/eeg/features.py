@@ -10,7 +10,9 @@ for cognitive state analysis (fatigue, stress, focus).
 
 import numpy as np
 from scipy.signal import welch
-from typing import Dict, Tuple
+from typing import Dict
+
+from .designs import band_bins, band_key, welch_window
 
 
 class EEGFeatureExtractor:
@@ -21,7 +23,8 @@ class EEGFeatureExtractor:
     def __init__(
         self,
         sampling_rate: float,
-        nperseg: int = 256
+        nperseg: int = 256,
+        dtype=np.float64
     ):
         """
         Initialize feature extractor.
@@ -32,9 +35,12 @@ class EEGFeatureExtractor:
             EEG sampling rate (Hz)
         nperseg : int
             Segment length for Welch PSD
+        dtype : np.float32 or np.float64
+            PSD / band power precision (match the EEGPreprocessor dtype)
         """
         self.fs = sampling_rate
         self.nperseg = nperseg
+        self.dtype = np.dtype(dtype)
 
         # Frequency bands (Hz)
         self.bands = {
@@ -52,14 +58,14 @@ class EEGFeatureExtractor:
         self,
         freqs: np.ndarray,
         psd: np.ndarray,
-        band: Tuple[float, float]
-    ) -> float:
+        bins: slice
+    ) -> np.ndarray:
         """
-        Compute band power using PSD integration.
+        Compute band power using PSD integration (over the last axis).
+
+        `bins` is the band's frequency-bin range from eeg.designs.band_bins.
         """
-        low, high = band
-        idx = np.logical_and(freqs >= low, freqs <= high)
-        return np.trapz(psd[idx], freqs[idx])
+        return np.trapz(psd[..., bins], freqs[bins])
 
     def compute_band_powers(self, data: np.ndarray) -> Dict[str, np.ndarray]:
         """
@@ -68,29 +74,38 @@ class EEGFeatureExtractor:
         Parameters
         ----------
         data : np.ndarray
-            Clean EEG data (samples, channels)
+            Clean EEG data (samples, channels), or a stack of windows
+            (windows, samples, channels) for a batched PSD
 
         Returns
         -------
         Dict[str, np.ndarray]
-            Band powers per channel
+            Band powers per channel, shaped (channels,) or (windows, channels)
         """
         band_powers = {band: [] for band in self.bands}
-
-        for ch in range(data.shape[1]):
-            freqs, psd = welch(
-                data[:, ch],
+        data = np.asarray(data, dtype=self.dtype)
+
+        # Same as welch(nperseg=...) - short windows use one full-length segment
+        nperseg = min(self.nperseg, data.shape[-2])
+        window = welch_window(nperseg, "hann", self.dtype.name)
+        freqs, bins = band_bins(float(self.fs), nperseg, band_key(self.bands), self.dtype.name)
+
+        # Per channel keeps peak memory at one channel's segments; for a
+        # stack of windows each call is one Welch PSD over all windows
+        for ch in range(data.shape[-1]):
+            _, psd = welch(
+                data[..., ch],
                 fs=self.fs,
-                nperseg=self.nperseg
+                window=window,
+                nperseg=nperseg
             )
 
-            for band, freq_range in self.bands.items():
-                power = self._band_power(freqs, psd, freq_range)
-                band_powers[band].append(power)
+            for band in self.bands:
+                band_powers[band].append(self._band_power(freqs, psd, bins[band]))
 
-        # Convert to numpy arrays
+        # Stack channels last: (channels,) or (windows, channels)
         for band in band_powers:
-            band_powers[band] = np.array(band_powers[band])
+            band_powers[band] = np.stack(band_powers[band], axis=-1)
 
         return band_powers
 
@@ -129,12 +144,12 @@ class EEGFeatureExtractor:
         Parameters
         ----------
         data : np.ndarray
-            Clean EEG data (samples, channels)
+            Clean EEG data (samples, channels) or (windows, samples, channels)
 
         Returns
         -------
         Dict[str, np.ndarray]
-            EEG features
+            EEG features, per channel (and per window for batched input)
         """
         if data.size == 0:
             return {}
@@ -0,0 +1,340 @@
+"""
+kernels.py
+==========
+Optional Numba-compiled kernels for the EEGPreprocessor hot paths.
+
+Purpose:
+The driving-mode cleanup (robust stats -> soft clipping -> median
+smoothing -> robust baseline / normalization) and the signal quality
+score are several NumPy passes over the window, each allocating a full
+temporary. With Numba installed these are fused into one pass per
+channel, which matters on the low-end laptops drivers actually use.
+
+Kernels never allocate: scratch space is passed in by the caller
+(EEGPreprocessor keeps it per instance), so steady-state processing of a
+window with `out=` performs no new allocations. They work for float32
+and float64 alike (compiled once per dtype).
+
+Numba is optional (pip install numba). Without it HAS_NUMBA is False and
+EEGPreprocessor keeps using its NumPy implementation - the reference the
+kernels are tested against (tests/test_kernels.py).
+
+All kernels take a stack of windows (windows, samples, channels).
+"""
+
+import numpy as np
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
+
+
+def _jit(fn):
+    """numba.njit when available; the plain function otherwise (tests only)."""
+    if HAS_NUMBA:
+        return numba.njit(cache=True, nogil=True)(fn)
+    return fn
+
+
+# MAD -> standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+
+# =========================
+# HELPERS
+# =========================
+@_jit
+def _median3(a, b, c):
+    return max(min(a, b), min(max(a, b), c))
+
+
+@_jit
+def _select(a, n, k):
+    """Partially sort a[:n] in place so that a[k] is the k-th smallest (quickselect)."""
+    lo, hi = 0, n - 1
+    while hi > lo:
+        pivot = _median3(a[lo], a[(lo + hi) // 2], a[hi])
+        i, j = lo, hi
+        while i <= j:
+            while a[i] < pivot:
+                i += 1
+            while a[j] > pivot:
+                j -= 1
+            if i <= j:
+                a[i], a[j] = a[j], a[i]
+                i += 1
+                j -= 1
+        if k <= j:
+            hi = j
+        elif k >= i:
+            lo = i
+        else:
+            break
+
+
+@_jit
+def _median(values, n, scratch):
+    """Median of values[:n] (same as np.median), using scratch[:n] as work space."""
+    for i in range(n):
+        scratch[i] = values[i]
+    k = n // 2
+    _select(scratch, n, k)
+    upper = scratch[k]
+    if n % 2:
+        return upper
+    lower = scratch[0]
+    for i in range(1, k):
+        lower = max(lower, scratch[i])
+    return (lower + upper) / 2
+
+
+@_jit
+def _sosfilt(sos, state, buf, m, reverse):
+    """scipy.signal.sosfilt over buf[:m] in place (backwards if reverse)."""
+    n_sections = sos.shape[0]
+    for step in range(m):
+        i = m - 1 - step if reverse else step
+        x_cur = buf[i]
+        for s in range(n_sections):
+            x_new = sos[s, 0] * x_cur + state[s, 0]
+            state[s, 0] = sos[s, 1] * x_cur - sos[s, 4] * x_new + state[s, 1]
+            state[s, 1] = sos[s, 2] * x_cur - sos[s, 5] * x_new
+            x_cur = x_new
+        buf[i] = x_cur
+
+
+# =========================
+# FILTERING
+# =========================
+@_jit
+def sosfiltfilt(sos, zi, data, edge, out, ext, state):
+    """
+    scipy.signal.sosfiltfilt (odd padding) along the samples axis.
+
+    Parameters
+    ----------
+    sos : np.ndarray
+        Second-order sections (sections, 6)
+    zi : np.ndarray
+        sosfilt_zi(sos), (sections, 2)
+    data : np.ndarray
+        EEG (windows, samples, channels); samples must be > edge
+    edge : int
+        Padding length (3 * effective taps, as scipy computes it)
+    out : np.ndarray
+        Output, same shape as `data` (may be `data` itself)
+    ext : np.ndarray
+        Scratch, at least samples + 2 * edge long
+    state : np.ndarray
+        Scratch, at least (sections, 2)
+
+    Returns
+    -------
+    np.ndarray
+        `out`
+    """
+    n_windows, n, n_channels = data.shape
+    n_sections = sos.shape[0]
+    m = n + 2 * edge
+
+    for w in range(n_windows):
+        for ch in range(n_channels):
+            first = data[w, 0, ch]
+            last = data[w, n - 1, ch]
+            # Odd extension: 2 * x[0] - x[edge:0:-1], x, 2 * x[-1] - x[-2:-edge-2:-1]
+            for i in range(edge):
+                ext[i] = (first + first) - data[w, edge - i, ch]
+                ext[edge + n + i] = (last + last) - data[w, n - 2 - i, ch]
+            for i in range(n):
+                ext[edge + i] = data[w, i, ch]
+
+            # Forward pass, then backward pass, each from the steady state
+            for s in range(n_sections):
+                state[s, 0] = zi[s, 0] * ext[0]
+                state[s, 1] = zi[s, 1] * ext[0]
+            _sosfilt(sos, state, ext, m, False)
+
+            for s in range(n_sections):
+                state[s, 0] = zi[s, 0] * ext[m - 1]
+                state[s, 1] = zi[s, 1] * ext[m - 1]
+            _sosfilt(sos, state, ext, m, True)
+
+            for i in range(n):
+                out[w, i, ch] = ext[edge + i]
+
+    return out
+
+
+# =========================
+# DRIVING-MODE CLEANUP
+# =========================
+@_jit
+def clean_driving(data, threshold_factor, window_size, out, work):
+    """
+    Fused attenuate_artifacts -> smooth_temporal -> robust_baseline_correction
+    -> robust_normalize, per window and channel.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Filtered EEG (windows, samples, channels)
+    threshold_factor : float
+        Soft-clipping threshold in (scaled) MADs
+    window_size : int
+        Moving median length (odd), zero-padded at the edges
+    out : np.ndarray
+        Output array, same shape as `data`
+    work : np.ndarray
+        Scratch, at least (4, max(samples, window_size))
+
+    Returns
+    -------
+    np.ndarray
+        `out`
+    """
+    n_windows, n, n_channels = data.shape
+    x = work[0]
+    y = work[1]
+    scratch = work[2]
+    neighbourhood = work[3]
+    half = window_size // 2
+
+    for w in range(n_windows):
+        for ch in range(n_channels):
+            for i in range(n):
+                x[i] = data[w, i, ch]
+
+            # --- Soft clipping around median +- k * MAD ---
+            median = _median(x, n, scratch)
+            for i in range(n):
+                y[i] = abs(x[i] - median)
+            mad = _median(y, n, scratch)
+            if mad > 0:
+                threshold = threshold_factor * mad * MAD_SCALE
+                upper = median + threshold
+                lower = median - threshold
+                for i in range(n):
+                    if x[i] > upper:
+                        x[i] = upper + np.tanh((x[i] - upper) / threshold) * threshold * 0.5
+                    elif x[i] < lower:
+                        x[i] = lower - np.tanh((lower - x[i]) / threshold) * threshold * 0.5
+
+            # --- Moving median (zero padding) ---
+            if window_size == 3:
+                for i in range(n):
+                    prev = x[i - 1] if i > 0 else 0.0
+                    nxt = x[i + 1] if i < n - 1 else 0.0
+                    y[i] = _median3(prev, x[i], nxt)
+            else:
+                for i in range(n):
+                    for k in range(window_size):
+                        j = i + k - half
+                        neighbourhood[k] = x[j] if 0 <= j < n else 0.0
+                    y[i] = _median(neighbourhood, window_size, scratch)
+
+            # --- Robust baseline correction ---
+            median = _median(y, n, scratch)
+            for i in range(n):
+                y[i] = y[i] - median
+
+            # --- Robust normalization (median / MAD) ---
+            median = _median(y, n, scratch)
+            for i in range(n):
+                x[i] = abs(y[i] - median)
+            mad = _median(x, n, scratch)
+            if mad == 0:
+                mad = 1.0
+            scale = mad * MAD_SCALE
+            for i in range(n):
+                out[w, i, ch] = (y[i] - median) / scale
+
+    return out
+
+
+# =========================
+# SIGNAL QUALITY
+# =========================
+@_jit
+def signal_quality(data, out, work, channel_work):
+    """
+    EEGPreprocessor._signal_quality in one pass per channel.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Raw EEG (windows, samples, channels)
+    out : np.ndarray
+        Quality per window (windows,)
+    work : np.ndarray
+        Scratch, at least (3, samples)
+    channel_work : np.ndarray
+        Scratch, at least (3, channels)
+
+    Returns
+    -------
+    np.ndarray
+        `out`, each value in [0, 1]
+    """
+    n_windows, n, n_channels = data.shape
+    x = work[0]
+    dev = work[1]
+    scratch = work[2]
+    stds = channel_work[0]
+    std_scratch = channel_work[1]
+    artifact = channel_work[2]
+
+    for w in range(n_windows):
+        flat = 0
+        diff_sum = 0.0
+
+        for ch in range(n_channels):
+            for i in range(n):
+                x[i] = data[w, i, ch]
+
+            # Check 1 input: per-channel std
+            mean = 0.0
+            for i in range(n):
+                mean += x[i]
+            mean /= n
+            var = 0.0
+            for i in range(n):
+                var += (x[i] - mean) ** 2
+            stds[ch] = np.sqrt(var / n)
+            if stds[ch] < 0.1:
+                flat += 1
+
+            # Check 2 input: sample-to-sample differences
+            for i in range(1, n):
+                diff_sum += abs(x[i] - x[i - 1])
+
+            # Check 3 input: outliers beyond 4 scaled MADs
+            median = _median(x, n, scratch)
+            for i in range(n):
+                dev[i] = abs(x[i] - median)
+            mad = _median(dev, n, scratch)
+            outliers = 0
+            if mad > 0:
+                limit = 4 * mad * MAD_SCALE
+                for i in range(n):
+                    if dev[i] > limit:
+                        outliers += 1
+            artifact[ch] = outliers / n
+
+        quality = 1.0
+        quality -= flat / n_channels * 0.3
+
+        noise_level = diff_sum / ((n - 1) * n_channels)
+        expected_noise = _median(stds, n_channels, std_scratch) * 0.5
+        if expected_noise > 0:
+            noise_ratio = min(noise_level / expected_noise, 2.0) - 1.0
+            quality -= max(0.0, noise_ratio) * 0.2
+
+        for ch in range(n_channels):
+            quality -= artifact[ch] * 0.1
+
+        out[w] = min(max(quality, 0.0), 1.0)
+
+    return out
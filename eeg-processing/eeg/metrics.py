@@ -0,0 +1,156 @@
+"""
+metrics.py
+==========
+Lightweight per-stage timing for the streaming pipeline.
+
+Purpose:
+When a driver reports lag we need to know whether acquisition,
+filtering, PSD, analysis or the HTTP send is the bottleneck.
+
+- StageTimer     : monotonic timers per stage with rolling percentiles
+- serve_metrics(): optional local JSON endpoint (GET /metrics)
+- dump_metrics() : atomic JSON snapshot for periodic dumps
+
+Timers cost two perf_counter() calls and a deque append per stage, so
+they stay on in the hot path.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Iterator
+
+import numpy as np
+
+# Percentiles reported by StageTimer.summary()
+PERCENTILES = (50, 90, 99)
+
+
+class StageTimer:
+    """
+    Rolling timing statistics per pipeline stage.
+
+    Thread-safe: in multi-headset mode DSP and sends for one stream run
+    on different pool threads.
+    """
+
+    def __init__(self, window: int = 600):
+        """
+        Parameters
+        ----------
+        window : int
+            Samples kept per stage for the percentiles (600 chunks is
+            ~20 minutes at one chunk per 2 s)
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._last: Dict[str, float] = {}
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the body of a `with` block as `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one measurement (seconds) for `stage`."""
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+            self._samples[stage].append(seconds)
+            self._counts[stage] += 1
+            self._last[stage] = seconds
+
+    def last(self) -> Dict[str, float]:
+        """Most recent duration per stage (ms)."""
+        with self._lock:
+            return {stage: round(seconds * 1000.0, 3) for stage, seconds in self._last.items()}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Rolling statistics per stage (ms).
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            {stage: {"count", "last", "mean", "p50", "p90", "p99", "max"}}
+        """
+        with self._lock:
+            snapshot = {stage: np.array(samples) for stage, samples in self._samples.items()}
+            counts = dict(self._counts)
+            last = dict(self._last)
+
+        summary = {}
+        for stage, samples in snapshot.items():
+            ms = samples * 1000.0
+            stats = {"count": counts[stage], "last": last[stage] * 1000.0, "mean": float(ms.mean())}
+            for q, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                stats[f"p{q}"] = float(value)
+            stats["max"] = float(ms.max())
+            summary[stage] = {key: round(value, 3) for key, value in stats.items()}
+        return summary
+
+    def format(self) -> str:
+        """One log line: 'stage p50/p99 ms' per stage."""
+        return " | ".join(
+            f"{stage} {stats['p50']:.1f}/{stats['p99']:.1f}ms"
+            for stage, stats in self.summary().items()
+        )
+
+
+# =========================
+# EXPORT
+# =========================
+def serve_metrics(
+    port: int,
+    collect: Callable[[], dict],
+    host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """
+    Serve `collect()` as JSON on http://host:port/metrics (daemon thread).
+
+    Bound to localhost by default: the endpoint is for the machine
+    running the headset, not the network.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        Running server (call .shutdown() to stop)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = json.dumps(collect()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep the server log for the pipeline
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="eeg-metrics", daemon=True).start()
+    return server
+
+
+def dump_metrics(path: str, data: dict) -> None:
+    """Write `data` as JSON to `path` atomically (readers never see half a file)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
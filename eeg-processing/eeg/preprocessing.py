@@ -15,11 +15,20 @@ Key Design Choices for Driving:
 - No aggressive data rejection (dangerous for safety-critical application)
 """
 
+import math
+import threading
+
 import numpy as np
-from scipy.signal import butter, filtfilt, iirnotch, medfilt
-from scipy.ndimage import uniform_filter1d
+from scipy.signal import sosfiltfilt
+from scipy.ndimage import median_filter, uniform_filter1d
 from typing import Optional, Tuple, Dict
 
+from . import kernels
+from .designs import bandpass_sos, bandpass_zi, filtfilt_padlen, notch_sos, notch_zi
+
+BACKENDS = ("auto", "numpy", "numba")
+DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
 
 class EEGPreprocessor:
     """
@@ -29,6 +38,15 @@ class EEGPreprocessor:
     - Uses artifact attenuation instead of rejection
     - Maintains data continuity for safety-critical monitoring
     - Robust to motion artifacts from driving
+
+    All steps work on the last two axes (samples, channels), so a stack of
+    windows (windows, samples, channels) is processed in one call with the
+    same per-window result (see process_batch).
+
+    With dtype=np.float32 the whole pipeline stays in float32 (LSL already
+    delivers float32). The Numba backend keeps its scratch space per
+    instance and thread, so process(data, out=...) on windows of a fixed
+    shape performs no new allocations after the first call.
     """
 
     def __init__(
@@ -38,7 +56,9 @@ class EEGPreprocessor:
         highcut: float = 30.0,  # Reduced from 40Hz - less muscle artifact
         notch_freq: Optional[float] = 50.0,
         filter_order: int = 4,
-        driving_mode: bool = True  # Enable driving-specific preprocessing
+        driving_mode: bool = True,  # Enable driving-specific preprocessing
+        backend: str = "auto",
+        dtype=np.float64
     ):
         """
         Initialize EEG preprocessor for driver monitoring.
@@ -57,6 +77,12 @@ class EEGPreprocessor:
             Order of Butterworth filter
         driving_mode : bool
             Enable driving-optimized preprocessing (artifact attenuation)
+        backend : str
+            "numba" runs signal quality and the driving-mode cleanup as
+            fused JIT kernels (eeg.kernels), "numpy" the reference
+            implementation below, "auto" Numba when installed
+        dtype : np.float32 or np.float64
+            Working / output precision (filters are cast to it)
         """
         self.fs = sampling_rate
         self.lowcut = lowcut
@@ -64,37 +90,76 @@ class EEGPreprocessor:
         self.notch_freq = notch_freq
         self.filter_order = filter_order
         self.driving_mode = driving_mode
+        self.backend = self._resolve_backend(backend)
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{self.dtype}' (expected float32 or float64)")
         
         # Adaptive baseline tracking
         self._baseline_buffer: list = []
         self._baseline_window = 30  # 30 windows (~60 seconds)
 
-        self._bandpass_b, self._bandpass_a = self._design_bandpass()
-        self._notch_b, self._notch_a = self._design_notch()
+        self._bandpass_sos = self._design_bandpass()
+        self._notch_sos = self._design_notch()
+
+        # Numba backend scratch space, grown on demand. Thread-local because
+        # server.SharedDSP shares one preprocessor between headset threads.
+        self._workspace = threading.local()
+
+    @staticmethod
+    def _resolve_backend(backend: str) -> str:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+        if backend == "auto":
+            return "numba" if kernels.HAS_NUMBA else "numpy"
+        if backend == "numba" and not kernels.HAS_NUMBA:
+            raise ImportError("backend='numba' requires numba: pip install numba")
+        return backend
 
     # =========================
     # FILTER DESIGN
     # =========================
-    def _design_bandpass(self) -> Tuple[np.ndarray, np.ndarray]:
-        nyq = 0.5 * self.fs
-        low = self.lowcut / nyq
-        high = self.highcut / nyq
-
-        b, a = butter(
-            self.filter_order,
-            [low, high],
-            btype="bandpass"
-        )
-        return b, a
+    # Designs are memoized in eeg.designs and shared by every instance
+    # with the same (fs, band, order, Q, dtype).
+    def _design_bandpass(self) -> np.ndarray:
+        return bandpass_sos(float(self.fs), float(self.lowcut), float(self.highcut),
+                            self.filter_order, self.dtype.name)
 
-    def _design_notch(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    def _design_notch(self) -> Optional[np.ndarray]:
         if self.notch_freq is None:
-            return None, None
+            return None
+        return notch_sos(float(self.fs), float(self.notch_freq), 30.0, self.dtype.name)
 
-        nyq = 0.5 * self.fs
-        freq = self.notch_freq / nyq
-        b, a = iirnotch(freq, Q=30)
-        return b, a
+    def _filter_states(self) -> list:
+        """(sos, zi, padlen) per filter stage, for kernels.sosfiltfilt."""
+        stages = [(
+            self._bandpass_sos,
+            bandpass_zi(float(self.fs), float(self.lowcut), float(self.highcut),
+                        self.filter_order, self.dtype.name),
+            filtfilt_padlen(self._bandpass_sos),
+        )]
+        if self._notch_sos is not None:
+            stages.append((
+                self._notch_sos,
+                notch_zi(float(self.fs), float(self.notch_freq), 30.0, self.dtype.name),
+                filtfilt_padlen(self._notch_sos),
+            ))
+        return stages
+
+    def _buffer(self, name: str, shape: tuple, dtype=None) -> np.ndarray:
+        """
+        Scratch array `name` of the given shape from this thread's workspace.
+
+        Reallocated (with some headroom) only when a larger one is needed,
+        so fixed-size windows reuse the same memory on every call.
+        """
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        size = math.prod(shape)
+        buffer = getattr(self._workspace, name, None)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = np.empty(size + size // 4, dtype=dtype)
+            setattr(self._workspace, name, buffer)
+        return buffer[:size].reshape(shape)
 
     # =========================
     # PREPROCESSING STEPS
@@ -113,30 +178,30 @@ class EEGPreprocessor:
         np.ndarray
             Filtered EEG data
         """
-        return filtfilt(self._bandpass_b, self._bandpass_a, data, axis=0)
+        return sosfiltfilt(self._bandpass_sos, data, axis=-2)
 
     def notch_filter(self, data: np.ndarray) -> np.ndarray:
         """
         Apply notch filter to remove powerline noise.
         """
-        if self._notch_b is None:
+        if self._notch_sos is None:
             return data
 
-        return filtfilt(self._notch_b, self._notch_a, data, axis=0)
+        return sosfiltfilt(self._notch_sos, data, axis=-2)
 
     def baseline_correction(self, data: np.ndarray) -> np.ndarray:
         """
         Remove DC offset using mean subtraction.
         """
-        baseline = np.mean(data, axis=0)
+        baseline = np.mean(data, axis=-2, keepdims=True)
         return data - baseline
 
     def normalize(self, data: np.ndarray) -> np.ndarray:
         """
         Z-score normalization per channel.
         """
-        mean = np.mean(data, axis=0)
-        std = np.std(data, axis=0)
+        mean = np.mean(data, axis=-2, keepdims=True)
+        std = np.std(data, axis=-2, keepdims=True)
         std[std == 0] = 1.0  # prevent division by zero
         return (data - mean) / std
 
@@ -148,7 +213,7 @@ class EEGPreprocessor:
         Remove DC offset using MEDIAN (more robust to artifacts).
         Better than mean for driving conditions with motion artifacts.
         """
-        baseline = np.median(data, axis=0)
+        baseline = np.median(data, axis=-2, keepdims=True)
         return data - baseline
 
     def robust_normalize(self, data: np.ndarray) -> np.ndarray:
@@ -156,8 +221,8 @@ class EEGPreprocessor:
         Robust normalization using median and MAD (Median Absolute Deviation).
         More resistant to outliers from motion artifacts.
         """
-        median = np.median(data, axis=0)
-        mad = np.median(np.abs(data - median), axis=0)
+        median = np.median(data, axis=-2, keepdims=True)
+        mad = np.median(np.abs(data - median), axis=-2, keepdims=True)
         mad[mad == 0] = 1.0  # prevent division by zero
         # Scale MAD to approximate std (for normal distribution)
         return (data - median) / (mad * 1.4826)
@@ -182,32 +247,32 @@ class EEGPreprocessor:
         np.ndarray
             Data with attenuated artifacts
         """
-        for ch in range(data.shape[1]):
-            channel = data[:, ch]
-            median = np.median(channel)
-            mad = np.median(np.abs(channel - median))
-            
-            if mad == 0:
-                continue
-                
-            threshold = threshold_factor * mad * 1.4826
-            
-            # Soft clipping: compress values beyond threshold
-            upper = median + threshold
-            lower = median - threshold
-            
-            # Apply soft sigmoid-like compression
-            above_mask = channel > upper
-            below_mask = channel < lower
-            
-            if np.any(above_mask):
-                excess = channel[above_mask] - upper
-                data[above_mask, ch] = upper + np.tanh(excess / threshold) * threshold * 0.5
-                
-            if np.any(below_mask):
-                excess = lower - channel[below_mask]
-                data[below_mask, ch] = lower - np.tanh(excess / threshold) * threshold * 0.5
-        
+        median = np.median(data, axis=-2, keepdims=True)
+        mad = np.median(np.abs(data - median), axis=-2, keepdims=True)
+
+        # Channels with mad == 0 (flat) are left untouched
+        live = mad > 0
+        threshold = threshold_factor * mad * 1.4826
+        safe_threshold = np.where(live, threshold, 1.0)
+
+        # Soft clipping: compress values beyond threshold
+        upper = median + threshold
+        lower = median - threshold
+
+        # Apply soft sigmoid-like compression
+        above_mask = (data > upper) & live
+        below_mask = (data < lower) & live
+
+        if np.any(above_mask):
+            excess = data - upper
+            compressed = upper + np.tanh(excess / safe_threshold) * threshold * 0.5
+            data = np.where(above_mask, compressed, data)
+
+        if np.any(below_mask):
+            excess = lower - data
+            compressed = lower - np.tanh(excess / safe_threshold) * threshold * 0.5
+            data = np.where(below_mask, compressed, data)
+
         return data
 
     def smooth_temporal(self, data: np.ndarray, window_size: int = 5) -> np.ndarray:
@@ -229,12 +294,11 @@ class EEGPreprocessor:
         """
         if window_size % 2 == 0:
             window_size += 1
-            
-        smoothed = np.zeros_like(data)
-        for ch in range(data.shape[1]):
-            smoothed[:, ch] = medfilt(data[:, ch], kernel_size=window_size)
-        
-        return smoothed
+
+        # Moving median along samples only, zero-padded at the edges
+        size = [1] * data.ndim
+        size[-2] = window_size
+        return median_filter(data, size=size, mode="constant", cval=0.0)
 
     def compute_signal_quality(self, data: np.ndarray) -> float:
         """
@@ -253,37 +317,45 @@ class EEGPreprocessor:
         """
         if data.size == 0:
             return 0.0
-            
-        quality = 1.0
+        return float(self._signal_quality(data))
+
+    def _signal_quality(self, data: np.ndarray) -> np.ndarray:
+        """
+        Signal quality per window for data shaped (..., samples, channels).
+        """
+        n_samples, n_channels = data.shape[-2:]
+        quality = np.ones(data.shape[:-2])
         
         # Check 1: Flat line detection (loose electrode)
-        std_per_channel = np.std(data, axis=0)
-        flat_ratio = np.sum(std_per_channel < 0.1) / len(std_per_channel)
+        std_per_channel = np.std(data, axis=-2)
+        flat_ratio = np.sum(std_per_channel < 0.1, axis=-1) / n_channels
         quality -= flat_ratio * 0.3
         
         # Check 2: Excessive high-frequency noise
-        diff = np.diff(data, axis=0)
-        noise_level = np.mean(np.abs(diff))
-        expected_noise = np.median(std_per_channel) * 0.5
-        if expected_noise > 0:
-            noise_ratio = min(noise_level / expected_noise, 2.0) - 1.0
-            quality -= max(0, noise_ratio) * 0.2
+        diff = np.diff(data, axis=-2)
+        noise_level = np.mean(np.abs(diff), axis=(-2, -1))
+        expected_noise = np.median(std_per_channel, axis=-1) * 0.5
+        has_noise_ref = expected_noise > 0
+        noise_ratio = np.minimum(
+            noise_level / np.where(has_noise_ref, expected_noise, 1.0), 2.0
+        ) - 1.0
+        quality -= np.where(has_noise_ref, np.maximum(0, noise_ratio), 0.0) * 0.2
         
         # Check 3: Artifact proportion
-        for ch in range(data.shape[1]):
-            median = np.median(data[:, ch])
-            mad = np.median(np.abs(data[:, ch] - median))
-            if mad > 0:
-                outliers = np.abs(data[:, ch] - median) > 4 * mad * 1.4826
-                artifact_ratio = np.sum(outliers) / len(outliers)
-                quality -= artifact_ratio * 0.1
+        median = np.median(data, axis=-2, keepdims=True)
+        deviation = np.abs(data - median)
+        mad = np.median(deviation, axis=-2, keepdims=True)
+        outliers = (deviation > 4 * mad * 1.4826) & (mad > 0)
+        artifact_ratio = np.sum(outliers, axis=-2) / n_samples
+        for ch in range(n_channels):
+            quality -= artifact_ratio[..., ch] * 0.1
         
-        return max(0.0, min(1.0, quality))
+        return np.clip(quality, 0.0, 1.0)
 
     # =========================
     # PIPELINE
     # =========================
-    def process(self, data: np.ndarray) -> Tuple[np.ndarray, float]:
+    def process(self, data: np.ndarray, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float]:
         """
         Full preprocessing pipeline optimized for driver monitoring.
 
@@ -291,6 +363,8 @@ class EEGPreprocessor:
         ----------
         data : np.ndarray
             Raw EEG data (samples, channels)
+        out : np.ndarray, optional
+            Preallocated result (same shape, self.dtype); may be `data`
 
         Returns
         -------
@@ -307,8 +381,53 @@ class EEGPreprocessor:
         if data.size == 0:
             return data, 0.0
 
+        data, quality = self._pipeline(data, out)
+        return data, float(quality)
+
+    def process_batch(
+        self,
+        frames: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Preprocess a stack of windows in one vectorized pass.
+
+        Each window gets exactly what process() would give it on its own
+        (filters, medians and normalization are all per window).
+
+        Parameters
+        ----------
+        frames : np.ndarray
+            Raw EEG windows (windows, samples, channels)
+        out : np.ndarray, optional
+            Preallocated result (same shape, self.dtype); may be `frames`
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            (Preprocessed windows, signal quality per window)
+        """
+        if frames.size == 0:
+            return frames, np.zeros(frames.shape[:-2])
+        frames, quality = self._pipeline(frames, out)
+        # The Numba backend returns a view of its workspace
+        return frames, quality.copy()
+
+    def _pipeline(
+        self,
+        data: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Shared body of process() / process_batch() on (..., samples, channels)."""
+        if out is not None and (out.shape != data.shape or out.dtype != self.dtype):
+            raise ValueError(f"out must have shape {data.shape} and dtype {self.dtype}")
+        if self.backend == "numba":
+            return self._pipeline_numba(data, out)
+
+        data = np.asarray(data, dtype=self.dtype)
+
         # Compute quality BEFORE processing (on raw data)
-        quality = self.compute_signal_quality(data)
+        quality = self._signal_quality(data)
 
         # Step 1: Bandpass filter (removes drift and high-freq noise)
         data = self.bandpass_filter(data)
@@ -335,4 +454,65 @@ class EEGPreprocessor:
             data = self.baseline_correction(data)
             data = self.normalize(data)
 
+        if out is not None:
+            np.copyto(out, data)
+            data = out
         return data, quality
+
+    def _pipeline_numba(
+        self,
+        data: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        _pipeline as Numba kernels (eeg.kernels) working in preallocated
+        buffers: quality, both zero-phase filters and, in driving mode,
+        steps 3-6. Only the returned window is new, and not even that
+        when `out` is given.
+        """
+        shape = data.shape
+        n_samples, n_channels = shape[-2:]
+        n_windows = math.prod(shape[:-2])
+        frame_shape = (n_windows, n_samples, n_channels)
+
+        if out is not None and not out.flags.c_contiguous:
+            raise ValueError("out must be C-contiguous for the numba backend")
+
+        stages = self._filter_states()
+        padlen = max(stage[2] for stage in stages)
+        if n_samples <= stages[0][2]:
+            raise ValueError(
+                f"Window of {n_samples} samples is too short for the bandpass "
+                f"filter (needs more than {stages[0][2]})"
+            )
+
+        # Kernels take contiguous (windows, samples, channels) in self.dtype
+        if data.dtype == self.dtype and data.flags.c_contiguous:
+            frames = data.reshape(frame_shape)
+        else:
+            frames = self._buffer("input", frame_shape)
+            np.copyto(frames.reshape(shape), data)
+
+        work = self._buffer("work", (4, max(n_samples, 3)))
+        quality = kernels.signal_quality(
+            frames,
+            self._buffer("quality", (n_windows,), np.float64),
+            work,
+            self._buffer("channel_work", (3, n_channels), np.float64),
+        )
+
+        target = np.empty(frame_shape, dtype=self.dtype) if out is None else out.reshape(frame_shape)
+        ext = self._buffer("ext", (n_samples + 2 * padlen,))
+        state = self._buffer("state", (max(len(stage[0]) for stage in stages), 2))
+        source = frames
+        for sos, zi, edge in stages:
+            kernels.sosfiltfilt(sos, zi, source, edge, target, ext, state)
+            source = target
+
+        if self.driving_mode:
+            kernels.clean_driving(target, 3.0, 3, target, work)
+        else:
+            np.copyto(target, self.normalize(self.baseline_correction(target)))
+
+        result = target.reshape(shape) if out is None else out
+        return result, quality.reshape(shape[:-2])
@@ -0,0 +1,184 @@
+"""
+scheduler.py
+============
+Sample-count driven analysis scheduling for the streaming server.
+
+Purpose:
+The old loop pulled a blocking 2 s chunk and then slept 0.5 s, so the
+output cadence drifted with processing and network time and windows
+never overlapped. Here analysis fires every `hop` worth of *samples*:
+
+- RingBuffer   : the last few windows of samples, indexed by absolute
+                 sample number
+- HopScheduler : waits (blocking in the source, CPU idle) until the next
+                 hop boundary has arrived and returns the window ending
+                 there; when processing falls behind it catches up on at
+                 most `max_catchup` late hops and skips the rest
+
+Output rate is therefore exactly one window per hop of stream time, no
+matter how long a hop took to process.
+
+Sources need `sampling_rate` and `pull_available(max_samples, timeout)`
+(EEGAcquisition, SyntheticEEGAcquisition, ReplayEEGAcquisition).
+"""
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    The most recent `capacity` samples of a stream.
+
+    Samples are addressed by absolute index (0 = first sample appended),
+    so windows can be requested by where they end in the stream.
+    """
+
+    def __init__(self, capacity: int, n_channels: int, dtype=np.float64):
+        self.capacity = capacity
+        self.total = 0  # samples appended since creation
+        self._data = np.zeros((capacity, n_channels), dtype=dtype)
+        self._times = np.zeros(capacity)
+
+    def extend(self, data: np.ndarray, timestamps: np.ndarray) -> None:
+        """Append samples (samples, channels); the oldest are overwritten."""
+        n = len(timestamps)
+        skip = max(0, n - self.capacity)  # only the newest `capacity` can be kept
+        self.total += skip
+        data, timestamps = data[skip:], timestamps[skip:]
+        n -= skip
+
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = data[:first]
+        self._times[start:start + first] = timestamps[:first]
+        self._data[:n - first] = data[first:]
+        self._times[:n - first] = timestamps[first:]
+        self.total += n
+
+    def window(self, end: int, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of samples [end - n, end) in absolute indices.
+
+        Raises
+        ------
+        ValueError
+            If part of the window has not arrived yet or was overwritten
+        """
+        if end > self.total or end - n < max(0, self.total - self.capacity):
+            raise ValueError(
+                f"Samples [{end - n}, {end}) not in buffer "
+                f"(holds [{max(0, self.total - self.capacity)}, {self.total}))"
+            )
+        start = (end - n) % self.capacity
+        idx = np.arange(start, start + n) % self.capacity
+        return self._data[idx], self._times[idx]
+
+
+class HopScheduler:
+    """
+    Deadline-based hop scheduling on sample counts.
+
+    The k-th window ends at sample `window + k * hop`. next_window()
+    blocks until that sample has arrived and returns the window. If the
+    stream is more than `max_catchup` hops ahead of the next deadline
+    (processing or network were too slow), the oldest late hops are
+    skipped so that latency stays bounded.
+    """
+
+    def __init__(
+        self,
+        source,
+        window: float = 2.0,
+        hop: float = 1.0,
+        max_catchup: int = 2,
+        timeout: float = 0.5
+    ):
+        """
+        Parameters
+        ----------
+        source : EEGAcquisition or compatible
+            Connected source with sampling_rate and pull_available()
+        window : float
+            Analysis window length (seconds)
+        hop : float
+            Time between analyses (seconds); window - hop is the overlap
+        max_catchup : int
+            Late hops still analyzed when behind; older ones are skipped
+        timeout : float
+            Longest single blocking pull, i.e. how often `should_stop`
+            is checked while waiting
+        """
+        fs = source.sampling_rate
+        self.source = source
+        self.window_samples = int(round(window * fs))
+        self.hop_samples = max(1, int(round(hop * fs)))
+        self.max_catchup = max(0, max_catchup)
+        self.timeout = timeout
+        if self.window_samples <= 0:
+            raise ValueError("window must be at least one sample")
+
+        # Every window we may still analyze, plus one hop of fresh samples
+        self.capacity = self.window_samples + (self.max_catchup + 1) * self.hop_samples
+        self.buffer: Optional[RingBuffer] = None
+
+        self.next_end = self.window_samples  # absolute sample the next window ends at
+        self.hops = 0      # windows returned
+        self.skipped = 0   # hops dropped while catching up
+
+    @property
+    def lag_samples(self) -> int:
+        """Samples received beyond the end of the last returned window."""
+        received = self.buffer.total if self.buffer else 0
+        return max(0, received - (self.next_end - self.hop_samples))
+
+    def _append(self, data: np.ndarray, timestamps: np.ndarray) -> int:
+        n = len(timestamps)
+        if n:
+            data = np.asarray(data)
+            if self.buffer is None:
+                self.buffer = RingBuffer(self.capacity, data.shape[1], data.dtype)
+            self.buffer.extend(data, np.asarray(timestamps, dtype=float))
+        return n
+
+    def next_window(
+        self,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Block until the next hop is due and return its window.
+
+        Parameters
+        ----------
+        should_stop : callable or None
+            Checked between pulls; returning True aborts the wait
+
+        Returns
+        -------
+        (data, timestamps) or None
+            Window (window_samples, channels) and its timestamps, None if
+            stopped while waiting
+        """
+        # Drain whatever is already queued: this is how lag becomes visible
+        while self._append(*self.source.pull_available(self.capacity, timeout=0.0)) == self.capacity:
+            pass
+
+        # Sleep in the source until the deadline sample arrives
+        while self.buffer is None or self.buffer.total < self.next_end:
+            if should_stop is not None and should_stop():
+                return None
+            received = self.buffer.total if self.buffer else 0
+            self._append(*self.source.pull_available(self.next_end - received, timeout=self.timeout))
+
+        # Overloaded: keep at most max_catchup late hops, skip older ones
+        late = (self.buffer.total - self.next_end) // self.hop_samples
+        if late > self.max_catchup:
+            skip = late - self.max_catchup
+            self.next_end += skip * self.hop_samples
+            self.skipped += skip
+
+        window = self.buffer.window(self.next_end, self.window_samples)
+        self.next_end += self.hop_samples
+        self.hops += 1
+        return window
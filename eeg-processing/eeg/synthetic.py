@@ -0,0 +1,557 @@
+"""
+synthetic.py
+============
+Hardware-free EEG sources with the same interface as EEGAcquisition.
+
+Purpose:
+Make DSP and throughput work reproducible without a Muse 2 / muselsl:
+
+- SyntheticEEGAcquisition : generated EEG (pink noise + band oscillators,
+                            blink / motion artifacts, drowsiness drift)
+- ReplayEEGAcquisition    : replays a recorded CSV (utils.save_eeg_to_csv or
+                            muselsl record) or XDF file
+- create_acquisition()    : picks LSL / synthetic / replay from CLI flags
+- load_recording()        : the CSV / XDF loader, also used by eeg.batch
+
+Both sources pace pull_chunk() like an LSL inlet: the call blocks for
+`duration / speed` seconds and returns every sample that became available
+meanwhile. speed=1.0 is real time, speed=10 is 10x faster, speed<=0
+returns exactly `duration` worth of samples without sleeping.
+pull_available() (used by eeg.scheduler) likewise sleeps only until the
+requested samples are due.
+"""
+
+import csv
+import os
+import time
+import numpy as np
+from scipy.signal import lfilter
+from typing import Dict, List, Optional, Tuple
+
+from .acquisition import EEGAcquisition
+
+
+MUSE_CHANNELS = ["TP9", "AF7", "AF8", "TP10", "AUX"]
+
+# Band oscillators: (frequency Hz, amplitude uV) for an alert, eyes-open driver
+DEFAULT_BANDS: Dict[str, Tuple[float, float]] = {
+    "delta": (2.0, 10.0),
+    "theta": (6.0, 6.0),
+    "alpha": (10.0, 10.0),
+    "beta": (20.0, 4.0),
+    "gamma": (38.0, 1.5),
+}
+
+# Paul Kellet's pink (1/f) noise filter
+_PINK_B = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+_PINK_A = np.array([1.0, -2.494956002, 2.017265875, -0.522189400])
+
+
+class _PacedSource:
+    """
+    Shared LSL-like pacing and bookkeeping for non-LSL sources.
+
+    Subclasses set `sampling_rate` / `channel_labels` in connect() and
+    implement `_read(n)` returning (data, timestamps) for the next n samples.
+    """
+
+    def __init__(self, speed: float = 1.0, dtype=np.float64):
+        self.speed = speed
+        self.dtype = np.dtype(dtype)
+        self.sampling_rate: Optional[float] = None
+        self.channel_labels: List[str] = []
+        self.connected = False
+
+        self._wall_start = 0.0
+        self._emitted = 0       # samples handed out so far
+        self._fraction = 0.0    # leftover fraction of a sample (unpaced mode)
+
+    def _start_clock(self) -> None:
+        self._wall_start = time.monotonic()
+        self._emitted = 0
+        self._fraction = 0.0
+        self.connected = True
+
+    def _read(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def _require_connected(self) -> None:
+        if not self.connected:
+            raise RuntimeError("EEG source not connected. Call connect() first.")
+
+    def _due_samples(self) -> int:
+        """Samples that have 'arrived' since connect() at the configured speed."""
+        elapsed = time.monotonic() - self._wall_start
+        return int(elapsed * self.sampling_rate * self.speed)
+
+    def pull_chunk(self, duration: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pull EEG data for a specific duration (same contract as EEGAcquisition).
+
+        Returns
+        -------
+        data : np.ndarray
+            EEG data array with shape (samples, channels)
+        timestamps : np.ndarray
+            Corresponding timestamps
+        """
+        self._require_connected()
+
+        if self.speed > 0:
+            time.sleep(duration / self.speed)
+            n = self._due_samples() - self._emitted
+        else:
+            self._fraction += duration * self.sampling_rate
+            n = int(self._fraction)
+            self._fraction -= n
+
+        if n <= 0:
+            return np.empty((0, 0)), np.empty((0,))
+
+        data, timestamps = self._read(n)
+        self._emitted += len(timestamps)
+        if len(timestamps) == 0:
+            return np.empty((0, 0), dtype=self.dtype), np.empty((0,))
+        return data.astype(self.dtype, copy=False), timestamps
+
+    def pull_available(self, max_samples: int, timeout: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pull up to `max_samples`, blocking at most `timeout` seconds
+        (same contract as EEGAcquisition.pull_available).
+
+        Unpaced sources (speed<=0) have nothing "queued": timeout=0.0
+        returns no samples, any wait returns `max_samples` at once.
+        """
+        self._require_connected()
+
+        if self.speed > 0:
+            rate = self.sampling_rate * self.speed
+            wait = min(timeout, (self._emitted + max_samples) / rate - (time.monotonic() - self._wall_start))
+            if wait > 0:
+                time.sleep(wait)
+            n = min(self._due_samples() - self._emitted, max_samples)
+        else:
+            n = max_samples if timeout > 0 else 0
+
+        if n > 0:
+            data, timestamps = self._read(n)
+            self._emitted += len(timestamps)
+            if len(timestamps):
+                return data.astype(self.dtype, copy=False), timestamps
+            time.sleep(timeout)  # replay ran dry: idle like an inlet without data
+        return np.empty((0, 0), dtype=self.dtype), np.empty((0,))
+
+    def get_latest_sample(self) -> Tuple[np.ndarray, float]:
+        """
+        Pull a single EEG sample.
+
+        Returns
+        -------
+        sample : np.ndarray
+            EEG sample (channels,)
+        timestamp : float
+            Sample timestamp
+        """
+        self._require_connected()
+
+        if self.speed > 0:
+            wait = (self._emitted + 1) / (self.sampling_rate * self.speed) \
+                - (time.monotonic() - self._wall_start)
+            if wait > 0:
+                time.sleep(wait)
+
+        data, timestamps = self._read(1)
+        if len(timestamps) == 0:
+            raise RuntimeError("Failed to retrieve EEG sample.")
+        self._emitted += 1
+        return data[0].astype(self.dtype, copy=False), float(timestamps[0])
+
+    def close(self) -> None:
+        """
+        Stop the source.
+        """
+        print("[INFO] Closing EEG stream...")
+        self.connected = False
+
+
+class SyntheticEEGAcquisition(_PacedSource):
+    """
+    Generated EEG with known band content and realistic nuisances.
+
+    Signal per channel:
+    - pink (1/f) background noise
+    - delta..gamma oscillators (DEFAULT_BANDS, per-channel phase / gain)
+    - 50 Hz mains hum
+    - eye blinks on frontal channels (AF7/AF8), Poisson-timed
+    - motion bursts on all channels, Poisson-timed
+    - drowsiness drift: theta grows and alpha fades over `drowsy_after` seconds
+    """
+
+    def __init__(
+        self,
+        sampling_rate: float = 256.0,
+        channel_labels: Optional[List[str]] = None,
+        bands: Optional[Dict[str, Tuple[float, float]]] = None,
+        noise_uv: float = 8.0,
+        line_noise_uv: float = 3.0,
+        line_freq: float = 50.0,
+        blink_rate: float = 15.0,
+        motion_rate: float = 2.0,
+        drowsy_after: Optional[float] = None,
+        speed: float = 1.0,
+        seed: Optional[int] = None,
+        dtype=np.float64
+    ):
+        """
+        Initialize synthetic EEG source.
+
+        Parameters
+        ----------
+        sampling_rate : float
+            Output sampling rate (Hz), Muse 2 default 256
+        channel_labels : list of str
+            Channel names (default: Muse 2 TP9, AF7, AF8, TP10, AUX)
+        bands : dict
+            {band: (frequency Hz, amplitude uV)} oscillators
+        noise_uv : float
+            Pink noise standard deviation (uV)
+        line_noise_uv : float
+            Mains hum amplitude (uV), 0 to disable
+        line_freq : float
+            Mains frequency (50 Hz Indonesia, 60 Hz USA)
+        blink_rate : float
+            Eye blinks per minute, 0 to disable
+        motion_rate : float
+            Motion artifact bursts per minute, 0 to disable
+        drowsy_after : float or None
+            Seconds until the driver is fully drowsy (θ up, α down); None = stays alert
+        speed : float
+            Playback speed (1.0 real time, <=0 unthrottled)
+        seed : int or None
+            Random seed for reproducible signals
+        dtype : np.float32 or np.float64
+            dtype of pulled data (as EEGAcquisition)
+        """
+        super().__init__(speed=speed, dtype=dtype)
+        self.stream_type = "EEG"
+        self._fs = float(sampling_rate)
+        self._labels = list(channel_labels or MUSE_CHANNELS)
+        self.bands = dict(bands or DEFAULT_BANDS)
+        self.noise_uv = noise_uv
+        self.line_noise_uv = line_noise_uv
+        self.line_freq = line_freq
+        self.blink_rate = blink_rate
+        self.motion_rate = motion_rate
+        self.drowsy_after = drowsy_after
+        self.seed = seed
+
+        n_ch = len(self._labels)
+        self._rng = np.random.default_rng(seed)
+        self._phases = self._rng.uniform(0, 2 * np.pi, size=(len(self.bands), n_ch))
+        self._gains = self._rng.uniform(0.8, 1.2, size=(len(self.bands), n_ch))
+        self._pink_state = np.zeros((len(_PINK_A) - 1, n_ch))
+        # Pink filter output std for unit white input (normalizes noise_uv)
+        self._pink_scale = 1.0 / np.std(lfilter(_PINK_B, _PINK_A, self._rng.standard_normal(65536)))
+
+        # Artifact spill-over into the next chunk
+        self._carry = np.zeros((0, n_ch))
+        self._frontal = [i for i, ch in enumerate(self._labels) if ch in ("AF7", "AF8")]
+        self._t0 = 0.0
+
+    def connect(self) -> None:
+        """
+        Start the synthetic stream (no LSL lookup).
+        """
+        self.sampling_rate = self._fs
+        self.channel_labels = self._labels
+        self._t0 = time.time()
+        self._start_clock()
+
+        print("[SUCCESS] Connected to synthetic EEG source")
+        print(f"          Sampling rate : {self.sampling_rate} Hz")
+        print(f"          Channels      : {self.channel_labels}")
+        if self.drowsy_after:
+            print(f"          Drowsy after  : {self.drowsy_after:.0f} s")
+
+    def drowsiness(self, t: np.ndarray) -> np.ndarray:
+        """Drowsiness level 0 (alert) .. 1 (fully drowsy) at stream time t (s)."""
+        if not self.drowsy_after:
+            return np.zeros_like(t)
+        return np.clip(t / self.drowsy_after, 0.0, 1.0)
+
+    def _read(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        fs = self.sampling_rate
+        n_ch = len(self.channel_labels)
+        idx = self._emitted + np.arange(n)
+        t = idx / fs
+
+        # Background: pink noise (filter state carried across chunks)
+        white = self._rng.standard_normal((n, n_ch))
+        pink, self._pink_state = lfilter(_PINK_B, _PINK_A, white, axis=0, zi=self._pink_state)
+        data = pink * (self.noise_uv * self._pink_scale)
+
+        # Band oscillators, with drowsiness drift on theta / alpha
+        drowsy = self.drowsiness(t)[:, None]
+        for b, (band, (freq, amp)) in enumerate(self.bands.items()):
+            if freq >= fs / 2:
+                continue
+            scale = amp * self._gains[b]
+            if band == "theta":
+                scale = scale * (1.0 + 1.5 * drowsy)
+            elif band == "alpha":
+                scale = scale * (1.0 - 0.5 * drowsy)
+            data += scale * np.sin(2 * np.pi * freq * t[:, None] + self._phases[b])
+
+        if self.line_noise_uv and self.line_freq < fs / 2:
+            data += self.line_noise_uv * np.sin(2 * np.pi * self.line_freq * t)[:, None]
+
+        data = self._add_artifacts(data)
+        return data, self._t0 + t
+
+    def _add_artifacts(self, data: np.ndarray) -> np.ndarray:
+        """Add Poisson-timed blinks / motion bursts; tails spill into the next chunk."""
+        fs = self.sampling_rate
+        n, n_ch = data.shape
+
+        blink = np.hanning(int(0.3 * fs))                  # ~300 ms eye blink
+        motion_len = int(0.6 * fs)                          # ~600 ms head movement
+        tail = max(len(blink), motion_len)
+        out = np.zeros((n + tail, n_ch))
+        out[:len(self._carry)] += self._carry
+
+        for onset in np.flatnonzero(self._rng.random(n) < self.blink_rate / 60.0 / fs):
+            amp = self._rng.uniform(80, 150)
+            out[onset:onset + len(blink), self._frontal] += amp * blink[:, None]
+            out[onset:onset + len(blink)] += 0.1 * amp * blink[:, None]
+
+        for onset in np.flatnonzero(self._rng.random(n) < self.motion_rate / 60.0 / fs):
+            burst = self._rng.normal(0, 40, (motion_len, n_ch)) * np.hanning(motion_len)[:, None]
+            out[onset:onset + motion_len] += burst
+
+        self._carry = out[n:]
+        return data + out[:n]
+
+
+class ReplayEEGAcquisition(_PacedSource):
+    """
+    Replay a recorded EEG file as if it were a live LSL stream.
+
+    Supported formats:
+    - .csv : header row, optional timestamp column ("timestamp(s)"/"time"),
+             remaining columns are channels (utils.save_eeg_to_csv, muselsl record)
+    - .xdf : first stream of type EEG (requires pyxdf)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: float = 1.0,
+        loop: bool = True,
+        sampling_rate: Optional[float] = None,
+        dtype=np.float64
+    ):
+        """
+        Initialize replay source.
+
+        Parameters
+        ----------
+        path : str
+            Recording file (.csv or .xdf)
+        speed : float
+            Playback speed (1.0 real time, <=0 unthrottled)
+        loop : bool
+            Restart from the beginning at end of file (otherwise return empty chunks)
+        sampling_rate : float or None
+            Override the rate inferred from the file
+        dtype : np.float32 or np.float64
+            dtype of pulled data (as EEGAcquisition)
+        """
+        super().__init__(speed=speed, dtype=dtype)
+        self.stream_type = "EEG"
+        self.path = path
+        self.loop = loop
+        self._rate_override = sampling_rate
+
+        self._data = np.empty((0, 0))
+        self._timestamps = np.empty((0,))
+        self._pos = 0
+        self._loops = 0
+        self._span = 0.0
+
+    def connect(self) -> None:
+        """
+        Load the recording and start replaying.
+        """
+        print(f"[INFO] Loading EEG recording: {self.path}")
+        data, timestamps, labels, fs = load_recording(self.path, self._rate_override)
+
+        self._data = data
+        self._timestamps = timestamps
+        self._span = float(timestamps[-1] - timestamps[0]) + 1.0 / fs
+        self._pos = 0
+        self._loops = 0
+        self.sampling_rate = float(fs)
+        self.channel_labels = labels
+        self._start_clock()
+
+        print("[SUCCESS] Replaying EEG recording")
+        print(f"          Sampling rate : {self.sampling_rate} Hz")
+        print(f"          Channels      : {self.channel_labels}")
+        print(f"          Duration      : {len(data) / fs:.1f} s @ {self.speed:g}x")
+
+    def _read(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        chunks, stamps = [], []
+        total = len(self._data)
+
+        while n > 0:
+            if self._pos >= total:
+                if not self.loop:
+                    break
+                self._pos = 0
+                self._loops += 1
+            take = min(n, total - self._pos)
+            chunks.append(self._data[self._pos:self._pos + take])
+            stamps.append(self._timestamps[self._pos:self._pos + take] + self._loops * self._span)
+            self._pos += take
+            n -= take
+
+        if not chunks:
+            return np.empty((0, self._data.shape[1])), np.empty((0,))
+        return np.vstack(chunks), np.hstack(stamps)
+
+
+# =========================
+# FILE LOADERS
+# =========================
+_TIMESTAMP_COLUMNS = ("timestamp", "timestamps", "time", "time_stamps")
+
+
+def load_recording(
+    path: str,
+    sampling_rate: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray, List[str], float]:
+    """
+    Load a CSV or XDF recording.
+
+    Parameters
+    ----------
+    path : str
+        Recording file (.csv or .xdf)
+    sampling_rate : float or None
+        Override the rate inferred from the file
+
+    Returns
+    -------
+    tuple
+        (data (samples, channels), timestamps (samples,), channel labels, fs)
+    """
+    if not os.path.exists(path):
+        raise RuntimeError(f"Replay file not found: {path}")
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".xdf":
+        data, timestamps, labels, fs = _load_xdf(path)
+    else:
+        data, timestamps, labels, fs = _load_csv(path)
+
+    if len(data) == 0:
+        raise RuntimeError(f"Replay file has no samples: {path}")
+
+    fs = float(sampling_rate or fs or 256.0)
+    if timestamps is None:
+        timestamps = np.arange(len(data)) / fs
+    return data, timestamps, labels, fs
+
+
+def _load_csv(path: str) -> Tuple[np.ndarray, Optional[np.ndarray], List[str], Optional[float]]:
+    """Load a CSV recording -> (data, timestamps or None, channel labels, fs or None)."""
+    with open(path, newline="") as f:
+        header = next(csv.reader(f))
+    header = [h.strip() for h in header]
+
+    ts_col = next((i for i, h in enumerate(header) if h.lower() in _TIMESTAMP_COLUMNS), None)
+    ch_cols = [i for i in range(len(header)) if i != ts_col]
+
+    table = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    data = table[:, ch_cols]
+    labels = [header[i] for i in ch_cols]
+
+    timestamps, fs = None, None
+    if ts_col is not None:
+        timestamps = table[:, ts_col]
+        if len(timestamps) > 1:
+            fs = _infer_rate(timestamps)
+    return data, timestamps, labels, fs
+
+
+def _load_xdf(path: str) -> Tuple[np.ndarray, np.ndarray, List[str], Optional[float]]:
+    """Load the first EEG stream of an XDF recording."""
+    try:
+        import pyxdf
+    except ImportError:
+        raise ImportError("pyxdf is required to replay .xdf files: pip install pyxdf") from None
+
+    streams, _ = pyxdf.load_xdf(path, select_streams=[{"type": "EEG"}])
+    if not streams:
+        raise RuntimeError(f"No EEG stream in {path}")
+    stream = streams[0]
+
+    data = np.asarray(stream["time_series"], dtype=float)
+    timestamps = np.asarray(stream["time_stamps"], dtype=float)
+    fs = float(stream["info"]["nominal_srate"][0]) or _infer_rate(timestamps)
+    try:
+        channels = stream["info"]["desc"][0]["channels"][0]["channel"]
+        labels = [ch["label"][0] for ch in channels]
+    except (KeyError, IndexError, TypeError):
+        labels = MUSE_CHANNELS[:data.shape[1]]
+    return data, timestamps, labels, fs
+
+
+def _infer_rate(timestamps: np.ndarray) -> float:
+    """Sampling rate from timestamp spacing, snapped to an integer rate."""
+    step = float(np.median(np.diff(timestamps)))
+    return float(round(1.0 / step)) if step > 0 else 256.0
+
+
+# =========================
+# FACTORY
+# =========================
+SOURCES = ("lsl", "synthetic", "replay")
+
+
+def create_acquisition(
+    source: str = "lsl",
+    replay_file: Optional[str] = None,
+    speed: float = 1.0,
+    dtype=np.float64,
+    **kwargs
+):
+    """
+    Create an EEG source for the given --source flag.
+
+    Parameters
+    ----------
+    source : str
+        "lsl" (Muse 2 via muselsl), "synthetic" or "replay"
+    replay_file : str or None
+        Recording to replay (required for source="replay")
+    speed : float
+        Playback speed for synthetic / replay sources (ignored for LSL)
+    dtype : np.float32 or np.float64
+        dtype of pulled data (config.DSP_DTYPE in server.py)
+    **kwargs
+        Passed to the source constructor
+
+    Returns
+    -------
+    EEGAcquisition, SyntheticEEGAcquisition or ReplayEEGAcquisition
+    """
+    if source == "lsl":
+        return EEGAcquisition(dtype=dtype, **kwargs)
+    if source == "synthetic":
+        return SyntheticEEGAcquisition(speed=speed, dtype=dtype, **kwargs)
+    if source == "replay":
+        if not replay_file:
+            raise ValueError("--replay-file is required for --source replay")
+        return ReplayEEGAcquisition(replay_file, speed=speed, dtype=dtype, **kwargs)
+    raise ValueError(f"Unknown EEG source '{source}' (expected one of {', '.join(SOURCES)})")
@@ -6,18 +6,40 @@ Main orchestrator for Muse EEG Driver Monitoring System.
 Purpose:
 Run real-time EEG acquisition, processing, feature extraction,
 and cognitive analysis for driver safety monitoring.
+
+Usage:
+    python main.py                                   # Muse 2 via muselsl
+    python main.py --source synthetic                # no headset
+    python main.py --source replay --replay-file recordings/rec.csv --speed 4
 """
 
 import time
+import argparse
 import numpy as np
 
-from eeg.acquisition import EEGAcquisition
+from eeg.synthetic import SOURCES, create_acquisition
 from eeg.preprocessing import EEGPreprocessor
 from eeg.features import EEGFeatureExtractor
 from eeg.analysis import CognitiveAnalyzer
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Muse EEG - Driver Monitoring System")
+    parser.add_argument("--source", choices=SOURCES, default="lsl",
+                        help="EEG source: lsl (Muse 2), synthetic or replay (default: lsl)")
+    parser.add_argument("--replay-file", default=None,
+                        help="Recording (.csv / .xdf) for --source replay")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Synthetic / replay speed (1.0 = real time, 0 = as fast as possible)")
+    args = parser.parse_args()
+    if args.source == "replay" and not args.replay_file:
+        parser.error("--replay-file is required for --source replay")
+    return args
+
+
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print(" MUSE EEG – DRIVER MONITORING SYSTEM ")
     print("=" * 60)
@@ -25,7 +47,7 @@ def main():
     # =========================
     # INITIALIZATION
     # =========================
-    eeg = EEGAcquisition()
+    eeg = create_acquisition(args.source, replay_file=args.replay_file, speed=args.speed)
     eeg.connect()
 
     preprocessor = EEGPreprocessor(
@@ -135,7 +157,7 @@ def main():
                 print("  ⚠️  WARNING: High stress detected! Try to relax.")
 
             # Control update rate
-            time.sleep(1.0)
+            time.sleep(1.0 / args.speed if args.speed > 0 else 0)
 
     except KeyboardInterrupt:
         print("\n\n[INFO] Stopping driver monitoring system...")
@@ -0,0 +1,154 @@
+"""
+rescore.py
+==========
+Offline re-analysis of recorded EEG sessions.
+
+Purpose:
+Re-run preprocessing, feature extraction and cognitive state analysis over
+recordings (CSV / XDF) in batch - e.g. to see how new thresholds or
+hysteresis settings would have scored past drives - without replaying
+them in real time.
+
+Usage:
+    python rescore.py recordings/                          # every .csv / .xdf in a folder
+    python rescore.py recordings/drive1.csv --out results/
+    python rescore.py recordings/ --workers 4 --window 2 --hop 1
+    python rescore.py recordings/ --thresholds '{"fatigue": {"theta_alpha_min": 1.6}}'
+    python rescore.py recordings/ --hysteresis '{"stress": {"hold_sec": 5}}'
+"""
+
+import os
+import csv
+import json
+import glob
+import argparse
+
+from eeg.batch import rescore_files
+from config import (
+    WINDOW_SECONDS, HOP_SECONDS,
+    LOWCUT_FREQ, HIGHCUT_FREQ, NOTCH_FREQ,
+    NPERSEG,
+)
+
+
+RECORDING_EXTENSIONS = (".csv", ".xdf")
+
+
+def find_recordings(inputs):
+    """Expand files / folders into a sorted list of recordings."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for ext in RECORDING_EXTENSIONS:
+                paths.extend(glob.glob(os.path.join(item, f"*{ext}")))
+        else:
+            paths.append(item)
+    return sorted(set(paths))
+
+
+def write_windows_csv(entry, out_dir):
+    """Write the per-window results of one recording, returns the CSV path."""
+    result = entry["result"]
+    name = os.path.splitext(os.path.basename(entry["path"]))[0]
+    path = os.path.join(out_dir, f"{name}_rescored.csv")
+
+    score_cols = [k for k in result if k.startswith("score_")]
+    columns = ["time", "state", "confidence", "quality",
+               "theta_alpha", "beta_alpha", "alpha_beta",
+               "variability", "stability"] + score_cols
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for i in range(len(result["state"])):
+            row = []
+            for col in columns:
+                value = result[col][i]
+                row.append(value if col == "state" else f"{float(value):.4f}")
+            writer.writerow(row)
+    return path
+
+
+def parse_json_arg(parser, value, flag):
+    if value is None:
+        return None
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError as e:
+        parser.error(f"{flag} must be JSON: {e}")
+    if not isinstance(parsed, dict):
+        parser.error(f"{flag} must be a JSON object of {{state: {{key: value}}}}")
+    return parsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fumorive EEG - offline re-analysis of recordings")
+    parser.add_argument("inputs", nargs="+",
+                        help="Recording files (.csv / .xdf) or folders containing them")
+    parser.add_argument("--out", default=None,
+                        help="Folder for per-window CSVs (default: no CSV, summary only)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS,
+                        help=f"Analysis window in seconds (default: {WINDOW_SECONDS}, as server.py)")
+    parser.add_argument("--hop", type=float, default=HOP_SECONDS,
+                        help=f"Step between windows in seconds (default: {HOP_SECONDS}, as server.py)")
+    parser.add_argument("--sampling-rate", type=float, default=None,
+                        help="Override the sampling rate inferred from the files")
+    parser.add_argument("--thresholds", default=None,
+                        help='Threshold overrides as JSON, e.g. \'{"fatigue": {"theta_alpha_min": 1.6}}\'')
+    parser.add_argument("--hysteresis", default=None,
+                        help='Hysteresis overrides as JSON, e.g. \'{"stress": {"hold_sec": 5}}\'')
+    parser.add_argument("--no-calibrate", action="store_true",
+                        help="Use the default baseline instead of the first 10 s of each recording")
+    args = parser.parse_args()
+
+    args.thresholds = parse_json_arg(parser, args.thresholds, "--thresholds")
+    args.hysteresis = parse_json_arg(parser, args.hysteresis, "--hysteresis")
+    args.paths = find_recordings(args.inputs)
+    if not args.paths:
+        parser.error("no .csv / .xdf recordings found")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print(" FUMORIVE EEG - OFFLINE RESCORE ")
+    print("=" * 60)
+    print(f"Recordings : {len(args.paths)}")
+    print(f"Window/hop : {args.window:g}s / {(args.hop or args.window):g}s")
+
+    results = rescore_files(
+        args.paths,
+        workers=args.workers,
+        sampling_rate=args.sampling_rate,
+        window=args.window,
+        hop=args.hop,
+        thresholds=args.thresholds,
+        hysteresis=args.hysteresis,
+        calibrate=not args.no_calibrate,
+        preprocessing={"lowcut": LOWCUT_FREQ, "highcut": HIGHCUT_FREQ, "notch_freq": NOTCH_FREQ},
+        nperseg=NPERSEG,
+    )
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    for entry in results:
+        summary = entry["summary"]
+        print("-" * 60)
+        print(f"{entry['path']}  ({entry['fs']:g} Hz, {len(entry['channels'])} ch)")
+        print(f"  windows     : {summary['windows']} ({summary['duration_s']} s)"
+              f"{'' if summary['calibrated'] else '  [default baseline]'}")
+        print(f"  transitions : {summary['transitions']}")
+        for state, count in sorted(summary["states"].items(), key=lambda kv: -kv[1]):
+            print(f"  {state:<10}: {count:>5}  ({summary['fractions'][state] * 100:5.1f}%)"
+                  f"  conf {summary['mean_confidence'][state]:.2f}")
+        if args.out:
+            print(f"  -> {write_windows_csv(entry, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,21 +15,43 @@ Usage:
     python server.py --session-id <SESSION_UUID>
     python server.py --session-id <SESSION_UUID> --backend-url http://localhost:8000
     python server.py --session-id <SESSION_UUID> --save-db --no-calibrate
+
+    # Tanpa headset (CI / benchmark):
+    python server.py --session-id <SESSION_UUID> --source synthetic
+    python server.py --session-id <SESSION_UUID> --source replay --replay-file rec.csv --speed 4
+
+    # Multi-headset (satu proses untuk semua stream LSL di mesin ini):
+    python server.py --multi --session-id <UUID_1> --session-id <UUID_2>
+    python server.py --multi --session-id Muse-1A2B=<UUID_1> --session-id Muse-3C4D=<UUID_2>
+
+    # Timing per stage (acquire / preprocess / features / analyze / send):
+    python server.py --session-id <SESSION_UUID> --metrics-port 9100    # GET /metrics
+    python server.py --session-id <SESSION_UUID> --metrics-dump metrics.json --send-timings
 """
 
+import os
 import time
 import argparse
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
-from eeg import EEGAcquisition, EEGPreprocessor, EEGFeatureExtractor, CognitiveAnalyzer
+from eeg import EEGAcquisition, EEGPreprocessor, EEGFeatureExtractor, CognitiveAnalyzer, create_acquisition
+from eeg.acquisition import resolve_eeg_streams
+from eeg.metrics import StageTimer, dump_metrics, serve_metrics
+from eeg.scheduler import HopScheduler
+from eeg.synthetic import SOURCES
 from config import (
     SAMPLING_RATE, CHUNK_DURATION, 
     LOWCUT_FREQ, HIGHCUT_FREQ, NOTCH_FREQ,
-    BACKEND_URL, EEG_ENDPOINT, EEG_INTERNAL_KEY
+    BACKEND_URL, EEG_ENDPOINT, EEG_INTERNAL_KEY,
+    STREAM_TYPE, STREAM_TIMEOUT, DSP_DTYPE,
+    WINDOW_SECONDS, HOP_SECONDS, MAX_CATCHUP_HOPS
 )
 
 
@@ -71,6 +93,42 @@ def get_backend_state(internal_state: str, fatigue_score: float) -> str:
     return "alert"
 
 
+# ===========================
+# SHARED DSP
+# ===========================
+class SharedDSP:
+    """
+    Preprocessor + feature extractor per sampling rate, shared antar stream.
+
+    Keduanya stateless setelah dibuat (koefisien filter, tabel band; buffer
+    kerja preprocessor disimpan per thread), jadi semua headset dengan
+    sampling rate sama memakai instance yang sama dan filter hanya didesain
+    sekali per proses. Presisi DSP mengikuti config.DSP_DTYPE. Analyzer
+    TIDAK dibagi.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_rate: Dict[float, Tuple[EEGPreprocessor, EEGFeatureExtractor]] = {}
+    
+    def get(self, sampling_rate: float) -> Tuple[EEGPreprocessor, EEGFeatureExtractor]:
+        """Preprocessor dan feature extractor untuk sampling rate ini."""
+        with self._lock:
+            if sampling_rate not in self._by_rate:
+                self._by_rate[sampling_rate] = (
+                    EEGPreprocessor(
+                        sampling_rate=sampling_rate,
+                        lowcut=LOWCUT_FREQ,
+                        highcut=HIGHCUT_FREQ,
+                        notch_freq=NOTCH_FREQ,
+                        driving_mode=True,
+                        dtype=DSP_DTYPE
+                    ),
+                    EEGFeatureExtractor(sampling_rate=sampling_rate, dtype=DSP_DTYPE)
+                )
+            return self._by_rate[sampling_rate]
+
+
 # ===========================
 # EEG SERVER CLASS
 # ===========================
@@ -85,7 +143,16 @@ class EEGStreamingServer:
         self,
         session_id: str,
         backend_url: str = None,
-        save_to_db: bool = False
+        save_to_db: bool = False,
+        source: str = "lsl",
+        replay_file: Optional[str] = None,
+        speed: float = 1.0,
+        acquisition=None,
+        shared_dsp: Optional["SharedDSP"] = None,
+        http: Optional[requests.Session] = None,
+        send_timings: bool = False,
+        metrics_port: Optional[int] = None,
+        metrics_dump: Optional[str] = None
     ):
         """
         Initialize EEG Streaming Server.
@@ -98,11 +165,37 @@ class EEGStreamingServer:
             URL backend Fumorive (default dari config.py)
         save_to_db : bool
             Apakah menyimpan ke database (untuk recording)
+        source : str
+            Sumber EEG: "lsl" (Muse 2), "synthetic" atau "replay"
+        replay_file : str or None
+            File rekaman (.csv / .xdf) untuk source="replay"
+        speed : float
+            Kecepatan synthetic / replay (1.0 = real time, <=0 = secepatnya)
+        acquisition : EEGAcquisition or None
+            Sumber EEG yang sudah dibuat (multi-headset), menggantikan `source`
+        shared_dsp : SharedDSP or None
+            Preprocessor / feature extractor bersama antar stream (multi-headset)
+        http : requests.Session or None
+            Koneksi HTTP (keep-alive) bersama, default session sendiri
+        send_timings : bool
+            Sertakan durasi tiap stage (ms) di payload ("timings")
+        metrics_port : int or None
+            Port lokal untuk GET /metrics (JSON), None = nonaktif
+        metrics_dump : str or None
+            File JSON yang ditulis ulang tiap 5 detik dengan metrics()
         """
         self.session_id = session_id
         self.backend_url = backend_url or BACKEND_URL
         self.save_to_db = save_to_db
         self.endpoint = f"{self.backend_url}{EEG_ENDPOINT}"
+        self.source = source
+        self.replay_file = replay_file
+        self.speed = speed
+        self.shared_dsp = shared_dsp
+        self.http = http or requests.Session()
+        self.send_timings = send_timings
+        self.metrics_port = metrics_port
+        self.metrics_dump = metrics_dump
         
         # Statistics
         self.samples_sent = 0
@@ -110,42 +203,40 @@ class EEGStreamingServer:
         self.consecutive_errors = 0
         self.last_clients_notified = 0
         self.zero_clients_warnings = 0
+        self.sends_replaced = 0  # payloads superseded before they were sent (multi-headset)
+        self.last_payload: Optional[dict] = None
         self.start_time = None
+        self.timer = StageTimer()
         
         # EEG Components (will be initialized on start)
-        self.eeg: Optional[EEGAcquisition] = None
+        self.eeg: Optional[EEGAcquisition] = acquisition
         self.preprocessor: Optional[EEGPreprocessor] = None
         self.extractor: Optional[EEGFeatureExtractor] = None
         self.analyzer: Optional[CognitiveAnalyzer] = None
+        self.scheduler: Optional[HopScheduler] = None
         
         logger.info("EEG Server initialized")
         logger.info(f"  Session ID: {session_id}")
         logger.info(f"  Backend: {self.backend_url}")
         logger.info(f"  Endpoint: {self.endpoint}")
+        logger.info(f"  EEG source: {source}" + (f" ({replay_file}, {speed:g}x)" if source == "replay" else ""))
     
     def _initialize_components(self):
         """Initialize EEG processing components."""
         logger.info("Initializing EEG components...")
         
-        # Acquisition
-        self.eeg = EEGAcquisition()
+        # Acquisition (Muse 2 via LSL, or synthetic / replay without headset)
+        if self.eeg is None:
+            self.eeg = create_acquisition(
+                self.source, replay_file=self.replay_file, speed=self.speed, dtype=DSP_DTYPE
+            )
         self.eeg.connect()
         
-        # Preprocessing
-        self.preprocessor = EEGPreprocessor(
-            sampling_rate=self.eeg.sampling_rate,
-            lowcut=LOWCUT_FREQ,
-            highcut=HIGHCUT_FREQ,
-            notch_freq=NOTCH_FREQ,
-            driving_mode=True
-        )
-        
-        # Feature extraction
-        self.extractor = EEGFeatureExtractor(
-            sampling_rate=self.eeg.sampling_rate
-        )
+        # Preprocessing + feature extraction (stateless, shared in multi-headset mode)
+        shared_dsp = self.shared_dsp or SharedDSP()
+        self.preprocessor, self.extractor = shared_dsp.get(self.eeg.sampling_rate)
         
-        # Cognitive analyzer
+        # Cognitive analyzer (stateful: always one per stream)
         self.analyzer = CognitiveAnalyzer()
         
         logger.info("EEG components initialized successfully")
@@ -180,13 +271,7 @@ class EEGStreamingServer:
         for i in range(num_samples):
             elapsed = (i + 1) * CHUNK_DURATION
             print(f"\r  ⏱️  Calibrating... {elapsed:.0f}/{duration:.0f}s", end="", flush=True)
-            
-            raw_data, _ = self.eeg.pull_chunk(duration=CHUNK_DURATION)
-            if raw_data.size > 0:
-                clean_data, quality = self.preprocessor.process(raw_data)
-                if clean_data.size > 0 and quality > 0.3:
-                    features = self.extractor.extract(clean_data)
-                    self.analyzer.add_calibration_sample(features)
+            self._calibration_step(self.eeg.pull_chunk(duration=CHUNK_DURATION)[0])
         
         print("")  # New line after progress
         logger.info("")
@@ -205,32 +290,77 @@ class EEGStreamingServer:
         else:
             logger.warning("⚠️ Calibration incomplete, using default thresholds")
     
+    def _calibration_step(self, raw_data: np.ndarray) -> None:
+        """Feed one raw chunk to the analyzer's calibration (if usable)."""
+        if raw_data.size > 0:
+            clean_data, quality = self.preprocessor.process(raw_data)
+            if clean_data.size > 0 and quality > 0.3:
+                features = self.extractor.extract(clean_data)
+                self.analyzer.add_calibration_sample(features)
+    
+    def _next_window(self, should_stop=None) -> Optional[np.ndarray]:
+        """
+        Wait for the next hop and return its raw window (None if stopped).
+        
+        Analysis fires every HOP_SECONDS of samples over the last
+        WINDOW_SECONDS, independent of how long processing / sending took;
+        when overloaded, hops older than MAX_CATCHUP_HOPS are skipped.
+        """
+        if self.scheduler is None:
+            self.scheduler = HopScheduler(self.eeg, WINDOW_SECONDS, HOP_SECONDS, MAX_CATCHUP_HOPS)
+        
+        skipped = self.scheduler.skipped
+        with self.timer.time("acquire"):
+            window = self.scheduler.next_window(should_stop)
+        if self.scheduler.skipped > skipped:
+            logger.warning(
+                f"⚠️ Pipeline tertinggal: {self.scheduler.skipped - skipped} hop dilewati "
+                f"(total {self.scheduler.skipped})"
+            )
+        return None if window is None else window[0]
+    
     def _process_chunk(self) -> Optional[dict]:
         """
-        Process one chunk of EEG data.
+        Acquire and process one window of EEG data.
+        
+        Returns
+        -------
+        dict or None
+            Processed data ready for backend, or None if invalid
+        """
+        # 1. Acquire (blocks until the next hop is due)
+        raw_data = self._next_window()
+        if raw_data is None:
+            return None
+        return self._analyze_chunk(raw_data)
+    
+    def _analyze_chunk(self, raw_data: np.ndarray) -> Optional[dict]:
+        """
+        Process one acquired chunk (steps 2-8 of _process_chunk).
         
         Returns
         -------
         dict or None
             Processed data ready for backend, or None if invalid
         """
-        # 1. Acquire
-        raw_data, timestamps = self.eeg.pull_chunk(duration=CHUNK_DURATION)
         if raw_data.size == 0:
             return None
         
         # 2. Preprocess
-        clean_data, quality = self.preprocessor.process(raw_data)
+        with self.timer.time("preprocess"):
+            clean_data, quality = self.preprocessor.process(raw_data)
         if clean_data.size == 0 or quality < 0.2:
             return None
         
         # 3. Extract features
-        features = self.extractor.extract(clean_data)
+        with self.timer.time("features"):
+            features = self.extractor.extract(clean_data)
         if not features:
             return None
         
         # 4. Analyze cognitive state
-        result = self.analyzer.analyze(features, signal_quality=quality)
+        with self.timer.time("analyze"):
+            result = self.analyzer.analyze(features, signal_quality=quality)
         
         # 5. Calculate fatigue score (0-100 scale for backend)
         theta_alpha = result['metrics'].get('theta_alpha', 1.0)
@@ -279,6 +409,10 @@ class EEGStreamingServer:
             "save_to_db": self.save_to_db
         }
         
+        # Durasi stage terakhir (send = pengiriman sebelumnya), untuk pipeline health di backend
+        if self.send_timings:
+            payload["timings"] = self.timer.last()
+        
         return payload
     
     def _send_to_backend(self, payload: dict) -> bool:
@@ -288,15 +422,16 @@ class EEGStreamingServer:
         Returns True if successful.
         """
         try:
-            response = requests.post(
-                self.endpoint,
-                json=payload,
-                timeout=2.0,
-                headers={
-                    "Content-Type": "application/json",
-                    "X-EEG-API-Key": EEG_INTERNAL_KEY
-                }
-            )
+            with self.timer.time("send"):
+                response = self.http.post(
+                    self.endpoint,
+                    json=payload,
+                    timeout=2.0,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-EEG-API-Key": EEG_INTERNAL_KEY
+                    }
+                )
             
             if response.status_code == 200:
                 self.samples_sent += 1
@@ -355,6 +490,20 @@ class EEGStreamingServer:
             logger.error(f"Send error: {e}")
             return False
     
+    def metrics(self) -> dict:
+        """Counters and per-stage timing summary (ms) for /metrics and dumps."""
+        return {
+            "session_id": self.session_id,
+            "uptime_s": round(time.time() - self.start_time, 1) if self.start_time else 0.0,
+            "samples_sent": self.samples_sent,
+            "errors": self.errors,
+            "clients_notified": self.last_clients_notified,
+            "sends_replaced": self.sends_replaced,
+            "hops": self.scheduler.hops if self.scheduler else 0,
+            "hops_skipped": self.scheduler.skipped if self.scheduler else 0,
+            "stages": self.timer.summary()
+        }
+    
     def start(self, calibrate: bool = True, calibration_duration: float = 10.0):
         """
         Start EEG streaming server.
@@ -370,7 +519,12 @@ class EEGStreamingServer:
         logger.info(" FUMORIVE EEG STREAMING SERVER")
         logger.info("=" * 60)
         
+        metrics_server = None
         try:
+            if self.metrics_port:
+                metrics_server = serve_metrics(self.metrics_port, self.metrics)
+                logger.info(f"Metrics: http://127.0.0.1:{self.metrics_port}/metrics")
+            
             # Initialize
             self._initialize_components()
             
@@ -403,6 +557,7 @@ class EEGStreamingServer:
             logger.info(" STREAMING TO BACKEND")
             logger.info("=" * 60)
             logger.info(f"Endpoint: {self.endpoint}")
+            logger.info(f"Window {WINDOW_SECONDS:g}s, analisis setiap {HOP_SECONDS:g}s")
             logger.info("Press Ctrl+C to stop")
             logger.info("")
             
@@ -430,10 +585,10 @@ class EEGStreamingServer:
                             f"Quality: {signal_quality:.2f} | "
                             f"Sent: {self.samples_sent} | {clients_str} | Errors: {self.errors}"
                         )
+                        logger.info(f"  Stages p50/p99: {self.timer.format()}")
+                        if self.metrics_dump:
+                            dump_metrics(self.metrics_dump, self.metrics())
                         last_log = now
-                
-                # Control rate
-                time.sleep(0.5)
         
         except KeyboardInterrupt:
             logger.info("")
@@ -442,6 +597,10 @@ class EEGStreamingServer:
         finally:
             if self.eeg:
                 self.eeg.close()
+            if metrics_server:
+                metrics_server.shutdown()
+            if self.metrics_dump:
+                dump_metrics(self.metrics_dump, self.metrics())
             
             # Print summary
             elapsed = time.time() - self.start_time if self.start_time else 0
@@ -452,6 +611,319 @@ class EEGStreamingServer:
             logger.info(f"Duration: {elapsed:.1f} seconds")
             logger.info(f"Samples sent: {self.samples_sent}")
             logger.info(f"Errors: {self.errors}")
+            if self.timer.summary():
+                logger.info(f"Stages p50/p99: {self.timer.format()}")
+            logger.info("Server stopped cleanly")
+
+
+# ===========================
+# MULTI-HEADSET SERVER
+# ===========================
+class MultiStreamServer:
+    """
+    Satu proses untuk banyak headset: setiap stream EEG dipetakan ke satu
+    session backend, masing-masing dengan analyzer (baseline, hysteresis)
+    sendiri.
+    
+    - Acquisition : satu thread per stream, menunggu hop berikutnya di
+                    inlet LSL (eeg.scheduler, CPU idle di antara hop)
+    - DSP         : thread pool bersama, default sebanyak core CPU
+                    (filter / FFT numpy-scipy melepas GIL)
+    - Network     : thread pool kecil dengan satu requests.Session
+                    (keep-alive, connection pool) untuk semua session;
+                    per stream maksimal satu send in-flight, payload yang
+                    belum terkirim diganti payload terbaru (urutan tetap,
+                    antrean tidak tumbuh kalau backend lambat)
+    - Filter      : preprocessor / extractor dibagi per sampling rate (SharedDSP)
+    """
+    
+    def __init__(
+        self,
+        sessions: List[str],
+        backend_url: str = None,
+        save_to_db: bool = False,
+        source: str = "lsl",
+        replay_file: Optional[str] = None,
+        speed: float = 1.0,
+        workers: Optional[int] = None,
+        send_timings: bool = False,
+        metrics_port: Optional[int] = None,
+        metrics_dump: Optional[str] = None
+    ):
+        """
+        Initialize multi-headset server.
+        
+        Parameters
+        ----------
+        sessions : list of str
+            Session UUID per headset. "KEY=UUID" mengikat stream dengan LSL
+            source id / nama KEY; UUID tanpa KEY dipakai untuk stream sisanya
+            sesuai urutan (stream diurutkan menurut source id)
+        backend_url, save_to_db, source, replay_file, speed
+            Sama seperti EEGStreamingServer. Untuk synthetic / replay dibuat
+            satu sumber per session.
+        workers : int or None
+            Thread DSP (default: jumlah core CPU)
+        send_timings, metrics_port, metrics_dump
+            Sama seperti EEGStreamingServer; /metrics dan dump berisi
+            semua stream
+        """
+        self.sessions = sessions
+        self.backend_url = backend_url or BACKEND_URL
+        self.save_to_db = save_to_db
+        self.source = source
+        self.replay_file = replay_file
+        self.speed = speed
+        self.workers = workers or os.cpu_count() or 1
+        self.send_timings = send_timings
+        self.metrics_port = metrics_port
+        self.metrics_dump = metrics_dump
+        
+        self.shared_dsp = SharedDSP()
+        self.http = requests.Session()
+        self.streams: List[EEGStreamingServer] = []
+        self.start_time = None
+        self._stop = threading.Event()
+        self._dsp_pool: Optional[ThreadPoolExecutor] = None
+        self._send_pool: Optional[ThreadPoolExecutor] = None
+        self._send_lock = threading.Lock()
+        self._pending_sends: Dict[EEGStreamingServer, dict] = {}  # newest unsent payload per stream
+        self._sending: set = set()  # streams with a send job in the pool
+    
+    @staticmethod
+    def _split_session(entry: str) -> Tuple[Optional[str], str]:
+        """'KEY=UUID' -> (KEY, UUID), 'UUID' -> (None, UUID)."""
+        key, sep, session_id = entry.rpartition("=")
+        return (key, session_id) if sep else (None, entry)
+    
+    def _bind_streams(self) -> List[Tuple[str, str, object]]:
+        """
+        Map EEG sources to sessions.
+        
+        Returns
+        -------
+        list of (label, session_id, acquisition)
+        """
+        entries = [self._split_session(e) for e in self.sessions]
+        
+        if self.source != "lsl":
+            bindings = []
+            for i, (_, session_id) in enumerate(entries):
+                kwargs = {"seed": i} if self.source == "synthetic" else {}
+                acq = create_acquisition(
+                    self.source, replay_file=self.replay_file, speed=self.speed, dtype=DSP_DTYPE, **kwargs
+                )
+                bindings.append((f"{self.source}-{i}", session_id, acq))
+            return bindings
+        
+        logger.info(f"Resolving {STREAM_TYPE} LSL streams ({STREAM_TIMEOUT}s)...")
+        infos = resolve_eeg_streams(STREAM_TYPE, STREAM_TIMEOUT)
+        logger.info(f"Found {len(infos)} EEG stream(s)")
+        
+        keyed = {key: session_id for key, session_id in entries if key}
+        unkeyed = [session_id for key, session_id in entries if not key]
+        
+        bindings = []
+        for info in infos:
+            label = info.source_id() or info.name()
+            key = next((k for k in (info.source_id(), info.name()) if k in keyed), None)
+            if key is not None:
+                session_id = keyed.pop(key)
+            elif unkeyed:
+                session_id = unkeyed.pop(0)
+            else:
+                logger.warning(f"⚠️ Stream '{label}' tidak punya session - dilewati")
+                continue
+            bindings.append((label, session_id, EEGAcquisition(stream_info=info, dtype=DSP_DTYPE)))
+        
+        for key in keyed:
+            logger.warning(f"⚠️ Tidak ada stream EEG dengan source id / nama '{key}'")
+        if unkeyed:
+            logger.warning(f"⚠️ {len(unkeyed)} session tanpa stream EEG")
+        if not bindings:
+            raise RuntimeError("No EEG LSL stream found. Is muselsl stream running?")
+        return bindings
+    
+    def _run_stream(self, label: str, stream: EEGStreamingServer, calibrate: bool, calibration_duration: float):
+        """Acquisition loop for one headset (runs in its own thread)."""
+        try:
+            if calibrate:
+                stream.analyzer.start_calibration()
+                for _ in range(int(calibration_duration / CHUNK_DURATION)):
+                    if self._stop.is_set():
+                        return
+                    raw_data, _ = stream.eeg.pull_chunk(duration=CHUNK_DURATION)
+                    self._dsp_pool.submit(stream._calibration_step, raw_data).result()
+                if stream.analyzer.calibrated:
+                    logger.info(f"[{label}] ✅ Calibration complete "
+                                f"(θ/α {stream.analyzer.baseline['theta_alpha']:.3f})")
+                else:
+                    logger.warning(f"[{label}] ⚠️ Calibration incomplete, using default thresholds")
+            
+            stream.start_time = time.time()
+            while not self._stop.is_set():
+                raw_data = stream._next_window(self._stop.is_set)
+                if raw_data is None:
+                    break
+                payload = self._dsp_pool.submit(stream._analyze_chunk, raw_data).result()
+                if payload:
+                    stream.last_payload = payload
+                    self._queue_send(stream, payload)
+        except Exception as e:
+            logger.error(f"[{label}] Stream stopped: {e}")
+    
+    def _queue_send(self, stream: EEGStreamingServer, payload: dict):
+        """
+        Hand a payload to the send pool, at most one in-flight send per stream.
+        
+        While a send for the stream is running, the payload waits in its
+        slot; a newer payload replaces it (only the latest state matters
+        to the game), so sends stay in order and never pile up.
+        """
+        with self._send_lock:
+            if stream in self._pending_sends:
+                stream.sends_replaced += 1
+            self._pending_sends[stream] = payload
+            if stream in self._sending:
+                return
+            self._sending.add(stream)
+        self._send_pool.submit(self._drain_sends, stream)
+    
+    def _drain_sends(self, stream: EEGStreamingServer):
+        """Send job: deliver the stream's pending payload until none is left."""
+        while True:
+            with self._send_lock:
+                payload = self._pending_sends.pop(stream, None)
+                if payload is None:
+                    self._sending.discard(stream)
+                    return
+            stream._send_to_backend(payload)
+    
+    def _log_status(self, labels: List[str]):
+        elapsed = time.time() - self.start_time
+        for label, stream in zip(labels, self.streams):
+            payload = stream.last_payload
+            fatigue = f"{payload['processed']['eeg_fatigue_score']:.0f}%" if payload else "-"
+            logger.info(
+                f"[{elapsed:.0f}s] {label} → {stream.session_id[:8]} | Fatigue: {fatigue} | "
+                f"Sent: {stream.samples_sent} | Clients: {stream.last_clients_notified} | "
+                f"Errors: {stream.errors}"
+            )
+            logger.info(f"  Stages p50/p99: {stream.timer.format()}")
+    
+    def metrics(self, labels: Optional[List[str]] = None) -> dict:
+        """metrics() of every stream, keyed by stream label."""
+        labels = labels or [stream.session_id for stream in self.streams]
+        return {
+            "uptime_s": round(time.time() - self.start_time, 1) if self.start_time else 0.0,
+            "streams": {label: stream.metrics() for label, stream in zip(labels, self.streams)}
+        }
+    
+    def start(self, calibrate: bool = True, calibration_duration: float = 10.0):
+        """
+        Start streaming all headsets (blocks until Ctrl+C).
+        
+        Parameters
+        ----------
+        calibrate : bool
+            Run calibration phase (per headset, in parallel) before streaming
+        calibration_duration : float
+            Duration of calibration in seconds
+        """
+        logger.info("=" * 60)
+        logger.info(" FUMORIVE EEG STREAMING SERVER (MULTI-HEADSET)")
+        logger.info("=" * 60)
+        
+        threads = []
+        labels = []
+        metrics_server = None
+        try:
+            bindings = self._bind_streams()
+            
+            for label, session_id, acq in bindings:
+                stream = EEGStreamingServer(
+                    session_id=session_id,
+                    backend_url=self.backend_url,
+                    save_to_db=self.save_to_db,
+                    source=self.source,
+                    replay_file=self.replay_file,
+                    speed=self.speed,
+                    acquisition=acq,
+                    shared_dsp=self.shared_dsp,
+                    http=self.http,
+                    send_timings=self.send_timings
+                )
+                stream._initialize_components()
+                self.streams.append(stream)
+                labels.append(label)
+            
+            # One pooled connection per concurrent send
+            send_workers = min(len(self.streams), 8)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=send_workers)
+            self.http.mount("http://", adapter)
+            self.http.mount("https://", adapter)
+            self._dsp_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="eeg-dsp")
+            self._send_pool = ThreadPoolExecutor(max_workers=send_workers, thread_name_prefix="eeg-send")
+            
+            logger.info("")
+            logger.info(f"Streaming {len(self.streams)} headset(s) → {self.backend_url}{EEG_ENDPOINT}")
+            logger.info(f"DSP workers: {self.workers} | Send workers: {send_workers}")
+            for label, stream in zip(labels, self.streams):
+                logger.info(f"  {label} → session {stream.session_id}")
+            if self.metrics_port:
+                metrics_server = serve_metrics(self.metrics_port, lambda: self.metrics(labels))
+                logger.info(f"Metrics: http://127.0.0.1:{self.metrics_port}/metrics")
+            logger.info("Press Ctrl+C to stop")
+            logger.info("")
+            
+            self.start_time = time.time()
+            for label, stream in zip(labels, self.streams):
+                thread = threading.Thread(
+                    target=self._run_stream,
+                    args=(label, stream, calibrate, calibration_duration),
+                    name=f"eeg-{label}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+            
+            last_log = time.time()
+            while any(t.is_alive() for t in threads):
+                time.sleep(0.5)
+                if time.time() - last_log >= 5.0:
+                    self._log_status(labels)
+                    if self.metrics_dump:
+                        dump_metrics(self.metrics_dump, self.metrics(labels))
+                    last_log = time.time()
+        
+        except KeyboardInterrupt:
+            logger.info("")
+            logger.info("Stopping EEG server...")
+        
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=CHUNK_DURATION + 1.0)
+            for pool in (self._dsp_pool, self._send_pool):
+                if pool:
+                    pool.shutdown(wait=True)
+            for stream in self.streams:
+                if stream.eeg:
+                    stream.eeg.close()
+            if metrics_server:
+                metrics_server.shutdown()
+            if self.metrics_dump and self.streams:
+                dump_metrics(self.metrics_dump, self.metrics(labels))
+            
+            elapsed = time.time() - self.start_time if self.start_time else 0
+            logger.info("")
+            logger.info("=" * 60)
+            logger.info(" SESSION SUMMARY")
+            logger.info("=" * 60)
+            logger.info(f"Duration: {elapsed:.1f} seconds")
+            for label, stream in zip(labels, self.streams):
+                logger.info(f"{label} → {stream.session_id}: sent {stream.samples_sent}, errors {stream.errors}")
+                logger.info(f"  Stages p50/p99: {stream.timer.format()}")
             logger.info("Server stopped cleanly")
 
 
@@ -467,18 +939,26 @@ Examples:
   python server.py --session-id 123e4567-e89b-12d3-a456-426614174000
   python server.py --session-id <UUID> --save-db
   python server.py --session-id <UUID> --no-calibrate
+  python server.py --session-id <UUID> --source synthetic --speed 2
+  python server.py --session-id <UUID> --source replay --replay-file recordings/rec.csv
+  python server.py --multi --session-id <UUID_1> --session-id <UUID_2>
+  python server.py --multi --session-id Muse-1A2B=<UUID_1> --session-id Muse-3C4D=<UUID_2> --workers 4
+  python server.py --session-id <UUID> --metrics-port 9100 --send-timings
 
 Note:
   - Session ID harus UUID yang valid dari backend
   - Pastikan 'muselsl stream' sudah berjalan sebelum menjalankan server
+    (kecuali --source synthetic / replay)
   - Pastikan backend Fumorive sudah berjalan (uvicorn main:app --reload)
         """
     )
     parser.add_argument(
         "--session-id",
         type=str,
+        action="append",
         required=True,
-        help="Session UUID dari backend (required)"
+        help="Session UUID dari backend (required). Dengan --multi boleh diulang, "
+             "atau KEY=UUID untuk mengikat ke LSL source id / nama stream"
     )
     parser.add_argument(
         "--backend-url",
@@ -502,14 +982,66 @@ Note:
         default=10.0,
         help="Durasi kalibrasi dalam detik (default: 10)"
     )
+    parser.add_argument(
+        "--source",
+        choices=SOURCES,
+        default="lsl",
+        help="Sumber EEG: lsl (Muse 2), synthetic, atau replay (default: lsl)"
+    )
+    parser.add_argument(
+        "--replay-file",
+        type=str,
+        default=None,
+        help="File rekaman .csv / .xdf untuk --source replay"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Kecepatan synthetic / replay (1.0 = real time, 0 = secepatnya)"
+    )
+    parser.add_argument(
+        "--multi",
+        action="store_true",
+        help="Multi-headset: semua stream EEG dalam satu proses, satu --session-id per stream"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Thread DSP untuk --multi (default: jumlah core CPU)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Port lokal untuk GET /metrics: durasi stage (p50/p90/p99) dalam JSON"
+    )
+    parser.add_argument(
+        "--metrics-dump",
+        type=str,
+        default=None,
+        help="Tulis metrics JSON ke file ini setiap 5 detik"
+    )
+    parser.add_argument(
+        "--send-timings",
+        action="store_true",
+        help="Kirim durasi stage per chunk ke backend (pipeline health di /eeg/status)"
+    )
     
     args = parser.parse_args()
     
+    if args.source == "replay" and not args.replay_file:
+        parser.error("--replay-file wajib untuk --source replay")
+    if len(args.session_id) > 1 and not args.multi:
+        parser.error("--session-id lebih dari satu hanya untuk --multi")
+    
     # Validate session_id format (basic UUID check)
-    if len(args.session_id) < 32:
-        logger.error("Session ID harus berupa UUID yang valid")
-        logger.error("Contoh: 123e4567-e89b-12d3-a456-426614174000")
-        return
+    for entry in args.session_id:
+        if len(MultiStreamServer._split_session(entry)[1]) < 32:
+            logger.error("Session ID harus berupa UUID yang valid")
+            logger.error("Contoh: 123e4567-e89b-12d3-a456-426614174000")
+            return
     
     # Print banner
     print("""
@@ -519,11 +1051,31 @@ Note:
     ╚══════════════════════════════════════════════════════════╝
     """)
     
-    server = EEGStreamingServer(
-        session_id=args.session_id,
-        backend_url=args.backend_url,
-        save_to_db=args.save_db
-    )
+    if args.multi:
+        server = MultiStreamServer(
+            sessions=args.session_id,
+            backend_url=args.backend_url,
+            save_to_db=args.save_db,
+            source=args.source,
+            replay_file=args.replay_file,
+            speed=args.speed,
+            workers=args.workers,
+            send_timings=args.send_timings,
+            metrics_port=args.metrics_port,
+            metrics_dump=args.metrics_dump
+        )
+    else:
+        server = EEGStreamingServer(
+            session_id=args.session_id[0],
+            backend_url=args.backend_url,
+            save_to_db=args.save_db,
+            source=args.source,
+            replay_file=args.replay_file,
+            speed=args.speed,
+            send_timings=args.send_timings,
+            metrics_port=args.metrics_port,
+            metrics_dump=args.metrics_dump
+        )
     
     server.start(
         calibrate=not args.no_calibrate,
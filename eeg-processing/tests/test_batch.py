@@ -0,0 +1,161 @@
+"""
+test_batch.py
+==============
+Unit tests for offline batch re-analysis (eeg/batch.py).
+
+Usage:
+    cd eeg-processing
+    python -m pytest tests/test_batch.py -v
+"""
+
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg.analysis import CognitiveAnalyzer
+from eeg.batch import frame_windows, rescore_file, rescore_files, rescore_recording, summarize
+from eeg.features import EEGFeatureExtractor
+from eeg.preprocessing import EEGPreprocessor
+from eeg.synthetic import SyntheticEEGAcquisition
+from utils import save_eeg_to_csv
+
+FS = 256.0
+
+
+def make_recording(seconds: float = 120.0, seed: int = 4):
+    """Synthetic drive that gets drowsy, with blinks and motion artifacts."""
+    eeg = SyntheticEEGAcquisition(speed=0, seed=seed, drowsy_after=seconds / 2,
+                                  blink_rate=20, motion_rate=4)
+    with redirect_stdout(io.StringIO()):
+        eeg.connect()
+    return eeg.pull_chunk(seconds)
+
+
+def test_frame_windows_is_a_view():
+    """Windows are (windows, samples, channels) slices of the recording, not copies."""
+    data = np.arange(10 * 3, dtype=float).reshape(10, 3)
+    frames, starts = frame_windows(data, fs=2.0, window=2.0, hop=1.0)
+
+    assert frames.shape == (4, 4, 3)
+    assert list(starts) == [0, 2, 4, 6]
+    assert np.array_equal(frames[1], data[2:6])
+    assert np.shares_memory(frames, data)
+    assert frame_windows(data, fs=2.0, window=10.0)[0].shape[0] == 0
+
+
+def test_batched_stages_match_per_window():
+    """process_batch / batched extract give the per-window results."""
+    data, _ = make_recording(20.0)
+    frames, _ = frame_windows(data, FS)
+    pre = EEGPreprocessor(sampling_rate=FS)
+    ext = EEGFeatureExtractor(sampling_rate=FS)
+
+    clean, quality = pre.process_batch(np.ascontiguousarray(frames))
+    features = ext.extract(clean)
+
+    for i, frame in enumerate(frames):
+        one_clean, one_quality = pre.process(frame.copy())
+        one_features = ext.extract(one_clean)
+        assert np.allclose(clean[i], one_clean, rtol=1e-10, atol=1e-12)
+        assert quality[i] == pytest.approx(one_quality, rel=1e-12)
+        for key, value in one_features.items():
+            assert np.allclose(features[key][i], value, rtol=1e-10)
+
+
+def test_rescore_matches_live_loop():
+    """Batch rescoring reproduces the live pipeline, hysteresis included."""
+    data, ts = make_recording()
+    result = rescore_recording(data, FS, ts)
+
+    frames, starts = frame_windows(data, FS)
+    times = ts[starts + frames.shape[1] - 1]
+    pre = EEGPreprocessor(sampling_rate=FS)
+    ext = EEGFeatureExtractor(sampling_rate=FS)
+    analyzer = CognitiveAnalyzer()
+    analyzer._state_entered_at = times[0]
+    with redirect_stdout(io.StringIO()):
+        analyzer.start_calibration()
+        for frame in frames[:5]:
+            clean, quality = pre.process(frame.copy())
+            if quality > 0.3:
+                analyzer.add_calibration_sample(ext.extract(clean))
+
+    live = []
+    for frame, now in zip(frames, times):
+        clean, quality = pre.process(frame.copy())
+        live.append(analyzer.analyze(ext.extract(clean), quality, now=now))
+
+    assert list(result["state"]) == [r["state"] for r in live]
+    assert len(set(result["state"])) > 1
+    for i, r in enumerate(live):
+        assert round(result["confidence"][i], 2) == pytest.approx(r["confidence"], abs=0.011)
+        if r["state"] != "unknown":
+            assert round(result["theta_alpha"][i], 3) == pytest.approx(r["metrics"]["theta_alpha"], abs=1e-3)
+
+
+def test_batches_continue_the_same_history():
+    """Splitting a recording into several analyze_batch calls changes nothing."""
+    data, ts = make_recording(60.0)
+    whole = rescore_recording(data, FS, ts)
+
+    import eeg.batch as batch
+    original = batch.BLOCK_WINDOWS
+    batch.BLOCK_WINDOWS = 4
+    try:
+        blocked = rescore_recording(data, FS, ts)
+    finally:
+        batch.BLOCK_WINDOWS = original
+
+    assert list(blocked["state"]) == list(whole["state"])
+    assert np.allclose(blocked["variability"], whole["variability"])
+
+
+def test_overrides_change_scoring_not_class_defaults():
+    """Threshold overrides apply to the rescore only."""
+    data, ts = make_recording(60.0)
+    default = rescore_recording(data, FS, ts)
+    strict = rescore_recording(data, FS, ts, thresholds={"fatigue": {"theta_alpha_min": 50.0}})
+
+    assert "fatigue" in set(default["state"])
+    assert "fatigue" not in set(strict["state"])
+    assert CognitiveAnalyzer.THRESHOLDS["fatigue"]["theta_alpha_min"] == 1.4
+    with pytest.raises(ValueError):
+        rescore_recording(data, FS, ts, hysteresis={"sleepy": {"hold_sec": 1}})
+
+
+def test_rescore_files_summary(tmp_path):
+    """Files are loaded, rescored (in a process pool) and summarized in order."""
+    paths = []
+    for seed in (1, 2):
+        data, ts = make_recording(30.0, seed=seed)
+        path = str(tmp_path / f"drive{seed}.csv")
+        save_eeg_to_csv(data, ts, ["TP9", "AF7", "AF8", "TP10", "AUX"], path)
+        paths.append(path)
+
+    results = rescore_files(paths, workers=2)
+    single = rescore_file(paths[0])
+
+    assert [r["path"] for r in results] == paths
+    summary = results[0]["summary"]
+    assert summary["windows"] == 15
+    assert summary["duration_s"] == pytest.approx(30.0, abs=0.1)
+    assert sum(summary["states"].values()) == 15
+    assert summary["calibrated"]
+    assert list(results[0]["result"]["state"]) == list(single["result"]["state"])
+
+
+def test_summary_duration_with_overlapping_windows():
+    """With hop < window the duration is the covered span, not windows * window."""
+    data, ts = make_recording(30.0)
+    result = rescore_recording(data, FS, ts, window=2.0, hop=0.5)
+
+    summary = summarize(result, window=2.0)
+    assert summary["windows"] == 57
+    assert summary["duration_s"] == pytest.approx(30.0, abs=0.1)
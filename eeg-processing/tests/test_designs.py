@@ -0,0 +1,85 @@
+"""
+test_designs.py
+================
+Unit tests for the shared DSP design cache (eeg/designs.py).
+
+Usage:
+    cd eeg-processing
+    python -m pytest tests/test_designs.py -v
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+from scipy.signal import butter, freqz_zpk, sosfreqz, welch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg import designs
+from eeg.features import EEGFeatureExtractor
+from eeg.preprocessing import EEGPreprocessor
+
+
+def test_instances_share_designs():
+    """Processors with the same parameters reuse one design, others get their own."""
+    a = EEGPreprocessor(sampling_rate=256.0)
+    b = EEGPreprocessor(sampling_rate=256.0)
+    c = EEGPreprocessor(sampling_rate=512.0)
+
+    assert a._bandpass_sos is b._bandpass_sos
+    assert a._notch_sos is b._notch_sos
+    assert a._bandpass_sos is not c._bandpass_sos
+    assert EEGPreprocessor(sampling_rate=256.0, notch_freq=None)._notch_sos is None
+
+
+@pytest.mark.parametrize("fs", [128.0, 256.0, 512.0])
+def test_bandpass_sos_matches_transfer_function(fs):
+    """The SOS bandpass has the exact Butterworth response (zeros / poles form)."""
+    # Reference from zpk: the old (b, a) form drifts at high fs / low cutoff
+    z, p, k = butter(4, [1.0 / (fs / 2), 30.0 / (fs / 2)], btype="bandpass", output="zpk")
+    _, h_ref = freqz_zpk(z, p, k, worN=512, fs=fs)
+    _, h_sos = sosfreqz(designs.bandpass_sos(fs, 1.0, 30.0, 4), worN=512, fs=fs)
+
+    assert np.allclose(np.abs(h_sos), np.abs(h_ref), atol=1e-9)
+
+
+def test_welch_window_and_bins_match_scipy():
+    """Cached window / bin map give the same band powers as the per-call design."""
+    fs, nperseg = 256.0, 256
+    x = np.random.default_rng(0).normal(size=(512, 4))
+    bands = EEGFeatureExtractor(sampling_rate=fs).bands
+
+    freqs, psd = welch(x, fs=fs, nperseg=nperseg, axis=0)
+    cached_freqs, bins = designs.band_bins(fs, nperseg, designs.band_key(bands))
+    _, cached_psd = welch(x, fs=fs, window=designs.welch_window(nperseg), nperseg=nperseg, axis=0)
+
+    assert np.array_equal(cached_freqs, freqs)
+    assert np.array_equal(cached_psd, psd)
+    for band, (low, high) in bands.items():
+        mask = (freqs >= low) & (freqs <= high)
+        assert np.array_equal(cached_freqs[bins[band]], freqs[mask])
+
+
+def test_shared_arrays_are_read_only():
+    """Windows and frequency maps cannot be modified by one of their users."""
+    window = designs.welch_window(128)
+    freqs, _ = designs.band_bins(128.0, 128, (("alpha", 8.0, 13.0),))
+
+    with pytest.raises(ValueError):
+        window[0] = 1.0
+    with pytest.raises(ValueError):
+        freqs[0] = 1.0
+
+
+def test_short_window_uses_full_length_segment():
+    """Windows shorter than nperseg behave like scipy's welch (one shorter segment)."""
+    fs = 256.0
+    data = np.random.default_rng(1).normal(size=(128, 3))
+    features = EEGFeatureExtractor(sampling_rate=fs, nperseg=256).extract(data)
+
+    freqs, psd = welch(data, fs=fs, nperseg=128, axis=0)
+    mask = (freqs >= 8) & (freqs <= 13)
+    assert np.allclose(features["alpha"], np.trapz(psd[mask], freqs[mask], axis=0))
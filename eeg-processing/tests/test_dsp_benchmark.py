@@ -0,0 +1,328 @@
+"""
+test_dsp_benchmark.py
+======================
+Benchmark suite for the EEG DSP pipeline (no headset / LSL required).
+
+Drives EEGPreprocessor.process, EEGFeatureExtractor.extract and
+CognitiveAnalyzer.analyze with synthetic multi-channel signals of known
+band content, and measures per-stage latency and peak allocations
+(tracemalloc) across window sizes, sampling rates and channel counts.
+
+Each stage has a latency and allocation budget for the reference window
+(2 s @ 256 Hz, 5 channels - what server.py processes every cycle), scaled
+with window size and channel count for the other grid points, so a
+regression shows up as a failed test instead of a slow driver laptop.
+
+Wall-clock budgets depend on the machine, so only the band-recovery
+sanity tests run by default; latency, allocation and pytest-benchmark
+tests need EEG_BENCH=1.
+
+Usage:
+    cd eeg-processing
+    EEG_BENCH=1 python -m pytest tests/test_dsp_benchmark.py -v
+
+    # with pytest-benchmark installed, also records comparable stats:
+    EEG_BENCH=1 python -m pytest tests/test_dsp_benchmark.py --benchmark-autosave
+    EEG_BENCH=1 python -m pytest tests/test_dsp_benchmark.py --benchmark-compare
+
+    # print the latency / allocation table only:
+    python tests/test_dsp_benchmark.py
+
+Environment:
+    EEG_BENCH         Set to 1 to run the budget and benchmark tests.
+    EEG_BENCH_SLACK   Multiplier for all latency budgets (default 1.0).
+                      Raise on slow CI runners instead of editing budgets.
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg.preprocessing import EEGPreprocessor
+from eeg.features import EEGFeatureExtractor
+from eeg.analysis import CognitiveAnalyzer
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+
+# =========================
+# BENCHMARK GRID
+# =========================
+WINDOW_SECONDS = [1.0, 2.0, 4.0]
+SAMPLING_RATES = [128.0, 256.0, 512.0]
+CHANNEL_COUNTS = [4, 5, 8]
+
+REFERENCE = {"window": 2.0, "fs": 256.0, "channels": 5}
+REFERENCE_SIZE = int(REFERENCE["window"] * REFERENCE["fs"]) * REFERENCE["channels"]
+
+# Budgets for the reference window (~4x a mid-range laptop). Latency in ms
+# (median of REPEAT runs); allocations as peak traced bytes per input byte
+# (float64 samples), never below a fixed floor for per-call overhead.
+STAGE_BUDGETS = {
+    "preprocess": {"ms": 10.0, "alloc_ratio": 8.0, "alloc_floor": 96 * 1024},
+    "features":   {"ms": 12.0, "alloc_ratio": 4.0, "alloc_floor": 96 * 1024},
+    "analyze":    {"ms": 1.5,  "alloc_ratio": 0.0, "alloc_floor": 32 * 1024},
+}
+
+SLACK = float(os.environ.get("EEG_BENCH_SLACK", "1.0"))
+REPEAT = 15
+
+# Machine-dependent tests are opt-in
+benchmark_only = pytest.mark.skipif(
+    os.environ.get("EEG_BENCH") != "1",
+    reason="latency / allocation budgets: set EEG_BENCH=1"
+)
+
+
+# =========================
+# SYNTHETIC SIGNALS
+# =========================
+# Dominant frequency (Hz) per band, inside FREQ_BANDS and away from edges
+BAND_TONES = {
+    "delta": 2.5,
+    "theta": 6.0,
+    "alpha": 10.0,
+    "beta": 20.0,
+    "gamma": 38.0,
+}
+
+
+def make_signal(
+    fs: float,
+    seconds: float,
+    channels: int,
+    dominant: str = "alpha",
+    amplitude_uv: float = 20.0,
+    noise_uv: float = 2.0,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Synthetic Muse-like EEG window with known band content.
+
+    Every channel carries all band tones at a low level plus a strong tone
+    in the `dominant` band, a slow DC drift, 50 Hz mains hum and white noise.
+
+    Returns
+    -------
+    np.ndarray
+        EEG data (samples, channels) in microvolts
+    """
+    rng = np.random.default_rng(seed)
+    n = int(fs * seconds)
+    t = np.arange(n) / fs
+
+    data = np.empty((n, channels))
+    for ch in range(channels):
+        phase = rng.uniform(0, 2 * np.pi, size=len(BAND_TONES))
+        signal = np.zeros(n)
+        for (band, freq), ph in zip(BAND_TONES.items(), phase):
+            if freq >= fs / 2:
+                continue
+            amp = amplitude_uv if band == dominant else amplitude_uv * 0.1
+            signal += amp * np.sin(2 * np.pi * freq * t + ph)
+        signal += 800.0 + 5.0 * t                      # electrode offset + drift
+        if fs > 100:
+            signal += 3.0 * np.sin(2 * np.pi * 50.0 * t)  # mains hum
+        signal += rng.normal(0, noise_uv, n)
+        data[:, ch] = signal
+    return data
+
+
+# =========================
+# MEASUREMENT HELPERS
+# =========================
+def measure_latency(fn, repeat: int = REPEAT) -> float:
+    """Median wall time of one call, in milliseconds (after one warm-up)."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000
+
+
+def measure_peak_alloc(fn) -> int:
+    """Peak bytes allocated by one call, as seen by tracemalloc."""
+    fn()  # warm caches / lazy imports outside the traced region
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def latency_budget(stage: str, size: Tuple[int, int]) -> float:
+    """
+    Latency budget (ms) for a window of shape `size` (samples, channels).
+
+    Both preprocessing and feature extraction loop over channels, so the
+    budget scales with whichever grows more: total values or channel count.
+    """
+    samples, channels = size
+    scale = max(
+        samples * channels / REFERENCE_SIZE,
+        channels / REFERENCE["channels"],
+        1.0
+    )
+    return STAGE_BUDGETS[stage]["ms"] * scale * SLACK
+
+
+def alloc_budget(stage: str, size: Tuple[int, int]) -> int:
+    """Peak allocation budget (bytes) for a float64 window of shape `size`."""
+    budget = STAGE_BUDGETS[stage]
+    samples, channels = size
+    return int(max(budget["alloc_ratio"] * samples * channels * 8, budget["alloc_floor"]))
+
+
+def build_stages(fs: float, data: np.ndarray):
+    """Stage callables for one window, each fed the previous stage's real output."""
+    preprocessor = EEGPreprocessor(sampling_rate=fs, driving_mode=True)
+    # Short windows: match the Welch segment to the window instead of
+    # benchmarking scipy's "nperseg > signal length" warning path
+    extractor = EEGFeatureExtractor(sampling_rate=fs, nperseg=min(256, len(data)))
+    analyzer = CognitiveAnalyzer()
+
+    clean, quality = preprocessor.process(data.copy())
+    features = extractor.extract(clean)
+
+    return {
+        # process() attenuates artifacts in place - always hand it a fresh copy
+        "preprocess": lambda: preprocessor.process(data.copy()),
+        "features": lambda: extractor.extract(clean),
+        "analyze": lambda: analyzer.analyze(features, signal_quality=quality),
+    }
+
+
+GRID = [
+    pytest.param(w, fs, ch, id=f"{w:g}s-{fs:g}Hz-{ch}ch")
+    for w in WINDOW_SECONDS
+    for fs in SAMPLING_RATES
+    for ch in CHANNEL_COUNTS
+]
+
+
+# =========================
+# SANITY: KNOWN BAND CONTENT
+# =========================
+@pytest.mark.parametrize("dominant", ["theta", "alpha", "beta"])
+def test_synthetic_band_is_recovered(dominant):
+    """The pipeline finds the band we injected - benchmarks run on meaningful data."""
+    fs = REFERENCE["fs"]
+    data = make_signal(fs, REFERENCE["window"], REFERENCE["channels"], dominant=dominant)
+
+    clean, quality = EEGPreprocessor(sampling_rate=fs).process(data)
+    features = EEGFeatureExtractor(sampling_rate=fs).extract(clean)
+
+    assert quality > 0.2
+    powers = {band: float(np.mean(features[band])) for band in ("theta", "alpha", "beta")}
+    assert max(powers, key=powers.get) == dominant
+
+
+def test_ratios_follow_band_content():
+    """θ/α rises for a theta-heavy window and falls for an alpha-heavy one."""
+    fs = REFERENCE["fs"]
+    pre = EEGPreprocessor(sampling_rate=fs)
+    ext = EEGFeatureExtractor(sampling_rate=fs)
+
+    theta = ext.extract(pre.process(make_signal(fs, 2.0, 4, dominant="theta"))[0])
+    alpha = ext.extract(pre.process(make_signal(fs, 2.0, 4, dominant="alpha"))[0])
+
+    assert np.mean(theta["theta_alpha"]) > 1.0 > np.mean(alpha["theta_alpha"])
+
+
+# =========================
+# PER-STAGE LATENCY / ALLOCATIONS
+# =========================
+@benchmark_only
+@pytest.mark.parametrize("window, fs, channels", GRID)
+@pytest.mark.parametrize("stage", list(STAGE_BUDGETS))
+def test_stage_latency(stage, window, fs, channels):
+    """Median stage latency stays within its (size-scaled) budget."""
+    data = make_signal(fs, window, channels)
+    fn = build_stages(fs, data)[stage]
+
+    ms = measure_latency(fn)
+    budget = latency_budget(stage, data.shape)
+    assert ms <= budget, f"{stage}: {ms:.2f} ms > budget {budget:.2f} ms"
+
+
+@benchmark_only
+@pytest.mark.parametrize("window, fs, channels", GRID)
+@pytest.mark.parametrize("stage", list(STAGE_BUDGETS))
+def test_stage_allocations(stage, window, fs, channels):
+    """Peak traced allocations of one stage call stay within budget."""
+    data = make_signal(fs, window, channels)
+    fn = build_stages(fs, data)[stage]
+
+    peak = measure_peak_alloc(fn)
+    budget = alloc_budget(stage, data.shape)
+    assert peak <= budget, f"{stage}: peak {peak / 1024:.1f} KiB > budget {budget / 1024:.1f} KiB"
+
+
+# =========================
+# PYTEST-BENCHMARK (OPTIONAL)
+# =========================
+@benchmark_only
+@pytest.mark.skipif(not HAS_PYTEST_BENCHMARK, reason="pytest-benchmark not installed")
+@pytest.mark.parametrize("stage", list(STAGE_BUDGETS))
+def test_benchmark_reference_window(benchmark, stage):
+    """Reference-window stage timings for --benchmark-autosave / --benchmark-compare."""
+    fs = REFERENCE["fs"]
+    data = make_signal(fs, REFERENCE["window"], REFERENCE["channels"])
+    benchmark.group = "reference-window"
+    benchmark(build_stages(fs, data)[stage])
+
+
+@benchmark_only
+@pytest.mark.skipif(not HAS_PYTEST_BENCHMARK, reason="pytest-benchmark not installed")
+def test_benchmark_full_pipeline(benchmark):
+    """One full analysis cycle as server.py runs it (preprocess -> features -> analyze)."""
+    fs = REFERENCE["fs"]
+    data = make_signal(fs, REFERENCE["window"], REFERENCE["channels"])
+    preprocessor = EEGPreprocessor(sampling_rate=fs)
+    extractor = EEGFeatureExtractor(sampling_rate=fs)
+    analyzer = CognitiveAnalyzer()
+
+    def cycle():
+        clean, quality = preprocessor.process(data.copy())
+        return analyzer.analyze(extractor.extract(clean), signal_quality=quality)
+
+    benchmark.group = "pipeline"
+    benchmark(cycle)
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 72)
+    print(" Fumorive EEG DSP Benchmark")
+    print("=" * 72)
+    print(f"{'window':<16} {'stage':<11} {'ms':>8} {'budget':>8} {'peak KiB':>9} {'budget':>8}")
+    print("-" * 72)
+
+    for w in WINDOW_SECONDS:
+        for fs in SAMPLING_RATES:
+            for ch in CHANNEL_COUNTS:
+                data = make_signal(fs, w, ch)
+                label = f"{w:g}s {fs:g}Hz {ch}ch"
+                for stage, fn in build_stages(fs, data).items():
+                    ms = measure_latency(fn)
+                    peak = measure_peak_alloc(fn)
+                    print(
+                        f"{label:<16} {stage:<11} {ms:>8.2f} {latency_budget(stage, data.shape):>8.2f} "
+                        f"{peak / 1024:>9.1f} {alloc_budget(stage, data.shape) / 1024:>8.1f}"
+                    )
@@ -0,0 +1,128 @@
+"""
+test_kernels.py
+================
+Equivalence tests: eeg/kernels.py against the NumPy reference in
+EEGPreprocessor.
+
+The kernels also run as plain Python (`py_func`), so their logic is
+checked even where Numba is not installed; the compiled backend tests
+are skipped then.
+
+Usage:
+    cd eeg-processing
+    python -m pytest tests/test_kernels.py -v
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+from scipy.signal import sosfiltfilt
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg import designs, kernels
+from eeg.preprocessing import EEGPreprocessor
+
+requires_numba = pytest.mark.skipif(not kernels.HAS_NUMBA, reason="numba not installed")
+
+
+def python_kernel(fn):
+    """The uncompiled kernel (Numba keeps it as .py_func)."""
+    return getattr(fn, "py_func", fn)
+
+
+def make_window(n: int = 512, channels: int = 5, seed: int = 0) -> np.ndarray:
+    """Noisy window with a blink-like spike and a flat (disconnected) channel."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 256.0
+    data = 20 * np.sin(2 * np.pi * 10 * t)[:, None] + rng.normal(0, 5, (n, channels)) + 800
+    data[n // 4:n // 4 + 30, 1] += 400
+    data[:, -1] = 0.0
+    return data
+
+
+def reference_clean(pre: EEGPreprocessor, filtered: np.ndarray, window_size: int = 3) -> np.ndarray:
+    data = pre.attenuate_artifacts(filtered, threshold_factor=3.0)
+    data = pre.smooth_temporal(data, window_size=window_size)
+    data = pre.robust_baseline_correction(data)
+    return pre.robust_normalize(data)
+
+
+@pytest.mark.parametrize("window_size", [3, 5])
+def test_clean_driving_logic_matches_numpy(window_size):
+    """Fused cleanup == attenuate -> smooth -> baseline -> normalize (pure Python run)."""
+    pre = EEGPreprocessor(sampling_rate=256.0, backend="numpy")
+    filtered = pre.notch_filter(pre.bandpass_filter(make_window(256, 3)))
+
+    expected = reference_clean(pre, filtered, window_size)
+    frames = filtered[None].copy()
+    work = np.empty((4, 256))
+    got = python_kernel(kernels.clean_driving)(frames, 3.0, window_size, np.empty_like(frames), work)
+
+    assert np.allclose(got[0], expected, rtol=1e-12, atol=1e-12)
+
+
+def test_signal_quality_logic_matches_numpy():
+    """Fused quality score == EEGPreprocessor._signal_quality (pure Python run)."""
+    pre = EEGPreprocessor(sampling_rate=256.0, backend="numpy")
+    frames = np.stack([make_window(256, 3, seed=s) for s in range(3)])
+    frames[2, :, :] = 0.0  # all channels flat
+
+    got = python_kernel(kernels.signal_quality)(frames, np.empty(len(frames)), np.empty((3, 256)), np.empty((3, 3)))
+
+    assert np.allclose(got, pre._signal_quality(frames), rtol=1e-12, atol=1e-12)
+
+
+def test_sosfiltfilt_logic_matches_scipy():
+    """Zero-phase kernel == scipy.signal.sosfiltfilt with its default odd padding (pure Python run)."""
+    sos = designs.bandpass_sos(128.0, 1.0, 30.0, 4)
+    zi = designs.bandpass_zi(128.0, 1.0, 30.0, 4)
+    edge = designs.filtfilt_padlen(sos)
+    frames = make_window(128, 2)[None]
+
+    got = python_kernel(kernels.sosfiltfilt)(
+        sos, zi, frames, edge, np.empty_like(frames), np.empty(128 + 2 * edge), np.empty((len(sos), 2))
+    )
+
+    assert np.allclose(got[0], sosfiltfilt(sos, frames[0], axis=0), rtol=1e-12, atol=1e-9)
+
+
+@requires_numba
+@pytest.mark.parametrize("driving_mode", [True, False])
+@pytest.mark.parametrize("fs", [128.0, 256.0, 512.0])
+def test_numba_backend_matches_numpy(fs, driving_mode):
+    """process() gives the same window and quality on both backends."""
+    data = make_window(int(2 * fs))
+    ref, ref_quality = EEGPreprocessor(fs, driving_mode=driving_mode, backend="numpy").process(data.copy())
+    got, quality = EEGPreprocessor(fs, driving_mode=driving_mode, backend="numba").process(data.copy())
+
+    assert np.allclose(got, ref, rtol=1e-10, atol=1e-10)
+    assert quality == pytest.approx(ref_quality, abs=1e-12)
+
+
+@requires_numba
+def test_numba_backend_batch_matches_numpy():
+    """process_batch() agrees across backends, window by window."""
+    frames = np.stack([make_window(512, seed=s) for s in range(6)])
+    ref, ref_quality = EEGPreprocessor(256.0, backend="numpy").process_batch(frames)
+    got, quality = EEGPreprocessor(256.0, backend="numba").process_batch(frames)
+
+    assert got.shape == ref.shape
+    assert np.allclose(got, ref, rtol=1e-10, atol=1e-10)
+    assert np.allclose(quality, ref_quality, atol=1e-12)
+
+
+def test_backend_selection(monkeypatch):
+    """auto picks Numba when available and falls back to NumPy without it."""
+    assert EEGPreprocessor(256.0, backend="numpy").backend == "numpy"
+    assert EEGPreprocessor(256.0).backend == ("numba" if kernels.HAS_NUMBA else "numpy")
+    with pytest.raises(ValueError):
+        EEGPreprocessor(256.0, backend="cuda")
+
+    monkeypatch.setattr(kernels, "HAS_NUMBA", False)
+    assert EEGPreprocessor(256.0).backend == "numpy"
+    with pytest.raises(ImportError):
+        EEGPreprocessor(256.0, backend="numba")
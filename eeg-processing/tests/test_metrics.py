@@ -0,0 +1,89 @@
+"""
+test_metrics.py
+================
+Unit tests for pipeline stage timing (eeg/metrics.py).
+
+Usage:
+    cd eeg-processing
+    python -m pytest tests/test_metrics.py -v
+"""
+
+import sys
+import os
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg.metrics import StageTimer, dump_metrics, serve_metrics
+
+
+def test_summary_percentiles_in_ms():
+    """Rolling percentiles / mean / max per stage, in milliseconds."""
+    timer = StageTimer()
+    for ms in range(1, 101):
+        timer.record("preprocess", ms / 1000.0)
+    timer.record("send", 0.5)
+
+    summary = timer.summary()
+    assert summary["preprocess"]["count"] == 100
+    assert summary["preprocess"]["p50"] == pytest.approx(50.5)
+    assert summary["preprocess"]["p99"] == pytest.approx(np.percentile(np.arange(1, 101), 99))
+    assert summary["preprocess"]["max"] == 100.0
+    assert summary["preprocess"]["last"] == 100.0
+    assert timer.last() == {"preprocess": 100.0, "send": 500.0}
+    assert "preprocess 50.5/" in timer.format()
+
+
+def test_window_keeps_recent_samples_only():
+    """Percentiles cover the last `window` samples; count covers all of them."""
+    timer = StageTimer(window=10)
+    for _ in range(50):
+        timer.record("analyze", 1.0)
+    for _ in range(10):
+        timer.record("analyze", 0.001)
+
+    stats = timer.summary()["analyze"]
+    assert stats["count"] == 60
+    assert stats["max"] == pytest.approx(1.0)
+
+
+def test_time_context_records_on_error():
+    """Stages that raise (e.g. a send timeout) are still timed."""
+    timer = StageTimer()
+    with pytest.raises(RuntimeError):
+        with timer.time("send"):
+            raise RuntimeError("timeout")
+    with timer.time("features"):
+        pass
+
+    assert set(timer.summary()) == {"send", "features"}
+    assert timer.summary()["send"]["count"] == 1
+
+
+def test_metrics_endpoint_and_dump(tmp_path):
+    """GET /metrics serves collect() as JSON; dumps are complete JSON files."""
+    timer = StageTimer()
+    timer.record("acquire", 2.0)
+
+    server = serve_metrics(0, lambda: {"stages": timer.summary()})
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            served = json.loads(resp.read())
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert served["stages"]["acquire"]["p50"] == 2000.0
+
+    path = tmp_path / "metrics.json"
+    dump_metrics(str(path), served)
+    assert json.loads(path.read_text()) == served
+    assert not (tmp_path / "metrics.json.tmp").exists()
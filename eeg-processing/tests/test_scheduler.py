@@ -0,0 +1,121 @@
+"""
+test_scheduler.py
+==================
+Unit tests for hop scheduling of the streaming loop (eeg/scheduler.py).
+
+Usage:
+    cd eeg-processing
+    python -m pytest tests/test_scheduler.py -v
+"""
+
+import sys
+import os
+import io
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg.scheduler import HopScheduler, RingBuffer
+from eeg.synthetic import SyntheticEEGAcquisition
+
+FS = 10.0
+
+
+class QueueSource:
+    """Scripted source: `queued` samples are waiting, blocking pulls deliver new ones."""
+
+    def __init__(self, n: int = 1000, queued: int = 0):
+        self.sampling_rate = FS
+        self.data = np.arange(n * 2, dtype=float).reshape(n, 2)
+        self.timestamps = np.arange(n) / FS
+        self.available = queued
+        self.pos = 0
+
+    def pull_available(self, max_samples, timeout=0.0):
+        if timeout > 0 and self.available == self.pos:
+            self.available = min(len(self.data), self.pos + max_samples)
+        end = min(self.available, self.pos + max_samples)
+        data, ts = self.data[self.pos:end], self.timestamps[self.pos:end]
+        self.pos = end
+        return data, ts
+
+
+def test_ring_buffer_wraps_and_forgets():
+    """Windows are addressed by absolute sample index across the wrap-around."""
+    ring = RingBuffer(capacity=8, n_channels=2)
+    data = np.arange(26, dtype=float).reshape(13, 2)
+    ring.extend(data[:5], np.arange(5.0))
+    ring.extend(data[5:], np.arange(5.0, 13.0))
+
+    window, ts = ring.window(end=12, n=6)
+    assert np.array_equal(window, data[6:12])
+    assert np.array_equal(ts, np.arange(6.0, 12.0))
+    with pytest.raises(ValueError):
+        ring.window(end=8, n=4)   # overwritten
+    with pytest.raises(ValueError):
+        ring.window(end=14, n=4)  # not arrived yet
+
+
+def test_windows_end_on_hop_boundaries():
+    """k-th window = samples [k * hop, k * hop + window), overlapping by window - hop."""
+    source = QueueSource()
+    scheduler = HopScheduler(source, window=2.0, hop=0.5)
+
+    for k in range(6):
+        window, ts = scheduler.next_window()
+        start = k * 5
+        assert np.array_equal(window, source.data[start:start + 20])
+        assert ts[-1] == source.timestamps[start + 19]
+
+    assert scheduler.hops == 6
+    assert scheduler.skipped == 0
+
+
+def test_catches_up_then_skips_when_behind():
+    """A backlog is analyzed for at most max_catchup late hops; older hops are dropped."""
+    source = QueueSource(queued=20 + 10 * 5)  # first window + 10 hops already queued
+    scheduler = HopScheduler(source, window=2.0, hop=0.5, max_catchup=2)
+
+    window, _ = scheduler.next_window()
+    assert scheduler.skipped == 8
+    assert np.array_equal(window, source.data[40:60])  # 2 hops behind the newest sample
+
+    ends = []
+    for _ in range(3):
+        window, _ = scheduler.next_window()
+        ends.append(int(window[-1, 0] // 2) + 1)
+    assert ends == [65, 70, 75]  # late hops, then the newly arrived one
+    assert scheduler.skipped == 8
+
+
+def test_should_stop_aborts_the_wait():
+    class Silent:
+        sampling_rate = FS
+
+        def pull_available(self, max_samples, timeout=0.0):
+            return np.empty((0, 0)), np.empty((0,))
+
+    scheduler = HopScheduler(Silent(), window=2.0, hop=1.0, timeout=0.0)
+    assert scheduler.next_window(should_stop=lambda: True) is None
+
+
+def test_paced_source_gives_fixed_cadence():
+    """With a real-time source hops arrive every `hop / speed` seconds, not after processing."""
+    eeg = SyntheticEEGAcquisition(sampling_rate=256.0, speed=20.0, seed=1)
+    with redirect_stdout(io.StringIO()):
+        eeg.connect()
+    scheduler = HopScheduler(eeg, window=2.0, hop=1.0)
+
+    start = time.monotonic()
+    windows = [scheduler.next_window()[0] for _ in range(5)]
+    elapsed = time.monotonic() - start
+
+    # First window after 2 s, then 4 hops of 1 s, at 20x
+    assert elapsed == pytest.approx((2.0 + 4 * 1.0) / 20.0, abs=0.1)
+    assert all(w.shape == (512, 5) for w in windows)
+    assert np.array_equal(windows[1][:256], windows[0][256:])  # 1 s overlap
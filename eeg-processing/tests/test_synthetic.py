@@ -0,0 +1,118 @@
+"""
+test_synthetic.py
+==================
+Unit tests for the hardware-free EEG sources (eeg/synthetic.py).
+
+Usage:
+    cd eeg-processing
+    python -m pytest tests/test_synthetic.py -v
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eeg.acquisition import EEGAcquisition
+from eeg.features import EEGFeatureExtractor
+from eeg.preprocessing import EEGPreprocessor
+from eeg.synthetic import (
+    ReplayEEGAcquisition, SyntheticEEGAcquisition, create_acquisition
+)
+from utils import save_eeg_to_csv
+
+
+def test_synthetic_chunks_match_acquisition_contract():
+    """pull_chunk returns (samples, channels) data with monotonic timestamps."""
+    eeg = SyntheticEEGAcquisition(speed=0, seed=1)
+    eeg.connect()
+
+    data, ts = eeg.pull_chunk(duration=2.0)
+    more, ts2 = eeg.pull_chunk(duration=0.5)
+
+    assert data.shape == (512, 5)
+    assert more.shape == (128, 5)
+    assert np.all(np.diff(np.hstack([ts, ts2])) > 0)
+    assert eeg.channel_labels == ["TP9", "AF7", "AF8", "TP10", "AUX"]
+
+
+def test_synthetic_is_reproducible_with_seed():
+    """The same seed produces the same signal."""
+    a = SyntheticEEGAcquisition(speed=0, seed=7)
+    b = SyntheticEEGAcquisition(speed=0, seed=7)
+    a.connect()
+    b.connect()
+
+    assert np.array_equal(a.pull_chunk(1.0)[0], b.pull_chunk(1.0)[0])
+
+
+def test_drowsiness_drift_raises_theta_alpha():
+    """θ/α measured by the real pipeline rises as the synthetic driver gets drowsy."""
+    eeg = SyntheticEEGAcquisition(speed=0, seed=3, blink_rate=0, motion_rate=0, drowsy_after=60)
+    eeg.connect()
+    pre = EEGPreprocessor(sampling_rate=eeg.sampling_rate)
+    ext = EEGFeatureExtractor(sampling_rate=eeg.sampling_rate)
+
+    ratios = []
+    for _ in range(30):  # 60 s of 2 s windows
+        clean, _ = pre.process(eeg.pull_chunk(2.0)[0])
+        ratios.append(float(np.mean(ext.extract(clean)["theta_alpha"])))
+
+    assert np.mean(ratios[-5:]) > 2 * np.mean(ratios[:5])
+
+
+def test_blinks_hit_frontal_channels():
+    """Eye blinks show up on AF7/AF8 much more than on TP9/TP10."""
+    eeg = SyntheticEEGAcquisition(speed=0, seed=5, blink_rate=60, motion_rate=0, noise_uv=1.0)
+    eeg.connect()
+    data, _ = eeg.pull_chunk(30.0)
+
+    frontal = np.ptp(data[:, [1, 2]], axis=0).mean()
+    temporal = np.ptp(data[:, [0, 3]], axis=0).mean()
+    assert frontal > 2 * temporal
+
+
+def test_replay_csv_roundtrip_and_loop(tmp_path):
+    """A recording saved by utils.save_eeg_to_csv replays sample-for-sample, then loops."""
+    fs = 256.0
+    source = np.random.default_rng(0).normal(size=(384, 4))
+    stamps = 1000.0 + np.arange(len(source)) / fs
+    path = str(tmp_path / "rec.csv")
+    save_eeg_to_csv(source, stamps, ["TP9", "AF7", "AF8", "TP10"], path)
+
+    eeg = ReplayEEGAcquisition(path, speed=0)
+    eeg.connect()
+    assert eeg.sampling_rate == fs
+    assert eeg.channel_labels == ["TP9", "AF7", "AF8", "TP10"]
+
+    first, _ = eeg.pull_chunk(1.0)
+    wrapped, ts = eeg.pull_chunk(1.0)
+    assert np.allclose(first, source[:256])
+    assert np.allclose(wrapped[128:], source[:128])
+    assert np.all(np.diff(ts) > 0)
+
+
+def test_replay_without_loop_runs_dry(tmp_path):
+    """Without loop, the source returns empty chunks at end of file (like a silent LSL inlet)."""
+    path = str(tmp_path / "rec.csv")
+    save_eeg_to_csv(np.zeros((256, 2)), np.arange(256) / 256.0, ["TP9", "AF7"], path)
+
+    eeg = ReplayEEGAcquisition(path, speed=0, loop=False)
+    eeg.connect()
+    eeg.pull_chunk(1.0)
+
+    assert eeg.pull_chunk(1.0)[0].size == 0
+
+
+def test_create_acquisition_sources():
+    """The --source flag maps onto the right class."""
+    assert isinstance(create_acquisition("lsl"), EEGAcquisition)
+    assert isinstance(create_acquisition("synthetic", speed=0), SyntheticEEGAcquisition)
+    with pytest.raises(ValueError):
+        create_acquisition("replay")
+    with pytest.raises(ValueError):
+        create_acquisition("muse3")